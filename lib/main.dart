@@ -9,6 +9,7 @@ import 'package:fittravel/config/app_config.dart';
 import 'package:marionette_flutter/marionette_flutter.dart';
 
 void main() async {
+  final timings = StartupTimings.instance..start();
   MarionetteBinding.ensureInitialized(const MarionetteConfiguration());
 
   // Global error handling to reduce noisy preview logs and capture unexpected errors
@@ -35,10 +36,15 @@ void main() async {
     AppConfig.validate();
 
     // Initialize Supabase
-    await SupabaseConfig.initialize();
+    await timings.measure('supabase_init', SupabaseConfig.initialize);
+
+    // Fetch the first screen's data in one RPC while the first frame builds;
+    // services' own syncs wait for it instead of querying separately
+    final bootstrap = AppBootstrap.instance.start();
 
     // Important: runApp in the same zone where bindings were initialized.
     runApp(const MyApp());
+    _trackTimeToInteractive(timings, bootstrap);
   } catch (e, stackTrace) {
     // If initialization fails, show error screen instead of white screen
     debugPrint('❌ App initialization failed: $e');
@@ -47,6 +53,17 @@ void main() async {
   }
 }
 
+/// Log the first frame, then the first frame showing the startup payload
+void _trackTimeToInteractive(StartupTimings timings, Future<void> bootstrap) {
+  final firstFrame = WidgetsBinding.instance.endOfFrame
+      .then((_) => timings.mark('first_frame'));
+  Future.wait([firstFrame, bootstrap]).then((_) async {
+    // Services rebuild with the payload's rows on the next frame
+    await WidgetsBinding.instance.endOfFrame;
+    timings.mark('interactive');
+  });
+}
+
 class MyApp extends StatelessWidget {
   const MyApp({super.key});
 
@@ -54,21 +71,30 @@ class MyApp extends StatelessWidget {
   Widget build(BuildContext context) {
     return MultiProvider(
       providers: [
+        // First-screen services, initialized together at launch. Their syncs
+        // are served from the startup payload (AppBootstrap)
         ChangeNotifierProvider(
+          lazy: false,
           create: (_) => UserService()..initialize(),
         ),
         ChangeNotifierProvider(
+          lazy: false,
           create: (_) => PlaceService()..initialize(),
         ),
         ChangeNotifierProvider(
+          lazy: false,
           create: (_) => TripService()..initialize(),
         ),
         ChangeNotifierProvider(
+          lazy: false,
           create: (_) => ActivityService()..initialize(),
         ),
         ChangeNotifierProvider(
+          lazy: false,
           create: (_) => GamificationService()..initialize(),
         ),
+        // Not needed by the first screen. Providers are lazy by default, so
+        // these are created and initialized when a screen first reads them
         ChangeNotifierProvider(
           create: (_) => CommunityPhotoService()..initialize(),
         ),
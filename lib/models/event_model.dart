@@ -236,4 +236,26 @@ class EventModel {
   String toJsonString() => jsonEncode(toJson());
   factory EventModel.fromJsonString(String source) =>
       EventModel.fromJson(jsonDecode(source) as Map<String, dynamic>);
+
+  /// Create from a Supabase `events` row (snake_case keys)
+  factory EventModel.fromSupabaseJson(Map<String, dynamic> json) {
+    return EventModel(
+      id: json['id'] as String,
+      title: json['title'] as String? ?? 'Untitled Event',
+      category: eventCategoryFromString(json['category'] as String? ?? 'other'),
+      start: DateTime.parse(json['start_date'] as String),
+      end: json['end_date'] != null
+          ? DateTime.tryParse(json['end_date'] as String)
+          : null,
+      description: json['description'] as String?,
+      venueName: json['venue_name'] as String? ?? 'TBA',
+      address: json['address'] as String?,
+      latitude: (json['latitude'] as num?)?.toDouble(),
+      longitude: (json['longitude'] as num?)?.toDouble(),
+      websiteUrl: json['website_url'] as String?,
+      registrationUrl: json['registration_url'] as String?,
+      imageUrl: json['image_url'] as String?,
+      source: json['source'] as String?,
+    );
+  }
 }
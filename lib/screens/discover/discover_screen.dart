@@ -105,11 +105,18 @@ class _DiscoverScreenState extends State<DiscoverScreen>
 
     try {
       // First try to load from Supabase (cached events)
-      await eventService.fetchEventsForCity(city: city);
+      await eventService.fetchEventsForCity(
+        city: city,
+        latitude: centerLat,
+        longitude: centerLng,
+        radiusKm: 80,
+      );
 
-      // Get events from the date range filter
+      // Get events from the date range filter, paging in any the first
+      // page didn't reach
       // Use destinationOnly when we have an active trip to show only relevant events
       final range = _currentDateRange();
+      await eventService.fetchMoreEventsThrough(range.$2);
       final hasActiveTrip = tripService.activeTrip != null;
       final results = eventService.search(
         query: '',
@@ -170,6 +177,8 @@ class _DiscoverScreenState extends State<DiscoverScreen>
       final tripService = context.read<TripService>();
       final range = _currentDateRange();
       final hasActiveTrip = tripService.activeTrip != null;
+      await eventService.fetchMoreEventsThrough(range.$2);
+      if (!mounted) return;
 
       // Search locally loaded events (from Supabase)
       // Use destinationOnly when we have an active trip
@@ -672,6 +681,7 @@ class _DiscoverScreenState extends State<DiscoverScreen>
           // Use destinationOnly when we have an active trip
           final range = _currentDateRange();
           final hasActiveTrip = activeTrip != null;
+          await eventService.fetchMoreEventsThrough(range.$2);
           final results = eventService.search(
             query: '',
             startDate: range.$1,
@@ -14,6 +14,7 @@ import 'package:fittravel/services/trip_service.dart';
 import 'package:fittravel/services/google_places_service.dart';
 import 'package:fittravel/services/user_service.dart';
 import 'package:fittravel/services/community_photo_service.dart';
+import 'package:fittravel/services/photo_storage_service.dart';
 import 'package:fittravel/models/community_photo.dart';
 import 'package:fittravel/services/review_service.dart';
 import 'package:fittravel/models/review_model.dart';
@@ -1242,6 +1243,13 @@ class _CommunityPhotosSection extends StatelessWidget {
             ),
           ],
         ),
+        if (svc.pendingUploadCount > 0) ...[
+          const SizedBox(height: 8),
+          _PendingUploadsBanner(
+            count: svc.pendingUploadCount,
+            progress: svc.uploadProgress,
+          ),
+        ],
         const SizedBox(height: 12),
         if (photos.isEmpty)
           Container(
@@ -1285,7 +1293,8 @@ class _CommunityPhotosSection extends StatelessWidget {
                   borderRadius: BorderRadius.circular(AppRadius.md),
                   child: ClipRRect(
                     borderRadius: BorderRadius.circular(AppRadius.md),
-                    child: _CommunityImage(imageUrl: p.imageUrl),
+                    child:
+                        _CommunityImage(imageUrl: p.imageUrl, thumbnail: true),
                   ),
                 ),
               );
@@ -1914,7 +1923,7 @@ class _AddPhotoSheetState extends State<_AddPhotoSheet> {
         navigator.pop();
         scaffoldMessenger.showSnackBar(
           const SnackBar(
-              content: Text('Photo added!'),
+              content: Text('Photo added! It will appear once uploaded.'),
               behavior: SnackBarBehavior.floating),
         );
       }
@@ -2041,9 +2050,47 @@ class _AddPhotoSheetState extends State<_AddPhotoSheet> {
   }
 }
 
+/// Photos queued for upload, with the progress of those in flight. Jobs
+/// that ran out of retries have no progress and wait for the next launch.
+class _PendingUploadsBanner extends StatelessWidget {
+  final int count;
+  final double? progress;
+  const _PendingUploadsBanner({required this.count, this.progress});
+
+  @override
+  Widget build(BuildContext context) {
+    final colors = Theme.of(context).colorScheme;
+    final textStyles = Theme.of(context).textTheme;
+    final photos = count == 1 ? '1 photo' : '$count photos';
+    return Column(
+      crossAxisAlignment: CrossAxisAlignment.start,
+      children: [
+        Text(
+          progress != null
+              ? 'Uploading $photos…'
+              : '$photos waiting to upload',
+          style:
+              textStyles.bodySmall?.copyWith(color: colors.onSurfaceVariant),
+        ),
+        if (progress != null) ...[
+          const SizedBox(height: 6),
+          ClipRRect(
+            borderRadius: BorderRadius.circular(AppRadius.sm),
+            child: LinearProgressIndicator(value: progress),
+          ),
+        ],
+      ],
+    );
+  }
+}
+
 class _CommunityImage extends StatelessWidget {
   final String imageUrl;
-  const _CommunityImage({required this.imageUrl});
+
+  /// Load the small upload-time thumbnail instead of the full photo, for
+  /// grid tiles
+  final bool thumbnail;
+  const _CommunityImage({required this.imageUrl, this.thumbnail = false});
 
   @override
   Widget build(BuildContext context) {
@@ -2061,7 +2108,7 @@ class _CommunityImage extends StatelessWidget {
         );
       }
     }
-    return Image.network(
+    final full = Image.network(
       imageUrl,
       fit: BoxFit.cover,
       errorBuilder: (context, error, stack) => Container(
@@ -2070,6 +2117,15 @@ class _CommunityImage extends StatelessWidget {
             Icon(Icons.broken_image_outlined, color: colors.onSurfaceVariant),
       ),
     );
+    final thumbnailUrl =
+        thumbnail ? PhotoStorageService.getThumbnailUrl(imageUrl) : null;
+    if (thumbnailUrl == null) return full;
+    // Photos uploaded before thumbnails existed fall back to the full image
+    return Image.network(
+      thumbnailUrl,
+      fit: BoxFit.cover,
+      errorBuilder: (context, error, stack) => full,
+    );
   }
 }
 
@@ -216,17 +216,49 @@ class _FitnessGuideScreenState extends State<FitnessGuideScreen> {
     // Scroll to bottom to show user message
     WidgetsBinding.instance.addPostFrameCallback((_) => _scrollToBottom());
 
+    // Index of the assistant message being streamed in, once text arrives
+    int? replyIndex;
+
     try {
-      // Use askFitnessGuide to get structured response with suggested places
+      // Stream the reply so text and places render as they are generated
       // Location priority: MapContextService > Active Trip > "your area"
-      final response = await _aiGuide.askFitnessGuide(
+      FitnessGuideResponse? response;
+      await for (final update in _aiGuide.streamFitnessGuide(
         question: question,
         destination: _currentDestination,
         userLat: _currentLat,
         userLng: _currentLng,
-      );
+      )) {
+        if (!mounted) return;
+        if (update.isDone) {
+          response = update.response;
+          break;
+        }
+        if (update.text.isEmpty) continue;
+
+        final draft = AiChatMessage.assistant(
+          update.text,
+          suggestedPlaces: update.suggestedPlaces,
+          elements: update.suggestedPlaces.isEmpty
+              ? null
+              : [MessageElement.places(update.suggestedPlaces)],
+        );
+        final isFirstChunk = replyIndex == null;
+        setState(() {
+          if (replyIndex == null) {
+            _messages.add(draft);
+            replyIndex = _messages.length - 1;
+          } else {
+            _messages[replyIndex!] = draft;
+          }
+          _isLoading = false;
+        });
+        if (isFirstChunk) {
+          WidgetsBinding.instance.addPostFrameCallback((_) => _scrollToBottom());
+        }
+      }
 
-      if (mounted) {
+      if (mounted && response != null) {
         // Build elements list from response
         final elements = <MessageElement>[];
 
@@ -265,12 +297,17 @@ class _FitnessGuideScreenState extends State<FitnessGuideScreen> {
           }
         }
 
+        final reply = AiChatMessage.assistant(
+          cleanText,
+          suggestedPlaces: response.suggestedPlaces,
+          elements: elements.isEmpty ? null : elements,
+        );
         setState(() {
-          _messages.add(AiChatMessage.assistant(
-            cleanText,
-            suggestedPlaces: response.suggestedPlaces,
-            elements: elements.isEmpty ? null : elements,
-          ));
+          if (replyIndex == null) {
+            _messages.add(reply);
+          } else {
+            _messages[replyIndex!] = reply;
+          }
           _isLoading = false;
         });
 
@@ -282,9 +319,14 @@ class _FitnessGuideScreenState extends State<FitnessGuideScreen> {
     } catch (e) {
       if (mounted) {
         setState(() {
-          _messages.add(AiChatMessage.assistant(
+          final error = AiChatMessage.assistant(
             'Sorry, something went wrong. Please try again.',
-          ));
+          );
+          if (replyIndex == null) {
+            _messages.add(error);
+          } else {
+            _messages[replyIndex!] = error;
+          }
           _isLoading = false;
         });
         _saveConversation();
@@ -1,14 +1,45 @@
+import 'dart:async';
 import 'package:flutter/material.dart';
 import 'package:go_router/go_router.dart';
 import 'package:fittravel/nav.dart';
+import 'package:fittravel/services/local_store.dart';
 import 'package:fittravel/theme.dart';
 import 'package:fittravel/utils/haptic_utils.dart';
 
-class MainShell extends StatelessWidget {
+class MainShell extends StatefulWidget {
   final Widget child;
 
   const MainShell({super.key, required this.child});
 
+  @override
+  State<MainShell> createState() => _MainShellState();
+}
+
+class _MainShellState extends State<MainShell> {
+  StreamSubscription<DroppedWrite>? _droppedSub;
+
+  @override
+  void initState() {
+    super.initState();
+    // Offline edits the server kept rejecting are gone; say so
+    _droppedSub = LocalStore.droppedWrites.listen((_) {
+      if (!mounted) return;
+      ScaffoldMessenger.of(context).showSnackBar(
+        SnackBar(
+          content: const Text('A change made offline couldn\'t be saved'),
+          backgroundColor: Theme.of(context).colorScheme.error,
+          behavior: SnackBarBehavior.floating,
+        ),
+      );
+    });
+  }
+
+  @override
+  void dispose() {
+    _droppedSub?.cancel();
+    super.dispose();
+  }
+
   @override
   Widget build(BuildContext context) {
     final location = GoRouterState.of(context).uri.toString();
@@ -16,7 +47,7 @@ class MainShell extends StatelessWidget {
     final colors = context.colorScheme;
 
     return Scaffold(
-      body: child,
+      body: widget.child,
       bottomNavigationBar: Container(
         decoration: BoxDecoration(
           border: Border(
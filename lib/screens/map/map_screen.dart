@@ -19,6 +19,8 @@ import 'package:fittravel/screens/map/widgets/map_place_preview.dart';
 import 'package:fittravel/screens/map/widgets/location_search_bar.dart';
 import 'package:fittravel/widgets/ai_map_concierge.dart';
 import 'package:fittravel/utils/haptic_utils.dart';
+import 'package:fittravel/utils/marker_clusterer.dart';
+import 'package:fittravel/utils/marker_differ.dart';
 import 'package:flutter_animate/flutter_animate.dart';
 import 'package:fittravel/models/ai_models.dart';
 
@@ -69,6 +71,20 @@ class _MapScreenState extends State<MapScreen> {
   final Map<String, PlaceModel> _placeMarkers = {};
   final Map<String, EventModel> _eventMarkers = {};
 
+  // Rebuilds only allocate markers that actually changed
+  final MarkerDiffer _markerDiffer = MarkerDiffer();
+  // Places of the current AI concierge reply, kept apart from the
+  // clustered items so marker rebuilds don't drop them. Cleared when a new
+  // question is asked or the concierge closes.
+  final Map<MarkerId, (SuggestedPlace, Marker)> _aiMarkers = {};
+  // AI markers on the map after category filters
+  Set<MarkerId> _shownAiMarkerIds = {};
+  int _markerGeneration = 0;
+
+  // Visible region and zoom used for viewport clustering
+  ClusterViewport? _visibleViewport;
+  double _currentZoom = 13;
+
   // Filters
   Set<MapFilterType> _activeFilters = {MapFilterType.all};
 
@@ -313,58 +329,148 @@ class _MapScreenState extends State<MapScreen> {
     }
   }
 
-  void _updateMarkers(Set<Marker> markers) {
-    setState(() => _markers = markers);
+  /// Show the rendered cluster markers plus the AI suggestions the active
+  /// filters allow
+  void _updateMarkers() {
+    _shownAiMarkerIds = _visibleAiMarkerIds();
+    setState(() => _markers = {
+          ..._markerDiffer.markers,
+          for (final id in _shownAiMarkerIds) _aiMarkers[id]!.$2,
+        });
   }
 
+  Set<MarkerId> _visibleAiMarkerIds() => {
+        for (final entry in _aiMarkers.entries)
+          if (_shouldShowAiPlace(entry.value.$1)) entry.key,
+      };
+
   void _updateMarkersFromItems() {
-    final markers = <Marker>{};
+    unawaited(_rebuildMarkers());
+  }
+
+  /// Cluster visible items for the current camera and diff against the
+  /// previously rendered markers
+  Future<void> _rebuildMarkers() async {
+    final generation = ++_markerGeneration;
     final placeService = context.read<PlaceService>();
     final savedPlaceIds =
         placeService.savedPlaces.map((p) => p.googlePlaceId ?? p.id).toSet();
 
+    final items = <String, dynamic>{};
+    final points = <ClusterPoint>[];
+
     // Add place markers
     for (final entry in _placeMarkers.entries) {
       final place = entry.value;
       if (!_shouldShowPlace(place)) continue;
 
-      final placeId = place.googlePlaceId ?? place.id;
-      final isSaved = savedPlaceIds.contains(placeId);
-
-      markers.add(Marker(
-        markerId: MarkerId('place_${entry.key}'),
-        position: LatLng(place.latitude ?? 0.0, place.longitude ?? 0.0),
-        icon: _getMarkerIcon(place.type, isSaved: isSaved),
-        alpha: isSaved ? 1.0 : 0.85, // Saved places are more prominent
-        onTap: () => _onMarkerTapped(place),
-      ));
+      final id = 'place_${entry.key}';
+      items[id] = place;
+      points.add(
+          ClusterPoint(id, place.latitude ?? 0.0, place.longitude ?? 0.0));
     }
 
-    // Add event markers (Royal Purple from premium theme)
+    // Add event markers
     if (_activeFilters.contains(MapFilterType.all) ||
         _activeFilters.contains(MapFilterType.events)) {
       for (final entry in _eventMarkers.entries) {
         final event = entry.value;
         if (event.latitude != null && event.longitude != null) {
-          markers.add(Marker(
-            markerId: MarkerId('event_${entry.key}'),
-            position: LatLng(event.latitude!, event.longitude!),
-            icon:
-                BitmapDescriptor.defaultMarkerWithHue(AppColors.markerHueEvent),
-            onTap: () => _onMarkerTapped(event),
-          ));
+          final id = 'event_${entry.key}';
+          items[id] = event;
+          points.add(ClusterPoint(id, event.latitude!, event.longitude!));
         }
       }
     }
 
-    _updateMarkers(markers);
+    final clusters = await MarkerClusterer.clusterAsync(ClusterRequest(
+      points: points,
+      viewport: _visibleViewport?.padded(0.25),
+      zoom: _currentZoom,
+    ));
+    // A newer rebuild started while this one was clustering
+    if (!mounted || generation != _markerGeneration) return;
+
+    final diff = _markerDiffer.update(clusters, (cluster) {
+      final markerId = MarkerId(cluster.id);
+      final item = cluster.isSingle ? items[cluster.id] : null;
+      final isSaved = item is PlaceModel &&
+          savedPlaceIds.contains(item.googlePlaceId ?? item.id);
+      return switch (item) {
+        PlaceModel place => (
+            MarkerDiffer.itemSignature('place', place, saved: isSaved),
+            () => _buildPlaceMarker(markerId, place, isSaved),
+          ),
+        EventModel event => (
+            MarkerDiffer.itemSignature('event', event),
+            () => _buildEventMarker(markerId, event),
+          ),
+        _ => (
+            MarkerDiffer.clusterSignature(cluster),
+            () => _buildClusterMarker(markerId, cluster),
+          ),
+      };
+    });
+
+    final aiChanged = !setEquals(_visibleAiMarkerIds(), _shownAiMarkerIds);
+    if (diff.built == 0 && diff.removed == 0 && !aiChanged) return;
+
+    _updateMarkers();
+  }
+
+  Marker _buildPlaceMarker(MarkerId markerId, PlaceModel place, bool isSaved) {
+    return Marker(
+      markerId: markerId,
+      position: LatLng(place.latitude ?? 0.0, place.longitude ?? 0.0),
+      icon: _getMarkerIcon(place.type, isSaved: isSaved),
+      alpha: isSaved ? 1.0 : 0.85, // Saved places are more prominent
+      onTap: () => _onMarkerTapped(place),
+    );
+  }
+
+  /// Event markers use Royal Purple from premium theme
+  Marker _buildEventMarker(MarkerId markerId, EventModel event) {
+    return Marker(
+      markerId: markerId,
+      position: LatLng(event.latitude!, event.longitude!),
+      icon: BitmapDescriptor.defaultMarkerWithHue(AppColors.markerHueEvent),
+      onTap: () => _onMarkerTapped(event),
+    );
+  }
+
+  /// Cluster marker; tapping zooms in so the cluster splits apart
+  Marker _buildClusterMarker(MarkerId markerId, MapCluster cluster) {
+    final position = LatLng(cluster.latitude, cluster.longitude);
+    return Marker(
+      markerId: markerId,
+      position: position,
+      icon: BitmapDescriptor.defaultMarkerWithHue(BitmapDescriptor.hueCyan),
+      infoWindow: InfoWindow(
+        title: '${cluster.size} spots here',
+        snippet: 'Tap to zoom in',
+      ),
+      onTap: () {
+        HapticUtils.light();
+        _mapController?.animateCamera(
+          CameraUpdate.newLatLngZoom(position, _currentZoom + 2),
+        );
+      },
+    );
   }
 
   bool _shouldShowPlace(PlaceModel place) {
     if (_activeFilters.contains(MapFilterType.all)) return true;
     if (_activeFilters.contains(MapFilterType.saved)) return true;
+    return _matchesCategoryFilter(place.type);
+  }
 
-    switch (place.type) {
+  /// AI suggestions aren't saved places, so only category filters apply
+  bool _shouldShowAiPlace(SuggestedPlace place) =>
+      _activeFilters.contains(MapFilterType.all) ||
+      _matchesCategoryFilter(_parsePlaceType(place.type));
+
+  bool _matchesCategoryFilter(PlaceType type) {
+    switch (type) {
       case PlaceType.gym:
         return _activeFilters.contains(MapFilterType.gyms);
       case PlaceType.restaurant:
@@ -444,6 +550,26 @@ class _MapScreenState extends State<MapScreen> {
     }
   }
 
+  Future<void> _onCameraIdle() async {
+    final controller = _mapController;
+    if (controller == null) return;
+
+    try {
+      final bounds = await controller.getVisibleRegion();
+      if (!mounted) return;
+      _visibleViewport = ClusterViewport(
+        south: bounds.southwest.latitude,
+        west: bounds.southwest.longitude,
+        north: bounds.northeast.latitude,
+        east: bounds.northeast.longitude,
+      );
+      _currentZoom = _currentCameraPosition?.zoom ?? _currentZoom;
+      _updateMarkersFromItems();
+    } catch (e) {
+      debugPrint('MapScreen: Error reading visible region: $e');
+    }
+  }
+
   void _searchThisArea() {
     HapticUtils.medium();
     if (_currentCameraPosition != null) {
@@ -643,6 +769,7 @@ class _MapScreenState extends State<MapScreen> {
             GoogleMap(
               onMapCreated: _onMapCreated,
               onCameraMove: _onCameraMove,
+              onCameraIdle: _onCameraIdle,
               initialCameraPosition: CameraPosition(
                 target: _center,
                 zoom: 13,
@@ -922,6 +1049,8 @@ class _MapScreenState extends State<MapScreen> {
             userLat: _center.latitude,
             userLng: _center.longitude,
             onPlacesSuggested: _onAiPlacesSuggested,
+            onSuggestionsComplete: _fitAiPlaces,
+            onSuggestionsCleared: _clearAiPlaces,
             onPlaceTapped: _onAiPlaceTapped,
             isBottomSheetOpen: _selectedItem != null,
           ),
@@ -932,12 +1061,13 @@ class _MapScreenState extends State<MapScreen> {
 
   void _onAiPlacesSuggested(List<SuggestedPlace> places) {
     // Add suggested places as markers on the map
-    final newMarkers = <Marker>{};
+    final newMarkers = <MarkerId, (SuggestedPlace, Marker)>{};
 
     for (final place in places) {
       if (place.hasCoordinates) {
-        newMarkers.add(Marker(
-          markerId: MarkerId('ai_${place.name}'),
+        final markerId = MarkerId('ai_${place.name}');
+        newMarkers[markerId] = (place, Marker(
+          markerId: markerId,
           position: LatLng(place.lat!, place.lng!),
           icon: BitmapDescriptor.defaultMarkerWithHue(
               AppColors.markerHueEvent), // AI suggestions use event color
@@ -951,29 +1081,39 @@ class _MapScreenState extends State<MapScreen> {
     }
 
     if (newMarkers.isNotEmpty) {
-      setState(() {
-        _markers = {..._markers, ...newMarkers};
-      });
+      _aiMarkers.addAll(newMarkers);
+      _updateMarkers();
+    }
+  }
 
-      // Zoom to show all suggested places if multiple
-      if (places.length > 1) {
-        final bounds = _calculateBounds(places
-            .where((p) => p.hasCoordinates)
-            .map((p) => LatLng(p.lat!, p.lng!))
-            .toList());
-        if (bounds != null) {
-          _mapController?.animateCamera(
-            CameraUpdate.newLatLngBounds(bounds, 100),
-          );
-        }
-      } else if (places.length == 1 && places.first.hasCoordinates) {
+  /// Drop the previous reply's places (new question, or concierge closed)
+  void _clearAiPlaces() {
+    if (_aiMarkers.isEmpty) return;
+    _aiMarkers.clear();
+    _updateMarkersFromItems();
+  }
+
+  /// Move the camera once the reply is complete, rather than on every
+  /// place as it streams in
+  void _fitAiPlaces(List<SuggestedPlace> places) {
+    final located = places.where((p) => p.hasCoordinates).toList();
+
+    // Zoom to show all suggested places if multiple
+    if (located.length > 1) {
+      final bounds = _calculateBounds(
+          located.map((p) => LatLng(p.lat!, p.lng!)).toList());
+      if (bounds != null) {
         _mapController?.animateCamera(
-          CameraUpdate.newLatLngZoom(
-            LatLng(places.first.lat!, places.first.lng!),
-            15,
-          ),
+          CameraUpdate.newLatLngBounds(bounds, 100),
         );
       }
+    } else if (located.length == 1) {
+      _mapController?.animateCamera(
+        CameraUpdate.newLatLngZoom(
+          LatLng(located.first.lat!, located.first.lng!),
+          15,
+        ),
+      );
     }
   }
 
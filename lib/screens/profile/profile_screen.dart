@@ -6,6 +6,7 @@ import 'package:fittravel/theme.dart';
 import 'package:fittravel/services/user_service.dart';
 import 'package:fittravel/services/activity_service.dart';
 import 'package:fittravel/services/gamification_service.dart';
+import 'package:fittravel/services/local_store.dart';
 import 'package:fittravel/models/user_model.dart';
 import 'package:fittravel/models/activity_model.dart';
 import 'package:fittravel/models/badge_model.dart';
@@ -174,6 +175,11 @@ class _ProfileScreenState extends State<ProfileScreen> {
     if (confirmed == true && context.mounted) {
       // Clear user service
       context.read<UserService>().clearUser();
+      // Drop offline cache and queued writes so they never leak across accounts
+      final userId = SupabaseConfig.auth.currentUser?.id;
+      final store = await LocalStore.getInstance();
+      if (userId != null) await store.clearScope(userId);
+      await store.clearPendingWrites();
       // Sign out from Supabase
       await SupabaseConfig.auth.signOut();
     }
@@ -1,8 +1,13 @@
 import 'package:flutter/foundation.dart';
+import 'package:uuid/uuid.dart';
 import 'package:fittravel/models/models.dart';
+import 'package:fittravel/services/delta_sync.dart';
+import 'package:fittravel/services/local_store.dart';
 import 'package:fittravel/supabase/supabase_config.dart';
 
 class ActivityService extends ChangeNotifier {
+  static const String _table = 'activities';
+
   List<ActivityModel> _activities = [];
   bool _isLoading = false;
   String? _error;
@@ -45,26 +50,41 @@ class ActivityService extends ChangeNotifier {
         return;
       }
 
-      // Fetch user's activities from Supabase
-      final activitiesData = await SupabaseConfig.client
-          .from('activities')
-          .select()
-          .eq('user_id', userId)
-          .order('completed_at', ascending: false);
+      final store = await LocalStore.getInstance();
 
-      _activities = (activitiesData as List)
-          .map((json) => ActivityModel.fromSupabaseJson(json))
-          .toList();
+      // Show the last synced activities immediately, then pull changes
+      _setActivities(await store.rows(userId, _table));
+      if (_activities.isNotEmpty) {
+        _isLoading = false;
+        notifyListeners();
+      }
+
+      await store.replayPendingWrites();
+      final rows = await DeltaSync.pull(
+        store,
+        scope: userId,
+        table: _table,
+        filters: {'user_id': userId},
+      );
+      _setActivities(rows);
     } catch (e) {
-      _error = 'Failed to load activities';
       debugPrint('ActivityService.initialize error: $e');
-      _activities = [];
+      // Keep locally cached activities when offline
+      if (_activities.isEmpty) {
+        _error = 'Failed to load activities';
+      }
     }
 
     _isLoading = false;
     notifyListeners();
   }
 
+  void _setActivities(List<Map<String, dynamic>> rows) {
+    _activities =
+        rows.map((json) => ActivityModel.fromSupabaseJson(json)).toList()
+          ..sort((a, b) => b.completedAt.compareTo(a.completedAt));
+  }
+
   Future<ActivityModel> logActivity({
     required ActivityType type,
     required String title,
@@ -82,7 +102,10 @@ class ActivityService extends ChangeNotifier {
     final xp = ActivityModel.calculateXp(type, durationMinutes);
 
     try {
+      final now = DateTime.now();
+      // Client-generated id so the insert can be queued and replayed offline
       final data = {
+        'id': const Uuid().v4(),
         'user_id': userId,
         'trip_id': tripId,
         'activity_type': type.name,
@@ -92,19 +115,19 @@ class ActivityService extends ChangeNotifier {
         'duration_minutes': durationMinutes,
         'calories_burned': caloriesBurned,
         'xp_earned': xp,
-        'completed_at': DateTime.now().toIso8601String(),
+        'completed_at': now.toIso8601String(),
+        'created_at': now.toIso8601String(),
       };
 
-      final result = await SupabaseService.insert('activities', data);
+      final store = await LocalStore.getInstance();
+      await store.writeOrQueue(PendingWrite.insert(_table, data));
+      await store.upsertRows(userId, _table, [data]);
 
-      if (result.isNotEmpty) {
-        final activity = ActivityModel.fromSupabaseJson(result.first);
-        _activities.insert(0, activity);
-        _error = null;
-        notifyListeners();
-        return activity;
-      }
-      throw Exception('Failed to log activity');
+      final activity = ActivityModel.fromSupabaseJson(data);
+      _activities.insert(0, activity);
+      _error = null;
+      notifyListeners();
+      return activity;
     } catch (e) {
       _error = 'Failed to log activity';
       debugPrint('ActivityService.logActivity error: $e');
@@ -114,8 +137,14 @@ class ActivityService extends ChangeNotifier {
   }
 
   Future<void> deleteActivity(String activityId) async {
+    final userId = _currentUserId;
+    if (userId == null) return;
+
     try {
-      await SupabaseService.delete('activities', filters: {'id': activityId});
+      final store = await LocalStore.getInstance();
+      await store.writeOrQueue(
+          PendingWrite.delete(_table, filters: {'id': activityId}));
+      await store.deleteRows(userId, _table, [activityId]);
 
       _activities.removeWhere((a) => a.id == activityId);
       _error = null;
@@ -1,6 +1,10 @@
+import 'dart:convert';
 import 'package:flutter/foundation.dart';
+import 'package:http/http.dart' as http;
+import 'package:fittravel/config/app_config.dart';
 import 'package:fittravel/supabase/supabase_config.dart';
 import 'package:fittravel/models/ai_models.dart';
+import 'package:fittravel/services/ai_guide_stream.dart';
 import 'package:supabase_flutter/supabase_flutter.dart';
 // We stick to Gemini via Supabase Edge Functions. No OpenAI fallback.
 
@@ -11,6 +15,10 @@ import 'package:supabase_flutter/supabase_flutter.dart';
 /// - Fitness itinerary generation
 /// - Place insights with caching
 /// - AIML-powered smart recommendations
+///
+/// The fitness guide chat also has a streaming variant
+/// ([streamFitnessGuide]) that renders the reply as it is generated and
+/// falls back to the regular request if streaming fails.
 class AiGuideService {
   // Edge function names
   static const String _cairoGuideFn = 'cairo_guide';
@@ -20,9 +28,31 @@ class AiGuideService {
   static const String _fitnessIntelFn = 'analyze_place_fitness';
   static const String _quickInsightsFn = 'generate_quick_insights';
 
+  // Give up on a stream that goes quiet for this long
+  static const Duration _streamIdleTimeout = Duration(seconds: 30);
+
+  // Screens and widgets each create their own service; sharing one client
+  // for the app's lifetime keeps its connections pooled instead of leaking
+  // a client per instance
+  static final http.Client _sharedHttpClient = http.Client();
+
+  final http.Client _httpClient;
+
+  AiGuideService({http.Client? httpClient})
+      : _httpClient = httpClient ?? _sharedHttpClient;
+
   // Conversation history for context-aware responses
   final List<AiChatMessage> _conversationHistory = [];
 
+  Duration? _lastTimeToFirstToken;
+  Duration? _lastStreamDuration;
+
+  /// Time from sending the last streamed question to its first text chunk
+  Duration? get lastTimeToFirstToken => _lastTimeToFirstToken;
+
+  /// Total time of the last streamed reply
+  Duration? get lastStreamDuration => _lastStreamDuration;
+
   /// Get current conversation history
   List<AiChatMessage> get conversationHistory =>
       List.unmodifiable(_conversationHistory);
@@ -134,22 +164,116 @@ class AiGuideService {
     String? fitnessLevel,
     List<String>? dietaryPreferences,
   }) async {
+    final body = _startFitnessGuideTurn(
+      question: question,
+      destination: destination,
+      userLat: userLat,
+      userLng: userLng,
+      mapBounds: mapBounds,
+      fitnessLevel: fitnessLevel,
+      dietaryPreferences: dietaryPreferences,
+    );
+    final response = await _invokeFitnessGuide(body);
+    _finishFitnessGuideTurn(response);
+    return response;
+  }
+
+  /// Streaming variant of [askFitnessGuide].
+  ///
+  /// Emits the reply text and suggested places parsed so far as they
+  /// arrive; the last update carries the complete [GuideStreamUpdate.response].
+  /// Falls back to the regular request if the stream fails before any text
+  /// arrives.
+  Stream<GuideStreamUpdate> streamFitnessGuide({
+    required String question,
+    String? destination,
+    double? userLat,
+    double? userLng,
+    Map<String, double>? mapBounds,
+    String? fitnessLevel,
+    List<String>? dietaryPreferences,
+  }) async* {
+    final body = _startFitnessGuideTurn(
+      question: question,
+      destination: destination,
+      userLat: userLat,
+      userLng: userLng,
+      mapBounds: mapBounds,
+      fitnessLevel: fitnessLevel,
+      dietaryPreferences: dietaryPreferences,
+    );
+    final stopwatch = Stopwatch()..start();
+    _lastTimeToFirstToken = null;
+    final parser = GuideReplyStreamParser();
+    FitnessGuideResponse? response;
+
     try {
-      // Add user message to history
-      _conversationHistory.add(AiChatMessage.user(question));
-
-      // Build conversation history for context
-      final historyForApi = _conversationHistory
-          .take(10) // Limit history to last 10 messages
-          .map((m) =>
-              {'role': m.isUser ? 'user' : 'assistant', 'content': m.content})
-          .toList();
-
-      // Enhance question for guided search
-      String enhancedQuestion = question;
-      if (_isGuidedSearchRequest(question) &&
-          _conversationHistory.length <= 2) {
-        enhancedQuestion = '''
+      await for (final event in _postStream(_egyptGuideFn, body)) {
+        final data = jsonDecode(event.data);
+        if (event.event == 'delta' && data is Map) {
+          final chunk = data['text'] as String? ?? '';
+          if (chunk.isNotEmpty && parser.rawText.isEmpty) {
+            _recordFirstToken(_egyptGuideFn, stopwatch);
+          }
+          if (parser.add(chunk)) {
+            yield GuideStreamUpdate(
+              text: parser.text,
+              suggestedPlaces: parser.suggestedPlaces,
+            );
+          }
+        } else if (event.event == 'done' && data is Map) {
+          response = EgyptGuideResponse.fromJson(data.cast<String, dynamic>());
+        } else if (event.event == 'error') {
+          throw StateError('Stream error: ${event.data}');
+        }
+      }
+    } catch (e) {
+      debugPrint('AiGuideService.streamFitnessGuide error: $e');
+    }
+
+    _recordStreamEnd(_egyptGuideFn, stopwatch);
+    if (response == null && parser.text.trim().isNotEmpty) {
+      // Cut off mid-stream: keep what was shown
+      response = EgyptGuideResponse(
+        text: parser.text,
+        suggestedPlaces: parser.suggestedPlaces,
+      );
+    }
+    // Nothing streamed: fall back to the regular request
+    response ??= await _invokeFitnessGuide(body);
+
+    _finishFitnessGuideTurn(response);
+    yield GuideStreamUpdate(
+      text: response.text,
+      suggestedPlaces: response.suggestedPlaces,
+      response: response,
+    );
+  }
+
+  /// Record the user's question and build the request body
+  Map<String, dynamic> _startFitnessGuideTurn({
+    required String question,
+    String? destination,
+    double? userLat,
+    double? userLng,
+    Map<String, double>? mapBounds,
+    String? fitnessLevel,
+    List<String>? dietaryPreferences,
+  }) {
+    // Add user message to history
+    _conversationHistory.add(AiChatMessage.user(question));
+
+    // Build conversation history for context
+    final historyForApi = _conversationHistory
+        .take(10) // Limit history to last 10 messages
+        .map((m) =>
+            {'role': m.isUser ? 'user' : 'assistant', 'content': m.content})
+        .toList();
+
+    // Enhance question for guided search
+    String enhancedQuestion = question;
+    if (_isGuidedSearchRequest(question) && _conversationHistory.length <= 2) {
+      enhancedQuestion = '''
 I want to start a guided search for fitness places. Please ask me questions to understand:
 1. What type of place I'm looking for (gym, restaurant, park, trail, etc.)
 2. How much time I have available
@@ -158,36 +282,39 @@ I want to start a guided search for fitness places. Please ask me questions to u
 
 Start by asking the first question to begin the guided conversation.
 ''';
-      }
+    }
+
+    return {
+      'question': enhancedQuestion,
+      if (destination != null) 'destination': destination,
+      if (userLat != null && userLng != null)
+        'userLocation': {'lat': userLat, 'lng': userLng},
+      if (mapBounds != null) 'mapBounds': mapBounds,
+      if (fitnessLevel != null) 'fitnessLevel': fitnessLevel,
+      if (dietaryPreferences != null && dietaryPreferences.isNotEmpty)
+        'dietaryPreferences': dietaryPreferences,
+      'conversationHistory': historyForApi,
+      'isGuidedSearch': _isGuidedSearchRequest(question),
+    };
+  }
+
+  /// Add the assistant's reply to history
+  void _finishFitnessGuideTurn(FitnessGuideResponse response) {
+    _conversationHistory.add(AiChatMessage.assistant(
+      response.text,
+      suggestedPlaces: response.suggestedPlaces,
+    ));
+  }
 
+  Future<FitnessGuideResponse> _invokeFitnessGuide(
+      Map<String, dynamic> body) async {
+    try {
       final FunctionsClient functions = SupabaseConfig.client.functions;
-      final invokeRes = await functions.invoke(
-        _egyptGuideFn,
-        body: {
-          'question': enhancedQuestion,
-          if (destination != null) 'destination': destination,
-          if (userLat != null && userLng != null)
-            'userLocation': {'lat': userLat, 'lng': userLng},
-          if (mapBounds != null) 'mapBounds': mapBounds,
-          if (fitnessLevel != null) 'fitnessLevel': fitnessLevel,
-          if (dietaryPreferences != null && dietaryPreferences.isNotEmpty)
-            'dietaryPreferences': dietaryPreferences,
-          'conversationHistory': historyForApi,
-          'isGuidedSearch': _isGuidedSearchRequest(question),
-        },
-      );
+      final invokeRes = await functions.invoke(_egyptGuideFn, body: body);
 
       if (invokeRes.data is Map) {
         final data = (invokeRes.data as Map).cast<String, dynamic>();
-        final response = EgyptGuideResponse.fromJson(data);
-
-        // Add assistant response to history
-        _conversationHistory.add(AiChatMessage.assistant(
-          response.text,
-          suggestedPlaces: response.suggestedPlaces,
-        ));
-
-        return response;
+        return EgyptGuideResponse.fromJson(data);
       }
 
       debugPrint(
@@ -205,6 +332,51 @@ Start by asking the first question to begin the guided conversation.
     }
   }
 
+  /// POST to an edge function with `stream: true` and decode the SSE reply.
+  ///
+  /// A function that answers with plain JSON instead (e.g. after an
+  /// upstream error) is reported as a single `done` event.
+  Stream<SseEvent> _postStream(
+      String functionName, Map<String, dynamic> body) async* {
+    final accessToken = SupabaseConfig.auth.currentSession?.accessToken;
+    final request = http.Request(
+        'POST', Uri.parse('${AppConfig.supabaseUrl}/functions/v1/$functionName'))
+      ..headers.addAll({
+        'content-type': 'application/json',
+        'accept': 'text/event-stream',
+        'apikey': AppConfig.supabaseAnonKey,
+        'authorization': 'Bearer ${accessToken ?? AppConfig.supabaseAnonKey}',
+      })
+      ..body = jsonEncode({...body, 'stream': true});
+
+    final response = await _httpClient.send(request);
+    if (response.statusCode != 200) {
+      final error = await response.stream.bytesToString();
+      throw http.ClientException(
+          '$functionName returned ${response.statusCode}: $error');
+    }
+
+    final contentType = response.headers['content-type'] ?? '';
+    if (!contentType.contains('text/event-stream')) {
+      yield SseEvent('done', await response.stream.bytesToString());
+      return;
+    }
+    yield* SseEvent.decode(response.stream).timeout(_streamIdleTimeout);
+  }
+
+  void _recordFirstToken(String functionName, Stopwatch stopwatch) {
+    _lastTimeToFirstToken = stopwatch.elapsed;
+    debugPrint('⏱️ $functionName first token after '
+        '${stopwatch.elapsedMilliseconds}ms');
+  }
+
+  void _recordStreamEnd(String functionName, Stopwatch stopwatch) {
+    _lastStreamDuration = stopwatch.elapsed;
+    debugPrint('⏱️ $functionName stream finished after '
+        '${stopwatch.elapsedMilliseconds}ms '
+        '(first token: ${_lastTimeToFirstToken?.inMilliseconds ?? '-'}ms)');
+  }
+
   /// Generate a fitness itinerary for a destination
   Future<ItineraryResponse?> generateItinerary({
     required String destination,
@@ -344,7 +516,8 @@ Start by asking the first question to begin the guided conversation.
   /// Analyze a place for fitness intelligence using AI
   ///
   /// Extracts fitness/health insights from place data and community reviews
-  /// Results are cached server-side for 24 hours
+  /// Results are cached server-side for 24 hours (see [analyzePlacesFitness]
+  /// for batches)
   Future<PlaceFitnessIntelligence?> analyzePlaceFitness({
     required String placeId,
     required String placeName,
@@ -382,6 +555,45 @@ Start by asking the first question to begin the guided conversation.
     }
   }
 
+  /// Analyze several places in one request.
+  ///
+  /// [places] are request bodies as sent by [analyzePlaceFitness] (at least
+  /// `placeId`, `placeName` and `placeType`). The server answers cached
+  /// places from one lookup and analyzes only the rest. Returns the
+  /// intelligence per place id; places that failed are left out.
+  Future<Map<String, PlaceFitnessIntelligence>> analyzePlacesFitness(
+    List<Map<String, dynamic>> places,
+  ) async {
+    if (places.isEmpty) return {};
+    try {
+      final FunctionsClient functions = SupabaseConfig.client.functions;
+      final invokeRes = await functions.invoke(
+        _fitnessIntelFn,
+        body: {'places': places},
+      );
+
+      final data = invokeRes.data;
+      if (data is Map && data['results'] is List) {
+        final results = <String, PlaceFitnessIntelligence>{};
+        for (final result in (data['results'] as List).whereType<Map>()) {
+          final placeId = result['placeId'] as String?;
+          final intelligence = result['intelligence'];
+          if (placeId == null || intelligence is! Map) continue;
+          results[placeId] = PlaceFitnessIntelligence.fromJson(
+              intelligence.cast<String, dynamic>());
+        }
+        return results;
+      }
+
+      debugPrint(
+          'AiGuideService: Invalid batch response from analyze_place_fitness: $data');
+      return {};
+    } catch (e) {
+      debugPrint('AiGuideService.analyzePlacesFitness error: $e');
+      return {};
+    }
+  }
+
   /// Generate quick insights for a place using a lighter AI model
   ///
   /// This provides fast, lightweight overview tags from Google reviews
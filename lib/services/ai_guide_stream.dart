@@ -0,0 +1,248 @@
+import 'dart:async';
+import 'dart:convert';
+import 'package:fittravel/models/ai_models.dart';
+
+/// A Server-Sent Event from a streaming edge function
+class SseEvent {
+  final String event;
+  final String data;
+
+  const SseEvent(this.event, this.data);
+
+  /// Split a UTF-8 byte stream into events. Events without an `event:`
+  /// field are reported as `message`, per the SSE spec.
+  static Stream<SseEvent> decode(Stream<List<int>> bytes) async* {
+    String? event;
+    final data = <String>[];
+
+    await for (final line
+        in bytes.transform(utf8.decoder).transform(const LineSplitter())) {
+      if (line.isEmpty) {
+        if (data.isNotEmpty) {
+          yield SseEvent(event ?? 'message', data.join('\n'));
+        }
+        event = null;
+        data.clear();
+      } else if (line.startsWith('event:')) {
+        event = line.substring(6).trim();
+      } else if (line.startsWith('data:')) {
+        final value = line.substring(5);
+        data.add(value.startsWith(' ') ? value.substring(1) : value);
+      }
+      // Comments (":") and unknown fields are ignored
+    }
+    if (data.isNotEmpty) yield SseEvent(event ?? 'message', data.join('\n'));
+  }
+}
+
+/// One incremental update of a streamed fitness guide reply
+class GuideStreamUpdate {
+  /// Reply text received so far
+  final String text;
+
+  /// Places parsed so far
+  final List<SuggestedPlace> suggestedPlaces;
+
+  /// The complete response; set only on the last update
+  final FitnessGuideResponse? response;
+
+  const GuideStreamUpdate({
+    required this.text,
+    this.suggestedPlaces = const [],
+    this.response,
+  });
+
+  bool get isDone => response != null;
+}
+
+/// Incrementally parses the fitness guide's streamed output.
+///
+/// The model replies with a JSON object (`{"text": ..., "suggestedPlaces":
+/// [...], ...}`), sometimes inside a code fence. While it streams, this
+/// extracts the partial `text` string and every complete object of the
+/// `suggestedPlaces` array, so the chat can render text and places before
+/// the JSON is closed. Replies that aren't JSON are shown verbatim. The
+/// final `done` event from the server remains the source of truth.
+class GuideReplyStreamParser {
+  static final RegExp _textKey = RegExp(r'"text"\s*:\s*"');
+  static final RegExp _placesKey = RegExp(r'"suggestedPlaces"\s*:\s*\[');
+  static const Map<String, String> _escapes = {
+    'n': '\n',
+    't': '\t',
+    'r': '\r',
+    'b': '\b',
+    'f': '\f',
+  };
+
+  final StringBuffer _raw = StringBuffer();
+  bool? _isJson;
+  int? _textStart;
+  int? _placesCursor;
+  bool _placesClosed = false;
+  String _text = '';
+  final List<SuggestedPlace> _places = [];
+
+  String get rawText => _raw.toString();
+  String get text => _text;
+  List<SuggestedPlace> get suggestedPlaces => List.unmodifiable(_places);
+
+  /// Feed the next raw chunk. Returns true if [text] or [suggestedPlaces]
+  /// changed.
+  bool add(String chunk) {
+    if (chunk.isEmpty) return false;
+    _raw.write(chunk);
+    final raw = _raw.toString();
+
+    _isJson ??= _detectJson(raw);
+    final isJson = _isJson;
+    if (isJson == null) return false;
+    if (!isJson) {
+      _text = raw;
+      return true;
+    }
+
+    final previousText = _text;
+    final previousPlaces = _places.length;
+    _parseText(raw);
+    _parsePlaces(raw);
+    return _text != previousText || _places.length != previousPlaces;
+  }
+
+  /// null while only whitespace or a code fence opener has arrived
+  static bool? _detectJson(String raw) {
+    var trimmed = raw.trimLeft();
+    if (trimmed.startsWith('```')) {
+      final newline = trimmed.indexOf('\n');
+      if (newline < 0) return null;
+      trimmed = trimmed.substring(newline + 1).trimLeft();
+    } else if ('```'.startsWith(trimmed)) {
+      return null;
+    }
+    if (trimmed.isEmpty) return null;
+    return trimmed.startsWith('{');
+  }
+
+  void _parseText(String raw) {
+    if (_textStart == null) {
+      // Top-level key only; quick replies have "text" fields too
+      final match = _textKey
+          .allMatches(raw)
+          .where((m) => _depthAt(raw, m.start) == 1)
+          .firstOrNull;
+      if (match == null) return;
+      _textStart = match.end;
+    }
+    _text = _decodeStringPrefix(raw, _textStart!);
+  }
+
+  void _parsePlaces(String raw) {
+    if (_placesClosed) return;
+    if (_placesCursor == null) {
+      final match = _placesKey.firstMatch(raw);
+      if (match == null) return;
+      _placesCursor = match.end;
+    }
+
+    var i = _placesCursor!;
+    while (i < raw.length) {
+      final c = raw[i];
+      if (c == ']') {
+        _placesClosed = true;
+        break;
+      }
+      if (c != '{') {
+        i++;
+        continue;
+      }
+      final end = _matchingBrace(raw, i);
+      if (end == null) break; // object still streaming
+      try {
+        final json = jsonDecode(raw.substring(i, end + 1));
+        if (json is Map<String, dynamic>) {
+          _places.add(SuggestedPlace.fromJson(json));
+        }
+      } catch (_) {
+        // Malformed or missing required fields; the final response decides
+      }
+      i = end + 1;
+    }
+    _placesCursor = i;
+  }
+
+  /// Object nesting depth at [index], ignoring braces inside strings
+  static int _depthAt(String raw, int index) {
+    var depth = 0;
+    var inString = false;
+    for (var i = 0; i < index; i++) {
+      final c = raw[i];
+      if (inString) {
+        if (c == r'\') {
+          i++;
+        } else if (c == '"') {
+          inString = false;
+        }
+      } else if (c == '"') {
+        inString = true;
+      } else if (c == '{') {
+        depth++;
+      } else if (c == '}') {
+        depth--;
+      }
+    }
+    return depth;
+  }
+
+  /// Index of the brace closing the object opened at [start], or null if
+  /// it hasn't arrived yet
+  static int? _matchingBrace(String raw, int start) {
+    var depth = 0;
+    var inString = false;
+    for (var i = start; i < raw.length; i++) {
+      final c = raw[i];
+      if (inString) {
+        if (c == r'\') {
+          i++;
+        } else if (c == '"') {
+          inString = false;
+        }
+      } else if (c == '"') {
+        inString = true;
+      } else if (c == '{') {
+        depth++;
+      } else if (c == '}') {
+        depth--;
+        if (depth == 0) return i;
+      }
+    }
+    return null;
+  }
+
+  /// Decode a JSON string body starting at [start] up to its closing quote
+  /// or the end of input, stopping before an incomplete escape sequence
+  static String _decodeStringPrefix(String raw, int start) {
+    final out = StringBuffer();
+    var i = start;
+    while (i < raw.length) {
+      final c = raw[i];
+      if (c == '"') break;
+      if (c != r'\') {
+        out.write(c);
+        i++;
+        continue;
+      }
+      if (i + 1 >= raw.length) break;
+      final next = raw[i + 1];
+      if (next == 'u') {
+        if (i + 6 > raw.length) break;
+        final code = int.tryParse(raw.substring(i + 2, i + 6), radix: 16);
+        if (code != null) out.writeCharCode(code);
+        i += 6;
+        continue;
+      }
+      // \" \\ and \/ map to the escaped character itself
+      out.write(_escapes[next] ?? next);
+      i += 2;
+    }
+    return out.toString();
+  }
+}
@@ -0,0 +1,174 @@
+import 'package:flutter/foundation.dart';
+import 'package:fittravel/services/delta_sync.dart';
+import 'package:fittravel/services/local_store.dart';
+import 'package:fittravel/supabase/supabase_config.dart';
+
+/// Calls the startup payload RPC with the given watermarks
+typedef StartupPayloadFetcher = Future<Map<String, dynamic>> Function(
+    Map<String, String> watermarks);
+
+/// Cold-start timing, per phase and as milestones since launch.
+///
+/// Phases (e.g. `supabase_init`, `startup_rpc`) are durations of one step;
+/// milestones (e.g. `first_frame`, `interactive`) are measured from
+/// [start], which `main` calls first thing.
+class StartupTimings {
+  StartupTimings();
+
+  static final StartupTimings instance = StartupTimings();
+
+  final Stopwatch _sinceLaunch = Stopwatch();
+  final Map<String, Duration> _entries = {};
+
+  /// Phase and milestone durations in the order they were recorded
+  Map<String, Duration> get entries => Map.unmodifiable(_entries);
+
+  Duration get sinceLaunch => _sinceLaunch.elapsed;
+
+  void start() {
+    _entries.clear();
+    _sinceLaunch
+      ..reset()
+      ..start();
+  }
+
+  /// Time [body] as [phase]
+  Future<T> measure<T>(String phase, Future<T> Function() body) async {
+    final stopwatch = Stopwatch()..start();
+    try {
+      return await body();
+    } finally {
+      record(phase, stopwatch.elapsed);
+    }
+  }
+
+  void record(String phase, Duration elapsed) {
+    _entries[phase] = elapsed;
+    debugPrint('⏱️ Startup $phase: ${elapsed.inMilliseconds}ms');
+  }
+
+  /// Record [milestone] at the time since launch, once
+  void mark(String milestone) {
+    if (_entries.containsKey(milestone)) return;
+    record(milestone, _sinceLaunch.elapsed);
+  }
+}
+
+/// Loads the signed-in user's first-screen data with one RPC at launch.
+///
+/// Rather than UserService, TripService, PlaceService, ActivityService and
+/// GamificationService each syncing their tables with their own queries,
+/// [start] fetches every table in one `get_startup_payload` call (see
+/// create_startup_payload_rpc.sql) and applies it to the [LocalStore]
+/// through [DeltaSync.applyPreloaded]. Services still initialize the usual
+/// way; their syncs wait for the payload and are then served from the store.
+/// If the RPC fails, they fall back to syncing on their own.
+class AppBootstrap {
+  static const String rpcName = 'get_startup_payload';
+
+  /// Give up on the batched payload after this long and let services sync
+  /// themselves
+  static const Duration timeout = Duration(seconds: 15);
+
+  /// Per-user tables in the payload
+  static const List<String> userTables = [
+    'users',
+    'trips',
+    'itinerary_items',
+    'saved_places',
+    'activities',
+    'user_badges',
+    'user_challenges',
+  ];
+
+  /// Tables shared by all users, kept under [LocalStore.globalScope]
+  static const List<String> globalTables = ['badges', 'challenges'];
+
+  static final AppBootstrap instance = AppBootstrap();
+
+  final StartupPayloadFetcher _fetchPayload;
+  final StartupTimings timings;
+
+  Future<void>? _loading;
+  String? _loadingUserId;
+
+  AppBootstrap({StartupPayloadFetcher? fetchPayload, StartupTimings? timings})
+      : _fetchPayload = fetchPayload ?? _rpcPayload,
+        timings = timings ?? StartupTimings.instance;
+
+  static Future<Map<String, dynamic>> _rpcPayload(
+      Map<String, String> watermarks) async {
+    final result = await SupabaseConfig.client
+        .rpc(rpcName, params: {'p_watermarks': watermarks});
+    return Map<String, dynamic>.from(result as Map);
+  }
+
+  /// Start loading the current user's payload. Completes once it has been
+  /// applied or has failed (never with an error); calling again for the
+  /// same user returns the same load.
+  Future<void> start() {
+    final userId = SupabaseConfig.auth.currentUser?.id;
+    if (userId == null) return Future.value();
+    return load(userId);
+  }
+
+  /// Fetch and apply the payload for [userId]
+  Future<void> load(String userId) {
+    if (_loading != null && _loadingUserId == userId) return _loading!;
+    _loadingUserId = userId;
+    final loading = _load(userId);
+    _loading = loading;
+    DeltaSync.preloadWith(loading);
+    return loading;
+  }
+
+  Future<void> _load(String userId) async {
+    try {
+      final store = await timings.measure('local_store', LocalStore.getInstance);
+
+      // Queued offline writes must land before the payload is read, or it
+      // would overwrite them locally with the server's older rows
+      await timings.measure('replay_writes', store.replayPendingWrites);
+
+      final watermarks = {
+        ...DeltaSync.watermarksFor(store, userId, userTables),
+        ...DeltaSync.watermarksFor(store, LocalStore.globalScope, globalTables),
+      };
+      final payload = await timings.measure(
+          'startup_rpc', () => _fetchPayload(watermarks).timeout(timeout));
+
+      final tables = Map<String, dynamic>.from(payload['tables'] as Map);
+      await timings.measure('startup_apply', () async {
+        for (final table in userTables) {
+          await _apply(store, userId, table, tables[table]);
+        }
+        for (final table in globalTables) {
+          await _apply(store, LocalStore.globalScope, table, tables[table]);
+        }
+      });
+    } catch (e) {
+      // Services sync their tables themselves; allow a retry on next start
+      debugPrint('AppBootstrap: startup payload failed: $e');
+      _loading = null;
+    }
+  }
+
+  Future<void> _apply(
+      LocalStore store, String scope, String table, Object? section) async {
+    // Older server versions may not send every table; those pull on their own
+    if (section is! Map) return;
+    await DeltaSync.applyPreloaded(
+      store,
+      scope: scope,
+      table: table,
+      full: section['full'] == true,
+      rows: _rows(section['rows']),
+      deleted: _rows(section['deleted']),
+    );
+  }
+
+  static List<Map<String, dynamic>> _rows(Object? value) => [
+        for (final row in (value as List?) ?? const [])
+          Map<String, dynamic>.from(row as Map),
+      ];
+}
@@ -1,22 +1,39 @@
+import 'dart:async';
 import 'package:flutter/foundation.dart';
 import 'package:fittravel/models/models.dart';
 import 'package:fittravel/supabase/supabase_config.dart';
-import 'package:fittravel/services/photo_storage_service.dart';
+import 'package:fittravel/services/photo_upload_queue.dart';
 
 /// Manages community photos for places via Supabase Storage.
 class CommunityPhotoService extends ChangeNotifier {
   List<CommunityPhoto> _photos = [];
   bool _isLoading = false;
-  bool _isUploading = false;
   String? _error;
-
-  CommunityPhotoService();
+  final PhotoUploadQueue _uploads;
+  StreamSubscription? _uploadSub;
+
+  CommunityPhotoService({PhotoUploadQueue? uploadQueue})
+      : _uploads = uploadQueue ?? PhotoUploadQueue.instance {
+    _uploads.addListener(notifyListeners);
+    // Finished uploads, including ones restored from a previous session
+    _uploadSub = _uploads.completed
+        .where((done) => done.$1.kind == PhotoUploadKind.community)
+        .listen((done) => _addUploaded(done.$2));
+  }
 
   bool get isLoading => _isLoading;
-  bool get isUploading => _isUploading;
+  bool get isUploading =>
+      _uploads.jobsOf(PhotoUploadKind.community).any((j) => j.isActive);
   List<CommunityPhoto> get photos => _photos;
   String? get error => _error;
 
+  /// Progress of in-flight uploads (0..1), or null when none are running
+  double? get uploadProgress => _uploads.progressOf(PhotoUploadKind.community);
+
+  /// Photos still waiting to upload, e.g. taken while offline
+  int get pendingUploadCount =>
+      _uploads.jobsOf(PhotoUploadKind.community).length;
+
   /// Get current authenticated user ID
   String? get _currentUserId => SupabaseConfig.auth.currentUser?.id;
 
@@ -35,6 +52,9 @@ class CommunityPhotoService extends ChangeNotifier {
       _photos = (photosData as List)
           .map((json) => CommunityPhoto.fromSupabaseJson(json))
           .toList();
+
+      // Retry uploads left over from a previous session
+      unawaited(_uploads.resume());
     } catch (e) {
       _error = 'Failed to load community photos';
       debugPrint('CommunityPhotoService.initialize error: $e');
@@ -50,8 +70,10 @@ class CommunityPhotoService extends ChangeNotifier {
       ..sort((a, b) => b.createdAt.compareTo(a.createdAt));
   }
 
-  /// Add a photo from image bytes (recommended - uses Supabase Storage)
-  Future<CommunityPhoto> addPhoto({
+  /// Add a photo from image bytes (recommended - uses Supabase Storage).
+  /// Returns once the upload is queued; the photo appears in [photos] when
+  /// it finishes, and [uploadProgress] / [pendingUploadCount] track it.
+  Future<void> addPhoto({
     required String placeId,
     required Uint8List imageBytes,
     String? photoId,
@@ -61,48 +83,34 @@ class CommunityPhotoService extends ChangeNotifier {
       throw Exception('User not authenticated');
     }
 
-    _isUploading = true;
     _error = null;
-    notifyListeners();
 
     try {
-      // Upload to Supabase Storage with compression
-      final storagePath = await PhotoStorageService.uploadCommunityPhoto(
-        imageBytes: imageBytes,
+      // Processed on a worker isolate, then uploaded through the persistent
+      // queue (retried with backoff, resumed on next launch if still failing)
+      await _uploads.enqueue(
+        kind: PhotoUploadKind.community,
+        userId: userId,
         placeId: placeId,
+        imageBytes: imageBytes,
         photoId: photoId,
       );
-
-      // Get public URL
-      final imageUrl = PhotoStorageService.getCommunityPhotoUrl(storagePath);
-
-      // Save metadata to database
-      final data = {
-        'place_id': placeId,
-        'user_id': userId,
-        'image_url': imageUrl,
-      };
-
-      final result = await SupabaseService.insert('community_photos', data);
-
-      if (result.isNotEmpty) {
-        final photo = CommunityPhoto.fromSupabaseJson(result.first);
-        _photos.insert(0, photo);
-        _error = null;
-        _isUploading = false;
-        notifyListeners();
-        return photo;
-      }
-      throw Exception('Failed to save photo metadata');
     } catch (e) {
       _error = 'Failed to upload photo: ${e.toString()}';
       debugPrint('CommunityPhotoService.addPhoto error: $e');
-      _isUploading = false;
       notifyListeners();
       rethrow;
     }
   }
 
+  void _addUploaded(Map<String, dynamic> row) {
+    final photo = CommunityPhoto.fromSupabaseJson(row);
+    if (_photos.any((p) => p.id == photo.id)) return;
+    _photos.insert(0, photo);
+    _error = null;
+    notifyListeners();
+  }
+
   /// Legacy method: Add a photo from URL (for backwards compatibility)
   @Deprecated('Use addPhoto() with image bytes instead')
   Future<CommunityPhoto> addPhotoUrl({
@@ -166,4 +174,11 @@ class CommunityPhotoService extends ChangeNotifier {
     _error = null;
     notifyListeners();
   }
+
+  @override
+  void dispose() {
+    _uploads.removeListener(notifyListeners);
+    _uploadSub?.cancel();
+    super.dispose();
+  }
 }
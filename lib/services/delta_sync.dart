@@ -0,0 +1,275 @@
+import 'package:flutter/foundation.dart';
+import 'package:fittravel/services/local_store.dart';
+import 'package:fittravel/supabase/supabase_config.dart';
+
+/// A select on [table] with equality [filters], an optional `(column,
+/// values)` [inFilter] and `sinceColumn >= since`; replaced in tests
+typedef DeltaQuery = Future<List<Map<String, dynamic>>> Function(
+  String table, {
+  required String select,
+  required Map<String, Object> filters,
+  (String, List<Object>)? inFilter,
+  String? sinceColumn,
+  DateTime? since,
+});
+
+/// Pulls only rows changed since the per-table updated_at watermark into a
+/// [LocalStore], plus tombstones for rows deleted in the meantime.
+///
+/// The first sync for a table (or one whose watermark is older than the
+/// server's tombstone retention) does a full fetch instead.
+class DeltaSync {
+  /// Keep below the 90 day tombstone cleanup in add_delta_sync_support.sql
+  static const Duration maxWatermarkAge = Duration(days: 60);
+
+  /// How long tables filled by [applyPreloaded] count as freshly synced
+  static const Duration preloadFreshness = Duration(minutes: 5);
+
+  static const String _tombstonesTable = 'sync_tombstones';
+
+  static DeltaQuery _query = _supabaseQuery;
+  static Future<void>? _preloading;
+  // "scope:table" -> when a batched fetch applied it
+  static final Map<String, DateTime> _preloaded = {};
+
+  /// Let a batched fetch (see AppBootstrap) fill tables before services
+  /// sync them. [pull] and [takePreloaded] wait for [loading] so the first
+  /// sync of each table doesn't race it with a query of its own.
+  static void preloadWith(Future<void> loading) {
+    _preloaded.clear();
+    _preloading = loading.catchError((Object e) {
+      debugPrint('DeltaSync: preload failed, tables will pull on their own: $e');
+    });
+  }
+
+  /// Apply one table of a batched payload to [store], the same way a [pull]
+  /// would, and serve it to the next [pull] or [takePreloaded] without
+  /// querying again.
+  ///
+  /// [full] replaces the local rows; otherwise [rows] are upserted and
+  /// [deleted] tombstones (`row_id`, `deleted_at`) applied.
+  static Future<void> applyPreloaded(
+    LocalStore store, {
+    required String scope,
+    required String table,
+    required bool full,
+    required List<Map<String, dynamic>> rows,
+    List<Map<String, dynamic>> deleted = const [],
+  }) async {
+    if (full) {
+      await _applyFull(store, scope, table, rows);
+    } else {
+      final since = store.watermark(scope, table);
+      await _applyDelta(store, scope, table, rows, since);
+      if (scope != LocalStore.globalScope) {
+        await _applyTombstones(store, scope, table, deleted,
+            store.watermark(scope, _tombstoneKey(table)) ?? since);
+      }
+    }
+    _preloaded[_preloadKey(scope, table)] = DateTime.now();
+  }
+
+  /// Rows of [table] if a batched fetch synced it within
+  /// [preloadFreshness], or null if the caller should sync it itself.
+  /// Each preload is handed out once.
+  static Future<List<Map<String, dynamic>>?> takePreloaded(
+    LocalStore store, {
+    required String scope,
+    required String table,
+  }) async {
+    final loading = _preloading;
+    if (loading != null) await loading;
+
+    final appliedAt = _preloaded.remove(_preloadKey(scope, table));
+    if (appliedAt == null ||
+        DateTime.now().difference(appliedAt) > preloadFreshness) {
+      return null;
+    }
+    return store.rows(scope, table);
+  }
+
+  /// Watermarks for [tables] in the form the startup payload RPC takes:
+  /// table -> ISO timestamp, plus `<table>#tombstones`. Tables that would
+  /// need a full sync in [pull] are left out so the server sends them whole.
+  static Map<String, String> watermarksFor(
+      LocalStore store, String scope, Iterable<String> tables) {
+    final now = DateTime.now().toUtc();
+    final watermarks = <String, String>{};
+    for (final table in tables) {
+      final since = store.watermark(scope, table);
+      if (since == null || now.difference(since) > maxWatermarkAge) continue;
+      watermarks[table] = since.toUtc().toIso8601String();
+      final deletedSince = store.watermark(scope, _tombstoneKey(table));
+      if (deletedSince != null) {
+        watermarks[_tombstoneKey(table)] =
+            deletedSince.toUtc().toIso8601String();
+      }
+    }
+    return watermarks;
+  }
+
+  /// Sync [table] for [scope] and return every local row afterwards.
+  ///
+  /// [filters] are equality filters and [inFilter] an optional
+  /// `(column, values)` membership filter, both applied to full and delta
+  /// queries alike.
+  static Future<List<Map<String, dynamic>>> pull(
+    LocalStore store, {
+    required String scope,
+    required String table,
+    String select = '*',
+    Map<String, Object> filters = const {},
+    (String, List<Object>)? inFilter,
+  }) async {
+    final preloaded = await takePreloaded(store, scope: scope, table: table);
+    if (preloaded != null) return preloaded;
+
+    final since = store.watermark(scope, table);
+    final isStale = since == null ||
+        DateTime.now().toUtc().difference(since) > maxWatermarkAge;
+
+    if (!isStale) {
+      try {
+        return await _pullDelta(store,
+            scope: scope,
+            table: table,
+            select: select,
+            filters: filters,
+            inFilter: inFilter,
+            since: since);
+      } catch (e) {
+        // e.g. updated_at or sync_tombstones not migrated yet
+        debugPrint('DeltaSync: delta pull of $table failed, doing full sync: $e');
+      }
+    }
+
+    final rows = await _query(table,
+        select: select, filters: filters, inFilter: inFilter);
+    await _applyFull(store, scope, table, rows);
+    return store.rows(scope, table);
+  }
+
+  static Future<List<Map<String, dynamic>>> _pullDelta(
+    LocalStore store, {
+    required String scope,
+    required String table,
+    required String select,
+    required Map<String, Object> filters,
+    required (String, List<Object>)? inFilter,
+    required DateTime since,
+  }) async {
+    final trackTombstones = scope != LocalStore.globalScope;
+    final tombstonesSince =
+        store.watermark(scope, _tombstoneKey(table)) ?? since;
+
+    final results = await Future.wait([
+      // gte rather than gt: rows sharing the watermark timestamp may have
+      // committed after the last pull; re-upserting them is harmless
+      _query(table,
+          select: select,
+          filters: filters,
+          inFilter: inFilter,
+          sinceColumn: 'updated_at',
+          since: since),
+      if (trackTombstones)
+        _query(_tombstonesTable,
+            select: 'row_id, deleted_at',
+            filters: {'user_id': scope, 'table_name': table},
+            sinceColumn: 'deleted_at',
+            since: tombstonesSince),
+    ]);
+
+    final changed = results[0];
+    await _applyDelta(store, scope, table, changed, since);
+    if (trackTombstones) {
+      await _applyTombstones(store, scope, table, results[1], tombstonesSince);
+    }
+    return store.rows(scope, table);
+  }
+
+  static Future<void> _applyFull(LocalStore store, String scope, String table,
+      List<Map<String, dynamic>> rows) async {
+    await store.replaceRows(scope, table, rows);
+    final watermark = _maxUpdatedAt(rows);
+    await store.setWatermark(scope, table, watermark);
+    await store.setWatermark(scope, _tombstoneKey(table), watermark);
+    debugPrint('DeltaSync: full sync of $table (${rows.length} rows)');
+  }
+
+  static Future<void> _applyDelta(LocalStore store, String scope, String table,
+      List<Map<String, dynamic>> changed, DateTime? since) async {
+    await store.upsertRows(scope, table, changed);
+    final watermark = _maxUpdatedAt(changed);
+    if (watermark != null && (since == null || watermark.isAfter(since))) {
+      await store.setWatermark(scope, table, watermark);
+    }
+    debugPrint('DeltaSync: $table +${changed.length}');
+  }
+
+  static Future<void> _applyTombstones(LocalStore store, String scope,
+      String table, List<Map<String, dynamic>> deleted, DateTime? since) async {
+    await store.deleteRows(
+        scope, table, deleted.map((t) => t['row_id'] as String));
+    final deletedAt = _maxTimestamp(deleted, 'deleted_at');
+    if (deletedAt != null && (since == null || deletedAt.isAfter(since))) {
+      await store.setWatermark(scope, _tombstoneKey(table), deletedAt);
+    }
+    if (deleted.isNotEmpty) {
+      debugPrint('DeltaSync: $table -${deleted.length}');
+    }
+  }
+
+  static Future<List<Map<String, dynamic>>> _supabaseQuery(
+    String table, {
+    required String select,
+    required Map<String, Object> filters,
+    (String, List<Object>)? inFilter,
+    String? sinceColumn,
+    DateTime? since,
+  }) async {
+    dynamic query = SupabaseConfig.client.from(table).select(select);
+    for (final entry in filters.entries) {
+      query = query.eq(entry.key, entry.value);
+    }
+    if (inFilter != null) {
+      query = query.inFilter(inFilter.$1, inFilter.$2);
+    }
+    if (sinceColumn != null && since != null) {
+      query = query.gte(sinceColumn, since.toUtc().toIso8601String());
+    }
+    final rows = await query;
+    return List<Map<String, dynamic>>.from(rows as List);
+  }
+
+  static String _tombstoneKey(String table) => '$table#tombstones';
+
+  static String _preloadKey(String scope, String table) => '$scope:$table';
+
+  @visibleForTesting
+  static void resetPreload() {
+    _preloading = null;
+    _preloaded.clear();
+  }
+
+  /// Route [pull]'s queries to [query], or back to Supabase when null
+  @visibleForTesting
+  static void overrideQuery(DeltaQuery? query) {
+    _query = query ?? _supabaseQuery;
+  }
+
+  static DateTime? _maxUpdatedAt(List<Map<String, dynamic>> rows) =>
+      _maxTimestamp(rows, 'updated_at');
+
+  static DateTime? _maxTimestamp(
+      List<Map<String, dynamic>> rows, String column) {
+    DateTime? latest;
+    for (final row in rows) {
+      final value = row[column];
+      final parsed = value is String ? DateTime.tryParse(value) : null;
+      if (parsed != null && (latest == null || parsed.isAfter(latest))) {
+        latest = parsed;
+      }
+    }
+    return latest;
+  }
+}
@@ -1,4 +1,5 @@
 import 'package:flutter/foundation.dart';
+import 'dart:collection';
 import 'dart:math';
 import 'dart:convert';
 import 'package:http/http.dart' as http;
@@ -8,19 +9,89 @@ import 'package:fittravel/supabase/supabase_config.dart';
 
 const String _n8nWebhookUrl = 'https://thesimpleapp.app.n8n.cloud/webhook/lifestyle-events';
 
+/// One page request against the `search_events` RPC
+class EventQuery {
+  final String city;
+  final DateTime start;
+  final DateTime end;
+
+  /// Bounding box (minLat, minLng, maxLat, maxLng); matches events by
+  /// coordinates, with [city] as the fallback for events without them
+  final (double, double, double, double)? bounds;
+
+  /// Keyset cursor: start date and id of the last event already loaded
+  final (DateTime, String)? after;
+  final int limit;
+
+  const EventQuery({
+    required this.city,
+    required this.start,
+    required this.end,
+    this.bounds,
+    this.after,
+    this.limit = EventService.pageSize,
+  });
+
+  Map<String, dynamic> toRpcParams() => {
+        'p_city': city,
+        'p_start': start.toUtc().toIso8601String(),
+        'p_end': end.toUtc().toIso8601String(),
+        if (bounds != null) ...{
+          'p_min_lat': bounds!.$1,
+          'p_min_lng': bounds!.$2,
+          'p_max_lat': bounds!.$3,
+          'p_max_lng': bounds!.$4,
+        },
+        if (after != null) ...{
+          'p_after_start': after!.$1.toUtc().toIso8601String(),
+          'p_after_id': after!.$2,
+        },
+        'p_limit': limit,
+      };
+}
+
+/// Loads one page of `events` rows
+typedef EventPageFetcher = Future<List<Map<String, dynamic>>> Function(
+    EventQuery query);
+
+class _CityEvents {
+  final EventQuery query;
+  final List<EventModel> events;
+  final DateTime fetchedAt;
+  bool hasMore;
+
+  _CityEvents(this.query, this.events, this.fetchedAt, {required this.hasMore});
+}
+
 /// EventService fetches events from Supabase database and Edge Functions.
 /// Events are shared across all users and fetched per destination.
+///
+/// Destination events are queried through the indexed `search_events` RPC
+/// (city and/or bounding box, date range, keyset pages) and kept in an LRU
+/// of the last [maxCachedCities] cities, so switching between trips doesn't
+/// refetch.
 class EventService extends ChangeNotifier {
+  static const int pageSize = 50;
+  static const int maxCachedCities = 8;
+  static const Duration cityCacheTtl = Duration(minutes: 30);
+
+  final EventPageFetcher _fetchPage;
+  final DateTime Function() _clock;
+
   List<EventModel> _events = [];
-  List<EventModel> _destinationEvents = [];
   bool _isLoading = false;
-  String? _currentCity;
+
+  // City cache key -> events, least recently used first
+  final LinkedHashMap<String, _CityEvents> _cityCache = LinkedHashMap();
+  String? _currentCityKey;
 
   // For webhook-based event discovery
   bool _isDiscoveringEvents = false;
   String? _lastDiscoveryError;
 
-  EventService();
+  EventService({EventPageFetcher? fetchPage, DateTime Function()? clock})
+      : _fetchPage = fetchPage ?? _searchEvents,
+        _clock = clock ?? DateTime.now;
 
   bool get isLoading => _isLoading;
   bool get isDiscoveringEvents => _isDiscoveringEvents;
@@ -28,10 +99,20 @@ class EventService extends ChangeNotifier {
   List<EventModel> get all =>
       List.unmodifiable([..._destinationEvents, ..._events]);
 
+  List<EventModel> get _destinationEvents =>
+      _cityCache[_currentCityKey]?.events ?? const [];
+
   /// Events for the current destination
   List<EventModel> get destinationEvents =>
       List.unmodifiable(_destinationEvents);
 
+  /// Whether [fetchMoreEventsForCity] can load another page
+  bool get hasMoreDestinationEvents =>
+      _cityCache[_currentCityKey]?.hasMore ?? false;
+
+  /// Number of cities currently cached
+  int get cachedCityCount => _cityCache.length;
+
   Future<void> initialize() async {
     _isLoading = true;
     notifyListeners();
@@ -62,30 +143,9 @@ class EventService extends ChangeNotifier {
           .order('start_date', ascending: true)
           .limit(100);
 
-      final List<dynamic> data = response as List<dynamic>;
-
-      _events = data.map((json) {
-        final map = json as Map<String, dynamic>;
-        return EventModel(
-          id: map['id'] as String,
-          title: map['title'] as String? ?? 'Untitled Event',
-          category:
-              eventCategoryFromString(map['category'] as String? ?? 'other'),
-          start: DateTime.parse(map['start_date'] as String),
-          end: map['end_date'] != null
-              ? DateTime.tryParse(map['end_date'] as String)
-              : null,
-          description: map['description'] as String?,
-          venueName: map['venue_name'] as String? ?? 'TBA',
-          address: map['address'] as String?,
-          latitude: (map['latitude'] as num?)?.toDouble(),
-          longitude: (map['longitude'] as num?)?.toDouble(),
-          websiteUrl: map['website_url'] as String?,
-          registrationUrl: map['registration_url'] as String?,
-          imageUrl: map['image_url'] as String?,
-          source: map['source'] as String?,
-        );
-      }).toList();
+      _events = List<Map<String, dynamic>>.from(response as List)
+          .map(EventModel.fromSupabaseJson)
+          .toList();
 
       debugPrint('EventService: Loaded ${_events.length} events from Supabase');
     } catch (e) {
@@ -96,65 +156,66 @@ class EventService extends ChangeNotifier {
 
   /// Fetch events for a specific city from Supabase
   /// Called when active trip changes or on demand
+  ///
+  /// With [latitude]/[longitude], events within [radiusKm] are matched by
+  /// coordinates (events without coordinates still match on city).
+  /// Results are cached per city and date range for [cityCacheTtl].
   Future<void> fetchEventsForCity({
     required String city,
     DateTime? startDate,
     DateTime? endDate,
+    double? latitude,
+    double? longitude,
+    double radiusKm = 50,
     bool forceRefresh = false,
   }) async {
-    if (!forceRefresh && _currentCity == city && _destinationEvents.isNotEmpty) {
-      // Already have events for this city, use cached
-      debugPrint('EventService: Using cached ${_destinationEvents.length} events for $city');
-      return;
+    final now = _clock();
+    final start = startDate ?? now;
+    final end = endDate ?? DateTime(now.year, now.month + 3, now.day);
+    final bounds = latitude != null && longitude != null
+        ? _boundingBox(latitude, longitude, radiusKm)
+        : null;
+    final key = _cityKey(city, start, end, bounds);
+
+    final cached = _cityCache.remove(key);
+    if (cached != null) {
+      // Re-insert as most recently used
+      _cityCache[key] = cached;
+      if (!forceRefresh && now.difference(cached.fetchedAt) < cityCacheTtl) {
+        debugPrint(
+            'EventService: Using cached ${cached.events.length} events for $city');
+        if (_currentCityKey != key) {
+          _currentCityKey = key;
+          notifyListeners();
+        }
+        return;
+      }
     }
 
     _isLoading = true;
-    _currentCity = city;
     notifyListeners();
 
+    final query = EventQuery(
+      city: city.trim(),
+      start: start,
+      end: end,
+      bounds: bounds,
+    );
     try {
-      final now = DateTime.now();
-      final start = startDate ?? now;
-      final end = endDate ?? DateTime(now.year, now.month + 3, now.day);
-
-      // Query events from Supabase
-      var query = SupabaseConfig.client
-          .from('events')
-          .select()
-          .ilike('city', '%$city%')
-          .gte('start_date', start.toIso8601String())
-          .lte('start_date', end.toIso8601String())
-          .order('start_date', ascending: true)
-          .limit(50);
-
-      final response = await query;
-      final List<dynamic> data = response as List<dynamic>;
-
-      _destinationEvents = data.map((json) {
-        final map = json as Map<String, dynamic>;
-        return EventModel(
-          id: map['id'] as String,
-          title: map['title'] as String? ?? 'Untitled Event',
-          category:
-              eventCategoryFromString(map['category'] as String? ?? 'other'),
-          start: DateTime.parse(map['start_date'] as String),
-          end: map['end_date'] != null
-              ? DateTime.tryParse(map['end_date'] as String)
-              : null,
-          description: map['description'] as String?,
-          venueName: map['venue_name'] as String? ?? 'TBA',
-          address: map['address'] as String?,
-          latitude: (map['latitude'] as num?)?.toDouble(),
-          longitude: (map['longitude'] as num?)?.toDouble(),
-          websiteUrl: map['website_url'] as String?,
-          registrationUrl: map['registration_url'] as String?,
-          imageUrl: map['image_url'] as String?,
-          source: map['source'] as String?,
-        );
-      }).toList();
-
-      debugPrint(
-          'EventService: Fetched ${_destinationEvents.length} events for $city');
+      final rows = await _fetchPage(query);
+      _putCity(
+        key,
+        _CityEvents(
+          query,
+          rows.map(EventModel.fromSupabaseJson).toList(),
+          now,
+          hasMore: rows.length >= query.limit,
+        ),
+      );
+      // Switch only once the new city is loaded, so a failed fetch keeps
+      // showing the previous destination's events
+      _currentCityKey = key;
+      debugPrint('EventService: Fetched ${rows.length} events for $city');
     } catch (e) {
       debugPrint('EventService.fetchEventsForCity error: $e');
       // Keep existing events on error
@@ -164,6 +225,85 @@ class EventService extends ChangeNotifier {
     notifyListeners();
   }
 
+  /// Load the next page of events for the current destination
+  Future<void> fetchMoreEventsForCity() async {
+    final key = _currentCityKey;
+    final entry = _cityCache[key];
+    if (key == null || entry == null || !entry.hasMore || _isLoading) return;
+
+    _isLoading = true;
+    notifyListeners();
+
+    final last = entry.events.last;
+    final query = EventQuery(
+      city: entry.query.city,
+      start: entry.query.start,
+      end: entry.query.end,
+      bounds: entry.query.bounds,
+      after: (last.start, last.id),
+    );
+    try {
+      final rows = await _fetchPage(query);
+      entry.events.addAll(rows.map(EventModel.fromSupabaseJson));
+      entry.hasMore = rows.length >= query.limit;
+    } catch (e) {
+      debugPrint('EventService.fetchMoreEventsForCity error: $e');
+    }
+
+    _isLoading = false;
+    notifyListeners();
+  }
+
+  /// Load further pages for the current destination until they cover every
+  /// event starting by [end], so a date range filtered in memory is complete
+  Future<void> fetchMoreEventsThrough(DateTime end) async {
+    while (hasMoreDestinationEvents) {
+      final loaded = _destinationEvents;
+      if (loaded.isEmpty || loaded.last.start.isAfter(end)) return;
+      final count = loaded.length;
+      await fetchMoreEventsForCity();
+      // Stop if the page failed or another load was in flight
+      if (_destinationEvents.length == count) return;
+    }
+  }
+
+  void _putCity(String key, _CityEvents entry) {
+    _cityCache.remove(key);
+    _cityCache[key] = entry;
+    while (_cityCache.length > maxCachedCities) {
+      _cityCache.remove(_cityCache.keys.first);
+    }
+  }
+
+  /// Bounds are rounded to ~1km so a slightly moved map reuses the entry,
+  /// while a different point or radius in the same city doesn't
+  static String _cityKey(String city, DateTime start, DateTime end,
+      (double, double, double, double)? bounds) {
+    String day(DateTime d) => d.toIso8601String().split('T').first;
+    final box = bounds == null
+        ? ''
+        : [bounds.$1, bounds.$2, bounds.$3, bounds.$4]
+            .map((v) => v.toStringAsFixed(2))
+            .join(',');
+    return '${city.trim().toLowerCase()}|${day(start)}|${day(end)}|$box';
+  }
+
+  /// (minLat, minLng, maxLat, maxLng) around a point
+  static (double, double, double, double) _boundingBox(
+      double lat, double lng, double radiusKm) {
+    const kmPerDegree = 111.32;
+    final dLat = radiusKm / kmPerDegree;
+    final dLng = radiusKm / (kmPerDegree * max(cos(lat * pi / 180), 0.01));
+    return (lat - dLat, lng - dLng, lat + dLat, lng + dLng);
+  }
+
+  static Future<List<Map<String, dynamic>>> _searchEvents(
+      EventQuery query) async {
+    final response = await SupabaseConfig.client
+        .rpc('search_events', params: query.toRpcParams());
+    return List<Map<String, dynamic>>.from(response as List);
+  }
+
   /// Trigger backend to fetch new events for a destination
   /// This calls the n8n webhook API that uses an AI agent to discover events
   Future<void> refreshEventsForCity({
@@ -191,16 +331,19 @@ class EventService extends ChangeNotifier {
 
       // Re-fetch events after refresh
       await fetchEventsForCity(
-          city: city, startDate: startDate, endDate: endDate);
+          city: city,
+          startDate: startDate,
+          endDate: endDate,
+          forceRefresh: true);
     } catch (e) {
       debugPrint('EventService.refreshEventsForCity error: $e');
     }
   }
 
-  /// Clear destination events (e.g., when switching cities)
+  /// Clear destination events (e.g., when switching cities). Cached cities
+  /// stay in the LRU.
   void clearDestinationEvents() {
-    _destinationEvents = [];
-    _currentCity = null;
+    _currentCityKey = null;
     notifyListeners();
   }
 
@@ -1,6 +1,9 @@
 import 'package:flutter/foundation.dart';
+import 'package:uuid/uuid.dart';
 import 'package:fittravel/models/models.dart';
 import 'package:fittravel/supabase/supabase_config.dart';
+import 'package:fittravel/services/delta_sync.dart';
+import 'package:fittravel/services/local_store.dart';
 
 class GamificationService extends ChangeNotifier {
   List<BadgeModel> _allBadges = [];
@@ -30,65 +33,80 @@ class GamificationService extends ChangeNotifier {
     notifyListeners();
 
     try {
-      // Load global badges (public read)
-      final badgesData = await SupabaseConfig.client
-          .from('badges')
-          .select()
-          .order('requirement_value');
-
-      _allBadges = (badgesData as List)
-          .map((json) => BadgeModel.fromSupabaseJson(json))
-          .toList();
-
-      // Load global challenges (public read)
-      final challengesData = await SupabaseConfig.client
-          .from('challenges')
-          .select()
-          .order('created_at');
-
-      _allChallenges = (challengesData as List)
-          .map((json) => ChallengeModel.fromSupabaseJson(json))
-          .toList();
+      final store = await LocalStore.getInstance();
+      final userId = _currentUserId;
+
+      // Render cached data first, then pull changes
+      _setBadges(await store.rows(LocalStore.globalScope, 'badges'));
+      _setChallenges(await store.rows(LocalStore.globalScope, 'challenges'));
+      _setUserBadges(
+          userId == null ? [] : await store.rows(userId, 'user_badges'));
+      _setUserChallenges(
+          userId == null ? [] : await store.rows(userId, 'user_challenges'));
+      if (_allBadges.isNotEmpty) {
+        _isLoading = false;
+        notifyListeners();
+      }
+
+      // Global badges and challenges (public read)
+      final results = await Future.wait([
+        DeltaSync.pull(store, scope: LocalStore.globalScope, table: 'badges'),
+        DeltaSync.pull(store,
+            scope: LocalStore.globalScope, table: 'challenges'),
+      ]);
+      _setBadges(results[0]);
+      _setChallenges(results[1]);
 
       // Load user-specific data if authenticated
-      final userId = _currentUserId;
       if (userId != null) {
-        // Load user badges
-        final userBadgesData = await SupabaseConfig.client
-            .from('user_badges')
-            .select()
-            .eq('user_id', userId);
-
-        _userBadges = (userBadgesData as List)
-            .map((json) => UserBadgeModel.fromSupabaseJson(json))
-            .toList();
-
-        // Load user challenges
-        final userChallengesData = await SupabaseConfig.client
-            .from('user_challenges')
-            .select()
-            .eq('user_id', userId);
-
-        _userChallenges = (userChallengesData as List)
-            .map((json) => UserChallengeModel.fromSupabaseJson(json))
-            .toList();
-      } else {
-        _userBadges = [];
-        _userChallenges = [];
+        await store.replayPendingWrites();
+        final userResults = await Future.wait([
+          DeltaSync.pull(store,
+              scope: userId,
+              table: 'user_badges',
+              filters: {'user_id': userId}),
+          DeltaSync.pull(store,
+              scope: userId,
+              table: 'user_challenges',
+              filters: {'user_id': userId}),
+        ]);
+        _setUserBadges(userResults[0]);
+        _setUserChallenges(userResults[1]);
       }
     } catch (e) {
-      _error = 'Failed to load gamification data';
       debugPrint('GamificationService.initialize error: $e');
-      _allBadges = [];
-      _allChallenges = [];
-      _userBadges = [];
-      _userChallenges = [];
+      // Keep locally cached data when offline
+      if (_allBadges.isEmpty) {
+        _error = 'Failed to load gamification data';
+      }
     }
 
     _isLoading = false;
     notifyListeners();
   }
 
+  void _setBadges(List<Map<String, dynamic>> rows) {
+    _allBadges = rows.map((json) => BadgeModel.fromSupabaseJson(json)).toList()
+      ..sort((a, b) => a.requirementValue.compareTo(b.requirementValue));
+  }
+
+  void _setChallenges(List<Map<String, dynamic>> rows) {
+    _allChallenges = rows
+        .map((json) => ChallengeModel.fromSupabaseJson(json))
+        .toList()
+      ..sort((a, b) => a.createdAt.compareTo(b.createdAt));
+  }
+
+  void _setUserBadges(List<Map<String, dynamic>> rows) {
+    _userBadges =
+        rows.map((json) => UserBadgeModel.fromSupabaseJson(json)).toList();
+  }
+
+  void _setUserChallenges(List<Map<String, dynamic>> rows) {
+    _userChallenges =
+        rows.map((json) => UserChallengeModel.fromSupabaseJson(json)).toList();
+  }
+
   bool hasBadge(String badgeId) {
     return _userBadges.any((ub) => ub.badgeId == badgeId);
   }
@@ -136,20 +154,21 @@ class GamificationService extends ChangeNotifier {
     if (userId == null) return;
 
     try {
+      // Client-generated id so the insert can be queued and replayed offline
       final data = {
+        'id': const Uuid().v4(),
         'user_id': userId,
         'badge_id': badgeId,
         'earned_at': DateTime.now().toIso8601String(),
       };
 
-      final result = await SupabaseService.insert('user_badges', data);
+      final store = await LocalStore.getInstance();
+      await store.writeOrQueue(PendingWrite.insert('user_badges', data));
+      await store.upsertRows(userId, 'user_badges', [data]);
 
-      if (result.isNotEmpty) {
-        final userBadge = UserBadgeModel.fromSupabaseJson(result.first);
-        _userBadges.add(userBadge);
-        _error = null;
-        notifyListeners();
-      }
+      _userBadges.add(UserBadgeModel.fromSupabaseJson(data));
+      _error = null;
+      notifyListeners();
     } catch (e) {
       _error = 'Failed to award badge';
       debugPrint('GamificationService.awardBadge error: $e');
@@ -231,11 +250,18 @@ class GamificationService extends ChangeNotifier {
           challenge != null && progress >= challenge.requirementValue;
 
       try {
-        await SupabaseConfig.client.from('user_challenges').update({
+        final id = _userChallenges[index].id;
+        final data = {
           'progress': progress,
           'is_completed': isCompleted,
           'completed_at': isCompleted ? DateTime.now().toIso8601String() : null,
-        }).eq('id', _userChallenges[index].id);
+        };
+        final store = await LocalStore.getInstance();
+        await store.writeOrQueue(
+            PendingWrite.update('user_challenges', data, filters: {'id': id}));
+        await store.upsertRows(userId, 'user_challenges', [
+          {...data, 'id': id}
+        ]);
 
         _userChallenges[index] = _userChallenges[index].copyWith(
           progress: progress,
@@ -256,23 +282,25 @@ class GamificationService extends ChangeNotifier {
           challenge != null && progress >= challenge.requirementValue;
 
       try {
+        final now = DateTime.now().toIso8601String();
+        // Client-generated id so the insert can be queued and replayed offline
         final data = {
+          'id': const Uuid().v4(),
           'user_id': userId,
           'challenge_id': challengeId,
           'progress': progress,
           'is_completed': isCompleted,
-          'completed_at': isCompleted ? DateTime.now().toIso8601String() : null,
+          'completed_at': isCompleted ? now : null,
+          'created_at': now,
         };
 
-        final result = await SupabaseService.insert('user_challenges', data);
+        final store = await LocalStore.getInstance();
+        await store.writeOrQueue(PendingWrite.insert('user_challenges', data));
+        await store.upsertRows(userId, 'user_challenges', [data]);
 
-        if (result.isNotEmpty) {
-          final userChallenge =
-              UserChallengeModel.fromSupabaseJson(result.first);
-          _userChallenges.add(userChallenge);
-          _error = null;
-          notifyListeners();
-        }
+        _userChallenges.add(UserChallengeModel.fromSupabaseJson(data));
+        _error = null;
+        notifyListeners();
       } catch (e) {
         _error = 'Failed to create challenge progress';
         debugPrint('GamificationService.updateChallengeProgress error: $e');
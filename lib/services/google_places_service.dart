@@ -3,6 +3,8 @@ import 'package:flutter/foundation.dart';
 import 'package:http/http.dart' as http;
 import 'package:fittravel/models/place_model.dart';
 import 'package:fittravel/config/app_config.dart';
+import 'package:fittravel/services/places_response_cache.dart';
+import 'package:fittravel/utils/geohash.dart';
 import 'package:uuid/uuid.dart';
 
 /// Suggestion model for city autocomplete
@@ -36,6 +38,20 @@ class GooglePlacesService {
   static String get _apiKey => AppConfig.googlePlacesApiKey;
   static const String _baseUrl = 'https://places.googleapis.com/v1/places';
 
+  /// Shared across instances since screens create their own service objects
+  static final PlacesResponseCache _cache = PlacesResponseCache();
+
+  static const Duration _searchTtl = Duration(minutes: 30);
+  static const Duration _searchStaleTtl = Duration(hours: 24);
+  static const Duration _detailsTtl = Duration(hours: 6);
+  static const Duration _detailsStaleTtl = Duration(days: 3);
+
+  /// Cache hit/miss counters, used to measure Places quota savings
+  static PlacesCacheStats get cacheStats => _cache.stats;
+
+  /// Drop all cached Places responses (memory and disk)
+  static Future<void> clearCache() => _cache.clear();
+
   /// Autocomplete destination cities using Google Places Autocomplete API
   /// - Prioritizes locality-level results (cities/towns)
   /// - Returns a lightweight list for UI suggestions
@@ -128,134 +144,193 @@ class GooglePlacesService {
     }
   }
 
-  /// Search for nearby places by type
+  /// Search for nearby places by type.
+  ///
+  /// Results are cached per geohash tile, [placeType] and radius bucket; the
+  /// request is centered on the tile so every point in it shares one entry.
   Future<List<PlaceModel>> searchNearbyPlaces({
     required double latitude,
     required double longitude,
     required PlaceType placeType,
     int radiusMeters = 5000,
   }) async {
-    try {
-      final includedTypes = _getIncludedTypes(placeType);
+    final radius = PlacesResponseCache.radiusBucket(radiusMeters);
+    final tile = Geohash.encode(latitude, longitude,
+        precision: PlacesResponseCache.tilePrecisionForRadius(radius));
+    final (tileLat, tileLng) = Geohash.center(tile);
 
-      final response = await http.post(
-        Uri.parse('$_baseUrl:searchNearby'),
-        headers: {
-          'Content-Type': 'application/json',
-          'X-Goog-Api-Key': _apiKey,
-          'X-Goog-FieldMask':
-              'places.id,places.displayName,places.formattedAddress,places.location,places.rating,places.userRatingCount,places.priceLevel,places.currentOpeningHours,places.photos,places.websiteUri,places.nationalPhoneNumber',
-        },
-        body: jsonEncode({
-          'includedTypes': includedTypes,
-          'maxResultCount': 20,
-          'locationRestriction': {
-            'circle': {
-              'center': {
-                'latitude': latitude,
-                'longitude': longitude,
-              },
-              'radius': radiusMeters.toDouble(),
-            },
-          },
-        }),
+    try {
+      return await _cache.getOrFetch(
+        'nearby:$tile:${placeType.name}:$radius',
+        () => _fetchNearbyPlaces(
+          latitude: tileLat,
+          longitude: tileLng,
+          placeType: placeType,
+          radiusMeters: radius,
+        ),
+        ttl: _searchTtl,
+        staleTtl: _searchStaleTtl,
       );
-
-      if (response.statusCode == 200) {
-        final data = jsonDecode(response.body);
-        final places = data['places'] as List<dynamic>? ?? [];
-        return places.map((p) => _parsePlace(p, placeType)).toList();
-      } else {
-        debugPrint(
-            'Google Places API error: ${response.statusCode} - ${response.body}');
-        return [];
-      }
     } catch (e) {
       debugPrint('GooglePlacesService.searchNearbyPlaces error: $e');
       return [];
     }
   }
 
-  /// Search places by text query
-  Future<List<PlaceModel>> searchPlacesByText({
-    required String query,
+  Future<List<PlaceModel>> _fetchNearbyPlaces({
+    required double latitude,
+    required double longitude,
     required PlaceType placeType,
-    double? latitude,
-    double? longitude,
+    required int radiusMeters,
   }) async {
-    try {
-      final includedType = _getIncludedTypes(placeType).first;
-
-      final body = <String, dynamic>{
-        'textQuery':
-            '$query ${placeType == PlaceType.gym ? 'gym fitness' : 'healthy restaurant'}',
-        'includedType': includedType,
+    final includedTypes = _getIncludedTypes(placeType);
+
+    final response = await http.post(
+      Uri.parse('$_baseUrl:searchNearby'),
+      headers: {
+        'Content-Type': 'application/json',
+        'X-Goog-Api-Key': _apiKey,
+        'X-Goog-FieldMask':
+            'places.id,places.displayName,places.formattedAddress,places.location,places.rating,places.userRatingCount,places.priceLevel,places.currentOpeningHours,places.photos,places.websiteUri,places.nationalPhoneNumber',
+      },
+      body: jsonEncode({
+        'includedTypes': includedTypes,
         'maxResultCount': 20,
-      };
-
-      if (latitude != null && longitude != null) {
-        body['locationBias'] = {
+        'locationRestriction': {
           'circle': {
             'center': {
               'latitude': latitude,
               'longitude': longitude,
             },
-            'radius': 10000.0,
+            'radius': radiusMeters.toDouble(),
           },
-        };
-      }
-
-      final response = await http.post(
-        Uri.parse('$_baseUrl:searchText'),
-        headers: {
-          'Content-Type': 'application/json',
-          'X-Goog-Api-Key': _apiKey,
-          'X-Goog-FieldMask':
-              'places.id,places.displayName,places.formattedAddress,places.location,places.rating,places.userRatingCount,places.priceLevel,places.currentOpeningHours,places.photos,places.websiteUri,places.nationalPhoneNumber',
         },
-        body: jsonEncode(body),
-      );
+      }),
+    );
 
-      if (response.statusCode == 200) {
-        final data = jsonDecode(response.body);
-        final places = data['places'] as List<dynamic>? ?? [];
-        return places.map((p) => _parsePlace(p, placeType)).toList();
-      } else {
-        debugPrint(
-            'Google Places API text search error: ${response.statusCode} - ${response.body}');
-        return [];
-      }
+    if (response.statusCode != 200) {
+      throw http.ClientException(
+          'Google Places API error: ${response.statusCode} - ${response.body}');
+    }
+    final data = jsonDecode(response.body);
+    final places = data['places'] as List<dynamic>? ?? [];
+    return places.map((p) => _parsePlace(p, placeType)).toList();
+  }
+
+  /// Search places by text query
+  Future<List<PlaceModel>> searchPlacesByText({
+    required String query,
+    required PlaceType placeType,
+    double? latitude,
+    double? longitude,
+  }) async {
+    // Bias circle is 10km, so a ~5km tile is precise enough
+    final tile = latitude != null && longitude != null
+        ? Geohash.encode(latitude, longitude, precision: 5)
+        : null;
+    final normalizedQuery =
+        query.trim().toLowerCase().replaceAll(RegExp(r'\s+'), ' ');
+
+    try {
+      return await _cache.getOrFetch(
+        'text:${tile ?? 'global'}:${placeType.name}:$normalizedQuery',
+        () => _fetchPlacesByText(
+          query: query.trim(),
+          placeType: placeType,
+          bias: tile != null ? Geohash.center(tile) : null,
+        ),
+        ttl: _searchTtl,
+        staleTtl: _searchStaleTtl,
+      );
     } catch (e) {
       debugPrint('GooglePlacesService.searchPlacesByText error: $e');
       return [];
     }
   }
 
+  Future<List<PlaceModel>> _fetchPlacesByText({
+    required String query,
+    required PlaceType placeType,
+    (double, double)? bias,
+  }) async {
+    final includedType = _getIncludedTypes(placeType).first;
+
+    final body = <String, dynamic>{
+      'textQuery':
+          '$query ${placeType == PlaceType.gym ? 'gym fitness' : 'healthy restaurant'}',
+      'includedType': includedType,
+      'maxResultCount': 20,
+    };
+
+    if (bias != null) {
+      final (latitude, longitude) = bias;
+      body['locationBias'] = {
+        'circle': {
+          'center': {
+            'latitude': latitude,
+            'longitude': longitude,
+          },
+          'radius': 10000.0,
+        },
+      };
+    }
+
+    final response = await http.post(
+      Uri.parse('$_baseUrl:searchText'),
+      headers: {
+        'Content-Type': 'application/json',
+        'X-Goog-Api-Key': _apiKey,
+        'X-Goog-FieldMask':
+            'places.id,places.displayName,places.formattedAddress,places.location,places.rating,places.userRatingCount,places.priceLevel,places.currentOpeningHours,places.photos,places.websiteUri,places.nationalPhoneNumber',
+      },
+      body: jsonEncode(body),
+    );
+
+    if (response.statusCode != 200) {
+      throw http.ClientException(
+          'Google Places API text search error: ${response.statusCode} - ${response.body}');
+    }
+    final data = jsonDecode(response.body);
+    final places = data['places'] as List<dynamic>? ?? [];
+    return places.map((p) => _parsePlace(p, placeType)).toList();
+  }
+
   /// Get place details by ID
   Future<PlaceModel?> getPlaceDetails(
       String googlePlaceId, PlaceType placeType) async {
     try {
-      final response = await http.get(
-        Uri.parse('$_baseUrl/$googlePlaceId'),
-        headers: {
-          'Content-Type': 'application/json',
-          'X-Goog-Api-Key': _apiKey,
-          'X-Goog-FieldMask':
-              'id,displayName,formattedAddress,location,rating,userRatingCount,priceLevel,currentOpeningHours,photos,websiteUri,nationalPhoneNumber,regularOpeningHours',
-        },
+      final result = await _cache.getOrFetch(
+        'details:$googlePlaceId:${placeType.name}',
+        () async => [await _fetchPlaceDetails(googlePlaceId, placeType)],
+        ttl: _detailsTtl,
+        staleTtl: _detailsStaleTtl,
       );
-
-      if (response.statusCode == 200) {
-        final data = jsonDecode(response.body);
-        return _parsePlace(data, placeType);
-      }
-      return null;
+      return result.firstOrNull;
     } catch (e) {
       debugPrint('GooglePlacesService.getPlaceDetails error: $e');
       return null;
     }
   }
 
+  Future<PlaceModel> _fetchPlaceDetails(
+      String googlePlaceId, PlaceType placeType) async {
+    final response = await http.get(
+      Uri.parse('$_baseUrl/$googlePlaceId'),
+      headers: {
+        'Content-Type': 'application/json',
+        'X-Goog-Api-Key': _apiKey,
+        'X-Goog-FieldMask':
+            'id,displayName,formattedAddress,location,rating,userRatingCount,priceLevel,currentOpeningHours,photos,websiteUri,nationalPhoneNumber,regularOpeningHours',
+      },
+    );
+
+    if (response.statusCode != 200) {
+      throw http.ClientException(
+          'Google Places details error: ${response.statusCode} - ${response.body}');
+    }
+    return _parsePlace(jsonDecode(response.body), placeType);
+  }
+
   /// Get photo URL for a place
   String getPhotoUrl(String photoReference, {int maxWidth = 400}) {
     return 'https://places.googleapis.com/v1/$photoReference/media?maxWidthPx=$maxWidth&key=$_apiKey';
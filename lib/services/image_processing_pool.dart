@@ -0,0 +1,166 @@
+import 'dart:async';
+import 'dart:collection';
+import 'package:flutter/foundation.dart';
+import 'package:image/image.dart' as img;
+
+/// A processed photo: the full-size upload and its thumbnail, both JPEG
+class ProcessedImage {
+  final Uint8List full;
+  final Uint8List thumbnail;
+
+  /// False when the input could not be decoded and [full] is the original
+  final bool wasProcessed;
+
+  const ProcessedImage({
+    required this.full,
+    required this.thumbnail,
+    this.wasProcessed = true,
+  });
+}
+
+/// Settings sent to the worker with each job
+class ImageProcessingOptions {
+  final int maxWidth;
+  final int maxHeight;
+  final int thumbnailSize;
+  final int jpegQuality;
+
+  /// Center-crop to a square of [thumbnailSize] instead of fitting in
+  /// [maxWidth] x [maxHeight] (used for avatars)
+  final bool squareCrop;
+
+  const ImageProcessingOptions({
+    required this.maxWidth,
+    required this.maxHeight,
+    required this.thumbnailSize,
+    required this.jpegQuality,
+    this.squareCrop = false,
+  });
+}
+
+/// Runs image decode/resize/encode off the UI isolate.
+///
+/// Each job decodes once and produces both the full-size image and the
+/// thumbnail. At most [maxWorkers] jobs run at a time so a burst of picked
+/// photos doesn't spawn an isolate (and a full decoded bitmap) per image;
+/// the rest wait in FIFO order.
+///
+/// Workers are `compute` isolates rather than long-lived `Isolate.spawn`
+/// ones because dart:isolate is unavailable on the web build, where
+/// `compute` runs the job inline instead.
+class ImageProcessingPool {
+  static const int maxWorkers = 2;
+
+  static final ImageProcessingPool instance = ImageProcessingPool();
+
+  final int _maxWorkers;
+  final Queue<Completer<void>> _waiting = Queue();
+  int _running = 0;
+
+  ImageProcessingPool({int maxWorkers = ImageProcessingPool.maxWorkers})
+      : _maxWorkers = maxWorkers;
+
+  int get runningJobs => _running;
+  int get waitingJobs => _waiting.length;
+
+  Future<ProcessedImage> process(
+    Uint8List bytes,
+    ImageProcessingOptions options,
+  ) async {
+    await _acquire();
+    try {
+      final stopwatch = Stopwatch()..start();
+      final result =
+          await compute(processImageJob, (bytes: bytes, options: options));
+      debugPrint('📸 Image processed in ${stopwatch.elapsedMilliseconds}ms: '
+          '${bytes.length} bytes → ${result.full.length} bytes '
+          '(thumbnail ${result.thumbnail.length} bytes)');
+      return result;
+    } finally {
+      _release();
+    }
+  }
+
+  Future<void> _acquire() async {
+    if (_running < _maxWorkers) {
+      _running++;
+      return;
+    }
+    final slot = Completer<void>();
+    _waiting.add(slot);
+    // The releasing job hands its slot over, so _running stays the same
+    await slot.future;
+  }
+
+  void _release() {
+    if (_waiting.isNotEmpty) {
+      _waiting.removeFirst().complete();
+    } else {
+      _running--;
+    }
+  }
+}
+
+/// Worker entry point; top-level so it can run in another isolate
+@visibleForTesting
+ProcessedImage processImageJob(
+    ({Uint8List bytes, ImageProcessingOptions options}) job) {
+  try {
+    final image = img.decodeImage(job.bytes);
+    if (image == null) throw const FormatException('Failed to decode image');
+    return _process(image, job.options);
+  } catch (e) {
+    // Keep the upload working with the original bytes
+    debugPrint('⚠️ Image processing failed, using original: $e');
+    return ProcessedImage(
+      full: job.bytes,
+      thumbnail: job.bytes,
+      wasProcessed: false,
+    );
+  }
+}
+
+ProcessedImage _process(img.Image image, ImageProcessingOptions options) {
+  if (options.squareCrop) {
+    final size = image.width < image.height ? image.width : image.height;
+    final cropped = img.copyCrop(
+      image,
+      x: (image.width - size) ~/ 2,
+      y: (image.height - size) ~/ 2,
+      width: size,
+      height: size,
+    );
+    final resized = img.copyResize(
+      cropped,
+      width: options.thumbnailSize,
+      height: options.thumbnailSize,
+      interpolation: img.Interpolation.linear,
+    );
+    final bytes = Uint8List.fromList(
+        img.encodeJpg(resized, quality: options.jpegQuality));
+    return ProcessedImage(full: bytes, thumbnail: bytes);
+  }
+
+  final full = _fitWithin(image, options.maxWidth, options.maxHeight);
+  // Downscale from the already resized image rather than the original
+  final thumbnail =
+      _fitWithin(full, options.thumbnailSize, options.thumbnailSize);
+
+  return ProcessedImage(
+    full: Uint8List.fromList(img.encodeJpg(full, quality: options.jpegQuality)),
+    thumbnail: Uint8List.fromList(
+        img.encodeJpg(thumbnail, quality: options.jpegQuality)),
+  );
+}
+
+/// Resize to fit in [maxWidth] x [maxHeight], keeping aspect ratio
+img.Image _fitWithin(img.Image image, int maxWidth, int maxHeight) {
+  if (image.width <= maxWidth && image.height <= maxHeight) return image;
+  final landscape = image.width / maxWidth >= image.height / maxHeight;
+  return img.copyResize(
+    image,
+    width: landscape ? maxWidth : null,
+    height: landscape ? null : maxHeight,
+    interpolation: img.Interpolation.linear,
+  );
+}
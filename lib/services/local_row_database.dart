@@ -0,0 +1,177 @@
+import 'dart:convert';
+import 'package:flutter/foundation.dart';
+import 'package:sqflite/sqflite.dart';
+import 'package:fittravel/services/storage_service.dart';
+
+/// Per-row persistence behind [LocalStore].
+///
+/// Rows are stored and written one by one, so a sync that changes a few
+/// rows writes only those, and loading a table decodes its rows off the UI
+/// isolate. [SqliteRowDatabase] is used on mobile; the web build has no
+/// SQLite and uses [PrefsRowDatabase].
+abstract class LocalRowDatabase {
+  factory LocalRowDatabase() =>
+      kIsWeb ? PrefsRowDatabase() : SqliteRowDatabase();
+
+  /// All stored rows of a table, newest updated_at first
+  Future<List<Map<String, dynamic>>> load(String scope, String table);
+
+  /// Upsert rows by id; a null row deletes that id
+  Future<void> write(
+      String scope, String table, Map<String, Map<String, dynamic>?> rows);
+
+  /// Delete every row of a scope
+  Future<void> deleteScope(String scope);
+}
+
+// Spawning an isolate costs more than decoding a small table inline
+const _isolateThreshold = 200;
+
+Future<List<Map<String, dynamic>>> _decode(List<String> rows) =>
+    rows.length < _isolateThreshold
+        ? Future.value(_decodeRows(rows))
+        : compute(_decodeRows, rows);
+
+Future<List<String>> _encode(List<Map<String, dynamic>> rows) =>
+    rows.length < _isolateThreshold
+        ? Future.value(_encodeRows(rows))
+        : compute(_encodeRows, rows);
+
+List<Map<String, dynamic>> _decodeRows(List<String> rows) =>
+    [for (final row in rows) jsonDecode(row) as Map<String, dynamic>];
+
+List<String> _encodeRows(List<Map<String, dynamic>> rows) =>
+    [for (final row in rows) jsonEncode(row)];
+
+/// Rows in a SQLite table keyed by (scope, table, id), with an index on
+/// (scope, table, updated_at) for loading a table newest first
+class SqliteRowDatabase implements LocalRowDatabase {
+  static const String _fileName = 'local_store.db';
+  static const String _rows = 'local_rows';
+
+  Future<Database>? _db;
+
+  Future<Database> _open() => _db ??= () async {
+        final dir = await getDatabasesPath();
+        return openDatabase(
+          '$dir/$_fileName',
+          version: 1,
+          onCreate: (db, _) async {
+            await db.execute('''
+              CREATE TABLE $_rows (
+                scope TEXT NOT NULL,
+                tbl TEXT NOT NULL,
+                id TEXT NOT NULL,
+                updated_at TEXT,
+                data TEXT NOT NULL,
+                PRIMARY KEY (scope, tbl, id)
+              )''');
+            await db.execute('CREATE INDEX ${_rows}_updated_at '
+                'ON $_rows (scope, tbl, updated_at)');
+          },
+        );
+      }();
+
+  @override
+  Future<List<Map<String, dynamic>>> load(String scope, String table) async {
+    final db = await _open();
+    final result = await db.query(
+      _rows,
+      columns: ['data'],
+      where: 'scope = ? AND tbl = ?',
+      whereArgs: [scope, table],
+      orderBy: 'updated_at DESC',
+    );
+    return _decode([for (final r in result) r['data'] as String]);
+  }
+
+  @override
+  Future<void> write(String scope, String table,
+      Map<String, Map<String, dynamic>?> rows) async {
+    final upserts = [
+      for (final row in rows.values)
+        if (row != null) row
+    ];
+    final encoded = await _encode(upserts);
+    final db = await _open();
+    await db.transaction((txn) async {
+      final batch = txn.batch();
+      for (final entry in rows.entries) {
+        if (entry.value != null) continue;
+        batch.delete(_rows,
+            where: 'scope = ? AND tbl = ? AND id = ?',
+            whereArgs: [scope, table, entry.key]);
+      }
+      for (var i = 0; i < upserts.length; i++) {
+        batch.insert(
+          _rows,
+          {
+            'scope': scope,
+            'tbl': table,
+            'id': upserts[i]['id'] as String,
+            'updated_at': upserts[i]['updated_at']?.toString(),
+            'data': encoded[i],
+          },
+          conflictAlgorithm: ConflictAlgorithm.replace,
+        );
+      }
+      await batch.commit(noResult: true);
+    });
+  }
+
+  @override
+  Future<void> deleteScope(String scope) async {
+    final db = await _open();
+    await db.delete(_rows, where: 'scope = ?', whereArgs: [scope]);
+  }
+}
+
+/// One SharedPreferences key per row, for the web build (and tests, where
+/// the SQLite plugin isn't available)
+class PrefsRowDatabase implements LocalRowDatabase {
+  String _prefix(String scope, [String? table]) =>
+      '${StorageKeys.localRowPrefix}:$scope:${table == null ? '' : '$table:'}';
+
+  @override
+  Future<List<Map<String, dynamic>>> load(String scope, String table) async {
+    final storage = await StorageService.getInstance();
+    final prefix = _prefix(scope, table);
+    final rows = await _decode(storage
+        .getKeys()
+        .where((key) => key.startsWith(prefix))
+        .map(storage.getString)
+        .whereType<String>()
+        .toList());
+    int newestFirst(Map<String, dynamic> a, Map<String, dynamic> b) =>
+        '${b['updated_at'] ?? ''}'.compareTo('${a['updated_at'] ?? ''}');
+    return rows..sort(newestFirst);
+  }
+
+  @override
+  Future<void> write(String scope, String table,
+      Map<String, Map<String, dynamic>?> rows) async {
+    final storage = await StorageService.getInstance();
+    final prefix = _prefix(scope, table);
+    final upserts = [
+      for (final row in rows.values)
+        if (row != null) row
+    ];
+    final encoded = await _encode(upserts);
+    for (final entry in rows.entries) {
+      if (entry.value == null) await storage.remove('$prefix${entry.key}');
+    }
+    for (var i = 0; i < upserts.length; i++) {
+      await storage.setString('$prefix${upserts[i]['id']}', encoded[i]);
+    }
+  }
+
+  @override
+  Future<void> deleteScope(String scope) async {
+    final storage = await StorageService.getInstance();
+    final prefix = _prefix(scope);
+    final keys = storage.getKeys().where((k) => k.startsWith(prefix)).toList();
+    for (final key in keys) {
+      await storage.remove(key);
+    }
+  }
+}
@@ -0,0 +1,420 @@
+import 'dart:async';
+import 'package:flutter/foundation.dart';
+import 'package:http/http.dart' as http;
+import 'package:supabase_flutter/supabase_flutter.dart';
+import 'package:uuid/uuid.dart';
+import 'package:fittravel/services/local_row_database.dart';
+import 'package:fittravel/services/storage_service.dart';
+import 'package:fittravel/supabase/supabase_config.dart';
+
+enum WriteOp { insert, update, delete }
+
+/// Sends a queued write to Supabase; replaced in tests
+typedef WriteExecutor = Future<void> Function(PendingWrite write);
+
+/// A Supabase write recorded while offline, replayed in order on next sync
+class PendingWrite {
+  final String id;
+  final WriteOp op;
+  final String table;
+  final Map<String, dynamic>? data;
+  final Map<String, dynamic> filters;
+  final int attempts;
+  final DateTime createdAt;
+
+  PendingWrite({
+    String? id,
+    required this.op,
+    required this.table,
+    this.data,
+    this.filters = const {},
+    this.attempts = 0,
+    DateTime? createdAt,
+  })  : id = id ?? const Uuid().v4(),
+        createdAt = createdAt ?? DateTime.now();
+
+  /// Inserts must carry a client-generated 'id' so replays are idempotent
+  factory PendingWrite.insert(String table, Map<String, dynamic> data) =>
+      PendingWrite(op: WriteOp.insert, table: table, data: data);
+
+  factory PendingWrite.update(String table, Map<String, dynamic> data,
+          {required Map<String, dynamic> filters}) =>
+      PendingWrite(
+          op: WriteOp.update, table: table, data: data, filters: filters);
+
+  factory PendingWrite.delete(String table,
+          {required Map<String, dynamic> filters}) =>
+      PendingWrite(op: WriteOp.delete, table: table, filters: filters);
+
+  PendingWrite withAttempt() => PendingWrite(
+        id: id,
+        op: op,
+        table: table,
+        data: data,
+        filters: filters,
+        attempts: attempts + 1,
+        createdAt: createdAt,
+      );
+
+  Map<String, dynamic> toJson() => {
+        'id': id,
+        'op': op.name,
+        'table': table,
+        'data': data,
+        'filters': filters,
+        'attempts': attempts,
+        'createdAt': createdAt.toIso8601String(),
+      };
+
+  factory PendingWrite.fromJson(Map<String, dynamic> json) => PendingWrite(
+        id: json['id'] as String,
+        op: WriteOp.values.byName(json['op'] as String),
+        table: json['table'] as String,
+        data: json['data'] as Map<String, dynamic>?,
+        filters: (json['filters'] as Map<String, dynamic>?) ?? const {},
+        attempts: json['attempts'] as int? ?? 0,
+        createdAt: DateTime.parse(json['createdAt'] as String),
+      );
+
+  /// Writes to the same row must replay in order
+  String get rowKey => '$table:${data?['id'] ?? filters['id'] ?? '*'}';
+}
+
+/// A queued write the server kept rejecting, given up on by replay
+class DroppedWrite {
+  final PendingWrite write;
+  final Object error;
+
+  const DroppedWrite(this.write, this.error);
+}
+
+/// Offline-first row store mirroring the user's Supabase tables.
+///
+/// Rows are kept per scope (user id, or [globalScope] for shared tables) and
+/// table, indexed by primary key, so services can render instantly at
+/// startup before syncing. A table is loaded from [LocalRowDatabase] on
+/// first use and kept in memory; changed rows are written back one by one,
+/// debounced so a burst of writes persists each row once.
+class LocalStore {
+  static const String globalScope = 'global';
+
+  /// Writes the server keeps rejecting are dropped after this many replays.
+  /// Network failures never count towards it.
+  static const int maxWriteAttempts = 5;
+
+  static const Duration _persistDelay = Duration(milliseconds: 300);
+
+  static LocalStore? _instance;
+  static WriteExecutor? _executorOverride;
+  static LocalRowDatabase? _databaseOverride;
+  static final StreamController<DroppedWrite> _dropped =
+      StreamController.broadcast();
+
+  /// Queued writes given up on after [maxWriteAttempts] rejections, so the
+  /// UI can tell the user a change didn't save
+  static Stream<DroppedWrite> get droppedWrites => _dropped.stream;
+
+  final StorageService _storage;
+  final LocalRowDatabase _db;
+  final WriteExecutor _execute;
+  // "scope:table" -> row id -> row
+  final Map<String, Map<String, Map<String, dynamic>>> _tables = {};
+  final Map<String, Future<Map<String, Map<String, dynamic>>>> _loading = {};
+  // (scope, table) -> ids of rows changed since the last persist
+  final Map<(String, String), Set<String>> _dirty = {};
+  Timer? _persistTimer;
+  List<PendingWrite>? _outbox;
+  Future<int>? _replaying;
+
+  LocalStore._(this._storage, this._db, this._execute);
+
+  static Future<LocalStore> getInstance() async {
+    _instance ??= LocalStore._(
+      await StorageService.getInstance(),
+      _databaseOverride ?? LocalRowDatabase(),
+      _executorOverride ?? _executeOnSupabase,
+    );
+    return _instance!;
+  }
+
+  String _tableKey(String scope, String table) => '$scope:$table';
+
+  Future<Map<String, Map<String, dynamic>>> _table(
+      String scope, String table) async {
+    final key = _tableKey(scope, table);
+    return _tables[key] ?? await (_loading[key] ??= _load(scope, table));
+  }
+
+  Future<Map<String, Map<String, dynamic>>> _load(
+      String scope, String table) async {
+    final key = _tableKey(scope, table);
+    try {
+      await _migrateLegacyTable(scope, table);
+      final rows = await _db.load(scope, table);
+      return _tables[key] ??= {
+        for (final row in rows) row['id'] as String: row,
+      };
+    } finally {
+      _loading.remove(key);
+    }
+  }
+
+  /// Move a table saved by older versions as one SharedPreferences blob
+  /// into the row database
+  Future<void> _migrateLegacyTable(String scope, String table) async {
+    final legacyKey =
+        '${StorageKeys.localStorePrefix}:${_tableKey(scope, table)}';
+    final json = _storage.getJson(legacyKey);
+    if (json == null) return;
+    await _db.write(scope, table, {
+      for (final entry in json.entries)
+        entry.key: entry.value as Map<String, dynamic>,
+    });
+    await _storage.remove(legacyKey);
+  }
+
+  /// All locally known rows for a table (unordered)
+  Future<List<Map<String, dynamic>>> rows(String scope, String table) async =>
+      (await _table(scope, table)).values.toList();
+
+  Future<Map<String, dynamic>?> row(
+          String scope, String table, String id) async =>
+      (await _table(scope, table))[id];
+
+  /// Insert rows or merge them into existing rows with the same 'id'
+  Future<void> upsertRows(
+      String scope, String table, Iterable<Map<String, dynamic>> rows) async {
+    final t = await _table(scope, table);
+    final changed = <String>[];
+    for (final row in rows) {
+      final id = row['id'] as String?;
+      if (id == null) continue;
+      t[id] = {...?t[id], ...row};
+      changed.add(id);
+    }
+    _markDirty(scope, table, changed);
+  }
+
+  Future<void> deleteRows(
+      String scope, String table, Iterable<String> ids) async {
+    final t = await _table(scope, table);
+    final removed = ids.where((id) => t.remove(id) != null).toList();
+    _markDirty(scope, table, removed);
+  }
+
+  Future<void> deleteWhere(String scope, String table,
+      bool Function(Map<String, dynamic> row) test) async {
+    final t = await _table(scope, table);
+    final removed = [
+      for (final entry in t.entries)
+        if (test(entry.value)) entry.key
+    ];
+    removed.forEach(t.remove);
+    _markDirty(scope, table, removed);
+  }
+
+  /// Replace all rows of a table (used after a full resync)
+  Future<void> replaceRows(
+      String scope, String table, Iterable<Map<String, dynamic>> rows) async {
+    final t = await _table(scope, table);
+    final removed = t.keys.toList();
+    t.clear();
+    _markDirty(scope, table, removed);
+    await upsertRows(scope, table, rows);
+  }
+
+  /// Server-side updated_at of the newest row seen for a table
+  DateTime? watermark(String scope, String table) {
+    final value = _watermarks()[_tableKey(scope, table)];
+    return value is String ? DateTime.tryParse(value) : null;
+  }
+
+  Future<void> setWatermark(String scope, String table, DateTime? value) async {
+    final watermarks = _watermarks();
+    final key = _tableKey(scope, table);
+    if (value == null) {
+      watermarks.remove(key);
+    } else {
+      watermarks[key] = value.toUtc().toIso8601String();
+    }
+    await _storage.setJson(StorageKeys.syncWatermarks, watermarks);
+  }
+
+  Map<String, dynamic> _watermarks() =>
+      _storage.getJson(StorageKeys.syncWatermarks) ?? <String, dynamic>{};
+
+  /// Drop every table and watermark for a scope (e.g. on logout)
+  Future<void> clearScope(String scope) async {
+    final prefix = '$scope:';
+    _tables.removeWhere((key, _) => key.startsWith(prefix));
+    _dirty.removeWhere((key, _) => key.$1 == scope);
+    await _db.deleteScope(scope);
+    final legacyPrefix = '${StorageKeys.localStorePrefix}:$prefix';
+    final legacyKeys =
+        _storage.getKeys().where((k) => k.startsWith(legacyPrefix)).toList();
+    for (final key in legacyKeys) {
+      await _storage.remove(key);
+    }
+    final watermarks = _watermarks()
+      ..removeWhere((k, _) => k.startsWith(prefix));
+    await _storage.setJson(StorageKeys.syncWatermarks, watermarks);
+  }
+
+  void _markDirty(String scope, String table, Iterable<String> ids) {
+    if (ids.isEmpty) return;
+    _dirty.putIfAbsent((scope, table), () => {}).addAll(ids);
+    _persistTimer ??= Timer(_persistDelay, () => unawaited(persist()));
+  }
+
+  /// Write changed rows to disk now
+  Future<void> persist() async {
+    _persistTimer?.cancel();
+    _persistTimer = null;
+    final dirty = Map.of(_dirty);
+    _dirty.clear();
+    for (final MapEntry(key: (scope, table), value: ids) in dirty.entries) {
+      final t = _tables[_tableKey(scope, table)];
+      if (t == null) continue;
+      await _db.write(scope, table, {for (final id in ids) id: t[id]});
+    }
+  }
+
+  // ---------- Offline write queue ----------
+
+  List<PendingWrite> get pendingWrites => List.unmodifiable(_loadOutbox());
+
+  List<PendingWrite> _loadOutbox() {
+    return _outbox ??= (_storage.getJsonList(StorageKeys.pendingWrites) ?? [])
+        .map(PendingWrite.fromJson)
+        .toList();
+  }
+
+  Future<void> _saveOutbox() => _storage.setJsonList(
+      StorageKeys.pendingWrites, _loadOutbox().map((w) => w.toJson()).toList());
+
+  /// Forget queued writes (e.g. on logout, so they never replay under
+  /// another account)
+  Future<void> clearPendingWrites() async {
+    _loadOutbox().clear();
+    await _storage.remove(StorageKeys.pendingWrites);
+  }
+
+  /// Run [write] against Supabase, queueing it for replay if it fails.
+  /// Returns true when the write reached the server.
+  Future<bool> writeOrQueue(PendingWrite write) async {
+    // Keep ordering: if older writes are still queued, queue behind them
+    if (_loadOutbox().isEmpty) {
+      try {
+        await _execute(write);
+        return true;
+      } catch (e) {
+        debugPrint('LocalStore: queueing ${write.op.name} on ${write.table}: $e');
+      }
+    }
+    _loadOutbox().add(write);
+    await _saveOutbox();
+    return false;
+  }
+
+  /// Replay queued writes in order. Stops at the first network failure
+  /// (still offline). A write the server rejects stays queued for the next
+  /// replay, and later writes to the same row wait behind it, until it has
+  /// been rejected [maxWriteAttempts] times; then it is dropped and reported
+  /// on [droppedWrites]. Returns the number of writes that reached the
+  /// server.
+  Future<int> replayPendingWrites() {
+    return _replaying ??= _replay().whenComplete(() => _replaying = null);
+  }
+
+  Future<int> _replay() async {
+    final outbox = _loadOutbox();
+    final blockedRows = <String>{};
+    var replayed = 0;
+    var i = 0;
+    while (i < outbox.length) {
+      final write = outbox[i];
+      if (blockedRows.contains(write.rowKey)) {
+        i++;
+        continue;
+      }
+      try {
+        await _execute(write);
+        outbox.removeAt(i);
+        replayed++;
+      } catch (e) {
+        if (!isRejection(e)) {
+          debugPrint('LocalStore: replay paused, ${write.table} unreachable: $e');
+          break;
+        }
+        final retried = write.withAttempt();
+        if (retried.attempts >= maxWriteAttempts) {
+          debugPrint('LocalStore: dropping ${write.op.name} on ${write.table} '
+              'after ${retried.attempts} rejections: $e');
+          outbox.removeAt(i);
+          _dropped.add(DroppedWrite(write, e));
+          continue;
+        }
+        outbox[i] = retried;
+        blockedRows.add(write.rowKey);
+        i++;
+      }
+    }
+    await _saveOutbox();
+    return replayed;
+  }
+
+  /// Whether [error] means the server refused the write, as opposed to the
+  /// request not getting through (offline, timeout, server hiccup, expired
+  /// session), which is always retried
+  @visibleForTesting
+  static bool isRejection(Object error) {
+    if (error is http.ClientException || error is TimeoutException) {
+      return false;
+    }
+    if (error is PostgrestException) {
+      final code = error.code ?? '';
+      // PGRST3xx are JWT errors, fixed by the next session refresh
+      if (code.startsWith('PGRST3')) return false;
+      final status = code.length == 3 ? int.tryParse(code) : null;
+      return status == null || status < 500;
+    }
+    return true;
+  }
+
+  /// Calls the client directly rather than through SupabaseService, whose
+  /// wrappers turn errors into strings [isRejection] can't classify
+  static Future<void> _executeOnSupabase(PendingWrite write) async {
+    final table = SupabaseConfig.client.from(write.table);
+    switch (write.op) {
+      case WriteOp.insert:
+        // Upsert so a replay of an insert that already landed is a no-op
+        await table.upsert(write.data!);
+        break;
+      case WriteOp.update:
+        var query = table.update(write.data!);
+        for (final entry in write.filters.entries) {
+          query = query.eq(entry.key, entry.value as Object);
+        }
+        await query;
+        break;
+      case WriteOp.delete:
+        var query = table.delete();
+        for (final entry in write.filters.entries) {
+          query = query.eq(entry.key, entry.value as Object);
+        }
+        await query;
+        break;
+    }
+  }
+
+  /// [execute] replaces the Supabase calls and [database] the on-device
+  /// row database of the next instance
+  @visibleForTesting
+  static void resetInstance(
+      {WriteExecutor? execute, LocalRowDatabase? database}) {
+    _instance?._persistTimer?.cancel();
+    _instance = null;
+    _executorOverride = execute;
+    _databaseOverride = database;
+  }
+}
@@ -0,0 +1,57 @@
+import 'dart:io';
+import 'package:flutter/foundation.dart';
+import 'package:path_provider/path_provider.dart';
+import 'package:fittravel/services/image_processing_pool.dart';
+
+/// Files holding the processed bytes of queued photo uploads.
+///
+/// Kept out of SharedPreferences, which is loaded whole into memory at
+/// startup and limited to about 5MB on the web. The web build has no file
+/// system, so there photos stay in memory only and a queued upload doesn't
+/// survive a reload.
+class PhotoFileStore {
+  static const String _dirName = 'photo_uploads';
+
+  Future<Directory?>? _dir;
+
+  /// False on the web, where [write] is a no-op and [read] finds nothing
+  bool get isPersistent => !kIsWeb;
+
+  Future<Directory?> _directory() => _dir ??= () async {
+        if (!isPersistent) return null;
+        final support = await getApplicationSupportDirectory();
+        return Directory('${support.path}/$_dirName').create(recursive: true);
+      }();
+
+  Future<(File, File)?> _files(String jobId) async {
+    final dir = await _directory();
+    if (dir == null) return null;
+    return (File('${dir.path}/$jobId.jpg'), File('${dir.path}/$jobId.thumb.jpg'));
+  }
+
+  Future<void> write(String jobId, ProcessedImage image) async {
+    final files = await _files(jobId);
+    if (files == null) return;
+    await files.$1.writeAsBytes(image.full, flush: true);
+    await files.$2.writeAsBytes(image.thumbnail, flush: true);
+  }
+
+  /// Null if the job's image isn't stored (or only partly)
+  Future<ProcessedImage?> read(String jobId) async {
+    final files = await _files(jobId);
+    if (files == null) return null;
+    if (!await files.$1.exists() || !await files.$2.exists()) return null;
+    return ProcessedImage(
+      full: await files.$1.readAsBytes(),
+      thumbnail: await files.$2.readAsBytes(),
+    );
+  }
+
+  Future<void> delete(String jobId) async {
+    final files = await _files(jobId);
+    if (files == null) return;
+    for (final file in [files.$1, files.$2]) {
+      if (await file.exists()) await file.delete();
+    }
+  }
+}
@@ -1,6 +1,6 @@
 import 'package:flutter/foundation.dart';
+import 'package:fittravel/services/image_processing_pool.dart';
 import 'package:fittravel/supabase/supabase_config.dart';
-import 'package:image/image.dart' as img;
 import 'package:supabase_flutter/supabase_flutter.dart';
 
 /// Service for managing Supabase Storage operations for photos
@@ -17,86 +17,24 @@ class PhotoStorageService {
   static const int thumbnailSize = 400;
   static const int jpegQuality = 85;
 
+  static const ImageProcessingOptions _photoOptions = ImageProcessingOptions(
+    maxWidth: maxImageWidth,
+    maxHeight: maxImageHeight,
+    thumbnailSize: thumbnailSize,
+    jpegQuality: jpegQuality,
+  );
+
+  static const ImageProcessingOptions _avatarOptions = ImageProcessingOptions(
+    maxWidth: maxImageWidth,
+    maxHeight: maxImageHeight,
+    thumbnailSize: thumbnailSize,
+    jpegQuality: jpegQuality,
+    squareCrop: true,
+  );
+
   /// Get current authenticated user ID
   static String? get _currentUserId => SupabaseConfig.auth.currentUser?.id;
 
-  /// Upload a photo to community photos bucket
-  /// Returns the storage path (not the full URL)
-  static Future<String> uploadCommunityPhoto({
-    required Uint8List imageBytes,
-    required String placeId,
-    String? photoId,
-  }) async {
-    final userId = _currentUserId;
-    if (userId == null) {
-      throw Exception('User not authenticated');
-    }
-
-    try {
-      // Compress and resize image
-      final processedBytes = await _processImage(imageBytes);
-
-      // Generate unique filename
-      final timestamp = DateTime.now().millisecondsSinceEpoch;
-      final filename = photoId ?? 'photo_$timestamp';
-      final path = '$userId/$placeId/$filename.jpg';
-
-      // Upload to Supabase Storage
-      await SupabaseConfig.storage.from(communityPhotosBucket).uploadBinary(
-            path,
-            processedBytes,
-            fileOptions: const FileOptions(
-              contentType: 'image/jpeg',
-              upsert: false,
-            ),
-          );
-
-      debugPrint('✅ Uploaded community photo to: $path');
-      return path;
-    } catch (e) {
-      debugPrint('❌ Failed to upload community photo: $e');
-      rethrow;
-    }
-  }
-
-  /// Upload a quick photo to quick photos bucket
-  /// Returns the storage path (not the full URL)
-  static Future<String> uploadQuickPhoto({
-    required Uint8List imageBytes,
-    String? photoId,
-  }) async {
-    final userId = _currentUserId;
-    if (userId == null) {
-      throw Exception('User not authenticated');
-    }
-
-    try {
-      // Compress and resize image
-      final processedBytes = await _processImage(imageBytes);
-
-      // Generate unique filename
-      final timestamp = DateTime.now().millisecondsSinceEpoch;
-      final filename = photoId ?? 'quick_$timestamp';
-      final path = '$userId/$filename.jpg';
-
-      // Upload to Supabase Storage
-      await SupabaseConfig.storage.from(quickPhotosBucket).uploadBinary(
-            path,
-            processedBytes,
-            fileOptions: const FileOptions(
-              contentType: 'image/jpeg',
-              upsert: false,
-            ),
-          );
-
-      debugPrint('✅ Uploaded quick photo to: $path');
-      return path;
-    } catch (e) {
-      debugPrint('❌ Failed to upload quick photo: $e');
-      rethrow;
-    }
-  }
-
   /// Upload an avatar photo
   /// Returns the storage path (not the full URL)
   static Future<String> uploadAvatar({
@@ -109,7 +47,7 @@ class PhotoStorageService {
 
     try {
       // Process avatar (smaller size, square crop)
-      final processedBytes = await _processAvatar(imageBytes);
+      final processedBytes = (await processAvatar(imageBytes)).full;
 
       // Use consistent filename for easy overwriting
       final path = '$userId/avatar.jpg';
@@ -132,10 +70,49 @@ class PhotoStorageService {
     }
   }
 
+  /// Storage path of a community photo
+  static String communityPhotoPath(
+          String userId, String placeId, String filename) =>
+      '$userId/$placeId/$filename.jpg';
+
+  /// Storage path of a quick photo
+  static String quickPhotoPath(String userId, String filename) =>
+      '$userId/$filename.jpg';
+
+  /// Storage path of the thumbnail uploaded next to [path]
+  static String thumbnailPath(String path) =>
+      path.endsWith('.jpg')
+          ? '${path.substring(0, path.length - 4)}_thumb.jpg'
+          : '${path}_thumb';
+
+  /// Upload a processed photo and its thumbnail.
+  ///
+  /// Uses upsert so a retried upload that already landed overwrites itself
+  /// instead of failing. [onProgress] receives the fraction of bytes
+  /// uploaded after each file.
+  static Future<void> uploadProcessed(
+    String bucket,
+    String path,
+    ProcessedImage image, {
+    void Function(double progress)? onProgress,
+  }) async {
+    const options = FileOptions(contentType: 'image/jpeg', upsert: true);
+    final total = image.full.length + image.thumbnail.length;
+    final storage = SupabaseConfig.storage.from(bucket);
+
+    await storage.uploadBinary(path, image.full, fileOptions: options);
+    onProgress?.call(image.full.length / total);
+    await storage.uploadBinary(thumbnailPath(path), image.thumbnail,
+        fileOptions: options);
+    onProgress?.call(1);
+  }
+
   /// Delete a photo from community photos bucket
   static Future<void> deleteCommunityPhoto(String path) async {
     try {
-      await SupabaseConfig.storage.from(communityPhotosBucket).remove([path]);
+      await SupabaseConfig.storage
+          .from(communityPhotosBucket)
+          .remove([path, thumbnailPath(path)]);
       debugPrint('✅ Deleted community photo: $path');
     } catch (e) {
       debugPrint('❌ Failed to delete community photo: $e');
@@ -146,7 +123,9 @@ class PhotoStorageService {
   /// Delete a photo from quick photos bucket
   static Future<void> deleteQuickPhoto(String path) async {
     try {
-      await SupabaseConfig.storage.from(quickPhotosBucket).remove([path]);
+      await SupabaseConfig.storage
+          .from(quickPhotosBucket)
+          .remove([path, thumbnailPath(path)]);
       debugPrint('✅ Deleted quick photo: $path');
     } catch (e) {
       debugPrint('❌ Failed to delete quick photo: $e');
@@ -175,6 +154,16 @@ class PhotoStorageService {
     return getPublicUrl(communityPhotosBucket, path);
   }
 
+  /// Get public URL of the thumbnail stored next to a community or quick
+  /// photo, or null if [imageUrl] isn't one of our uploads (legacy rows
+  /// can hold data URLs or links elsewhere)
+  static String? getThumbnailUrl(String imageUrl) {
+    final uploaded = imageUrl.endsWith('.jpg') &&
+        (imageUrl.contains('/$communityPhotosBucket/') ||
+            imageUrl.contains('/$quickPhotosBucket/'));
+    return uploaded ? thumbnailPath(imageUrl) : null;
+  }
+
   /// Get public URL for a quick photo
   static String getQuickPhotoUrl(String path) {
     return getPublicUrl(quickPhotosBucket, path);
@@ -185,83 +174,14 @@ class PhotoStorageService {
     return getPublicUrl(avatarsBucket, path);
   }
 
-  /// Process and compress an image
-  /// Resizes to max dimensions and compresses to JPEG
-  static Future<Uint8List> _processImage(Uint8List imageBytes) async {
-    try {
-      // Decode image
-      final image = img.decodeImage(imageBytes);
-      if (image == null) {
-        throw Exception('Failed to decode image');
-      }
-
-      // Resize if needed (maintain aspect ratio)
-      img.Image processedImage;
-      if (image.width > maxImageWidth || image.height > maxImageHeight) {
-        processedImage = img.copyResize(
-          image,
-          width: image.width > image.height ? maxImageWidth : null,
-          height: image.height > image.width ? maxImageHeight : null,
-          interpolation: img.Interpolation.linear,
-        );
-      } else {
-        processedImage = image;
-      }
+  /// Resize to max dimensions and build the thumbnail in one decode, on a
+  /// worker isolate
+  static Future<ProcessedImage> processPhoto(Uint8List imageBytes) =>
+      ImageProcessingPool.instance.process(imageBytes, _photoOptions);
 
-      // Encode as JPEG with quality compression
-      final compressedBytes =
-          img.encodeJpg(processedImage, quality: jpegQuality);
-
-      debugPrint(
-          '📸 Image processed: ${imageBytes.length} bytes → ${compressedBytes.length} bytes');
-      return Uint8List.fromList(compressedBytes);
-    } catch (e) {
-      debugPrint('⚠️ Image processing failed, using original: $e');
-      return imageBytes;
-    }
-  }
-
-  /// Process an avatar image (square crop, smaller size)
-  static Future<Uint8List> _processAvatar(Uint8List imageBytes) async {
-    try {
-      // Decode image
-      final image = img.decodeImage(imageBytes);
-      if (image == null) {
-        throw Exception('Failed to decode image');
-      }
-
-      // Crop to square (center crop)
-      final size = image.width < image.height ? image.width : image.height;
-      final x = (image.width - size) ~/ 2;
-      final y = (image.height - size) ~/ 2;
-
-      final cropped = img.copyCrop(
-        image,
-        x: x,
-        y: y,
-        width: size,
-        height: size,
-      );
-
-      // Resize to thumbnail size
-      final resized = img.copyResize(
-        cropped,
-        width: thumbnailSize,
-        height: thumbnailSize,
-        interpolation: img.Interpolation.linear,
-      );
-
-      // Encode as JPEG
-      final compressedBytes = img.encodeJpg(resized, quality: jpegQuality);
-
-      debugPrint(
-          '👤 Avatar processed: ${imageBytes.length} bytes → ${compressedBytes.length} bytes');
-      return Uint8List.fromList(compressedBytes);
-    } catch (e) {
-      debugPrint('⚠️ Avatar processing failed, using fallback processing: $e');
-      return _processImage(imageBytes);
-    }
-  }
+  /// Square-crop and resize an avatar on a worker isolate
+  static Future<ProcessedImage> processAvatar(Uint8List imageBytes) =>
+      ImageProcessingPool.instance.process(imageBytes, _avatarOptions);
 
   /// Download a photo from storage
   static Future<Uint8List> downloadPhoto(String bucket, String path) async {
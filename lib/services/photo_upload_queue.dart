@@ -0,0 +1,362 @@
+import 'dart:async';
+import 'dart:math';
+import 'package:flutter/foundation.dart';
+import 'package:uuid/uuid.dart';
+import 'package:fittravel/services/image_processing_pool.dart';
+import 'package:fittravel/services/photo_file_store.dart';
+import 'package:fittravel/services/photo_storage_service.dart';
+import 'package:fittravel/services/storage_service.dart';
+import 'package:fittravel/supabase/supabase_config.dart';
+
+enum PhotoUploadKind { community, quick }
+
+enum PhotoUploadStatus { queued, uploading, waitingToRetry, failed }
+
+/// A photo waiting to be uploaded to Storage and recorded in its table
+class PhotoUploadJob {
+  /// Client-generated row id, so a retried metadata insert is idempotent
+  final String id;
+  final PhotoUploadKind kind;
+  final String userId;
+  final String? placeId;
+  final String? _filename;
+  final DateTime createdAt;
+  int attempts;
+  PhotoUploadStatus status;
+
+  /// Fraction of the job done, 0..1
+  double progress;
+
+  PhotoUploadJob({
+    String? id,
+    required this.kind,
+    required this.userId,
+    this.placeId,
+    String? filename,
+    DateTime? createdAt,
+    this.attempts = 0,
+    this.status = PhotoUploadStatus.queued,
+    this.progress = 0,
+  })  : id = id ?? const Uuid().v4(),
+        _filename = filename,
+        createdAt = createdAt ?? DateTime.now();
+
+  /// Storage file name without extension; defaults to the row id
+  String get filename => _filename ?? id;
+
+  String get bucket => switch (kind) {
+        PhotoUploadKind.community => PhotoStorageService.communityPhotosBucket,
+        PhotoUploadKind.quick => PhotoStorageService.quickPhotosBucket,
+      };
+
+  String get table => switch (kind) {
+        PhotoUploadKind.community => 'community_photos',
+        PhotoUploadKind.quick => 'quick_photos',
+      };
+
+  String get storagePath => switch (kind) {
+        PhotoUploadKind.community =>
+          PhotoStorageService.communityPhotoPath(userId, placeId!, filename),
+        PhotoUploadKind.quick =>
+          PhotoStorageService.quickPhotoPath(userId, filename),
+      };
+
+  bool get isActive => status != PhotoUploadStatus.failed;
+
+  Map<String, dynamic> toJson() => {
+        'id': id,
+        'kind': kind.name,
+        'userId': userId,
+        'placeId': placeId,
+        'filename': filename,
+        'createdAt': createdAt.toIso8601String(),
+        'attempts': attempts,
+        'failed': status == PhotoUploadStatus.failed,
+      };
+
+  factory PhotoUploadJob.fromJson(Map<String, dynamic> json) => PhotoUploadJob(
+        id: json['id'] as String,
+        kind: PhotoUploadKind.values.byName(json['kind'] as String),
+        userId: json['userId'] as String,
+        placeId: json['placeId'] as String?,
+        filename: json['filename'] as String,
+        createdAt: DateTime.parse(json['createdAt'] as String),
+        attempts: json['attempts'] as int? ?? 0,
+        status: json['failed'] == true
+            ? PhotoUploadStatus.failed
+            : PhotoUploadStatus.queued,
+      );
+}
+
+/// Uploads [image] for [job] and returns the inserted metadata row
+typedef PhotoUploader = Future<Map<String, dynamic>> Function(
+  PhotoUploadJob job,
+  ProcessedImage image,
+  void Function(double progress) onProgress,
+);
+
+/// Persistent photo upload queue.
+///
+/// Photos are processed on the [ImageProcessingPool], saved to a
+/// [PhotoFileStore] (only job metadata goes to SharedPreferences) and
+/// uploaded with at most [maxConcurrentUploads] in flight. Failed
+/// uploads retry with exponential backoff; jobs that exhaust [maxAttempts]
+/// stay persisted and are retried by [resume] on the next launch, so a
+/// photo taken offline is never lost.
+///
+/// [enqueue] returns as soon as the job is saved; finished uploads are
+/// reported on [completed] and in-flight ones through [progressOf].
+class PhotoUploadQueue extends ChangeNotifier {
+  static const int maxConcurrentUploads = 2;
+  static const int maxAttempts = 5;
+  static const Duration baseRetryDelay = Duration(seconds: 2);
+
+  static final PhotoUploadQueue instance = PhotoUploadQueue();
+
+  final PhotoUploader _upload;
+  final Future<ProcessedImage> Function(Uint8List bytes) _process;
+  final String? Function() _currentUserId;
+  final PhotoFileStore _files;
+  final bool persist;
+  final int _maxConcurrent;
+  final Duration _retryDelay;
+  final Random _random = Random();
+
+  final List<PhotoUploadJob> _jobs = [];
+  final Map<String, ProcessedImage> _images = {};
+  final StreamController<(PhotoUploadJob, Map<String, dynamic>)> _completed =
+      StreamController.broadcast();
+  int _active = 0;
+  Future<void>? _restoring;
+
+  PhotoUploadQueue({
+    PhotoUploader? uploader,
+    Future<ProcessedImage> Function(Uint8List bytes)? processor,
+    String? Function()? currentUserId,
+    PhotoFileStore? files,
+    this.persist = true,
+    int maxConcurrent = maxConcurrentUploads,
+    Duration retryDelay = baseRetryDelay,
+  })  : _upload = uploader ?? _uploadToSupabase,
+        _process = processor ?? PhotoStorageService.processPhoto,
+        _currentUserId =
+            currentUserId ?? (() => SupabaseConfig.auth.currentUser?.id),
+        _files = files ?? PhotoFileStore(),
+        _maxConcurrent = maxConcurrent,
+        _retryDelay = retryDelay;
+
+  List<PhotoUploadJob> get jobs => List.unmodifiable(_jobs);
+
+  List<PhotoUploadJob> jobsOf(PhotoUploadKind kind) =>
+      _jobs.where((j) => j.kind == kind).toList();
+
+  /// Emits every finished upload with its metadata row, including jobs
+  /// restored from a previous session
+  Stream<(PhotoUploadJob, Map<String, dynamic>)> get completed =>
+      _completed.stream;
+
+  /// Average progress of active jobs of [kind], or null when idle
+  double? progressOf(PhotoUploadKind kind) {
+    final active = _jobs.where((j) => j.kind == kind && j.isActive).toList();
+    if (active.isEmpty) return null;
+    return active.fold<double>(0, (sum, j) => sum + j.progress) /
+        active.length;
+  }
+
+  /// Process [imageBytes] and queue the upload. Completes with the job
+  /// once it is saved and will survive a restart; throws if the photo
+  /// couldn't be processed or saved, in which case nothing is queued.
+  Future<PhotoUploadJob> enqueue({
+    required PhotoUploadKind kind,
+    required String userId,
+    required Uint8List imageBytes,
+    String? placeId,
+    String? photoId,
+  }) async {
+    assert(kind != PhotoUploadKind.community || placeId != null);
+    final job = PhotoUploadJob(
+      kind: kind,
+      userId: userId,
+      placeId: placeId,
+      filename: photoId,
+    );
+    _jobs.add(job);
+    notifyListeners();
+
+    final ProcessedImage image;
+    try {
+      image = await _process(imageBytes);
+    } catch (e) {
+      _jobs.remove(job);
+      notifyListeners();
+      rethrow;
+    }
+    _images[job.id] = image;
+    job.progress = 0.1;
+    try {
+      await _save(job, image: image);
+    } catch (e) {
+      // e.g. disk full: don't leave a job behind that can never finish
+      debugPrint('❌ Photo upload ${job.id} could not be saved: $e');
+      _jobs.remove(job);
+      _images.remove(job.id);
+      notifyListeners();
+      if (persist) unawaited(_files.delete(job.id).catchError((_) {}));
+      rethrow;
+    }
+
+    _pump();
+    return job;
+  }
+
+  /// Load jobs persisted by a previous session and start uploading those
+  /// belonging to the signed-in user, giving failed jobs a fresh set of
+  /// attempts. Safe to call repeatedly.
+  Future<void> resume() async {
+    await (_restoring ??= _restore());
+    for (final job in _jobs) {
+      if (job.status == PhotoUploadStatus.failed) {
+        job.status = PhotoUploadStatus.queued;
+        job.attempts = 0;
+      }
+    }
+    _pump();
+  }
+
+  /// Drop a job and its stored image
+  Future<void> cancel(String jobId) async {
+    final job = _jobs.where((j) => j.id == jobId).firstOrNull;
+    if (job == null || job.status == PhotoUploadStatus.uploading) return;
+    await _finish(job);
+  }
+
+  void _pump() {
+    final userId = _currentUserId();
+    while (_active < _maxConcurrent) {
+      final next = _jobs
+          .where((j) =>
+              j.status == PhotoUploadStatus.queued &&
+              j.userId == userId &&
+              _images.containsKey(j.id))
+          .firstOrNull;
+      if (next == null) break;
+      _active++;
+      unawaited(_run(next).whenComplete(() {
+        _active--;
+        _pump();
+      }));
+    }
+  }
+
+  Future<void> _run(PhotoUploadJob job) async {
+    job.status = PhotoUploadStatus.uploading;
+    job.attempts++;
+    notifyListeners();
+
+    try {
+      final row = await _upload(job, _images[job.id]!, (progress) {
+        // Processing counted for the first 10%
+        job.progress = 0.1 + progress * 0.8;
+        notifyListeners();
+      });
+      job.progress = 1;
+      await _finish(job);
+      debugPrint('✅ Photo upload ${job.id} done after ${job.attempts} '
+          'attempt(s)');
+      _completed.add((job, row));
+    } catch (e) {
+      if (job.attempts >= maxAttempts) {
+        debugPrint('❌ Photo upload ${job.id} failed, keeping for next '
+            'launch: $e');
+        job.status = PhotoUploadStatus.failed;
+        await _save(job);
+        notifyListeners();
+        return;
+      }
+
+      final delay = _backoff(job.attempts);
+      debugPrint('⚠️ Photo upload ${job.id} attempt ${job.attempts} failed, '
+          'retrying in ${delay.inMilliseconds}ms: $e');
+      job.status = PhotoUploadStatus.waitingToRetry;
+      await _save(job);
+      notifyListeners();
+      Timer(delay, () {
+        if (job.status != PhotoUploadStatus.waitingToRetry) return;
+        job.status = PhotoUploadStatus.queued;
+        _pump();
+      });
+    }
+  }
+
+  /// Exponential backoff with up to 25% jitter
+  Duration _backoff(int attempt) {
+    final base = _retryDelay * pow(2, attempt - 1);
+    return base + base * (_random.nextDouble() * 0.25);
+  }
+
+  Future<void> _finish(PhotoUploadJob job) async {
+    _jobs.remove(job);
+    _images.remove(job.id);
+    notifyListeners();
+    if (!persist) return;
+    await _files.delete(job.id);
+    await _saveIndex(await StorageService.getInstance());
+  }
+
+  // ---------- Persistence ----------
+
+  Future<void> _save(PhotoUploadJob job, {ProcessedImage? image}) async {
+    if (!persist) return;
+    if (image != null) await _files.write(job.id, image);
+    await _saveIndex(await StorageService.getInstance());
+  }
+
+  Future<void> _saveIndex(StorageService storage) => storage.setJsonList(
+      StorageKeys.photoUploadQueue, _jobs.map((j) => j.toJson()).toList());
+
+  Future<void> _restore() async {
+    if (!persist) return;
+    final storage = await StorageService.getInstance();
+    final saved = storage.getJsonList(StorageKeys.photoUploadQueue) ?? [];
+    var dropped = false;
+    for (final json in saved) {
+      final job = PhotoUploadJob.fromJson(json);
+      if (_jobs.any((j) => j.id == job.id)) continue;
+      final image = await _files.read(job.id);
+      if (image == null) {
+        // Its file is gone, so it can never upload
+        dropped = true;
+        continue;
+      }
+      _images[job.id] = image;
+      job.progress = 0.1;
+      _jobs.add(job);
+    }
+    if (dropped) await _saveIndex(storage);
+    if (saved.isNotEmpty) {
+      debugPrint('PhotoUploadQueue: restored ${_jobs.length} pending uploads');
+      notifyListeners();
+    }
+  }
+
+  static Future<Map<String, dynamic>> _uploadToSupabase(
+    PhotoUploadJob job,
+    ProcessedImage image,
+    void Function(double progress) onProgress,
+  ) async {
+    final path = job.storagePath;
+    await PhotoStorageService.uploadProcessed(job.bucket, path, image,
+        onProgress: onProgress);
+
+    final data = {
+      'id': job.id,
+      'user_id': job.userId,
+      'place_id': job.placeId,
+      'image_url': PhotoStorageService.getPublicUrl(job.bucket, path),
+    };
+    // Upsert on the client id so a retry after a lost response is a no-op
+    final result =
+        await SupabaseConfig.client.from(job.table).upsert(data).select();
+    return List<Map<String, dynamic>>.from(result).first;
+  }
+}
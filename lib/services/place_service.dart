@@ -1,10 +1,17 @@
-import 'dart:math';
 import 'package:flutter/foundation.dart';
 import 'package:fittravel/models/models.dart';
+import 'package:fittravel/services/delta_sync.dart';
+import 'package:fittravel/services/local_store.dart';
+import 'package:fittravel/services/saved_place_index.dart';
 import 'package:fittravel/supabase/supabase_config.dart';
+import 'package:uuid/uuid.dart';
 
 class PlaceService extends ChangeNotifier {
+  static const String _table = 'saved_places';
+
   List<PlaceModel> _savedPlaces = [];
+  // Kept in sync with _savedPlaces on every write
+  final SavedPlaceIndex _index = SavedPlaceIndex();
   bool _isLoading = false;
   String? _error;
 
@@ -33,30 +40,47 @@ class PlaceService extends ChangeNotifier {
       final userId = _currentUserId;
       if (userId == null) {
         _savedPlaces = [];
+        _index.clear();
         _isLoading = false;
         notifyListeners();
         return;
       }
 
-      // Fetch user's saved places from Supabase
-      final data = await SupabaseService.select(
-        'saved_places',
+      final store = await LocalStore.getInstance();
+
+      // Show the last synced places immediately, then pull changes
+      _setSavedPlaces(await store.rows(userId, _table));
+      if (_savedPlaces.isNotEmpty) {
+        _isLoading = false;
+        notifyListeners();
+      }
+
+      await store.replayPendingWrites();
+      final rows = await DeltaSync.pull(
+        store,
+        scope: userId,
+        table: _table,
         filters: {'user_id': userId},
-        orderBy: 'created_at',
-        ascending: false,
       );
-
-      _savedPlaces = data.map((j) => PlaceModel.fromSupabaseJson(j)).toList();
+      _setSavedPlaces(rows);
     } catch (e) {
-      _error = 'Failed to load saved places';
       debugPrint('PlaceService.initialize error: $e');
-      _savedPlaces = [];
+      // Keep locally cached places when offline
+      if (_savedPlaces.isEmpty) {
+        _error = 'Failed to load saved places';
+      }
     }
 
     _isLoading = false;
     notifyListeners();
   }
 
+  void _setSavedPlaces(List<Map<String, dynamic>> rows) {
+    _savedPlaces = rows.map((j) => PlaceModel.fromSupabaseJson(j)).toList()
+      ..sort((a, b) => b.createdAt.compareTo(a.createdAt));
+    _index.rebuild(_savedPlaces);
+  }
+
   Future<void> savePlace(PlaceModel place) async {
     final userId = _currentUserId;
     if (userId == null) {
@@ -66,22 +90,27 @@ class PlaceService extends ChangeNotifier {
     }
 
     // Check if already exists locally
-    final exists = _savedPlaces.any((p) =>
-        p.id == place.id ||
+    final exists = _index.byId(place.id) != null ||
         (place.googlePlaceId != null &&
-            p.googlePlaceId == place.googlePlaceId));
+            _index.containsGoogleId(place.googlePlaceId!));
     if (exists) return;
 
     try {
-      final data = place.toSupabaseJson(userId);
-      final result = await SupabaseService.insert('saved_places', data);
-
-      if (result.isNotEmpty) {
-        final newPlace = PlaceModel.fromSupabaseJson(result.first);
-        _savedPlaces.insert(0, newPlace);
-        _error = null;
-        notifyListeners();
-      }
+      // Client-generated id so the insert can be queued and replayed offline
+      final data = {
+        ...place.toSupabaseJson(userId),
+        'id': const Uuid().v4(),
+        'created_at': DateTime.now().toIso8601String(),
+      };
+      final store = await LocalStore.getInstance();
+      await store.writeOrQueue(PendingWrite.insert(_table, data));
+      await store.upsertRows(userId, _table, [data]);
+
+      final newPlace = PlaceModel.fromSupabaseJson(data);
+      _savedPlaces.insert(0, newPlace);
+      _index.add(newPlace);
+      _error = null;
+      notifyListeners();
     } catch (e) {
       _error = 'Failed to save place';
       debugPrint('PlaceService.savePlace error: $e');
@@ -90,13 +119,18 @@ class PlaceService extends ChangeNotifier {
   }
 
   Future<void> removePlace(String placeId) async {
+    final userId = _currentUserId;
+    if (userId == null) return;
+
     try {
-      await SupabaseService.delete(
-        'saved_places',
-        filters: {'id': placeId},
-      );
+      final store = await LocalStore.getInstance();
+      // Applied locally right away; replayed later if offline
+      await store.writeOrQueue(
+          PendingWrite.delete(_table, filters: {'id': placeId}));
+      await store.deleteRows(userId, _table, [placeId]);
 
       _savedPlaces.removeWhere((p) => p.id == placeId);
+      _index.remove(placeId);
       _error = null;
       notifyListeners();
     } catch (e) {
@@ -111,15 +145,18 @@ class PlaceService extends ChangeNotifier {
     if (userId == null) return;
 
     try {
-      await SupabaseService.update(
-        'saved_places',
-        place.toSupabaseJson(userId),
-        filters: {'id': place.id},
-      );
+      final store = await LocalStore.getInstance();
+      final data = place.toSupabaseJson(userId);
+      await store.writeOrQueue(
+          PendingWrite.update(_table, data, filters: {'id': place.id}));
+      await store.upsertRows(userId, _table, [
+        {...data, 'id': place.id}
+      ]);
 
       final index = _savedPlaces.indexWhere((p) => p.id == place.id);
       if (index >= 0) {
         _savedPlaces[index] = place;
+        _index.replace(place);
         _error = null;
         notifyListeners();
       }
@@ -131,25 +168,29 @@ class PlaceService extends ChangeNotifier {
   }
 
   Future<void> markVisited(String placeId) async {
+    final userId = _currentUserId;
     final index = _savedPlaces.indexWhere((p) => p.id == placeId);
-    if (index < 0) return;
+    if (userId == null || index < 0) return;
 
     final visitedAt = DateTime.now();
 
     try {
-      await SupabaseService.update(
-        'saved_places',
-        {
-          'is_visited': true,
-          'visited_at': visitedAt.toIso8601String(),
-        },
-        filters: {'id': placeId},
-      );
+      final store = await LocalStore.getInstance();
+      final data = {
+        'is_visited': true,
+        'visited_at': visitedAt.toIso8601String(),
+      };
+      await store.writeOrQueue(
+          PendingWrite.update(_table, data, filters: {'id': placeId}));
+      await store.upsertRows(userId, _table, [
+        {...data, 'id': placeId}
+      ]);
 
       _savedPlaces[index] = _savedPlaces[index].copyWith(
         isVisited: true,
         visitedAt: visitedAt,
       );
+      _index.replace(_savedPlaces[index]);
       _error = null;
       notifyListeners();
     } catch (e) {
@@ -159,40 +200,23 @@ class PlaceService extends ChangeNotifier {
     }
   }
 
-  PlaceModel? getPlaceById(String id) {
-    try {
-      return _savedPlaces.firstWhere((p) => p.id == id);
-    } catch (e) {
-      return null;
-    }
-  }
+  PlaceModel? getPlaceById(String id) => _index.byId(id);
 
   /// Check if a place is saved by Google Place ID
   bool isPlaceSaved(String? googlePlaceId) {
     if (googlePlaceId == null) return false;
-    return _savedPlaces.any((p) => p.googlePlaceId == googlePlaceId);
+    return _index.containsGoogleId(googlePlaceId);
   }
 
   /// Get saved place by Google Place ID
-  PlaceModel? getPlaceByGoogleId(String googlePlaceId) {
-    try {
-      return _savedPlaces.firstWhere((p) => p.googlePlaceId == googlePlaceId);
-    } catch (e) {
-      return null;
-    }
-  }
+  PlaceModel? getPlaceByGoogleId(String googlePlaceId) =>
+      _index.byGoogleId(googlePlaceId);
 
   List<PlaceModel> getPlacesByType(PlaceType type) {
     return _savedPlaces.where((p) => p.type == type).toList();
   }
 
-  List<PlaceModel> searchPlaces(String query) {
-    final lowerQuery = query.toLowerCase();
-    return _savedPlaces.where((p) {
-      return p.name.toLowerCase().contains(lowerQuery) ||
-          (p.address?.toLowerCase().contains(lowerQuery) ?? false);
-    }).toList();
-  }
+  List<PlaceModel> searchPlaces(String query) => _index.search(query);
 
   /// Get saved places near a specific location (for trip planning).
   /// Returns places within [radiusMiles] of the given coordinates.
@@ -202,40 +226,17 @@ class PlaceService extends ChangeNotifier {
     required double longitude,
     double radiusMiles = 50, // Default 50 mile radius
   }) {
-    return _savedPlaces.where((place) {
-      if (place.latitude == null || place.longitude == null) return false;
-
-      final distanceMiles = _calculateDistanceInMiles(
-        latitude,
-        longitude,
-        place.latitude!,
-        place.longitude!,
-      );
-
-      return distanceMiles <= radiusMiles;
-    }).toList();
-  }
-
-  /// Calculate distance between two points in miles using Haversine formula
-  double _calculateDistanceInMiles(
-      double lat1, double lon1, double lat2, double lon2) {
-    const R = 6371.0; // Earth's radius in km
-    final dLat = _deg2rad(lat2 - lat1);
-    final dLon = _deg2rad(lon2 - lon1);
-    final a = (sin(dLat / 2) * sin(dLat / 2)) +
-        cos(_deg2rad(lat1)) *
-            cos(_deg2rad(lat2)) *
-            (sin(dLon / 2) * sin(dLon / 2));
-    final c = 2 * atan2(sqrt(a), sqrt(1 - a));
-    final km = R * c;
-    return km * 0.621371; // Convert km to miles
+    return _index.near(
+      latitude: latitude,
+      longitude: longitude,
+      radiusMiles: radiusMiles,
+    );
   }
 
-  double _deg2rad(double deg) => deg * (pi / 180.0);
-
   /// Clear local state (called on logout)
   void clearPlaces() {
     _savedPlaces = [];
+    _index.clear();
     _error = null;
     notifyListeners();
   }
@@ -0,0 +1,269 @@
+import 'dart:async';
+import 'dart:collection';
+import 'package:flutter/foundation.dart';
+import 'package:fittravel/models/place_model.dart';
+import 'package:fittravel/services/storage_service.dart';
+
+/// Hit/miss counters for [PlacesResponseCache]
+class PlacesCacheStats {
+  int memoryHits = 0;
+  int diskHits = 0;
+  int staleHits = 0;
+  int misses = 0;
+  int coalesced = 0;
+  int networkFetches = 0;
+  int evictions = 0;
+
+  /// Requests answered without waiting on the network
+  int get hits => memoryHits + diskHits + staleHits + coalesced;
+
+  int get requests => hits + misses;
+
+  double get hitRate => requests == 0 ? 0 : hits / requests;
+
+  void reset() {
+    memoryHits = 0;
+    diskHits = 0;
+    staleHits = 0;
+    misses = 0;
+    coalesced = 0;
+    networkFetches = 0;
+    evictions = 0;
+  }
+
+  Map<String, dynamic> toJson() => {
+        'memoryHits': memoryHits,
+        'diskHits': diskHits,
+        'staleHits': staleHits,
+        'misses': misses,
+        'coalesced': coalesced,
+        'networkFetches': networkFetches,
+        'evictions': evictions,
+        'hitRate': hitRate,
+      };
+
+  @override
+  String toString() => 'PlacesCacheStats(${toJson()})';
+}
+
+class _CacheEntry {
+  final List<PlaceModel> places;
+  final DateTime fetchedAt;
+
+  _CacheEntry(this.places, this.fetchedAt);
+
+  Map<String, dynamic> toJson() => {
+        'fetchedAt': fetchedAt.toIso8601String(),
+        'places': places.map((p) => p.toJson()).toList(),
+      };
+
+  factory _CacheEntry.fromJson(Map<String, dynamic> json) => _CacheEntry(
+        (json['places'] as List<dynamic>)
+            .map((p) => PlaceModel.fromJson(p as Map<String, dynamic>))
+            .toList(),
+        DateTime.parse(json['fetchedAt'] as String),
+      );
+}
+
+/// Two-tier (memory + SharedPreferences) cache for Google Places responses.
+///
+/// - Memory tier is an LRU bounded by [maxMemoryEntries]
+/// - Disk tier survives restarts and is bounded by [maxDiskEntries]
+/// - Entries younger than `ttl` are served directly; entries within
+///   `ttl + staleTtl` are served immediately and refreshed in the background
+/// - Concurrent requests for the same key share one network call
+class PlacesResponseCache {
+  final int maxMemoryEntries;
+  final int maxDiskEntries;
+  final bool persistToDisk;
+  final DateTime Function() _clock;
+
+  final LinkedHashMap<String, _CacheEntry> _memory = LinkedHashMap();
+  final Map<String, Future<List<PlaceModel>>> _inFlight = {};
+  final PlacesCacheStats stats = PlacesCacheStats();
+
+  PlacesResponseCache({
+    this.maxMemoryEntries = 100,
+    this.maxDiskEntries = 200,
+    this.persistToDisk = true,
+    DateTime Function()? clock,
+  }) : _clock = clock ?? DateTime.now;
+
+  /// Radius buckets (meters) so nearby slider values share cache entries
+  static const List<int> radiusBuckets = [1000, 2000, 5000, 10000, 20000, 50000];
+
+  /// Round a radius up to the nearest bucket
+  static int radiusBucket(int radiusMeters) {
+    for (final bucket in radiusBuckets) {
+      if (radiusMeters <= bucket) return bucket;
+    }
+    return radiusBuckets.last;
+  }
+
+  /// Geohash precision whose tile is small relative to the search radius,
+  /// so snapping the search center to the tile barely moves the circle
+  static int tilePrecisionForRadius(int radiusMeters) {
+    if (radiusMeters >= 20000) return 5;
+    if (radiusMeters >= 2500) return 6;
+    return 7;
+  }
+
+  /// Return cached places for [key], calling [fetch] on a miss.
+  ///
+  /// [fetch] should throw on failure so that errors are never cached.
+  Future<List<PlaceModel>> getOrFetch(
+    String key,
+    Future<List<PlaceModel>> Function() fetch, {
+    required Duration ttl,
+    Duration staleTtl = Duration.zero,
+  }) async {
+    var entry = _memory.remove(key);
+    var fromDisk = false;
+    if (entry != null) {
+      // Re-insert to mark as most recently used
+      _memory[key] = entry;
+    } else {
+      final inFlight = _inFlight[key];
+      if (inFlight != null) {
+        stats.coalesced++;
+        return inFlight;
+      }
+      entry = await _readFromDisk(key);
+      if (entry != null) {
+        fromDisk = true;
+        _putInMemory(key, entry);
+      }
+    }
+
+    if (entry != null) {
+      final age = _clock().difference(entry.fetchedAt);
+      if (age <= ttl) {
+        if (fromDisk) {
+          stats.diskHits++;
+        } else {
+          stats.memoryHits++;
+        }
+        return entry.places;
+      }
+      if (age <= ttl + staleTtl) {
+        stats.staleHits++;
+        _revalidate(key, fetch);
+        return entry.places;
+      }
+      _memory.remove(key);
+    }
+
+    final pending = _inFlight[key];
+    if (pending != null) {
+      stats.coalesced++;
+      return pending;
+    }
+    stats.misses++;
+    return _fetch(key, fetch);
+  }
+
+  /// Drop a single entry from both tiers
+  Future<void> invalidate(String key) async {
+    _memory.remove(key);
+    if (!persistToDisk) return;
+    try {
+      final storage = await StorageService.getInstance();
+      await storage.remove(_diskKey(key));
+      final index = storage.getStringList(StorageKeys.placesCacheIndex) ?? [];
+      if (index.remove(key)) {
+        await storage.setStringList(StorageKeys.placesCacheIndex, index);
+      }
+    } catch (e) {
+      debugPrint('PlacesResponseCache.invalidate error: $e');
+    }
+  }
+
+  /// Drop every entry from both tiers
+  Future<void> clear() async {
+    _memory.clear();
+    if (!persistToDisk) return;
+    try {
+      final storage = await StorageService.getInstance();
+      final index = storage.getStringList(StorageKeys.placesCacheIndex) ?? [];
+      for (final key in index) {
+        await storage.remove(_diskKey(key));
+      }
+      await storage.remove(StorageKeys.placesCacheIndex);
+    } catch (e) {
+      debugPrint('PlacesResponseCache.clear error: $e');
+    }
+  }
+
+  Future<List<PlaceModel>> _fetch(
+    String key,
+    Future<List<PlaceModel>> Function() fetch,
+  ) {
+    final existing = _inFlight[key];
+    if (existing != null) return existing;
+
+    stats.networkFetches++;
+    final future = fetch().then((places) async {
+      final entry = _CacheEntry(places, _clock());
+      _putInMemory(key, entry);
+      await _writeToDisk(key, entry);
+      return places;
+    });
+    _inFlight[key] = future;
+    future.whenComplete(() => _inFlight.remove(key)).ignore();
+    return future;
+  }
+
+  void _revalidate(String key, Future<List<PlaceModel>> Function() fetch) {
+    if (_inFlight.containsKey(key)) return;
+    unawaited(_fetch(key, fetch).then(
+      (_) {},
+      onError: (Object e) =>
+          debugPrint('PlacesResponseCache: background refresh of $key failed: $e'),
+    ));
+  }
+
+  void _putInMemory(String key, _CacheEntry entry) {
+    _memory.remove(key);
+    _memory[key] = entry;
+    while (_memory.length > maxMemoryEntries) {
+      _memory.remove(_memory.keys.first);
+      stats.evictions++;
+    }
+  }
+
+  String _diskKey(String key) => '${StorageKeys.placesCache}:$key';
+
+  Future<_CacheEntry?> _readFromDisk(String key) async {
+    if (!persistToDisk) return null;
+    try {
+      final storage = await StorageService.getInstance();
+      final json = storage.getJson(_diskKey(key));
+      if (json == null) return null;
+      return _CacheEntry.fromJson(json);
+    } catch (e) {
+      debugPrint('PlacesResponseCache._readFromDisk error: $e');
+      return null;
+    }
+  }
+
+  Future<void> _writeToDisk(String key, _CacheEntry entry) async {
+    if (!persistToDisk) return;
+    try {
+      final storage = await StorageService.getInstance();
+      await storage.setJson(_diskKey(key), entry.toJson());
+
+      // Index is kept oldest-first; trim from the front when over capacity
+      final index = storage.getStringList(StorageKeys.placesCacheIndex) ?? [];
+      index
+        ..remove(key)
+        ..add(key);
+      while (index.length > maxDiskEntries) {
+        await storage.remove(_diskKey(index.removeAt(0)));
+        stats.evictions++;
+      }
+      await storage.setStringList(StorageKeys.placesCacheIndex, index);
+    } catch (e) {
+      debugPrint('PlacesResponseCache._writeToDisk error: $e');
+    }
+  }
+}
@@ -1,22 +1,39 @@
+import 'dart:async';
 import 'package:flutter/foundation.dart';
 import 'package:fittravel/models/quick_photo.dart';
 import 'package:fittravel/supabase/supabase_config.dart';
-import 'package:fittravel/services/photo_storage_service.dart';
+import 'package:fittravel/services/photo_upload_queue.dart';
 
 /// Manages quick-added photos captured from the camera before assignment via Supabase Storage.
 class QuickPhotoService extends ChangeNotifier {
   List<QuickPhoto> _photos = [];
   bool _isLoading = false;
-  bool _isUploading = false;
   String? _error;
-
-  QuickPhotoService();
+  final PhotoUploadQueue _uploads;
+  StreamSubscription? _uploadSub;
+
+  QuickPhotoService({PhotoUploadQueue? uploadQueue})
+      : _uploads = uploadQueue ?? PhotoUploadQueue.instance {
+    _uploads.addListener(notifyListeners);
+    // Finished uploads, including ones restored from a previous session
+    _uploadSub = _uploads.completed
+        .where((done) => done.$1.kind == PhotoUploadKind.quick)
+        .listen((done) => _addUploaded(done.$2));
+  }
 
   bool get isLoading => _isLoading;
-  bool get isUploading => _isUploading;
+  bool get isUploading =>
+      _uploads.jobsOf(PhotoUploadKind.quick).any((j) => j.isActive);
   List<QuickPhoto> get photos => _photos;
   String? get error => _error;
 
+  /// Progress of in-flight uploads (0..1), or null when none are running
+  double? get uploadProgress => _uploads.progressOf(PhotoUploadKind.quick);
+
+  /// Photos still waiting to upload, e.g. taken while offline
+  int get pendingUploadCount =>
+      _uploads.jobsOf(PhotoUploadKind.quick).length;
+
   /// Get current authenticated user ID
   String? get _currentUserId => SupabaseConfig.auth.currentUser?.id;
 
@@ -44,6 +61,9 @@ class QuickPhotoService extends ChangeNotifier {
       _photos = (photosData as List)
           .map((json) => QuickPhoto.fromSupabaseJson(json))
           .toList();
+
+      // Retry uploads left over from a previous session
+      unawaited(_uploads.resume());
     } catch (e) {
       _error = 'Failed to load quick photos';
       debugPrint('QuickPhotoService.initialize error: $e');
@@ -54,8 +74,10 @@ class QuickPhotoService extends ChangeNotifier {
     notifyListeners();
   }
 
-  /// Add a photo from image bytes (recommended - uses Supabase Storage)
-  Future<QuickPhoto> addPhoto({
+  /// Add a photo from image bytes (recommended - uses Supabase Storage).
+  /// Returns once the upload is queued; the photo appears in [photos] when
+  /// it finishes, and [uploadProgress] / [pendingUploadCount] track it.
+  Future<void> addPhoto({
     required Uint8List imageBytes,
     String? photoId,
   }) async {
@@ -64,47 +86,33 @@ class QuickPhotoService extends ChangeNotifier {
       throw Exception('User not authenticated');
     }
 
-    _isUploading = true;
     _error = null;
-    notifyListeners();
 
     try {
-      // Upload to Supabase Storage with compression
-      final storagePath = await PhotoStorageService.uploadQuickPhoto(
+      // Processed on a worker isolate, then uploaded through the persistent
+      // queue (retried with backoff, resumed on next launch if still failing)
+      await _uploads.enqueue(
+        kind: PhotoUploadKind.quick,
+        userId: userId,
         imageBytes: imageBytes,
         photoId: photoId,
       );
-
-      // Get public URL
-      final imageUrl = PhotoStorageService.getQuickPhotoUrl(storagePath);
-
-      // Save metadata to database
-      final data = {
-        'user_id': userId,
-        'image_url': imageUrl,
-        'place_id': null,
-      };
-
-      final result = await SupabaseService.insert('quick_photos', data);
-
-      if (result.isNotEmpty) {
-        final photo = QuickPhoto.fromSupabaseJson(result.first);
-        _photos.insert(0, photo);
-        _error = null;
-        _isUploading = false;
-        notifyListeners();
-        return photo;
-      }
-      throw Exception('Failed to save quick photo metadata');
     } catch (e) {
       _error = 'Failed to upload quick photo: ${e.toString()}';
       debugPrint('QuickPhotoService.addPhoto error: $e');
-      _isUploading = false;
       notifyListeners();
       rethrow;
     }
   }
 
+  void _addUploaded(Map<String, dynamic> row) {
+    final photo = QuickPhoto.fromSupabaseJson(row);
+    if (_photos.any((p) => p.id == photo.id)) return;
+    _photos.insert(0, photo);
+    _error = null;
+    notifyListeners();
+  }
+
   /// Legacy method: Add a photo from data URL (for backwards compatibility)
   @Deprecated('Use addPhoto() with image bytes instead')
   Future<QuickPhoto> addPhotoDataUrl({
@@ -188,4 +196,11 @@ class QuickPhotoService extends ChangeNotifier {
     _error = null;
     notifyListeners();
   }
+
+  @override
+  void dispose() {
+    _uploads.removeListener(notifyListeners);
+    _uploadSub?.cancel();
+    super.dispose();
+  }
 }
@@ -0,0 +1,215 @@
+import 'dart:math';
+import 'package:fittravel/models/place_model.dart';
+
+/// In-memory lookup indexes over the user's saved places.
+///
+/// Maintained incrementally by [PlaceService] so per-marker and per-card
+/// lookups avoid scanning the full saved list:
+/// - id and googlePlaceId hash maps
+/// - a fixed lat/lng grid for radius queries (bounding-box prefilter first,
+///   Haversine only on candidates)
+/// - a trigram index for substring search over name and address
+///
+/// Query results are ordered newest first, matching the saved list order.
+class SavedPlaceIndex {
+  /// Grid cell size in degrees (~28km of latitude)
+  static const double cellDegrees = 0.25;
+  static const int _rows = 720; // 180 / cellDegrees
+  static const int _columns = 1440; // 360 / cellDegrees
+  static const double _milesPerDegreeLat = 69.0;
+
+  final Map<String, PlaceModel> _byId = {};
+  final Map<String, PlaceModel> _byGoogleId = {};
+  final Map<int, Set<String>> _cells = {};
+  final Map<String, Set<String>> _trigrams = {};
+  // Lowercased (name, address) per place id, computed once per write
+  final Map<String, (String, String)> _searchText = {};
+
+  int get length => _byId.length;
+
+  /// Replace index contents with [places]
+  void rebuild(Iterable<PlaceModel> places) {
+    clear();
+    for (final place in places) {
+      add(place);
+    }
+  }
+
+  void clear() {
+    _byId.clear();
+    _byGoogleId.clear();
+    _cells.clear();
+    _trigrams.clear();
+    _searchText.clear();
+  }
+
+  void add(PlaceModel place) {
+    if (_byId.containsKey(place.id)) remove(place.id);
+
+    _byId[place.id] = place;
+    if (place.googlePlaceId != null) {
+      _byGoogleId.putIfAbsent(place.googlePlaceId!, () => place);
+    }
+
+    final cell = _cellFor(place);
+    if (cell != null) {
+      _cells.putIfAbsent(cell, () => <String>{}).add(place.id);
+    }
+
+    final name = place.name.toLowerCase();
+    final address = place.address?.toLowerCase() ?? '';
+    _searchText[place.id] = (name, address);
+    for (final trigram in {..._trigramsOf(name), ..._trigramsOf(address)}) {
+      _trigrams.putIfAbsent(trigram, () => <String>{}).add(place.id);
+    }
+  }
+
+  void remove(String id) {
+    final place = _byId.remove(id);
+    if (place == null) return;
+
+    final googleId = place.googlePlaceId;
+    if (googleId != null && identical(_byGoogleId[googleId], place)) {
+      _byGoogleId.remove(googleId);
+      // Another saved entry may share the Google id
+      for (final other in _byId.values) {
+        if (other.googlePlaceId == googleId) {
+          _byGoogleId[googleId] = other;
+          break;
+        }
+      }
+    }
+
+    final cell = _cellFor(place);
+    if (cell != null) {
+      final ids = _cells[cell];
+      ids?.remove(id);
+      if (ids != null && ids.isEmpty) _cells.remove(cell);
+    }
+
+    final text = _searchText.remove(id);
+    if (text != null) {
+      final (name, address) = text;
+      for (final trigram in {..._trigramsOf(name), ..._trigramsOf(address)}) {
+        final ids = _trigrams[trigram];
+        ids?.remove(id);
+        if (ids != null && ids.isEmpty) _trigrams.remove(trigram);
+      }
+    }
+  }
+
+  /// Swap in an updated copy of an already indexed place
+  void replace(PlaceModel place) => add(place);
+
+  PlaceModel? byId(String id) => _byId[id];
+
+  PlaceModel? byGoogleId(String googlePlaceId) => _byGoogleId[googlePlaceId];
+
+  bool containsGoogleId(String googlePlaceId) =>
+      _byGoogleId.containsKey(googlePlaceId);
+
+  /// Places within [radiusMiles] of the given coordinates
+  List<PlaceModel> near({
+    required double latitude,
+    required double longitude,
+    required double radiusMiles,
+  }) {
+    final latDelta = radiusMiles / _milesPerDegreeLat;
+    final minRow = max(0, ((latitude - latDelta + 90) / cellDegrees).floor());
+    final maxRow =
+        min(_rows - 1, ((latitude + latDelta + 90) / cellDegrees).floor());
+
+    // Longitude span widens toward the poles; size it for the most poleward
+    // latitude in the box so the prefilter never drops a match
+    final maxAbsLat = min(90.0, latitude.abs() + latDelta);
+    final cosLat = cos(maxAbsLat * pi / 180);
+    final lngDelta = cosLat < 1e-6 ? 180.0 : latDelta / cosLat;
+    final minColRaw = ((longitude - lngDelta + 180) / cellDegrees).floor();
+    final maxColRaw = ((longitude + lngDelta + 180) / cellDegrees).floor();
+    final allColumns = maxColRaw - minColRaw + 1 >= _columns;
+
+    final results = <PlaceModel>[];
+    for (var row = minRow; row <= maxRow; row++) {
+      final firstCol = allColumns ? 0 : minColRaw;
+      final lastCol = allColumns ? _columns - 1 : maxColRaw;
+      for (var col = firstCol; col <= lastCol; col++) {
+        final wrappedCol = (col % _columns + _columns) % _columns;
+        final ids = _cells[row * _columns + wrappedCol];
+        if (ids == null) continue;
+
+        for (final id in ids) {
+          final place = _byId[id]!;
+          final lat = place.latitude!;
+          if ((lat - latitude).abs() > latDelta) continue;
+          final distance =
+              _haversineMiles(latitude, longitude, lat, place.longitude!);
+          if (distance <= radiusMiles) results.add(place);
+        }
+      }
+    }
+    return _newestFirst(results);
+  }
+
+  /// Case-insensitive substring match on name or address
+  List<PlaceModel> search(String query) {
+    final lowerQuery = query.toLowerCase();
+
+    Iterable<String> candidates = _byId.keys;
+    if (lowerQuery.length >= 3) {
+      Set<String>? narrowed;
+      for (final trigram in _trigramsOf(lowerQuery)) {
+        final ids = _trigrams[trigram];
+        if (ids == null) return [];
+        narrowed = narrowed == null ? {...ids} : narrowed.intersection(ids);
+        if (narrowed.isEmpty) return [];
+      }
+      candidates = narrowed!;
+    }
+
+    final results = <PlaceModel>[];
+    for (final id in candidates) {
+      final (name, address) = _searchText[id]!;
+      if (name.contains(lowerQuery) || address.contains(lowerQuery)) {
+        results.add(_byId[id]!);
+      }
+    }
+    return _newestFirst(results);
+  }
+
+  int? _cellFor(PlaceModel place) {
+    final lat = place.latitude;
+    final lng = place.longitude;
+    if (lat == null || lng == null) return null;
+    final row = ((lat + 90) / cellDegrees).floor().clamp(0, _rows - 1);
+    final col = ((lng + 180) / cellDegrees).floor() % _columns;
+    return row * _columns + col;
+  }
+
+  static Set<String> _trigramsOf(String text) {
+    final result = <String>{};
+    for (var i = 0; i + 3 <= text.length; i++) {
+      result.add(text.substring(i, i + 3));
+    }
+    return result;
+  }
+
+  static List<PlaceModel> _newestFirst(List<PlaceModel> places) =>
+      places..sort((a, b) => b.createdAt.compareTo(a.createdAt));
+
+  /// Calculate distance between two points in miles using Haversine formula
+  static double _haversineMiles(
+      double lat1, double lon1, double lat2, double lon2) {
+    const R = 6371.0; // Earth's radius in km
+    final dLat = _deg2rad(lat2 - lat1);
+    final dLon = _deg2rad(lon2 - lon1);
+    final a = (sin(dLat / 2) * sin(dLat / 2)) +
+        cos(_deg2rad(lat1)) *
+            cos(_deg2rad(lat2)) *
+            (sin(dLon / 2) * sin(dLon / 2));
+    final c = 2 * atan2(sqrt(a), sqrt(1 - a));
+    final km = R * c;
+    return km * 0.621371; // Convert km to miles
+  }
+
+  static double _deg2rad(double deg) => deg * (pi / 180.0);
+}
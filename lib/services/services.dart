@@ -1,18 +1,27 @@
 // Barrel file for all services
 export 'storage_service.dart';
+export 'local_row_database.dart';
+export 'local_store.dart';
+export 'delta_sync.dart';
+export 'app_bootstrap.dart';
 export 'photo_storage_service.dart';
+export 'image_processing_pool.dart';
+export 'photo_file_store.dart';
+export 'photo_upload_queue.dart';
 export 'user_service.dart';
 export 'place_service.dart';
 export 'trip_service.dart';
 export 'activity_service.dart';
 export 'gamification_service.dart';
 export 'google_places_service.dart';
+export 'places_response_cache.dart';
 export 'community_photo_service.dart';
 export 'quick_photo_service.dart';
 export 'review_service.dart';
 export 'event_service.dart';
 export 'feedback_service.dart';
 export 'ai_guide_service.dart';
+export 'ai_guide_stream.dart';
 export 'strava_service.dart';
 export 'ai_recommendation_service.dart';
 export 'map_context_service.dart';
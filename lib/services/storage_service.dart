@@ -21,6 +21,13 @@ class StorageKeys {
   static const String reviews = 'reviews';
   static const String events = 'events';
   static const String feedbackItems = 'feedback_items';
+  static const String placesCache = 'places_cache';
+  static const String placesCacheIndex = 'places_cache_index';
+  static const String localStorePrefix = 'local_store';
+  static const String localRowPrefix = 'local_row';
+  static const String syncWatermarks = 'sync_watermarks';
+  static const String pendingWrites = 'pending_writes';
+  static const String photoUploadQueue = 'photo_upload_queue';
 }
 
 /// Wrapper service for SharedPreferences
@@ -188,4 +195,9 @@ class StorageService {
   bool containsKey(String key) {
     return _prefs!.containsKey(key);
   }
+
+  // All stored keys
+  Set<String> getKeys() {
+    return _prefs!.getKeys();
+  }
 }
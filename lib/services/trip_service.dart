@@ -1,17 +1,26 @@
 import 'dart:async';
 import 'package:flutter/foundation.dart';
+import 'package:flutter/scheduler.dart';
 import 'package:fittravel/models/models.dart';
 import 'package:fittravel/supabase/supabase_config.dart';
+import 'package:fittravel/services/delta_sync.dart';
 import 'package:fittravel/services/google_places_service.dart';
+import 'package:fittravel/services/local_store.dart';
 import 'package:supabase_flutter/supabase_flutter.dart';
+import 'package:uuid/uuid.dart';
 
 class TripService extends ChangeNotifier {
+  static const String _tripsTable = 'trips';
+  static const String _itineraryTable = 'itinerary_items';
+
   List<TripModel> _trips = [];
   bool _isLoading = false;
   String? _error;
   // tripId -> itinerary items (cached locally)
   final Map<String, List<ItineraryItem>> _itineraries = {};
   StreamSubscription? _authSub;
+  // User whose trips are currently loaded
+  String? _loadedUserId;
 
   TripService();
 
@@ -53,9 +62,11 @@ class TripService extends ChangeNotifier {
   String? get _currentUserId => SupabaseConfig.auth.currentUser?.id;
 
   Future<void> initialize() async {
-    // Ensure we listen to auth changes exactly once
-    _authSub ??= SupabaseConfig.auth.onAuthStateChange.listen((event) async {
-      debugPrint('TripService: auth state changed, reloading trips');
+    // Ensure we listen to auth changes exactly once. Token refreshes also
+    // emit events, so only reload when the signed-in user actually changes.
+    _authSub ??= SupabaseConfig.auth.onAuthStateChange.listen((state) async {
+      if (state.session?.user.id == _loadedUserId) return;
+      debugPrint('TripService: auth user changed, reloading trips');
       await initialize();
     });
 
@@ -65,6 +76,7 @@ class TripService extends ChangeNotifier {
 
     try {
       final userId = _currentUserId;
+      _loadedUserId = userId;
       if (userId == null) {
         debugPrint('TripService.initialize: no auth user, clearing trips');
         _trips = [];
@@ -74,60 +86,141 @@ class TripService extends ChangeNotifier {
         return;
       }
 
-      // Fetch trips with joined trip_places for savedPlaceIds
-      final tripsData = await SupabaseConfig.client
-          .from('trips')
-          .select('*, trip_places(place_id)')
-          .eq('user_id', userId)
-          .order('start_date', ascending: false);
+      final store = await LocalStore.getInstance();
 
-      _trips = (tripsData as List).map((json) {
-        final placeIds = (json['trip_places'] as List?)
-                ?.map((tp) => tp['place_id'] as String)
-                .toList() ??
-            [];
-        return TripModel.fromSupabaseJson(json, savedPlaceIds: placeIds);
-      }).toList();
+      // Show the last synced trips immediately, then pull changes
+      _setTrips(await store.rows(userId, _tripsTable));
+      _setItineraries(await store.rows(userId, _itineraryTable));
+      if (_trips.isNotEmpty) {
+        _isLoading = false;
+        notifyListeners();
+      }
 
-      // Load all itineraries for user's trips
-      await _loadAllItineraries();
+      await store.replayPendingWrites();
+      final knownTripIds = _trips.map((t) => t.id).toSet();
+      // trip_places changes touch the parent trip's updated_at
+      final rows = await DeltaSync.pull(
+        store,
+        scope: userId,
+        table: _tripsTable,
+        select: '*, trip_places(place_id)',
+        filters: {'user_id': userId},
+      );
+      _setTrips(rows);
+
+      // Sync itineraries for user's trips
+      await _loadAllItineraries(userId, store, knownTripIds);
 
       // Fetch missing trip images in the background
-      _fetchMissingTripImages();
+      unawaited(_fetchMissingTripImages());
     } catch (e) {
-      _error = 'Failed to load trips';
       debugPrint('TripService.initialize error: $e');
-      _trips = [];
+      // Keep locally cached trips when offline
+      if (_trips.isEmpty) {
+        _error = 'Failed to load trips';
+      }
     }
 
     _isLoading = false;
     notifyListeners();
   }
 
-  Future<void> _loadAllItineraries() async {
-    if (_trips.isEmpty) return;
+  void _setTrips(List<Map<String, dynamic>> rows) {
+    _trips = rows.map((json) {
+      final placeIds = (json['trip_places'] as List?)
+              ?.map((tp) => tp['place_id'] as String)
+              .toList() ??
+          [];
+      return TripModel.fromSupabaseJson(json, savedPlaceIds: placeIds);
+    }).toList()
+      ..sort((a, b) => b.startDate.compareTo(a.startDate));
+  }
 
-    final tripIds = _trips.map((t) => t.id).toList();
+  /// Load trips from synced rows the way [initialize] does, without auth or
+  /// a backend
+  @visibleForTesting
+  void debugSetTripRows(List<Map<String, dynamic>> rows) {
+    _setTrips(rows);
+    notifyListeners();
+  }
 
-    try {
-      final items = await SupabaseConfig.client
-          .from('itinerary_items')
-          .select()
-          .inFilter('trip_id', tripIds)
-          .order('date')
-          .order('start_time');
+  void _setItineraries(List<Map<String, dynamic>> rows) {
+    _itineraries.clear();
+    for (final item in rows) {
+      final tripId = item['trip_id'] as String;
+      _itineraries.putIfAbsent(tripId, () => []);
+      _itineraries[tripId]!.add(ItineraryItem.fromSupabaseJson(item));
+    }
+    for (final list in _itineraries.values) {
+      list.sort(_compareItems);
+    }
+  }
 
+  Future<void> _loadAllItineraries(
+    String userId,
+    LocalStore store,
+    Set<String> knownTripIds,
+  ) async {
+    final tripIds = _trips.map((t) => t.id).toSet();
+
+    // Items of trips deleted elsewhere (cascade deletes leave no tombstone)
+    await store.deleteWhere(
+        userId, _itineraryTable, (row) => !tripIds.contains(row['trip_id']));
+    if (tripIds.isEmpty) {
       _itineraries.clear();
-      for (final item in items) {
-        final tripId = item['trip_id'] as String;
-        _itineraries.putIfAbsent(tripId, () => []);
-        _itineraries[tripId]!.add(ItineraryItem.fromSupabaseJson(item));
+      return;
+    }
+
+    try {
+      // The startup payload already includes full itineraries of new trips
+      final preloaded = await DeltaSync.takePreloaded(store,
+          scope: userId, table: _itineraryTable);
+      if (preloaded != null) {
+        _setItineraries(preloaded);
+        return;
+      }
+
+      final rows = await DeltaSync.pull(
+        store,
+        scope: userId,
+        table: _itineraryTable,
+        inFilter: ('trip_id', tripIds.toList()),
+      );
+
+      // Trips first seen in this sync may have items older than the
+      // itinerary watermark, so fetch those in full
+      final newTripIds = tripIds.difference(knownTripIds);
+      if (newTripIds.isNotEmpty && knownTripIds.isNotEmpty) {
+        final items = await SupabaseConfig.client
+            .from(_itineraryTable)
+            .select()
+            .inFilter('trip_id', newTripIds.toList());
+        await store.upsertRows(userId, _itineraryTable, items);
+        _setItineraries(await store.rows(userId, _itineraryTable));
+      } else {
+        _setItineraries(rows);
       }
     } catch (e) {
       debugPrint('TripService._loadAllItineraries error: $e');
     }
   }
 
+  /// Mirror a locally changed trip into the LocalStore
+  Future<void> _cacheTrip(TripModel trip) async {
+    final userId = _currentUserId;
+    if (userId == null) return;
+    final store = await LocalStore.getInstance();
+    await store.upsertRows(userId, _tripsTable, [
+      {
+        ...trip.toSupabaseJson(userId),
+        'id': trip.id,
+        'created_at': trip.createdAt.toIso8601String(),
+        'trip_places':
+            trip.savedPlaceIds.map((id) => {'place_id': id}).toList(),
+      }
+    ]);
+  }
+
   Future<TripModel> createTrip({
     required String destinationCity,
     String? destinationCountry,
@@ -143,7 +236,10 @@ class TripService extends ChangeNotifier {
     }
 
     try {
+      final now = DateTime.now().toIso8601String();
+      // Client-generated id so the insert can be queued and replayed offline
       final data = {
+        'id': const Uuid().v4(),
         'user_id': userId,
         'destination_city': destinationCity,
         'destination_country': destinationCountry,
@@ -152,38 +248,18 @@ class TripService extends ChangeNotifier {
         'start_date': startDate.toIso8601String().split('T')[0],
         'end_date': endDate.toIso8601String().split('T')[0],
         'notes': notes,
+        'created_at': now,
         // is_active is deprecated - trips are now automatically active based on dates
       };
 
-      final result = await SupabaseService.insert('trips', data);
+      await (await LocalStore.getInstance())
+          .writeOrQueue(PendingWrite.insert(_tripsTable, data));
 
-      TripModel? trip;
-      if (result.isNotEmpty) {
-        trip = TripModel.fromSupabaseJson(result.first, savedPlaceIds: []);
-        _trips.insert(0, trip);
-        _error = null;
-        notifyListeners();
-      } else {
-        // Some RLS setups allow insert but deny select on returning rows.
-        // As a resilient fallback, reload trips from backend and try to find the new one.
-        debugPrint(
-            'TripService.createTrip: insert returned empty, attempting fallback reload');
-        await initialize();
-        try {
-          trip = _trips.firstWhere((t) =>
-              t.userId == userId &&
-              t.destinationCity.toLowerCase() ==
-                  destinationCity.toLowerCase() &&
-              t.startDate.year == startDate.year &&
-              t.startDate.month == startDate.month &&
-              t.startDate.day == startDate.day &&
-              t.endDate.year == endDate.year &&
-              t.endDate.month == endDate.month &&
-              t.endDate.day == endDate.day);
-        } catch (_) {
-          throw Exception('Trip created but could not load it due to RLS');
-        }
-      }
+      final trip = TripModel.fromSupabaseJson(data, savedPlaceIds: []);
+      _trips.insert(0, trip);
+      await _cacheTrip(trip);
+      _error = null;
+      notifyListeners();
 
       // Trigger async event fetching for this destination
       _fetchEventsForDestination(
@@ -221,14 +297,16 @@ class TripService extends ChangeNotifier {
               oldTrip.startDate != trip.startDate ||
               oldTrip.endDate != trip.endDate);
 
-      await SupabaseService.update(
-        'trips',
+      // Applied locally right away; replayed later if offline
+      await (await LocalStore.getInstance()).writeOrQueue(PendingWrite.update(
+        _tripsTable,
         trip.toSupabaseJson(userId),
         filters: {'id': trip.id},
-      );
+      ));
 
       if (index >= 0) {
         _trips[index] = trip.copyWith(updatedAt: DateTime.now());
+        await _cacheTrip(_trips[index]);
         _error = null;
         notifyListeners();
       }
@@ -253,9 +331,17 @@ class TripService extends ChangeNotifier {
   }
 
   Future<void> deleteTrip(String tripId) async {
+    final userId = _currentUserId;
+    if (userId == null) return;
+
     try {
       // Delete trip (cascade will handle trip_places and itinerary_items)
-      await SupabaseService.delete('trips', filters: {'id': tripId});
+      final store = await LocalStore.getInstance();
+      await store.writeOrQueue(
+          PendingWrite.delete(_tripsTable, filters: {'id': tripId}));
+      await store.deleteRows(userId, _tripsTable, [tripId]);
+      await store.deleteWhere(
+          userId, _itineraryTable, (row) => row['trip_id'] == tripId);
 
       _trips.removeWhere((t) => t.id == tripId);
       _itineraries.remove(tripId);
@@ -341,15 +427,18 @@ class TripService extends ChangeNotifier {
       );
 
       if (imageUrl != null) {
-        // Update in database
-        await SupabaseConfig.client.from('trips').update({
-          'image_url': imageUrl,
-        }).eq('id', tripId);
+        // Queued and replayed if offline
+        await (await LocalStore.getInstance()).writeOrQueue(PendingWrite.update(
+          _tripsTable,
+          {'image_url': imageUrl},
+          filters: {'id': tripId},
+        ));
 
         // Update local state
         final index = _trips.indexWhere((t) => t.id == tripId);
         if (index >= 0) {
           _trips[index] = _trips[index].copyWith(imageUrl: imageUrl);
+          await _cacheTrip(_trips[index]);
           notifyListeners();
           debugPrint('TripService: Fetched image for ${trip.destinationCity}');
         }
@@ -360,13 +449,17 @@ class TripService extends ChangeNotifier {
     }
   }
 
-  /// Fetch images for all trips that don't have one (background task)
+  /// Fetch images for all trips that don't have one (background task).
+  /// Waits for the next frame and fetches one at a time so it doesn't
+  /// compete with the first screen's requests at startup.
   Future<void> _fetchMissingTripImages() async {
-    for (final trip in _trips) {
-      if (trip.imageUrl == null || trip.imageUrl!.isEmpty) {
-        // Don't await - let it run in background
-        fetchTripImage(trip.id);
-      }
+    await SchedulerBinding.instance.endOfFrame;
+    final missing = _trips
+        .where((t) => t.imageUrl == null || t.imageUrl!.isEmpty)
+        .map((t) => t.id)
+        .toList();
+    for (final tripId in missing) {
+      await fetchTripImage(tripId);
     }
   }
 
@@ -382,11 +475,12 @@ class TripService extends ChangeNotifier {
       if (coords != null) {
         final (lat, lng) = coords;
 
-        // Update in database
-        await SupabaseConfig.client.from('trips').update({
-          'destination_latitude': lat,
-          'destination_longitude': lng,
-        }).eq('id', trip.id);
+        // Queued and replayed if offline
+        await (await LocalStore.getInstance()).writeOrQueue(PendingWrite.update(
+          _tripsTable,
+          {'destination_latitude': lat, 'destination_longitude': lng},
+          filters: {'id': trip.id},
+        ));
 
         // Update local state
         final index = _trips.indexWhere((t) => t.id == trip.id);
@@ -395,6 +489,7 @@ class TripService extends ChangeNotifier {
             destinationLatitude: lat,
             destinationLongitude: lng,
           );
+          await _cacheTrip(_trips[index]);
           notifyListeners();
           debugPrint(
               'TripService: Geocoded ${trip.destinationCity} to ($lat, $lng)');
@@ -407,27 +502,25 @@ class TripService extends ChangeNotifier {
   }
 
   Future<void> addPlaceToTrip(String tripId, String placeId) async {
-    try {
-      // Check if already exists
-      final existing = await SupabaseService.selectSingle(
-        'trip_places',
-        filters: {'trip_id': tripId, 'place_id': placeId},
-      );
+    final index = _trips.indexWhere((t) => t.id == tripId);
+    // trip_places rows sync with their trip, so the local copy is complete
+    if (index >= 0 && _trips[index].savedPlaceIds.contains(placeId)) return;
 
-      if (existing != null) return;
-
-      // Insert into junction table
-      await SupabaseService.insert('trip_places', {
+    try {
+      // Insert into junction table; queued and replayed if offline
+      await (await LocalStore.getInstance())
+          .writeOrQueue(PendingWrite.insert('trip_places', {
+        'id': const Uuid().v4(),
         'trip_id': tripId,
         'place_id': placeId,
-      });
+      }));
 
       // Update local state
-      final index = _trips.indexWhere((t) => t.id == tripId);
-      if (index >= 0 && !_trips[index].savedPlaceIds.contains(placeId)) {
+      if (index >= 0) {
         _trips[index] = _trips[index].copyWith(
           savedPlaceIds: [..._trips[index].savedPlaceIds, placeId],
         );
+        await _cacheTrip(_trips[index]);
         _error = null;
         notifyListeners();
       }
@@ -440,11 +533,9 @@ class TripService extends ChangeNotifier {
 
   Future<void> removePlaceFromTrip(String tripId, String placeId) async {
     try {
-      await SupabaseConfig.client
-          .from('trip_places')
-          .delete()
-          .eq('trip_id', tripId)
-          .eq('place_id', placeId);
+      await (await LocalStore.getInstance()).writeOrQueue(PendingWrite.delete(
+          'trip_places',
+          filters: {'trip_id': tripId, 'place_id': placeId}));
 
       // Update local state
       final index = _trips.indexWhere((t) => t.id == tripId);
@@ -453,6 +544,7 @@ class TripService extends ChangeNotifier {
           savedPlaceIds:
               _trips[index].savedPlaceIds.where((id) => id != placeId).toList(),
         );
+        await _cacheTrip(_trips[index]);
         _error = null;
         notifyListeners();
       }
@@ -492,17 +584,19 @@ class TripService extends ChangeNotifier {
   }
 
   Future<void> addItineraryItem(String tripId, ItineraryItem item) async {
+    final userId = _currentUserId;
+    if (userId == null) return;
+
     try {
-      final data = item.toSupabaseJson(tripId);
-      final result = await SupabaseService.insert('itinerary_items', data);
+      // Items carry a client-generated id, so the insert can be replayed
+      final data = {...item.toSupabaseJson(tripId), 'id': item.id};
+      final store = await LocalStore.getInstance();
+      await store.writeOrQueue(PendingWrite.insert(_itineraryTable, data));
+      await store.upsertRows(userId, _itineraryTable, [data]);
 
-      if (result.isNotEmpty) {
-        final newItem = ItineraryItem.fromSupabaseJson(result.first);
-        final list = _itineraries.putIfAbsent(tripId, () => []);
-        list.add(newItem);
-        _error = null;
-        notifyListeners();
-      }
+      _itineraries.putIfAbsent(tripId, () => []).add(item);
+      _error = null;
+      notifyListeners();
     } catch (e) {
       _error = 'Failed to add itinerary item';
       debugPrint('TripService.addItineraryItem error: $e');
@@ -511,12 +605,20 @@ class TripService extends ChangeNotifier {
   }
 
   Future<void> updateItineraryItem(String tripId, ItineraryItem item) async {
+    final userId = _currentUserId;
+    if (userId == null) return;
+
     try {
-      await SupabaseService.update(
-        'itinerary_items',
-        item.toSupabaseJson(tripId),
+      final store = await LocalStore.getInstance();
+      final data = item.toSupabaseJson(tripId);
+      await store.writeOrQueue(PendingWrite.update(
+        _itineraryTable,
+        data,
         filters: {'id': item.id},
-      );
+      ));
+      await store.upsertRows(userId, _itineraryTable, [
+        {...data, 'id': item.id}
+      ]);
 
       final list = _itineraries[tripId];
       if (list != null) {
@@ -533,8 +635,14 @@ class TripService extends ChangeNotifier {
   }
 
   Future<void> removeItineraryItem(String tripId, String itemId) async {
+    final userId = _currentUserId;
+    if (userId == null) return;
+
     try {
-      await SupabaseService.delete('itinerary_items', filters: {'id': itemId});
+      final store = await LocalStore.getInstance();
+      await store.writeOrQueue(
+          PendingWrite.delete(_itineraryTable, filters: {'id': itemId}));
+      await store.deleteRows(userId, _itineraryTable, [itemId]);
 
       final list = _itineraries[tripId];
       if (list != null) {
@@ -1,5 +1,7 @@
 import 'package:flutter/foundation.dart';
 import 'package:fittravel/models/models.dart';
+import 'package:fittravel/services/delta_sync.dart';
+import 'package:fittravel/services/local_store.dart';
 import 'package:fittravel/supabase/supabase_config.dart';
 
 class UserService extends ChangeNotifier {
@@ -33,11 +35,18 @@ class UserService extends ChangeNotifier {
         return;
       }
 
-      // Fetch user profile from Supabase
-      final userData = await SupabaseService.selectSingle(
-        'users',
-        filters: {'id': userId},
+      // Use the profile from the startup payload, else fetch it
+      final preloaded = await DeltaSync.takePreloaded(
+        await LocalStore.getInstance(),
+        scope: userId,
+        table: 'users',
       );
+      final userData = preloaded != null
+          ? preloaded.firstOrNull
+          : await SupabaseService.selectSingle(
+              'users',
+              filters: {'id': userId},
+            );
 
       if (userData != null) {
         _currentUser = UserModel.fromSupabaseJson(userData);
@@ -0,0 +1,149 @@
+-- Delta sync support for the client-side LocalStore
+-- Clients pull only rows with updated_at >= their per-table watermark, plus
+-- tombstones for rows deleted since their last sync.
+
+-- Shared trigger: stamp updated_at with server time on every write
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.updated_at = NOW();
+  RETURN NEW;
+END;
+$$;
+
+-- Add updated_at to synced tables that don't have it yet
+ALTER TABLE saved_places ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE itinerary_items ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE activities ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE user_badges ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE user_challenges ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE badges ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+ALTER TABLE challenges ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+DO $$
+DECLARE
+  t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY[
+    'trips', 'saved_places', 'itinerary_items', 'activities',
+    'user_badges', 'user_challenges', 'badges', 'challenges'
+  ] LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_%I_updated_at ON %I', t, t);
+    EXECUTE format(
+      'CREATE TRIGGER trg_%I_updated_at BEFORE INSERT OR UPDATE ON %I
+         FOR EACH ROW EXECUTE FUNCTION set_updated_at()', t, t);
+  END LOOP;
+END;
+$$;
+
+-- Watermark queries: WHERE user_id = ? AND updated_at >= ?
+CREATE INDEX IF NOT EXISTS idx_trips_user_updated ON trips(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_saved_places_user_updated ON saved_places(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_activities_user_updated ON activities(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_user_badges_user_updated ON user_badges(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_user_challenges_user_updated ON user_challenges(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_itinerary_items_trip_updated ON itinerary_items(trip_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_badges_updated ON badges(updated_at);
+CREATE INDEX IF NOT EXISTS idx_challenges_updated ON challenges(updated_at);
+
+-- trip_places is selected through its parent trip, so touch the trip when
+-- the junction changes to make the trip show up in the next delta
+CREATE OR REPLACE FUNCTION touch_trip_from_trip_places()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE trips SET updated_at = NOW()
+  WHERE id = COALESCE(NEW.trip_id, OLD.trip_id);
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_trip_places_touch_trip ON trip_places;
+CREATE TRIGGER trg_trip_places_touch_trip
+  AFTER INSERT OR UPDATE OR DELETE ON trip_places
+  FOR EACH ROW EXECUTE FUNCTION touch_trip_from_trip_places();
+
+-- Tombstones for deleted rows
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+  id BIGSERIAL PRIMARY KEY,
+  table_name TEXT NOT NULL,
+  row_id UUID NOT NULL,
+  user_id UUID,
+  deleted_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_lookup
+  ON sync_tombstones(user_id, table_name, deleted_at);
+
+ALTER TABLE sync_tombstones ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can read their own tombstones"
+  ON sync_tombstones
+  FOR SELECT
+  USING (auth.uid() = user_id);
+
+-- SECURITY DEFINER so the insert bypasses RLS on sync_tombstones
+CREATE OR REPLACE FUNCTION record_sync_tombstone()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  owner UUID;
+BEGIN
+  IF TG_TABLE_NAME = 'itinerary_items' THEN
+    -- NULL when the parent trip is being cascade-deleted; clients drop
+    -- items of removed trips themselves
+    SELECT user_id INTO owner FROM trips WHERE id = OLD.trip_id;
+  ELSE
+    owner := OLD.user_id;
+  END IF;
+
+  IF owner IS NOT NULL THEN
+    INSERT INTO sync_tombstones (table_name, row_id, user_id)
+    VALUES (TG_TABLE_NAME, OLD.id, owner);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DO $$
+DECLARE
+  t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY[
+    'trips', 'saved_places', 'itinerary_items', 'activities',
+    'user_badges', 'user_challenges'
+  ] LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_%I_tombstone ON %I', t, t);
+    EXECUTE format(
+      'CREATE TRIGGER trg_%I_tombstone AFTER DELETE ON %I
+         FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone()', t, t);
+  END LOOP;
+END;
+$$;
+
+-- Tombstones only need to outlive the longest expected offline period
+CREATE OR REPLACE FUNCTION cleanup_old_sync_tombstones()
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  DELETE FROM sync_tombstones
+  WHERE deleted_at < NOW() - INTERVAL '90 days';
+END;
+$$;
+
+-- Run the cleanup nightly. DeltaSync.maxWatermarkAge (60 days) stays below
+-- the retention, so clients never miss a tombstone. cron.schedule replaces
+-- an existing job of the same name, so re-running this is safe.
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+
+SELECT cron.schedule(
+  'cleanup-old-sync-tombstones',
+  '30 3 * * *',
+  $cron$SELECT cleanup_old_sync_tombstones()$cron$
+);
@@ -0,0 +1,126 @@
+-- Indexed location/time queries for events
+-- Replaces `city ILIKE '%…%'` scans (sequential on every call) with an
+-- exact match on a normalized city column, a GiST index on the event's
+-- coordinates for bounding-box queries, and keyset pagination on
+-- (start_date, id). Also makes external_id unique so ingest can dedup.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Columns written by fetch_destination_events / EventService that predate
+-- this migration in some environments
+ALTER TABLE events ADD COLUMN IF NOT EXISTS city TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS country TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS image_url TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS price_info TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS source TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS fetched_at TIMESTAMPTZ;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS expires_at TIMESTAMPTZ;
+
+-- Lower-cased, trimmed city for index-backed equality matches
+ALTER TABLE events ADD COLUMN IF NOT EXISTS city_normalized TEXT
+  GENERATED ALWAYS AS (lower(btrim(city))) STORED;
+
+-- City + date range, ordered for keyset pagination
+CREATE INDEX IF NOT EXISTS idx_events_city_start
+  ON events(city_normalized, start_date, id);
+
+-- Fuzzy city lookups ("New York" vs "New York City")
+CREATE INDEX IF NOT EXISTS idx_events_city_trgm
+  ON events USING GIN (city_normalized gin_trgm_ops);
+
+-- Bounding-box lookups on coordinates (built-in point type, no PostGIS)
+CREATE INDEX IF NOT EXISTS idx_events_location
+  ON events USING GIST (point(longitude, latitude))
+  WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+
+-- Keyset pagination over all upcoming events
+CREATE INDEX IF NOT EXISTS idx_events_start_id
+  ON events(start_date, id);
+
+-- Ingest dedup: keep the oldest row per external_id, then enforce it
+DELETE FROM events e
+USING events older
+WHERE e.external_id IS NOT NULL
+  AND e.external_id = older.external_id
+  AND (e.created_at, e.id) > (older.created_at, older.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_external_id
+  ON events(external_id);
+
+-- Upcoming events for a city and/or bounding box, one page at a time.
+--
+-- Pass the bounding box to match by coordinates; events without
+-- coordinates still match on city. Without a box, city must match exactly
+-- (normalized), falling back to trigram similarity when nothing matches.
+-- Page with the last row's (start_date, id) as p_after_start/p_after_id;
+-- pass both or neither.
+CREATE OR REPLACE FUNCTION search_events(
+  p_start TIMESTAMPTZ,
+  p_end TIMESTAMPTZ,
+  p_city TEXT DEFAULT NULL,
+  p_min_lat DOUBLE PRECISION DEFAULT NULL,
+  p_min_lng DOUBLE PRECISION DEFAULT NULL,
+  p_max_lat DOUBLE PRECISION DEFAULT NULL,
+  p_max_lng DOUBLE PRECISION DEFAULT NULL,
+  p_after_start TIMESTAMPTZ DEFAULT NULL,
+  p_after_id UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 50
+)
+RETURNS SETOF events
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  v_city TEXT := lower(btrim(p_city));
+  v_has_box BOOLEAN := p_min_lat IS NOT NULL AND p_min_lng IS NOT NULL
+    AND p_max_lat IS NOT NULL AND p_max_lng IS NOT NULL;
+BEGIN
+  -- A row comparison against a NULL id is NULL, which would silently
+  -- return no rows
+  IF (p_after_start IS NULL) <> (p_after_id IS NULL) THEN
+    RAISE EXCEPTION 'search_events requires both p_after_start and p_after_id, or neither';
+  END IF;
+
+  IF v_has_box THEN
+    RETURN QUERY
+      SELECT * FROM events e
+      WHERE e.start_date BETWEEN p_start AND p_end
+        AND (p_after_start IS NULL OR (e.start_date, e.id) > (p_after_start, p_after_id))
+        AND (
+          (e.latitude IS NOT NULL AND e.longitude IS NOT NULL
+            AND point(e.longitude, e.latitude)
+              <@ box(point(p_min_lng, p_min_lat), point(p_max_lng, p_max_lat)))
+          OR (v_city IS NOT NULL AND e.latitude IS NULL AND e.city_normalized = v_city)
+        )
+      ORDER BY e.start_date, e.id
+      LIMIT p_limit;
+    RETURN;
+  END IF;
+
+  IF v_city IS NULL THEN
+    RETURN;
+  END IF;
+
+  IF EXISTS (SELECT 1 FROM events e WHERE e.city_normalized = v_city) THEN
+    RETURN QUERY
+      SELECT * FROM events e
+      WHERE e.city_normalized = v_city
+        AND e.start_date BETWEEN p_start AND p_end
+        AND (p_after_start IS NULL OR (e.start_date, e.id) > (p_after_start, p_after_id))
+      ORDER BY e.start_date, e.id
+      LIMIT p_limit;
+  ELSE
+    -- Spelling differs from what ingest stored ("NYC" vs "New York City")
+    RETURN QUERY
+      SELECT * FROM events e
+      WHERE e.city_normalized % v_city
+        AND e.start_date BETWEEN p_start AND p_end
+        AND (p_after_start IS NULL OR (e.start_date, e.id) > (p_after_start, p_after_id))
+      ORDER BY e.start_date, e.id
+      LIMIT p_limit;
+  END IF;
+END;
+$$;
+
+COMMENT ON FUNCTION search_events IS
+  'Upcoming events by city and/or bounding box with keyset pagination on (start_date, id).';
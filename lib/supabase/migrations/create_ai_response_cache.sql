@@ -0,0 +1,117 @@
+-- Shared cache for AI edge function responses
+-- Used by supabase/functions/_shared/ai_cache.ts. Responses are keyed by
+-- function name and a hash of the normalized request, so identical requests
+-- from different users share one model call.
+
+CREATE TABLE IF NOT EXISTS ai_response_cache (
+  function_name TEXT NOT NULL,
+  cache_key TEXT NOT NULL,
+  request JSONB NOT NULL,
+  response JSONB NOT NULL,
+  hit_count INTEGER NOT NULL DEFAULT 0,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  expires_at TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (function_name, cache_key)
+);
+
+-- Index for expiry cleanup
+CREATE INDEX IF NOT EXISTS idx_ai_response_cache_expires_at
+  ON ai_response_cache(expires_at);
+
+-- Single-flight locks: the first request for a key computes the response,
+-- concurrent identical requests wait for it to land in the cache
+CREATE TABLE IF NOT EXISTS ai_response_cache_locks (
+  function_name TEXT NOT NULL,
+  cache_key TEXT NOT NULL,
+  locked_until TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (function_name, cache_key)
+);
+
+-- One row per cache lookup, for hit rate and model latency reporting
+CREATE TABLE IF NOT EXISTS ai_cache_metrics (
+  id BIGSERIAL PRIMARY KEY,
+  function_name TEXT NOT NULL,
+  cache_key TEXT NOT NULL,
+  outcome TEXT NOT NULL CHECK (outcome IN ('hit', 'miss', 'coalesced')),
+  model_latency_ms INTEGER,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_ai_cache_metrics_function_created_at
+  ON ai_cache_metrics(function_name, created_at DESC);
+
+-- Enable Row Level Security (service role only; no client policies)
+ALTER TABLE ai_response_cache ENABLE ROW LEVEL SECURITY;
+ALTER TABLE ai_response_cache_locks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE ai_cache_metrics ENABLE ROW LEVEL SECURITY;
+
+-- Take the lock for a key unless another request holds an unexpired one.
+-- Returns true if the caller should compute the response.
+CREATE OR REPLACE FUNCTION try_acquire_ai_cache_lock(
+  p_function_name TEXT,
+  p_cache_key TEXT,
+  p_ttl_seconds INTEGER
+)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  acquired BOOLEAN;
+BEGIN
+  INSERT INTO ai_response_cache_locks (function_name, cache_key, locked_until)
+  VALUES (p_function_name, p_cache_key, NOW() + make_interval(secs => p_ttl_seconds))
+  ON CONFLICT (function_name, cache_key) DO UPDATE
+    SET locked_until = EXCLUDED.locked_until
+    WHERE ai_response_cache_locks.locked_until < NOW()
+  RETURNING TRUE INTO acquired;
+
+  RETURN COALESCE(acquired, FALSE);
+END;
+$$;
+
+-- Count hits without a read-modify-write round trip from the edge function
+CREATE OR REPLACE FUNCTION increment_ai_cache_hits(
+  p_function_name TEXT,
+  p_cache_keys TEXT[]
+)
+RETURNS void
+LANGUAGE sql
+AS $$
+  UPDATE ai_response_cache
+  SET hit_count = hit_count + 1
+  WHERE function_name = p_function_name
+    AND cache_key = ANY(p_cache_keys);
+$$;
+
+-- Daily hit rate and model latency per function
+CREATE OR REPLACE VIEW ai_cache_stats AS
+SELECT
+  function_name,
+  date_trunc('day', created_at) AS day,
+  COUNT(*) AS lookups,
+  COUNT(*) FILTER (WHERE outcome IN ('hit', 'coalesced')) AS hits,
+  ROUND(
+    COUNT(*) FILTER (WHERE outcome IN ('hit', 'coalesced'))::NUMERIC
+      / NULLIF(COUNT(*), 0),
+    3
+  ) AS hit_rate,
+  ROUND(AVG(model_latency_ms)) AS avg_model_latency_ms,
+  PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY model_latency_ms)
+    AS p95_model_latency_ms
+FROM ai_cache_metrics
+GROUP BY function_name, date_trunc('day', created_at);
+
+-- Function to clean up expired entries, stale locks and old metrics
+CREATE OR REPLACE FUNCTION cleanup_ai_response_cache()
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  DELETE FROM ai_response_cache WHERE expires_at < NOW();
+  DELETE FROM ai_response_cache_locks WHERE locked_until < NOW();
+  DELETE FROM ai_cache_metrics WHERE created_at < NOW() - INTERVAL '30 days';
+END;
+$$;
+
+COMMENT ON TABLE ai_response_cache IS
+  'Caches AI edge function responses by normalized request hash. TTL is set per function in _shared/ai_cache.ts.';
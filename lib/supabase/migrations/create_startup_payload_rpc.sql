@@ -0,0 +1,167 @@
+-- Batched startup payload
+-- One round trip for everything the first screens render: the profile,
+-- trips (with their places and itinerary items), saved places, activities,
+-- badges and challenges. Used by AppBootstrap on the client. Each table
+-- honours the client's delta-sync watermark (see add_delta_sync_support.sql),
+-- so warm starts only carry rows changed since the last sync.
+--
+-- p_watermarks maps table name -> ISO timestamp, plus '<table>#tombstones'
+-- for the tombstone watermark. A table without a watermark is sent in full.
+--
+-- Response:
+--   { "server_time": ..., "tables": { "<table>": {
+--       "full": bool, "rows": [...], "deleted": [{row_id, deleted_at}] } } }
+
+-- Tombstones for one of the user's tables since a watermark
+CREATE OR REPLACE FUNCTION startup_tombstones(
+  p_user UUID,
+  p_table TEXT,
+  p_since TIMESTAMPTZ
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT COALESCE(
+    jsonb_agg(jsonb_build_object('row_id', s.row_id, 'deleted_at', s.deleted_at)),
+    '[]'::JSONB
+  )
+  FROM sync_tombstones s
+  WHERE p_since IS NOT NULL
+    AND s.user_id = p_user
+    AND s.table_name = p_table
+    AND s.deleted_at >= p_since;
+$$;
+
+-- Rows of a plain synced table changed since its watermark. Pass p_user for
+-- per-user tables (filtered on user_id, with tombstones) or NULL for global
+-- ones like badges.
+CREATE OR REPLACE FUNCTION startup_table_delta(
+  p_table TEXT,
+  p_user UUID,
+  p_watermarks JSONB
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  v_since TIMESTAMPTZ := (p_watermarks ->> p_table)::TIMESTAMPTZ;
+  v_rows JSONB;
+BEGIN
+  -- Global tables have no user_id column, and column names are resolved
+  -- when the statement is planned, so only mention it for per-user tables
+  EXECUTE format(
+    'SELECT COALESCE(jsonb_agg(to_jsonb(r)), ''[]''::JSONB) FROM %I r
+     WHERE ($2::TIMESTAMPTZ IS NULL OR r.updated_at >= $2) %s',
+    p_table,
+    CASE WHEN p_user IS NULL THEN '' ELSE 'AND r.user_id = $1' END
+  )
+  INTO v_rows
+  USING p_user, v_since;
+
+  RETURN jsonb_build_object(
+    'full', v_since IS NULL,
+    'rows', v_rows,
+    'deleted', CASE
+      WHEN p_user IS NULL THEN '[]'::JSONB
+      ELSE startup_tombstones(
+        p_user,
+        p_table,
+        COALESCE((p_watermarks ->> (p_table || '#tombstones'))::TIMESTAMPTZ, v_since)
+      )
+    END
+  );
+END;
+$$;
+
+-- SECURITY INVOKER: every read goes through the caller's RLS policies
+CREATE OR REPLACE FUNCTION get_startup_payload(
+  p_watermarks JSONB DEFAULT '{}'::JSONB
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+SECURITY INVOKER
+AS $$
+DECLARE
+  v_user UUID := auth.uid();
+  v_trips_since TIMESTAMPTZ := (p_watermarks ->> 'trips')::TIMESTAMPTZ;
+  v_items_since TIMESTAMPTZ := (p_watermarks ->> 'itinerary_items')::TIMESTAMPTZ;
+  v_tables JSONB;
+BEGIN
+  IF v_user IS NULL THEN
+    RAISE EXCEPTION 'get_startup_payload requires an authenticated user';
+  END IF;
+
+  v_tables := jsonb_build_object(
+    -- Profile is small and has no tombstones; always send it whole
+    'users', jsonb_build_object(
+      'full', TRUE,
+      'rows', COALESCE(
+        (SELECT jsonb_agg(to_jsonb(u)) FROM users u WHERE u.id = v_user),
+        '[]'::JSONB
+      ),
+      'deleted', '[]'::JSONB
+    ),
+
+    -- Same shape as TripService's select('*, trip_places(place_id)')
+    'trips', jsonb_build_object(
+      'full', v_trips_since IS NULL,
+      'rows', COALESCE((
+        SELECT jsonb_agg(
+          to_jsonb(t) || jsonb_build_object('trip_places', COALESCE(
+            (SELECT jsonb_agg(jsonb_build_object('place_id', tp.place_id))
+             FROM trip_places tp WHERE tp.trip_id = t.id),
+            '[]'::JSONB
+          ))
+        )
+        FROM trips t
+        WHERE t.user_id = v_user
+          AND (v_trips_since IS NULL OR t.updated_at >= v_trips_since)
+      ), '[]'::JSONB),
+      'deleted', startup_tombstones(
+        v_user,
+        'trips',
+        COALESCE((p_watermarks ->> 'trips#tombstones')::TIMESTAMPTZ, v_trips_since)
+      )
+    ),
+
+    -- Trips created since the last sync may have items older than the
+    -- itinerary watermark, so those trips' items are sent in full
+    'itinerary_items', jsonb_build_object(
+      'full', v_items_since IS NULL,
+      'rows', COALESCE((
+        SELECT jsonb_agg(to_jsonb(i))
+        FROM itinerary_items i
+        JOIN trips t ON t.id = i.trip_id
+        WHERE t.user_id = v_user
+          AND (
+            v_items_since IS NULL
+            OR i.updated_at >= v_items_since
+            OR (v_trips_since IS NOT NULL AND t.created_at >= v_trips_since)
+          )
+      ), '[]'::JSONB),
+      'deleted', startup_tombstones(
+        v_user,
+        'itinerary_items',
+        COALESCE((p_watermarks ->> 'itinerary_items#tombstones')::TIMESTAMPTZ, v_items_since)
+      )
+    ),
+
+    'saved_places', startup_table_delta('saved_places', v_user, p_watermarks),
+    'activities', startup_table_delta('activities', v_user, p_watermarks),
+    'user_badges', startup_table_delta('user_badges', v_user, p_watermarks),
+    'user_challenges', startup_table_delta('user_challenges', v_user, p_watermarks),
+    'badges', startup_table_delta('badges', NULL, p_watermarks),
+    'challenges', startup_table_delta('challenges', NULL, p_watermarks)
+  );
+
+  RETURN jsonb_build_object('server_time', NOW(), 'tables', v_tables);
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_startup_payload(JSONB) TO authenticated;
+
+COMMENT ON FUNCTION get_startup_payload IS
+  'First-screen data for the signed-in user in one call, delta-synced per table against client watermarks.';
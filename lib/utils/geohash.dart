@@ -0,0 +1,92 @@
+/// Geohash encoding helpers used to bucket coordinates into map tiles.
+///
+/// A geohash is a base32 string where each extra character narrows the
+/// cell. Approximate cell sizes at the equator:
+/// - 4 chars: 39km x 19.5km
+/// - 5 chars: 4.9km x 4.9km
+/// - 6 chars: 1.2km x 0.61km
+/// - 7 chars: 153m x 153m
+class Geohash {
+  static const String _base32 = '0123456789bcdefghjkmnpqrstuvwxyz';
+
+  /// Encode a coordinate into a geohash of [precision] characters
+  static String encode(double latitude, double longitude,
+      {int precision = 6}) {
+    var minLat = -90.0, maxLat = 90.0;
+    var minLng = -180.0, maxLng = 180.0;
+    final buffer = StringBuffer();
+    var isLng = true;
+    var bit = 0;
+    var ch = 0;
+
+    while (buffer.length < precision) {
+      if (isLng) {
+        final mid = (minLng + maxLng) / 2;
+        if (longitude >= mid) {
+          ch = (ch << 1) | 1;
+          minLng = mid;
+        } else {
+          ch = ch << 1;
+          maxLng = mid;
+        }
+      } else {
+        final mid = (minLat + maxLat) / 2;
+        if (latitude >= mid) {
+          ch = (ch << 1) | 1;
+          minLat = mid;
+        } else {
+          ch = ch << 1;
+          maxLat = mid;
+        }
+      }
+      isLng = !isLng;
+
+      if (++bit == 5) {
+        buffer.write(_base32[ch]);
+        bit = 0;
+        ch = 0;
+      }
+    }
+    return buffer.toString();
+  }
+
+  /// Decode a geohash into its cell bounds as (minLat, minLng, maxLat, maxLng)
+  static (double, double, double, double) bounds(String geohash) {
+    var minLat = -90.0, maxLat = 90.0;
+    var minLng = -180.0, maxLng = 180.0;
+    var isLng = true;
+
+    for (final c in geohash.toLowerCase().split('')) {
+      final value = _base32.indexOf(c);
+      if (value < 0) {
+        throw ArgumentError.value(geohash, 'geohash', 'Invalid character');
+      }
+      for (var mask = 16; mask > 0; mask >>= 1) {
+        final isSet = (value & mask) != 0;
+        if (isLng) {
+          final mid = (minLng + maxLng) / 2;
+          if (isSet) {
+            minLng = mid;
+          } else {
+            maxLng = mid;
+          }
+        } else {
+          final mid = (minLat + maxLat) / 2;
+          if (isSet) {
+            minLat = mid;
+          } else {
+            maxLat = mid;
+          }
+        }
+        isLng = !isLng;
+      }
+    }
+    return (minLat, minLng, maxLat, maxLng);
+  }
+
+  /// Decode a geohash to the (latitude, longitude) of its cell center
+  static (double, double) center(String geohash) {
+    final (minLat, minLng, maxLat, maxLng) = bounds(geohash);
+    return ((minLat + maxLat) / 2, (minLng + maxLng) / 2);
+  }
+}
@@ -0,0 +1,189 @@
+import 'dart:math';
+import 'package:flutter/foundation.dart';
+
+/// A single map item to be clustered (place or event)
+class ClusterPoint {
+  final String id;
+  final double latitude;
+  final double longitude;
+
+  const ClusterPoint(this.id, this.latitude, this.longitude);
+}
+
+/// A group of points sharing one grid cell at the current zoom.
+/// Single-point clusters are rendered as the item's own marker.
+class MapCluster {
+  final String id;
+  final double latitude;
+  final double longitude;
+  final List<String> pointIds;
+
+  const MapCluster({
+    required this.id,
+    required this.latitude,
+    required this.longitude,
+    required this.pointIds,
+  });
+
+  bool get isSingle => pointIds.length == 1;
+  int get size => pointIds.length;
+}
+
+/// Visible camera region; [west] > [east] when crossing the antimeridian
+class ClusterViewport {
+  final double south;
+  final double west;
+  final double north;
+  final double east;
+
+  const ClusterViewport({
+    required this.south,
+    required this.west,
+    required this.north,
+    required this.east,
+  });
+
+  /// Grow the viewport by [fraction] of its span on every side so markers
+  /// just off-screen are ready before they pan into view
+  ClusterViewport padded(double fraction) {
+    final latPad = (north - south) * fraction;
+    var lngSpan = east - west;
+    if (lngSpan < 0) lngSpan += 360;
+    final lngPad = lngSpan * fraction;
+    if (lngSpan + lngPad * 2 >= 360) {
+      return ClusterViewport(
+          south: max(-90, south - latPad),
+          west: -180,
+          north: min(90, north + latPad),
+          east: 180);
+    }
+    return ClusterViewport(
+      south: max(-90, south - latPad),
+      west: _wrapLng(west - lngPad),
+      north: min(90, north + latPad),
+      east: _wrapLng(east + lngPad),
+    );
+  }
+
+  bool contains(double latitude, double longitude) {
+    if (latitude < south || latitude > north) return false;
+    if (west <= east) return longitude >= west && longitude <= east;
+    return longitude >= west || longitude <= east;
+  }
+
+  static double _wrapLng(double lng) {
+    if (lng > 180) return lng - 360;
+    if (lng < -180) return lng + 360;
+    return lng;
+  }
+}
+
+/// Input for [MarkerClusterer.cluster]; kept to plain data so it can be
+/// sent to a background isolate
+class ClusterRequest {
+  final List<ClusterPoint> points;
+  final ClusterViewport? viewport;
+  final double zoom;
+  final double cellSizePx;
+  final double maxClusterZoom;
+
+  const ClusterRequest({
+    required this.points,
+    required this.zoom,
+    this.viewport,
+    this.cellSizePx = 60,
+    this.maxClusterZoom = 16,
+  });
+}
+
+/// Grid-based marker clustering in Web Mercator pixel space.
+///
+/// Cell ids are derived from the integer zoom and grid coordinates, so a
+/// cluster keeps the same id while the user pans at a fixed zoom. That
+/// keeps marker diffs small.
+class MarkerClusterer {
+  /// Below this many points the work is cheaper than an isolate hop
+  static const int isolateThreshold = 500;
+
+  static const double _tileSize = 256;
+
+  /// Cluster on a background isolate when the input is large
+  static Future<List<MapCluster>> clusterAsync(ClusterRequest request) {
+    if (request.points.length < isolateThreshold) {
+      return Future.value(cluster(request));
+    }
+    return compute(cluster, request);
+  }
+
+  static List<MapCluster> cluster(ClusterRequest request) {
+    final viewport = request.viewport;
+    final visible = viewport == null
+        ? request.points
+        : request.points
+            .where((p) => viewport.contains(p.latitude, p.longitude))
+            .toList();
+
+    // Past the max cluster zoom every point gets its own marker
+    if (request.zoom >= request.maxClusterZoom) {
+      return [
+        for (final p in visible)
+          MapCluster(
+            id: p.id,
+            latitude: p.latitude,
+            longitude: p.longitude,
+            pointIds: [p.id],
+          ),
+      ];
+    }
+
+    final zoomLevel = request.zoom.floor();
+    final worldSize = _tileSize * pow(2, zoomLevel);
+    final cells = <int, _Cell>{};
+    // Grid is at most worldSize / cellSizePx cells wide
+    final columns = (worldSize / request.cellSizePx).ceil() + 1;
+
+    for (final p in visible) {
+      final x = (p.longitude + 180) / 360 * worldSize;
+      final sinLat = sin(p.latitude.clamp(-85.0511, 85.0511) * pi / 180);
+      final y =
+          (0.5 - log((1 + sinLat) / (1 - sinLat)) / (4 * pi)) * worldSize;
+      final cellX = (x / request.cellSizePx).floor();
+      final cellY = (y / request.cellSizePx).floor();
+      cells.putIfAbsent(cellY * columns + cellX, () => _Cell(cellX, cellY)).add(p);
+    }
+
+    return [
+      for (final cell in cells.values)
+        if (cell.ids.length == 1)
+          MapCluster(
+            id: cell.ids.first,
+            latitude: cell.latSum,
+            longitude: cell.lngSum,
+            pointIds: cell.ids,
+          )
+        else
+          MapCluster(
+            id: 'cluster_${zoomLevel}_${cell.x}_${cell.y}',
+            latitude: cell.latSum / cell.ids.length,
+            longitude: cell.lngSum / cell.ids.length,
+            pointIds: cell.ids,
+          ),
+    ];
+  }
+}
+
+class _Cell {
+  final int x;
+  final int y;
+  final List<String> ids = [];
+  double latSum = 0;
+  double lngSum = 0;
+
+  _Cell(this.x, this.y);
+
+  void add(ClusterPoint p) {
+    ids.add(p.id);
+    latSum += p.latitude;
+    lngSum += p.longitude;
+  }
+}
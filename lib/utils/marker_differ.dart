@@ -0,0 +1,58 @@
+import 'package:google_maps_flutter/google_maps_flutter.dart';
+import 'package:fittravel/utils/marker_clusterer.dart';
+
+/// What a cluster's marker shows, and how to build it if that changed
+typedef MarkerDescription = (String signature, Marker Function() build);
+
+/// Markers built and dropped by one [MarkerDiffer.update]
+typedef MarkerDiff = ({int built, int removed});
+
+/// Keeps the markers of the last clustering and rebuilds only those whose
+/// content changed, so panning the map doesn't allocate a Marker (and
+/// bitmap descriptor) per visible item every frame.
+///
+/// A marker is reused while its cluster id and signature stay the same.
+/// Signatures describe what the marker shows; use [itemSignature] for a
+/// single item and [clusterSignature] for a group.
+class MarkerDiffer {
+  // Cluster id -> signature and marker last rendered for it
+  final Map<String, (String, Marker)> _rendered = {};
+
+  Iterable<Marker> get markers => _rendered.values.map((e) => e.$2);
+
+  int get length => _rendered.length;
+
+  /// A single item's marker, unchanged while it is the same object
+  static String itemSignature(String kind, Object item, {bool saved = false}) =>
+      '$kind:${identityHashCode(item)}:$saved';
+
+  /// A group marker, unchanged while its size and position are
+  static String clusterSignature(MapCluster cluster) =>
+      'cluster:${cluster.size}:${cluster.latitude},${cluster.longitude}';
+
+  /// Replace the rendered markers with one per cluster, reusing those whose
+  /// signature from [describe] is unchanged
+  MarkerDiff update(
+    Iterable<MapCluster> clusters,
+    MarkerDescription Function(MapCluster cluster) describe,
+  ) {
+    final next = <String, (String, Marker)>{};
+    var built = 0;
+    for (final cluster in clusters) {
+      final (signature, build) = describe(cluster);
+      final previous = _rendered[cluster.id];
+      if (previous != null && previous.$1 == signature) {
+        next[cluster.id] = previous;
+        continue;
+      }
+      built++;
+      next[cluster.id] = (signature, build());
+    }
+
+    final removed = _rendered.keys.where((id) => !next.containsKey(id)).length;
+    _rendered
+      ..clear()
+      ..addAll(next);
+    return (built: built, removed: removed);
+  }
+}
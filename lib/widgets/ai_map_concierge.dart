@@ -16,7 +16,16 @@ class AiMapConcierge extends StatefulWidget {
   final String? destination;
   final double? userLat;
   final double? userLng;
+  /// Places parsed from the reply so far, called with only the new ones
+  /// each time more arrive while the reply streams
   final void Function(List<SuggestedPlace> places)? onPlacesSuggested;
+
+  /// Every place of a finished reply, once (e.g. to fit the camera)
+  final void Function(List<SuggestedPlace> places)? onSuggestionsComplete;
+
+  /// The places suggested so far are stale: a new question was sent or the
+  /// concierge was closed
+  final VoidCallback? onSuggestionsCleared;
   final void Function(SuggestedPlace place)? onPlaceTapped;
   final bool isBottomSheetOpen;
 
@@ -26,6 +35,8 @@ class AiMapConcierge extends StatefulWidget {
     this.userLat,
     this.userLng,
     this.onPlacesSuggested,
+    this.onSuggestionsComplete,
+    this.onSuggestionsCleared,
     this.onPlaceTapped,
     this.isBottomSheetOpen = false,
   });
@@ -45,6 +56,9 @@ class _AiMapConciergeState extends State<AiMapConcierge>
   bool _isExpanded = false;
   bool _isLoading = false;
 
+  // Assistant reply while it streams in; moved into history when done
+  AiChatMessage? _streamingReply;
+
   @override
   void dispose() {
     _textController.dispose();
@@ -55,6 +69,7 @@ class _AiMapConciergeState extends State<AiMapConcierge>
 
   void _toggleExpanded() {
     setState(() => _isExpanded = !_isExpanded);
+    if (!_isExpanded) widget.onSuggestionsCleared?.call();
   }
 
   @override
@@ -77,25 +92,43 @@ class _AiMapConciergeState extends State<AiMapConcierge>
 
     _textController.clear();
     setState(() => _isLoading = true);
+    widget.onSuggestionsCleared?.call();
 
+    var places = const <SuggestedPlace>[];
+    var placesShown = 0;
     try {
-      final response = await _aiService.askFitnessGuide(
+      await for (final update in _aiService.streamFitnessGuide(
         question: message,
         destination: widget.destination,
         userLat: widget.userLat,
         userLng: widget.userLng,
-      );
+      )) {
+        if (!mounted) return;
+
+        // Hand the parent each newly parsed place once, to highlight on
+        // the map as soon as it arrives
+        places = update.suggestedPlaces;
+        if (places.length > placesShown) {
+          widget.onPlacesSuggested?.call(places.sublist(placesShown));
+          placesShown = places.length;
+        }
 
-      // Notify parent about suggested places to highlight on map
-      if (response.suggestedPlaces.isNotEmpty &&
-          widget.onPlacesSuggested != null) {
-        widget.onPlacesSuggested!(response.suggestedPlaces);
+        setState(() {
+          _streamingReply = update.isDone || update.text.isEmpty
+              ? null
+              : AiChatMessage.assistant(update.text, suggestedPlaces: places);
+        });
       }
     } catch (e) {
       debugPrint('AiMapConcierge error: $e');
     }
 
-    setState(() => _isLoading = false);
+    if (!mounted) return;
+    if (places.isNotEmpty) widget.onSuggestionsComplete?.call(places);
+    setState(() {
+      _isLoading = false;
+      _streamingReply = null;
+    });
 
     // Scroll to bottom after new message
     WidgetsBinding.instance.addPostFrameCallback((_) {
@@ -357,19 +390,26 @@ class _AiMapConciergeState extends State<AiMapConcierge>
   }
 
   Widget _buildMessageList(ColorScheme colors, List<String> quickQuestions) {
-    final messages = _aiService.conversationHistory;
+    final streamingReply = _streamingReply;
+    final messages = [
+      ..._aiService.conversationHistory,
+      if (streamingReply != null) streamingReply,
+    ];
 
     if (messages.isEmpty) {
       return _buildWelcomeState(colors, quickQuestions);
     }
 
+    final showTyping = _isLoading && streamingReply == null;
+
     return ListView.builder(
       controller: _scrollController,
       padding: const EdgeInsets.fromLTRB(20, 16, 20, 16),
       physics: const BouncingScrollPhysics(),
-      itemCount: messages.length + (_isLoading ? 1 : 0),
+      // Typing indicator only until the first streamed text arrives
+      itemCount: messages.length + (showTyping ? 1 : 0),
       itemBuilder: (context, index) {
-        if (_isLoading && index == messages.length) {
+        if (showTyping && index == messages.length) {
           return _buildLoadingIndicator(colors);
         }
 
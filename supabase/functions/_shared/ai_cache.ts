@@ -0,0 +1,492 @@
+// supabase/functions/_shared/ai_cache.ts
+// Shared response cache for the AI edge functions
+//
+// Requests are normalized (free text trimmed and lower-cased, keys sorted,
+// set-like string arrays sorted) and hashed, so equivalent requests from
+// different users share one model call. Identifiers (keys named id, *Id,
+// *_id, *Ids, *_ids) are case-sensitive and kept verbatim. Each function
+// has its own TTL.
+//
+// A burst of identical requests triggers a single model call: requests in
+// the same isolate share the in-flight promise, and across isolates the
+// first request takes a lock row (try_acquire_ai_cache_lock) while the
+// others poll the cache for its result.
+//
+// Every lookup is recorded in ai_cache_metrics (see the ai_cache_stats view
+// for hit rate and model latency). Cache failures are logged and never fail
+// the request; the model is called directly instead.
+//
+// Tables: lib/supabase/migrations/create_ai_response_cache.sql
+
+import { createClient, SupabaseClient } from "https://esm.sh/@supabase/supabase-js@2";
+
+const HOUR = 60 * 60;
+const DAY = 24 * HOUR;
+
+/// Cache lifetime per edge function, in seconds
+export const AI_CACHE_TTL_SECONDS: Record<string, number> = {
+  analyze_place_fitness: DAY,
+  generate_quick_insights: 7 * DAY,
+  generate_fitness_itinerary: 3 * DAY,
+  cairo_guide: DAY,
+  // Recommendations depend on the live event list
+  aiml_recommendations: HOUR,
+};
+
+const DEFAULT_TTL_SECONDS = DAY;
+
+// How long a lock outlives a crashed holder. A live holder extends it every
+// third of this while the model is still generating.
+const LOCK_TTL_SECONDS = 30;
+// How long a request waits on another request's model call before computing
+// itself. A dead holder's lock expires well before this, so it only bounds
+// a holder stuck in an unusually long generation.
+const LOCK_WAIT_MS = 2 * LOCK_TTL_SECONDS * 1000;
+const LOCK_POLL_MS = 500;
+
+type Outcome = "hit" | "miss" | "coalesced";
+
+export interface CachedResult<T> {
+  value: T;
+  /// True if the value came from the cache or another in-flight request
+  cached: boolean;
+}
+
+export interface Claim<T> {
+  /// Another request's result, if it finished while this one waited
+  value?: T;
+  /// Ends this request's hold on the key once its result is stored
+  release: () => Promise<void>;
+}
+
+export interface AiCacheOptions<T> {
+  ttlSeconds?: number;
+  /// Return false for fallback/error values that must not be cached
+  shouldCache?: (value: T) => boolean;
+}
+
+export interface AiCacheBatchOptions<R, T> extends AiCacheOptions<T> {
+  /// The part of each request that determines the response
+  keyOf?: (request: R) => unknown;
+  /// Maximum model calls in flight for the batch
+  concurrency?: number;
+}
+
+interface MetricRow {
+  function_name: string;
+  cache_key: string;
+  outcome: Outcome;
+  model_latency_ms?: number;
+}
+
+interface Resolved<T> {
+  value: T;
+  outcome: Outcome;
+  latencyMs?: number;
+}
+
+const encoder = new TextEncoder();
+const inFlight = new Map<string, Promise<unknown>>();
+let client: SupabaseClient | null | undefined;
+
+function cacheClient(): SupabaseClient | null {
+  if (client === undefined) {
+    const url = Deno.env.get("SUPABASE_URL");
+    const key = Deno.env.get("SUPABASE_SERVICE_ROLE_KEY");
+    client = url && key ? createClient(url, key) : null;
+    if (!client) console.warn("AI cache disabled: Supabase service role not configured");
+  }
+  return client;
+}
+
+// Keys whose values are identifiers (Google place ids, uuids) and must not
+// be case-folded
+const IDENTIFIER_KEY = /^(id|ids)$|(Id|_id|Ids|_ids)$/;
+
+/// Canonical form of a request for hashing: free-text strings trimmed,
+/// lower-cased and whitespace-collapsed; identifiers kept verbatim; empty
+/// values dropped; object keys sorted; string arrays treated as sets
+/// (sorted, deduplicated)
+export function normalizeRequest(value: unknown, verbatim = false): unknown {
+  if (typeof value === "string") {
+    return verbatim ? value : value.trim().toLowerCase().replace(/\s+/g, " ");
+  }
+  if (Array.isArray(value)) {
+    const items = value
+      .map((v) => normalizeRequest(v, verbatim))
+      .filter((v) => v !== undefined);
+    if (items.every((v) => typeof v === "string")) {
+      return [...new Set(items as string[])].sort();
+    }
+    return items;
+  }
+  if (value && typeof value === "object") {
+    const out: Record<string, unknown> = {};
+    for (const key of Object.keys(value).sort()) {
+      const v = normalizeRequest(
+        (value as Record<string, unknown>)[key],
+        verbatim || IDENTIFIER_KEY.test(key),
+      );
+      if (v === undefined || v === "" || (Array.isArray(v) && v.length === 0)) continue;
+      out[key] = v;
+    }
+    return out;
+  }
+  return value ?? undefined;
+}
+
+/// SHA-256 hex digest of the normalized request
+export async function requestCacheKey(request: unknown): Promise<string> {
+  const canonical = JSON.stringify(normalizeRequest(request) ?? null);
+  const digest = await crypto.subtle.digest("SHA-256", encoder.encode(canonical));
+  return Array.from(new Uint8Array(digest))
+    .map((b) => b.toString(16).padStart(2, "0"))
+    .join("");
+}
+
+/// Return the cached response for [request], or compute, cache and return it
+export async function withAiCache<T>(
+  functionName: string,
+  request: unknown,
+  compute: () => Promise<T>,
+  options: AiCacheOptions<T> = {},
+): Promise<CachedResult<T>> {
+  const key = await requestCacheKey(request);
+  const cached = await lookup<T>(functionName, [key]);
+  const hit = cached.get(key);
+  if (hit !== undefined) {
+    recordHits(functionName, [key]);
+    recordMetrics([{ function_name: functionName, cache_key: key, outcome: "hit" }]);
+    return { value: hit, cached: true };
+  }
+
+  const resolved = await resolveMiss(functionName, key, request, compute, options);
+  recordMetrics([metricRow(functionName, key, resolved)]);
+  return { value: resolved.value, cached: resolved.outcome !== "miss" };
+}
+
+/// Batch variant of [withAiCache]: looks every request up in one query and
+/// computes only the misses (duplicates once), at most [concurrency] at a
+/// time. Results are returned in request order.
+export async function withAiCacheBatch<R, T>(
+  functionName: string,
+  requests: R[],
+  compute: (request: R) => Promise<T>,
+  options: AiCacheBatchOptions<R, T> = {},
+): Promise<CachedResult<T>[]> {
+  const keyOf = options.keyOf ?? ((r: R) => r);
+  const keys = await Promise.all(requests.map((r) => requestCacheKey(keyOf(r))));
+  const cached = await lookup<T>(functionName, [...new Set(keys)]);
+
+  const results: (CachedResult<T> | undefined)[] = keys.map((key) => {
+    const hit = cached.get(key);
+    return hit === undefined ? undefined : { value: hit, cached: true };
+  });
+  const metrics: MetricRow[] = keys
+    .filter((key) => cached.has(key))
+    .map((key) => ({ function_name: functionName, cache_key: key, outcome: "hit" as const }));
+  if (metrics.length > 0) recordHits(functionName, [...cached.keys()]);
+
+  // One model call per distinct missing key
+  const misses = new Map<string, R>();
+  keys.forEach((key, i) => {
+    if (!cached.has(key) && !misses.has(key)) misses.set(key, requests[i]);
+  });
+
+  const resolved = new Map<string, Resolved<T>>();
+  const queue = [...misses.entries()];
+  const workers = Array.from(
+    { length: Math.min(options.concurrency ?? 3, queue.length) },
+    async () => {
+      for (let next = queue.shift(); next; next = queue.shift()) {
+        const [key, request] = next;
+        const result = await resolveMiss(
+          functionName,
+          key,
+          keyOf(request),
+          () => compute(request),
+          options,
+        );
+        resolved.set(key, result);
+        metrics.push(metricRow(functionName, key, result));
+      }
+    },
+  );
+  await Promise.all(workers);
+
+  recordMetrics(metrics);
+  return keys.map((key, i) => {
+    if (results[i]) return results[i]!;
+    const r = resolved.get(key)!;
+    return { value: r.value, cached: r.outcome !== "miss" };
+  });
+}
+
+/// Look up a single cached response without computing (e.g. before
+/// starting a stream). Returns the key for a later [storeAiCache], which
+/// records the miss.
+export async function lookupAiCache<T>(
+  functionName: string,
+  request: unknown,
+): Promise<{ key: string; value: T | undefined }> {
+  const key = await requestCacheKey(request);
+  const value = (await lookup<T>(functionName, [key])).get(key);
+  if (value !== undefined) {
+    recordHits(functionName, [key]);
+    recordMetrics([{ function_name: functionName, cache_key: key, outcome: "hit" }]);
+  }
+  return { key, value };
+}
+
+/// Single-flight for a response computed outside [withAiCache] (e.g. a
+/// stream) after [lookupAiCache] missed: returns another request's result
+/// if one was computing [key], otherwise holds the key until `release` is
+/// called after [storeAiCache]
+export async function claimAiCacheKey<T>(
+  functionName: string,
+  key: string,
+): Promise<Claim<T>> {
+  const claim = await claimKey<T>(functionName, key);
+  if (claim.value !== undefined) {
+    recordMetrics([{ function_name: functionName, cache_key: key, outcome: "coalesced" }]);
+  }
+  return claim;
+}
+
+/// Store a response computed outside [withAiCache] (e.g. a finished
+/// stream) and record the miss with its model latency
+export async function storeAiCache<T>(
+  functionName: string,
+  key: string,
+  request: unknown,
+  value: T,
+  latencyMs?: number,
+  ttlSeconds?: number,
+): Promise<void> {
+  await store(functionName, key, request, value, ttlSeconds);
+  recordMetrics([{
+    function_name: functionName,
+    cache_key: key,
+    outcome: "miss",
+    model_latency_ms: latencyMs !== undefined ? Math.round(latencyMs) : undefined,
+  }]);
+}
+
+// ---------- Internals ----------
+
+function metricRow<T>(functionName: string, key: string, r: Resolved<T>): MetricRow {
+  return {
+    function_name: functionName,
+    cache_key: key,
+    outcome: r.outcome,
+    model_latency_ms: r.latencyMs !== undefined ? Math.round(r.latencyMs) : undefined,
+  };
+}
+
+/// Single-flight computation of a cache miss
+function resolveMiss<T>(
+  functionName: string,
+  key: string,
+  request: unknown,
+  compute: () => Promise<T>,
+  options: AiCacheOptions<T>,
+): Promise<Resolved<T>> {
+  const flightKey = `${functionName}:${key}`;
+  const pending = inFlight.get(flightKey) as Promise<Resolved<T>> | undefined;
+  if (pending) {
+    return pending.then((r) => ({ value: r.value, outcome: "coalesced" as const }));
+  }
+
+  const promise = (async (): Promise<Resolved<T>> => {
+    const claim = await claimKey<T>(functionName, key);
+    if (claim.value !== undefined) return { value: claim.value, outcome: "coalesced" };
+
+    try {
+      const started = performance.now();
+      const value = await compute();
+      const latencyMs = performance.now() - started;
+      console.log(`${functionName}: model call took ${Math.round(latencyMs)}ms`);
+      if (options.shouldCache?.(value) ?? true) {
+        await store(functionName, key, request, value, options.ttlSeconds);
+      }
+      return { value, outcome: "miss", latencyMs };
+    } finally {
+      await claim.release();
+    }
+  })();
+
+  inFlight.set(flightKey, promise);
+  promise.then(
+    () => inFlight.delete(flightKey),
+    () => inFlight.delete(flightKey),
+  );
+  return promise;
+}
+
+async function lookup<T>(functionName: string, keys: string[]): Promise<Map<string, T>> {
+  const found = new Map<string, T>();
+  const db = cacheClient();
+  if (!db || keys.length === 0) return found;
+  try {
+    const { data, error } = await db
+      .from("ai_response_cache")
+      .select("cache_key, response")
+      .eq("function_name", functionName)
+      .in("cache_key", keys)
+      .gt("expires_at", new Date().toISOString());
+    if (error) throw error;
+    for (const row of data ?? []) found.set(row.cache_key, row.response as T);
+  } catch (e) {
+    console.error(`AI cache lookup failed for ${functionName}:`, e);
+  }
+  return found;
+}
+
+async function store<T>(
+  functionName: string,
+  key: string,
+  request: unknown,
+  value: T,
+  ttlSeconds?: number,
+): Promise<void> {
+  const db = cacheClient();
+  if (!db) return;
+  const ttl = ttlSeconds ?? AI_CACHE_TTL_SECONDS[functionName] ?? DEFAULT_TTL_SECONDS;
+  const now = Date.now();
+  try {
+    const { error } = await db.from("ai_response_cache").upsert({
+      function_name: functionName,
+      cache_key: key,
+      request: normalizeRequest(request) ?? {},
+      response: value,
+      hit_count: 0,
+      created_at: new Date(now).toISOString(),
+      expires_at: new Date(now + ttl * 1000).toISOString(),
+    });
+    if (error) throw error;
+  } catch (e) {
+    console.error(`AI cache store failed for ${functionName}:`, e);
+  }
+}
+
+async function acquireLock(functionName: string, key: string): Promise<boolean> {
+  const db = cacheClient();
+  if (!db) return true;
+  try {
+    const { data, error } = await db.rpc("try_acquire_ai_cache_lock", {
+      p_function_name: functionName,
+      p_cache_key: key,
+      p_ttl_seconds: LOCK_TTL_SECONDS,
+    });
+    if (error) throw error;
+    return data === true;
+  } catch (e) {
+    console.error(`AI cache lock failed for ${functionName}:`, e);
+    return true;
+  }
+}
+
+/// Take the lock for [key], or wait for the request holding it. Waiters take
+/// over when the holder releases the lock without a cacheable result or its
+/// lock expires, so a burst on a cold key makes one model call at a time.
+async function claimKey<T>(functionName: string, key: string): Promise<Claim<T>> {
+  const noop = async () => {};
+  const deadline = Date.now() + LOCK_WAIT_MS;
+  let locked = await acquireLock(functionName, key);
+  while (!locked && Date.now() < deadline) {
+    const value = await waitForCached<T>(functionName, key, deadline);
+    if (value !== undefined) return { value, release: noop };
+    locked = await acquireLock(functionName, key);
+  }
+  if (!locked) {
+    console.warn(`AI cache: gave up waiting for ${functionName} ${key.slice(0, 12)}`);
+    return { release: noop };
+  }
+
+  const heartbeat = setInterval(
+    () => void extendLock(functionName, key),
+    (LOCK_TTL_SECONDS * 1000) / 3,
+  );
+  return {
+    release: async () => {
+      clearInterval(heartbeat);
+      await releaseLock(functionName, key);
+    },
+  };
+}
+
+async function extendLock(functionName: string, key: string): Promise<void> {
+  const db = cacheClient();
+  if (!db) return;
+  const { error } = await db
+    .from("ai_response_cache_locks")
+    .update({ locked_until: new Date(Date.now() + LOCK_TTL_SECONDS * 1000).toISOString() })
+    .eq("function_name", functionName)
+    .eq("cache_key", key);
+  if (error) console.error(`AI cache lock extension failed for ${functionName}:`, error);
+}
+
+/// Whether another request still holds an unexpired lock on [key]
+async function lockHeld(functionName: string, key: string): Promise<boolean> {
+  const db = cacheClient();
+  if (!db) return false;
+  const { data, error } = await db
+    .from("ai_response_cache_locks")
+    .select("locked_until")
+    .eq("function_name", functionName)
+    .eq("cache_key", key)
+    .gt("locked_until", new Date().toISOString())
+    .maybeSingle();
+  if (error) {
+    console.error(`AI cache lock check failed for ${functionName}:`, error);
+    return true;
+  }
+  return data !== null;
+}
+
+async function releaseLock(functionName: string, key: string): Promise<void> {
+  const db = cacheClient();
+  if (!db) return;
+  const { error } = await db
+    .from("ai_response_cache_locks")
+    .delete()
+    .eq("function_name", functionName)
+    .eq("cache_key", key);
+  if (error) console.error(`AI cache unlock failed for ${functionName}:`, error);
+}
+
+/// Poll for another request's result until it is cached, its lock is gone
+/// (released without caching, or expired) or [deadline] passes
+async function waitForCached<T>(
+  functionName: string,
+  key: string,
+  deadline: number,
+): Promise<T | undefined> {
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, LOCK_POLL_MS));
+    const value = (await lookup<T>(functionName, [key])).get(key);
+    if (value !== undefined) return value;
+    if (!(await lockHeld(functionName, key))) return undefined;
+  }
+  return undefined;
+}
+
+/// Fire-and-forget: metrics must not delay the response
+function recordMetrics(rows: MetricRow[]): void {
+  const db = cacheClient();
+  if (!db || rows.length === 0) return;
+  db.from("ai_cache_metrics").insert(rows).then(({ error }) => {
+    if (error) console.error("AI cache metrics insert failed:", error);
+  });
+}
+
+function recordHits(functionName: string, keys: string[]): void {
+  const db = cacheClient();
+  if (!db || keys.length === 0) return;
+  db.rpc("increment_ai_cache_hits", {
+    p_function_name: functionName,
+    p_cache_keys: keys,
+  }).then(({ error }) => {
+    if (error) console.error("AI cache hit count update failed:", error);
+  });
+}
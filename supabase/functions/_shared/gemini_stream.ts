@@ -0,0 +1,108 @@
+// supabase/functions/_shared/gemini_stream.ts
+// Streams Gemini output to the client as Server-Sent Events
+//
+// Events sent to the client:
+//   event: delta  data: {"text": "<raw model text chunk>"}
+//   event: done   data: <final response JSON, same shape as non-streaming>
+//   event: error  data: {"error": "<message>"}
+
+const encoder = new TextEncoder();
+
+export function sseHeaders(cors: Record<string, string>): Record<string, string> {
+  return {
+    ...cors,
+    "content-type": "text/event-stream; charset=utf-8",
+    "cache-control": "no-cache",
+    // Stop proxies from buffering the whole response
+    "x-accel-buffering": "no",
+  };
+}
+
+export function sseEvent(event: string, data: unknown): Uint8Array {
+  return encoder.encode(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+}
+
+export function geminiStreamUrl(model: string, apiKey: string): string {
+  return `https://generativelanguage.googleapis.com/v1beta/models/${model}:streamGenerateContent?alt=sse&key=${apiKey}`;
+}
+
+/// Yield text chunks from Gemini's `alt=sse` response body
+export async function* geminiTextChunks(
+  body: ReadableStream<Uint8Array>,
+): AsyncGenerator<string> {
+  const reader = body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+
+    let newline: number;
+    while ((newline = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (!line.startsWith("data:")) continue;
+
+      const payload = line.slice(5).trim();
+      if (!payload || payload === "[DONE]") continue;
+      try {
+        const json = JSON.parse(payload);
+        const parts = json?.candidates?.[0]?.content?.parts;
+        if (!Array.isArray(parts)) continue;
+        for (const part of parts) {
+          if (typeof part?.text === "string" && part.text) yield part.text;
+        }
+      } catch (e) {
+        console.error("Skipping malformed Gemini SSE line:", e);
+      }
+    }
+  }
+}
+
+/// Send an already known reply (e.g. a cache hit) in the same event format
+export function streamCachedResponse(
+  rawText: string,
+  done: unknown,
+  cors: Record<string, string>,
+): Response {
+  const body = new Blob([
+    sseEvent("delta", { text: rawText }),
+    sseEvent("done", done),
+  ]).stream();
+  return new Response(body, { status: 200, headers: sseHeaders(cors) });
+}
+
+/// Forward a streaming Gemini response to the client. [finish] turns the
+/// complete raw text into the final `done` payload and is awaited, so work
+/// it does (e.g. caching the reply) completes before the stream closes.
+/// [onClose] runs once the stream ends, whether or not it succeeded.
+export function streamGeminiResponse(
+  geminiRes: Response,
+  cors: Record<string, string>,
+  finish: (rawText: string) => unknown | Promise<unknown>,
+  onClose?: () => Promise<void>,
+): Response {
+  const started = Date.now();
+  const stream = new ReadableStream<Uint8Array>({
+    async start(controller) {
+      let rawText = "";
+      try {
+        for await (const chunk of geminiTextChunks(geminiRes.body!)) {
+          if (!rawText) {
+            console.log(`Gemini first token after ${Date.now() - started}ms`);
+          }
+          rawText += chunk;
+          controller.enqueue(sseEvent("delta", { text: chunk }));
+        }
+        controller.enqueue(sseEvent("done", await finish(rawText)));
+      } catch (err) {
+        console.error("Stream error:", err);
+        controller.enqueue(sseEvent("error", { error: String(err) }));
+      } finally {
+        await onClose?.().catch((e) => console.error("Stream cleanup failed:", e));
+        controller.close();
+      }
+    },
+  });
+  return new Response(stream, { status: 200, headers: sseHeaders(cors) });
+}
@@ -1,4 +1,5 @@
 import "jsr:@supabase/functions-js/edge-runtime.d.ts";
+import { withAiCache } from "../_shared/ai_cache.ts";
 
 const AIML_API_KEY = Deno.env.get("AIML_API_KEY");
 const AIML_BASE_URL = "https://api.aimlapi.com/v1";
@@ -74,42 +75,59 @@ Keep responses concise but informative. Use a friendly, motivating tone.`;
       userPrompt += `\n\nPlease recommend the most relevant events from this list and explain why they're a good fit.`;
     }
 
-    const response = await fetch(`${AIML_BASE_URL}/chat/completions`, {
-      method: "POST",
-      headers: {
-        "Authorization": `Bearer ${AIML_API_KEY}`,
-        "Content-Type": "application/json",
+    // Location rounded to ~1 km so nearby users share recommendations
+    const location = userProfile?.location;
+    const cacheRequest = {
+      query,
+      fitnessLevel: userProfile?.fitnessLevel,
+      preferences: userProfile?.preferences,
+      location: location
+        ? { lat: location.lat.toFixed(2), lng: location.lng.toFixed(2) }
+        : undefined,
+      eventIds: availableEvents?.slice(0, 15).map((e) => e.id),
+      model,
+    };
+
+    const { value: result } = await withAiCache(
+      "aiml_recommendations",
+      cacheRequest,
+      async () => {
+        const response = await fetch(`${AIML_BASE_URL}/chat/completions`, {
+          method: "POST",
+          headers: {
+            "Authorization": `Bearer ${AIML_API_KEY}`,
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify({
+            model,
+            messages: [
+              { role: "system", content: systemPrompt },
+              { role: "user", content: userPrompt },
+            ],
+            temperature: 0.7,
+            max_tokens: 1024,
+          }),
+        });
+
+        if (!response.ok) {
+          const errorText = await response.text();
+          console.error("AIML API error:", errorText);
+          return {
+            status: response.status,
+            body: { error: "AIML API request failed", details: errorText },
+          };
+        }
+
+        const data = await response.json();
+        const text = data.choices?.[0]?.message?.content || "No recommendations available.";
+        return { status: 200, body: { text, model, usage: data.usage } };
       },
-      body: JSON.stringify({
-        model,
-        messages: [
-          { role: "system", content: systemPrompt },
-          { role: "user", content: userPrompt },
-        ],
-        temperature: 0.7,
-        max_tokens: 1024,
-      }),
-    });
-
-    if (!response.ok) {
-      const errorText = await response.text();
-      console.error("AIML API error:", errorText);
-      return new Response(
-        JSON.stringify({ error: "AIML API request failed", details: errorText }),
-        { status: response.status, headers: { ...corsHeaders, "Content-Type": "application/json" } }
-      );
-    }
-
-    const data = await response.json();
-    const text = data.choices?.[0]?.message?.content || "No recommendations available.";
+      { shouldCache: (r) => r.status === 200 },
+    );
 
     return new Response(
-      JSON.stringify({
-        text,
-        model,
-        usage: data.usage,
-      }),
-      { headers: { ...corsHeaders, "Content-Type": "application/json" } }
+      JSON.stringify(result.body),
+      { status: result.status, headers: { ...corsHeaders, "Content-Type": "application/json" } }
     );
   } catch (error) {
     console.error("Error in aiml_recommendations:", error);
@@ -2,12 +2,20 @@
 // https://deno.land/manual/getting_started/setup_your_environment
 // This enables autocomplete, go to definition, etc.
 
+//
+// Accepts one place ({ placeId, ... } → { intelligence }) or a batch
+// ({ places: [...] } → { results: [{ placeId, intelligence, fromCache }] }).
+// Results are cached for 24 hours in the shared AI cache; a batch looks up
+// all places in one query and only analyzes the misses.
+
 import { serve } from 'https://deno.land/std@0.168.0/http/server.ts'
-import { createClient } from 'https://esm.sh/@supabase/supabase-js@2'
+import { withAiCache, withAiCacheBatch } from '../_shared/ai_cache.ts'
 
 const GEMINI_API_KEY = Deno.env.get('GEMINI_API_KEY')!
-const SUPABASE_URL = Deno.env.get('SUPABASE_URL')!
-const SUPABASE_SERVICE_ROLE_KEY = Deno.env.get('SUPABASE_SERVICE_ROLE_KEY')!
+
+// Places analyzed concurrently in batch mode
+const BATCH_CONCURRENCY = 3
+const MAX_BATCH_SIZE = 25
 
 interface AnalysisRequest {
   placeId: string
@@ -28,107 +36,96 @@ interface AnalysisRequest {
   }
 }
 
+interface BatchAnalysisRequest {
+  places: AnalysisRequest[]
+}
+
+interface Analysis {
+  intelligence: any
+  /// False when the fallback structure was returned
+  parsed: boolean
+}
+
+const CORS_HEADERS = {
+  'Access-Control-Allow-Origin': '*',
+  'Access-Control-Allow-Methods': 'POST',
+  'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
+}
+
+// Cached per place, as before
+const cacheKeyOf = (place: AnalysisRequest) => ({ placeId: place.placeId })
+const shouldCache = (analysis: Analysis) => analysis.parsed
+
+// Without a place id every request would share one cache entry
+const hasPlaceId = (place: AnalysisRequest | undefined) =>
+  typeof place?.placeId === 'string' && place.placeId.trim() !== ''
+
+const badRequest = (error: string) =>
+  new Response(
+    JSON.stringify({ error }),
+    { status: 400, headers: { ...CORS_HEADERS, 'Content-Type': 'application/json' } }
+  )
+
 serve(async (req) => {
   // CORS headers
   if (req.method === 'OPTIONS') {
-    return new Response('ok', {
-      headers: {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'POST',
-        'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
-      },
-    })
+    return new Response('ok', { headers: CORS_HEADERS })
   }
 
   try {
-    const supabase = createClient(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
-
     // Parse request
-    const body: AnalysisRequest = await req.json()
-    const { placeId, placeName, placeType, reviews = [], placeData } = body
-
-    // Check cache first (24 hour TTL)
-    const { data: cached } = await supabase
-      .from('place_fitness_intelligence_cache')
-      .select('*')
-      .eq('place_id', placeId)
-      .gte('created_at', new Date(Date.now() - 24 * 60 * 60 * 1000).toISOString())
-      .single()
-
-    if (cached) {
-      console.log(`Cache hit for place ${placeId}`)
-      return new Response(
-        JSON.stringify({ intelligence: cached.intelligence }),
-        {
-          headers: {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-          },
-        }
-      )
-    }
-
-    // Build context for AI
-    const reviewTexts = reviews
-      .filter((r) => r.text && r.text.trim().length > 0)
-      .map((r) => `[${r.rating}/5] ${r.text}`)
-      .join('\n')
+    const body: AnalysisRequest | BatchAnalysisRequest = await req.json()
 
-    const hasReviews = reviewTexts.length > 0
+    if ('places' in body) {
+      if (!Array.isArray(body.places) || body.places.length > MAX_BATCH_SIZE) {
+        return badRequest(`places must be an array of at most ${MAX_BATCH_SIZE}`)
+      }
+      if (!body.places.every(hasPlaceId)) {
+        return badRequest('every place requires a placeId')
+      }
 
-    // Build prompt based on place type
-    const prompt = buildAnalysisPrompt(placeName, placeType, reviewTexts, placeData, hasReviews)
+      // One failed place shouldn't fail the whole batch
+      const analyzeOrSkip = (place: AnalysisRequest) =>
+        analyzePlace(place).catch((error): Analysis => {
+          console.error(`Error analyzing place ${place.placeId}:`, error)
+          return { intelligence: null, parsed: false }
+        })
+
+      const results = await withAiCacheBatch('analyze_place_fitness', body.places, analyzeOrSkip, {
+        keyOf: cacheKeyOf,
+        shouldCache,
+        concurrency: BATCH_CONCURRENCY,
+      })
+      const hits = results.filter((r) => r.cached).length
+      console.log(`Analyzed ${body.places.length} places (${hits} from cache)`)
 
-    // Call Gemini API
-    const geminiResponse = await fetch(
-      `https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key=${GEMINI_API_KEY}`,
-      {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          contents: [{ parts: [{ text: prompt }] }],
-          generationConfig: {
-            temperature: 0.7,
-            topK: 40,
-            topP: 0.95,
-            maxOutputTokens: 2048,
-          },
+      return new Response(
+        JSON.stringify({
+          results: body.places.map((place, i) => ({
+            placeId: place.placeId,
+            intelligence: results[i].value.intelligence,
+            fromCache: results[i].cached,
+          })),
         }),
-      }
-    )
-
-    if (!geminiResponse.ok) {
-      throw new Error(`Gemini API error: ${geminiResponse.status}`)
+        { headers: { ...CORS_HEADERS, 'Content-Type': 'application/json' } }
+      )
     }
 
-    const geminiData = await geminiResponse.json()
-    const responseText = geminiData.candidates?.[0]?.content?.parts?.[0]?.text
-
-    if (!responseText) {
-      throw new Error('No response from Gemini')
+    if (!hasPlaceId(body)) {
+      return badRequest('placeId is required')
     }
 
-    // Parse JSON response
-    const intelligence = parseAiResponse(responseText, reviews.length)
-
-    // Cache the result
-    await supabase.from('place_fitness_intelligence_cache').upsert({
-      place_id: placeId,
-      place_name: placeName,
-      place_type: placeType,
-      intelligence,
-      reviews_analyzed: reviews.length,
-      created_at: new Date().toISOString(),
-    })
+    const { value, cached } = await withAiCache(
+      'analyze_place_fitness',
+      cacheKeyOf(body),
+      () => analyzePlace(body),
+      { shouldCache },
+    )
+    if (cached) console.log(`Cache hit for place ${body.placeId}`)
 
     return new Response(
-      JSON.stringify({ intelligence }),
-      {
-        headers: {
-          'Content-Type': 'application/json',
-          'Access-Control-Allow-Origin': '*',
-        },
-      }
+      JSON.stringify({ intelligence: value.intelligence }),
+      { headers: { ...CORS_HEADERS, 'Content-Type': 'application/json' } }
     )
   } catch (error) {
     console.error('Error analyzing place fitness:', error)
@@ -145,6 +142,53 @@ serve(async (req) => {
   }
 })
 
+async function analyzePlace(place: AnalysisRequest): Promise<Analysis> {
+  const { placeName, placeType, reviews = [], placeData } = place
+
+  // Build context for AI
+  const reviewTexts = reviews
+    .filter((r) => r.text && r.text.trim().length > 0)
+    .map((r) => `[${r.rating}/5] ${r.text}`)
+    .join('\n')
+
+  const hasReviews = reviewTexts.length > 0
+
+  // Build prompt based on place type
+  const prompt = buildAnalysisPrompt(placeName, placeType, reviewTexts, placeData, hasReviews)
+
+  // Call Gemini API
+  const geminiResponse = await fetch(
+    `https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key=${GEMINI_API_KEY}`,
+    {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        contents: [{ parts: [{ text: prompt }] }],
+        generationConfig: {
+          temperature: 0.7,
+          topK: 40,
+          topP: 0.95,
+          maxOutputTokens: 2048,
+        },
+      }),
+    }
+  )
+
+  if (!geminiResponse.ok) {
+    throw new Error(`Gemini API error: ${geminiResponse.status}`)
+  }
+
+  const geminiData = await geminiResponse.json()
+  const responseText = geminiData.candidates?.[0]?.content?.parts?.[0]?.text
+
+  if (!responseText) {
+    throw new Error('No response from Gemini')
+  }
+
+  // Parse JSON response
+  return parseAiResponse(responseText, reviews.length)
+}
+
 function buildAnalysisPrompt(
   placeName: string,
   placeType: string,
@@ -234,7 +278,7 @@ function getTypeSpecificFields(placeType: string): string {
   }
 }
 
-function parseAiResponse(responseText: string, reviewCount: number): any {
+function parseAiResponse(responseText: string, reviewCount: number): Analysis {
   try {
     // Remove markdown code blocks if present
     let cleaned = responseText.trim()
@@ -249,25 +293,28 @@ function parseAiResponse(responseText: string, reviewCount: number): any {
     // Ensure reviewsAnalyzed is set correctly
     parsed.reviewsAnalyzed = reviewCount
 
-    return parsed
+    return { intelligence: parsed, parsed: true }
   } catch (error) {
     console.error('Failed to parse AI response:', error)
     console.error('Response text:', responseText)
     
     // Return a fallback structure
     return {
-      summary: 'Unable to generate detailed insights at this time.',
-      fitnessScore: null,
-      bestTimesDetailed: {},
-      crowdInsights: null,
-      pros: [],
-      cons: [],
-      tips: [],
-      whatToBring: [],
-      sentiment: null,
-      commonPhrases: [],
-      generatedAt: new Date().toISOString(),
-      reviewsAnalyzed: reviewCount,
+      parsed: false,
+      intelligence: {
+        summary: 'Unable to generate detailed insights at this time.',
+        fitnessScore: null,
+        bestTimesDetailed: {},
+        crowdInsights: null,
+        pros: [],
+        cons: [],
+        tips: [],
+        whatToBring: [],
+        sentiment: null,
+        commonPhrases: [],
+        generatedAt: new Date().toISOString(),
+        reviewsAnalyzed: reviewCount,
+      },
     }
   }
 }
@@ -2,8 +2,12 @@
 // Secure Gemini proxy for Fitness Guide
 // Updated to use Gemini 2.5 Flash (latest stable model)
 // Now location-agnostic - works with any destination
+// Pass { stream: true } to receive the reply as Server-Sent Events
+// Answers are shared across users through the AI cache (24 hours)
 
 import "jsr:@supabase/functions-js/edge-runtime.d.ts";
+import { geminiStreamUrl, streamCachedResponse, streamGeminiResponse } from "../_shared/gemini_stream.ts";
+import { claimAiCacheKey, lookupAiCache, storeAiCache, withAiCache } from "../_shared/ai_cache.ts";
 
 const CORS_HEADERS = {
   "access-control-allow-origin": "*",
@@ -18,8 +22,11 @@ interface RequestBody {
   userLocation?: string;
   fitnessLevel?: string;
   dietaryPreferences?: string[];
+  stream?: boolean;
 }
 
+const EMPTY_TEXT = "Sorry, I couldn't generate a response. Please try again.";
+
 function buildSystemPrompt(
   question: string,
   destination?: string,
@@ -50,6 +57,13 @@ ${context}
 User question: ${question}`;
 }
 
+function geminiErrorResponse(status: number, details: unknown): Response {
+  return new Response(
+    JSON.stringify({ error: "Gemini API error", status, details }),
+    { status: 502, headers: { ...CORS_HEADERS, "content-type": "application/json" } }
+  );
+}
+
 async function handler(req: Request): Promise<Response> {
   if (req.method === "OPTIONS") {
     return new Response("ok", { headers: CORS_HEADERS });
@@ -96,56 +110,112 @@ async function handler(req: Request): Promise<Response> {
     body?.dietaryPreferences
   );
 
-  try {
-    // Using Gemini 2.5 Flash (stable model)
-    const geminiUrl = `https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key=${GEMINI_KEY}`;
-    const geminiRes = await fetch(geminiUrl, {
-      method: "POST",
-      headers: { "content-type": "application/json" },
-      body: JSON.stringify({
-        contents: [
-          { parts: [{ text: prompt }] }
-        ],
-        generationConfig: {
-          temperature: 0.7,
-          topK: 40,
-          topP: 0.95,
-          maxOutputTokens: 1024,
-        },
-        safetySettings: [
-          { category: "HARM_CATEGORY_HARASSMENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
-          { category: "HARM_CATEGORY_HATE_SPEECH", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
-          { category: "HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
-          { category: "HARM_CATEGORY_DANGEROUS_CONTENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" }
-        ]
-      })
-    });
-
-    const data = await geminiRes.json();
-
-    if (!geminiRes.ok) {
-      console.error("Gemini API error:", data);
-      return new Response(
-        JSON.stringify({ error: "Gemini API error", status: geminiRes.status, details: data }),
-        { status: 502, headers: { ...CORS_HEADERS, "content-type": "application/json" } }
-      );
-    }
+  const geminiBody = JSON.stringify({
+    contents: [
+      { parts: [{ text: prompt }] }
+    ],
+    generationConfig: {
+      temperature: 0.7,
+      topK: 40,
+      topP: 0.95,
+      maxOutputTokens: 1024,
+    },
+    safetySettings: [
+      { category: "HARM_CATEGORY_HARASSMENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
+      { category: "HARM_CATEGORY_HATE_SPEECH", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
+      { category: "HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
+      { category: "HARM_CATEGORY_DANGEROUS_CONTENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" }
+    ]
+  });
+
+  // Same question in the same context gets the same cached answer
+  const cacheRequest = {
+    question,
+    destination: body?.destination,
+    userLocation: body?.userLocation,
+    fitnessLevel: body?.fitnessLevel,
+    dietaryPreferences: body?.dietaryPreferences,
+  };
 
-    let text = "";
-    if (data?.candidates?.length > 0) {
-      const candidate = data.candidates[0];
-      const parts = candidate?.content?.parts;
-      if (Array.isArray(parts) && parts.length > 0) {
-        text = parts[0]?.text ?? "";
+  try {
+    if (body?.stream) {
+      const { key, value: cached } = await lookupAiCache<{ text: string }>("cairo_guide", cacheRequest);
+      if (cached) return streamCachedResponse(cached.text, cached, CORS_HEADERS);
+
+      // One model call per question across concurrent requests, as withAiCache
+      const claim = await claimAiCacheKey<{ text: string }>("cairo_guide", key);
+      if (claim.value) return streamCachedResponse(claim.value.text, claim.value, CORS_HEADERS);
+
+      let streaming = false;
+      try {
+        const started = performance.now();
+        const geminiRes = await fetch(geminiStreamUrl("gemini-2.5-flash", GEMINI_KEY), {
+          method: "POST",
+          headers: { "content-type": "application/json" },
+          body: geminiBody,
+        });
+        if (geminiRes.ok && geminiRes.body) {
+          streaming = true;
+          return streamGeminiResponse(
+            geminiRes,
+            CORS_HEADERS,
+            async (rawText) => {
+              const reply = { text: rawText || EMPTY_TEXT };
+              if (rawText) {
+                await storeAiCache("cairo_guide", key, cacheRequest, reply, performance.now() - started);
+              }
+              return reply;
+            },
+            claim.release,
+          );
+        }
+        const data = await geminiRes.json().catch(() => null);
+        return geminiErrorResponse(geminiRes.status, data);
+      } finally {
+        // The stream releases the key once it has stored the reply
+        if (!streaming) await claim.release();
       }
     }
 
-    if (!text) {
-      text = "Sorry, I couldn't generate a response. Please try again.";
+    const { value: result } = await withAiCache(
+      "cairo_guide",
+      cacheRequest,
+      async () => {
+        // Using Gemini 2.5 Flash (stable model)
+        const geminiUrl = `https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key=${GEMINI_KEY}`;
+        const geminiRes = await fetch(geminiUrl, {
+          method: "POST",
+          headers: { "content-type": "application/json" },
+          body: geminiBody,
+        });
+
+        const data = await geminiRes.json();
+
+        if (!geminiRes.ok) {
+          console.error("Gemini API error:", data);
+          return { ok: false, status: geminiRes.status, data };
+        }
+
+        let text = "";
+        if (data?.candidates?.length > 0) {
+          const candidate = data.candidates[0];
+          const parts = candidate?.content?.parts;
+          if (Array.isArray(parts) && parts.length > 0) {
+            text = parts[0]?.text ?? "";
+          }
+        }
+
+        return { ok: true, text };
+      },
+      { shouldCache: (r) => r.ok && !!r.text },
+    );
+
+    if (!result.ok) {
+      return geminiErrorResponse(result.status!, result.data);
     }
 
     return new Response(
-      JSON.stringify({ text }),
+      JSON.stringify({ text: result.text || EMPTY_TEXT }),
       { status: 200, headers: { ...CORS_HEADERS, "content-type": "application/json" } }
     );
   } catch (err) {
@@ -2,8 +2,10 @@
 // Enhanced fitness guide with dynamic, conversational responses
 // Supports interactive elements: quick replies, selects, images, and places
 // Now location-agnostic - works with any destination
+// Pass { stream: true } to receive the reply as Server-Sent Events
 
 import "jsr:@supabase/functions-js/edge-runtime.d.ts";
+import { geminiStreamUrl, streamGeminiResponse } from "../_shared/gemini_stream.ts";
 
 const CORS_HEADERS = {
   "access-control-allow-origin": "*",
@@ -26,6 +28,7 @@ interface RequestBody {
   dietaryPreferences?: string[];
   conversationHistory?: ConversationMessage[];
   isGuidedSearch?: boolean;
+  stream?: boolean;
 }
 
 interface QuickReply {
@@ -74,6 +77,24 @@ interface EgyptGuideResponse {
   quickReplies?: QuickReply[];
 }
 
+const ERROR_RESPONSE: EgyptGuideResponse = {
+  text: "Oops! I had a moment there. Can you ask again? 🤔",
+  quickReplies: [
+    { id: "1", text: "Best gyms", emoji: "💪" },
+    { id: "2", text: "Healthy food", emoji: "🥗" },
+    { id: "3", text: "Running spots", emoji: "🏃" }
+  ]
+};
+
+const EMPTY_RESPONSE: EgyptGuideResponse = {
+  text: "Hmm, I'm drawing a blank. What are you looking for? 🤔",
+  quickReplies: [
+    { id: "1", text: "Gyms", emoji: "💪", value: "Best gyms near me?" },
+    { id: "2", text: "Restaurants", emoji: "🥗", value: "Healthy restaurants nearby?" },
+    { id: "3", text: "Running", emoji: "🏃", value: "Best running routes?" }
+  ]
+};
+
 function buildSystemPrompt(
   destination: string,
   conversationHistory: ConversationMessage[]
@@ -263,36 +284,57 @@ async function handler(req: Request): Promise<Response> {
     { role: 'user', content: question }
   ];
 
+  // Build Gemini request with full conversation
+  const geminiBody = JSON.stringify({
+    contents: [
+      {
+        parts: [{ text: systemPrompt }]
+      },
+      {
+        role: 'user',
+        parts: [{ text: question }]
+      }
+    ],
+    generationConfig: {
+      temperature: 0.8,
+      topK: 40,
+      topP: 0.95,
+      maxOutputTokens: 1024, // Increased to avoid JSON truncation
+    },
+    safetySettings: [
+      { category: "HARM_CATEGORY_HARASSMENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
+      { category: "HARM_CATEGORY_HATE_SPEECH", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
+      { category: "HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
+      { category: "HARM_CATEGORY_DANGEROUS_CONTENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" }
+    ]
+  });
+
   try {
+    if (body?.stream) {
+      const streamRes = await fetch(geminiStreamUrl("gemini-2.5-flash", GEMINI_KEY), {
+        method: "POST",
+        headers: { "content-type": "application/json" },
+        body: geminiBody,
+      });
+
+      if (streamRes.ok && streamRes.body) {
+        return streamGeminiResponse(streamRes, CORS_HEADERS, (rawText) =>
+          rawText ? parseAIResponse(rawText) : EMPTY_RESPONSE
+        );
+      }
+      // Same JSON reply as the non-streaming path; clients accept either
+      console.error("Gemini stream error:", streamRes.status, await streamRes.text());
+      return new Response(
+        JSON.stringify(ERROR_RESPONSE),
+        { status: 200, headers: { ...CORS_HEADERS, "content-type": "application/json" } }
+      );
+    }
+
     const geminiUrl = `https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key=${GEMINI_KEY}`;
-    
-    // Build Gemini request with full conversation
     const geminiRes = await fetch(geminiUrl, {
       method: "POST",
       headers: { "content-type": "application/json" },
-      body: JSON.stringify({
-        contents: [
-          {
-            parts: [{ text: systemPrompt }]
-          },
-          {
-            role: 'user',
-            parts: [{ text: question }]
-          }
-        ],
-        generationConfig: {
-          temperature: 0.8,
-          topK: 40,
-          topP: 0.95,
-          maxOutputTokens: 1024, // Increased to avoid JSON truncation
-        },
-        safetySettings: [
-          { category: "HARM_CATEGORY_HARASSMENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
-          { category: "HARM_CATEGORY_HATE_SPEECH", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
-          { category: "HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
-          { category: "HARM_CATEGORY_DANGEROUS_CONTENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" }
-        ]
-      })
+      body: geminiBody,
     });
 
     const data = await geminiRes.json();
@@ -300,14 +342,7 @@ async function handler(req: Request): Promise<Response> {
     if (!geminiRes.ok) {
       console.error("Gemini API error:", data);
       return new Response(
-        JSON.stringify({ 
-          text: "Oops! I had a moment there. Can you ask again? 🤔",
-          quickReplies: [
-            { id: "1", text: "Best gyms", emoji: "💪" },
-            { id: "2", text: "Healthy food", emoji: "🥗" },
-            { id: "3", text: "Running spots", emoji: "🏃" }
-          ]
-        }),
+        JSON.stringify(ERROR_RESPONSE),
         { status: 200, headers: { ...CORS_HEADERS, "content-type": "application/json" } }
       );
     }
@@ -323,14 +358,7 @@ async function handler(req: Request): Promise<Response> {
 
     if (!rawText) {
       return new Response(
-        JSON.stringify({
-          text: "Hmm, I'm drawing a blank. What are you looking for? 🤔",
-          quickReplies: [
-            { id: "1", text: "Gyms", emoji: "💪", value: "Best gyms near me?" },
-            { id: "2", text: "Restaurants", emoji: "🥗", value: "Healthy restaurants nearby?" },
-            { id: "3", text: "Running", emoji: "🏃", value: "Best running routes?" }
-          ]
-        }),
+        JSON.stringify(EMPTY_RESPONSE),
         { status: 200, headers: { ...CORS_HEADERS, "content-type": "application/json" } }
       );
     }
@@ -50,6 +50,26 @@ const EVENT_CATEGORIES = [
   'martial_arts', 'dance', 'climbing', 'wellness', 'sports', 'other'
 ];
 
+function normalizeCity(city: string): string {
+  return city.trim().toLowerCase();
+}
+
+/// Stable id for an event so re-fetching a city upserts instead of
+/// inserting duplicates: same city, title and start day → same id,
+/// whichever source found it
+async function eventExternalId(city: string, title: string, startDate: string): Promise<string> {
+  const canonical = [
+    normalizeCity(city),
+    title.trim().toLowerCase().replace(/[^a-z0-9]+/g, ' ').trim(),
+    startDate.slice(0, 10),
+  ].join('|');
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(canonical));
+  const hex = Array.from(new Uint8Array(digest).slice(0, 12))
+    .map((b) => b.toString(16).padStart(2, '0'))
+    .join('');
+  return `evt_${hex}`;
+}
+
 function mapToCategory(cat: string): string {
   const lower = cat.toLowerCase();
   if (lower.includes('run') || lower.includes('5k') || lower.includes('10k') || lower.includes('marathon')) return 'running';
@@ -203,7 +223,7 @@ Format:
       registration_url: e.registration_url,
       price_info: e.price_info,
       source: e.source || 'perplexity_sonar',
-      external_id: e.external_id || `aiml_${city.replace(/\s+/g, '_')}_${(e.title || '').replace(/\s+/g, '_').substring(0, 30)}_${Date.now()}`,
+      external_id: e.external_id,
     }));
   } catch (err) {
     console.error('AIML fetch error:', err);
@@ -282,7 +302,7 @@ Use real venue names and addresses you know exist in ${city}. Return ONLY valid
     const events = JSON.parse(jsonMatch[0]);
     console.log(`Parsed ${events.length} events from Gemini`);
 
-    return events.map((e: any, idx: number) => ({
+    return events.map((e: any) => ({
       title: e.title || 'Untitled Event',
       category: mapToCategory(e.category || 'other'),
       start_date: e.start_date,
@@ -296,7 +316,6 @@ Use real venue names and addresses you know exist in ${city}. Return ONLY valid
       registration_url: e.registration_url,
       price_info: e.price_info,
       source: 'ai_generated',
-      external_id: `gem_${city.replace(/\s+/g, '_')}_${idx}_${Date.now()}`,
     }));
   } catch (err) {
     console.error('Gemini fetch error:', err);
@@ -346,7 +365,8 @@ async function handler(req: Request): Promise<Response> {
     );
   }
 
-  const city = body.city;
+  const city = body.city.trim();
+  const cityKey = normalizeCity(city);
   const country = body.country;
   const maxEvents = body.max_events || 50;
 
@@ -364,7 +384,7 @@ async function handler(req: Request): Promise<Response> {
   const { data: existingEvents } = await supabase
     .from('events')
     .select('id, fetched_at')
-    .ilike('city', city)
+    .eq('city_normalized', cityKey)
     .gte('start_date', startDate)
     .order('fetched_at', { ascending: false })
     .limit(1);
@@ -377,7 +397,7 @@ async function handler(req: Request): Promise<Response> {
     const { count } = await supabase
       .from('events')
       .select('*', { count: 'exact', head: true })
-      .ilike('city', city)
+      .eq('city_normalized', cityKey)
       .gte('start_date', startDate)
       .lte('start_date', endDate);
 
@@ -425,10 +445,17 @@ async function handler(req: Request): Promise<Response> {
     );
   }
 
-  // Insert events into Supabase
-  const eventsToInsert = allEvents
-    .filter(e => e.title && e.start_date)
-    .map(e => ({
+  // Insert events into Supabase, deduplicated on external_id: ids are
+  // derived from city/title/day only (never a source's own id), so the same
+  // event found by both sources or by an earlier fetch collapses into one row
+  const fetchedAt = new Date().toISOString();
+  const expiresAt = new Date(Date.now() + 7 * 24 * 60 * 60 * 1000).toISOString(); // 7 days
+  const byExternalId = new Map<string, Record<string, unknown>>();
+  for (const e of allEvents) {
+    if (!e.title || !e.start_date) continue;
+    const externalId = await eventExternalId(city, e.title, e.start_date);
+    if (byExternalId.has(externalId)) continue;
+    byExternalId.set(externalId, {
       title: e.title,
       category: e.category,
       start_date: e.start_date,
@@ -440,24 +467,29 @@ async function handler(req: Request): Promise<Response> {
       longitude: e.longitude,
       website_url: e.website_url,
       registration_url: e.registration_url,
-      external_id: e.external_id,
+      external_id: externalId,
       image_url: e.image_url,
       price_info: e.price_info,
       source: e.source,
       city: city,
       country: country,
-      fetched_at: new Date().toISOString(),
-      expires_at: new Date(Date.now() + 7 * 24 * 60 * 60 * 1000).toISOString(), // 7 days
-    }));
+      fetched_at: fetchedAt,
+      expires_at: expiresAt,
+    });
+  }
+  const eventsToInsert = [...byExternalId.values()];
+  const duplicates = allEvents.length - eventsToInsert.length;
+  if (duplicates > 0) console.log(`Dropped ${duplicates} duplicate or incomplete events`);
 
   console.log(`Inserting ${eventsToInsert.length} events...`);
 
-  // Upsert to handle duplicates (based on external_id)
+  // Upsert on external_id: known events are refreshed (including
+  // fetched_at, which the 24h check above relies on) instead of duplicated
   const { error: insertError } = await supabase
     .from('events')
     .upsert(eventsToInsert, {
       onConflict: 'external_id',
-      ignoreDuplicates: true
+      ignoreDuplicates: false
     });
 
   if (insertError) {
@@ -469,7 +501,7 @@ async function handler(req: Request): Promise<Response> {
   const { count: totalCount } = await supabase
     .from('events')
     .select('*', { count: 'exact', head: true })
-    .ilike('city', city)
+    .eq('city_normalized', cityKey)
     .gte('start_date', startDate)
     .lte('start_date', endDate);
 
@@ -1,8 +1,10 @@
 // supabase/functions/generate_fitness_itinerary/index.ts
 // Generate fitness-focused day itineraries for any destination
 // Location-agnostic - works with any city worldwide
+// Results are shared across users through the AI cache (3 days)
 
 import "jsr:@supabase/functions-js/edge-runtime.d.ts";
+import { withAiCache } from "../_shared/ai_cache.ts";
 
 const CORS_HEADERS = {
   "access-control-allow-origin": "*",
@@ -58,7 +60,9 @@ Return ONLY valid JSON (no markdown):
 Create 6-8 items from 5-6am to 8-9pm. Balance activities with meals and rest. Be specific to ${destination} when possible.`;
 }
 
-function parseItineraryResponse(responseText: string, destination: string): ItineraryResponse {
+/// The model's itinerary, or null if the output was truncated, unparseable
+/// or had no items
+function parseItineraryResponse(responseText: string, destination: string): ItineraryResponse | null {
   try {
     let cleaned = responseText.trim();
 
@@ -74,32 +78,91 @@ function parseItineraryResponse(responseText: string, destination: string): Itin
     }
 
     const itinerary = JSON.parse(cleaned) as ItineraryResponse;
+    if (!Array.isArray(itinerary.items) || itinerary.items.length === 0) return null;
 
     return {
       title: itinerary.title || `Active Day in ${destination}`,
       destination: destination,
-      items: itinerary.items || [],
+      items: itinerary.items,
       packingList: itinerary.packingList || ['Water bottle', 'Sunscreen', 'Comfortable shoes'],
     };
   } catch {
-    // Return default itinerary
-    return {
-      title: `Active Day in ${destination}`,
-      destination: destination,
-      items: [
-        { time: '06:00', duration: 60, type: 'activity', title: 'Morning Workout', description: `Start with exercise in ${destination}. Check hotel fitness facilities or nearby running routes.` },
-        { time: '07:30', duration: 45, type: 'meal', title: 'Healthy Breakfast', description: 'Fuel up with a protein-rich breakfast. Look for local healthy options.' },
-        { time: '09:00', duration: 180, type: 'activity', title: 'Explore & Stay Active', description: `Explore ${destination}'s attractions while staying active. Walking tours burn calories.` },
-        { time: '13:00', duration: 60, type: 'meal', title: 'Light Lunch', description: 'Grilled proteins and fresh salads are great options.' },
-        { time: '14:30', duration: 90, type: 'rest', title: 'Midday Rest', description: 'Rest, hydrate, and prepare for evening activities.' },
-        { time: '17:00', duration: 90, type: 'activity', title: 'Evening Activity', description: 'Get another workout or active sightseeing as temperatures cool.' },
-        { time: '19:30', duration: 60, type: 'meal', title: 'Dinner', description: 'Look for grilled and vegetable-focused options.' },
-      ],
-      packingList: ['Water bottle', 'Sunscreen', 'Hat', 'Comfortable walking shoes', 'Light workout clothes'],
-    };
+    return null;
   }
 }
 
+function defaultItinerary(destination: string): ItineraryResponse {
+  return {
+    title: `Active Day in ${destination}`,
+    destination: destination,
+    items: [
+      { time: '06:00', duration: 60, type: 'activity', title: 'Morning Workout', description: `Start with exercise in ${destination}. Check hotel fitness facilities or nearby running routes.` },
+      { time: '07:30', duration: 45, type: 'meal', title: 'Healthy Breakfast', description: 'Fuel up with a protein-rich breakfast. Look for local healthy options.' },
+      { time: '09:00', duration: 180, type: 'activity', title: 'Explore & Stay Active', description: `Explore ${destination}'s attractions while staying active. Walking tours burn calories.` },
+      { time: '13:00', duration: 60, type: 'meal', title: 'Light Lunch', description: 'Grilled proteins and fresh salads are great options.' },
+      { time: '14:30', duration: 90, type: 'rest', title: 'Midday Rest', description: 'Rest, hydrate, and prepare for evening activities.' },
+      { time: '17:00', duration: 90, type: 'activity', title: 'Evening Activity', description: 'Get another workout or active sightseeing as temperatures cool.' },
+      { time: '19:30', duration: 60, type: 'meal', title: 'Dinner', description: 'Look for grilled and vegetable-focused options.' },
+    ],
+    packingList: ['Water bottle', 'Sunscreen', 'Hat', 'Comfortable walking shoes', 'Light workout clothes'],
+  };
+}
+
+interface GeneratedItinerary {
+  itinerary: ItineraryResponse;
+  /// False when the default itinerary was returned because the model failed
+  /// or its output couldn't be parsed; such results are never cached
+  fromModel: boolean;
+}
+
+async function generateItinerary(body: ItineraryRequest, geminiKey: string): Promise<GeneratedItinerary> {
+  const prompt = buildPrompt(body);
+  const geminiUrl = `https://generativelanguage.googleapis.com/v1/models/gemini-2.5-flash:generateContent?key=${geminiKey}`;
+  const geminiRes = await fetch(geminiUrl, {
+    method: "POST",
+    headers: { "content-type": "application/json" },
+    body: JSON.stringify({
+      contents: [{ parts: [{ text: prompt }] }],
+      generationConfig: {
+        temperature: 0.8,
+        topK: 40,
+        topP: 0.95,
+        maxOutputTokens: 1500,
+      },
+      safetySettings: [
+        { category: "HARM_CATEGORY_HARASSMENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
+        { category: "HARM_CATEGORY_HATE_SPEECH", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
+        { category: "HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
+        { category: "HARM_CATEGORY_DANGEROUS_CONTENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" }
+      ]
+    })
+  });
+
+  const data = await geminiRes.json();
+
+  if (!geminiRes.ok) {
+    console.error("Gemini API error:", data);
+    // Return default itinerary on API error
+    return { itinerary: defaultItinerary(body.destination), fromModel: false };
+  }
+
+  let rawText = "";
+  if (data?.candidates?.length > 0) {
+    const candidate = data.candidates[0];
+    const parts = candidate?.content?.parts;
+    if (Array.isArray(parts) && parts.length > 0) {
+      rawText = parts[0]?.text ?? "";
+    }
+  }
+
+  const parsed = parseItineraryResponse(rawText, body.destination);
+  if (!parsed) {
+    console.warn("Itinerary output unparseable, using default", { length: rawText.length });
+    return { itinerary: defaultItinerary(body.destination), fromModel: false };
+  }
+  return { itinerary: parsed, fromModel: true };
+}
+
 async function handler(req: Request): Promise<Response> {
   if (req.method === "OPTIONS") {
     return new Response("ok", { headers: CORS_HEADERS });
@@ -137,63 +200,29 @@ async function handler(req: Request): Promise<Response> {
     );
   }
 
-  const prompt = buildPrompt(body);
-
   try {
-    const geminiUrl = `https://generativelanguage.googleapis.com/v1/models/gemini-2.5-flash:generateContent?key=${GEMINI_KEY}`;
-    const geminiRes = await fetch(geminiUrl, {
-      method: "POST",
-      headers: { "content-type": "application/json" },
-      body: JSON.stringify({
-        contents: [{ parts: [{ text: prompt }] }],
-        generationConfig: {
-          temperature: 0.8,
-          topK: 40,
-          topP: 0.95,
-          maxOutputTokens: 1500,
-        },
-        safetySettings: [
-          { category: "HARM_CATEGORY_HARASSMENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
-          { category: "HARM_CATEGORY_HATE_SPEECH", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
-          { category: "HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold: "BLOCK_MEDIUM_AND_ABOVE" },
-          { category: "HARM_CATEGORY_DANGEROUS_CONTENT", threshold: "BLOCK_MEDIUM_AND_ABOVE" }
-        ]
-      })
-    });
-
-    const data = await geminiRes.json();
-
-    if (!geminiRes.ok) {
-      console.error("Gemini API error:", data);
-      // Return default itinerary on API error
-      const defaultItinerary = parseItineraryResponse("", body.destination);
-      return new Response(
-        JSON.stringify(defaultItinerary),
-        { status: 200, headers: { ...CORS_HEADERS, "content-type": "application/json" } }
-      );
-    }
-
-    let rawText = "";
-    if (data?.candidates?.length > 0) {
-      const candidate = data.candidates[0];
-      const parts = candidate?.content?.parts;
-      if (Array.isArray(parts) && parts.length > 0) {
-        rawText = parts[0]?.text ?? "";
-      }
-    }
-
-    const itinerary = parseItineraryResponse(rawText, body.destination);
+    // Same destination/date/level/focus share one cached itinerary
+    const { value } = await withAiCache(
+      "generate_fitness_itinerary",
+      {
+        destination: body.destination,
+        date: body.date,
+        fitnessLevel: body.fitnessLevel ?? "intermediate",
+        focusAreas: body.focusAreas ?? [],
+      },
+      () => generateItinerary(body!, GEMINI_KEY),
+      { shouldCache: (r) => r.fromModel },
+    );
 
     return new Response(
-      JSON.stringify(itinerary),
+      JSON.stringify(value.itinerary),
       { status: 200, headers: { ...CORS_HEADERS, "content-type": "application/json" } }
     );
   } catch (err) {
     console.error("Server error:", err);
     // Return default itinerary on server error
-    const defaultItinerary = parseItineraryResponse("", body.destination);
     return new Response(
-      JSON.stringify(defaultItinerary),
+      JSON.stringify(defaultItinerary(body.destination)),
       { status: 200, headers: { ...CORS_HEADERS, "content-type": "application/json" } }
     );
   }
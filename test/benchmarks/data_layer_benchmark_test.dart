@@ -0,0 +1,333 @@
+@Tags(['benchmark'])
+library;
+
+import 'dart:convert';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:http/http.dart' as http;
+import 'package:shared_preferences/shared_preferences.dart';
+import 'package:supabase_flutter/supabase_flutter.dart';
+import 'package:fittravel/models/models.dart';
+import 'package:fittravel/services/services.dart';
+import 'support/benchmark_harness.dart';
+import 'support/fake_backend.dart';
+import 'support/scaled_fixtures.dart';
+
+/// Benchmarks for data-layer hot paths at 10k trips, places and events,
+/// run against the in-process fake Supabase and Places backend with a
+/// simulated 20ms round trip. Run with:
+///   flutter test test/benchmarks/data_layer_benchmark_test.dart
+///
+/// Fails when a benchmark regresses past test/benchmarks/baseline.json.
+
+const _roundTrip = Duration(milliseconds: 20);
+const _paris = (48.8566, 2.3522);
+
+void main() {
+  TestWidgetsFlutterBinding.ensureInitialized();
+
+  final report = BenchmarkReport('data_layer');
+  final backend = FakeBackend(latency: _roundTrip);
+  late TripService tripService;
+  late PlaceService placeService;
+
+  /// Empty LocalStore, so every sync is a cold full sync
+  void resetLocalState() {
+    SharedPreferences.setMockInitialValues({});
+    LocalStore.resetInstance(database: PrefsRowDatabase());
+    DeltaSync.resetPreload();
+    backend.resetCounts();
+  }
+
+  Map<String, num> requestsPerRun() => {'requests': backend.requestCount};
+
+  setUpAll(() async {
+    backend.tables
+      ..['users'] = [
+        {
+          'id': benchmarkUserId,
+          'email': benchmarkEmail,
+          'display_name': 'Benchmark User',
+          'created_at': '2025-01-01T00:00:00Z',
+          'updated_at': '2025-01-01T00:00:00Z',
+        },
+      ]
+      ..['trips'] = scaledTripRows()
+      ..['trip_places'] = scaledTripPlaceRows()
+      ..['itinerary_items'] = scaledItineraryRows()
+      ..['saved_places'] = scaledPlaceRows()
+      ..['events'] = scaledEventRows();
+    backend.googlePlaces = scaledGooglePlaces();
+    backend.rpcs['get_startup_payload'] = (params) => _startupPayload(
+        backend, Map<String, dynamic>.from(params['p_watermarks'] as Map));
+    backend.rpcs['search_events'] = (params) => _searchEvents(backend, params);
+
+    resetLocalState();
+    await backend.start();
+    await backend.connectSupabase();
+
+    // Loaded through the startup payload, like the app at launch
+    tripService = TripService();
+    placeService = PlaceService();
+    await Future.wait([
+      AppBootstrap(timings: StartupTimings()).load(benchmarkUserId),
+      tripService.initialize(),
+      placeService.initialize(),
+    ]);
+  });
+
+  tearDownAll(() async {
+    tripService.dispose();
+    placeService.dispose();
+    await Supabase.instance.dispose();
+    await backend.close();
+  });
+
+  group('Sync', () {
+    test('trips full sync', () async {
+      final result = await report.measure(
+        'trips_full_sync_10k',
+        () async {
+          final service = TripService();
+          await service.initialize();
+          service.dispose();
+        },
+        warmup: 1,
+        iterations: 3,
+        setUp: resetLocalState,
+        counters: requestsPerRun,
+      );
+      expect(result.samples, hasLength(3));
+    });
+
+    test('cold start, per-service syncs', () async {
+      await report.measure(
+        'cold_start_per_service_10k',
+        () => _initializeFirstScreenServices(),
+        warmup: 1,
+        iterations: 3,
+        setUp: resetLocalState,
+        counters: requestsPerRun,
+      );
+    });
+
+    test('cold start, batched startup payload', () async {
+      await report.measure(
+        'cold_start_bootstrap_10k',
+        () async {
+          final bootstrap = AppBootstrap(timings: StartupTimings());
+          await Future.wait([
+            bootstrap.load(benchmarkUserId),
+            _initializeFirstScreenServices(),
+          ]);
+        },
+        warmup: 1,
+        iterations: 3,
+        setUp: resetLocalState,
+        counters: requestsPerRun,
+      );
+      expect(backend.requestCounts['POST /rpc/get_startup_payload'], 1);
+    });
+  });
+
+  group('In-memory queries', () {
+    test('trip search', () async {
+      late List<TripModel> matches;
+      await report.measure(
+        'trip_search_10k',
+        () => matches = tripService.searchTrips('paris'),
+        iterations: 50,
+      );
+      expect(matches, hasLength(benchmarkScale ~/ benchmarkCities.length));
+    });
+
+    test('itinerary sort', () async {
+      late List<ItineraryItem> items;
+      await report.measure(
+        'itinerary_sort_1k',
+        () => items = tripService.getItinerary(benchmarkId(1, 0)),
+        iterations: 50,
+      );
+      expect(items.length, greaterThan(1000));
+    });
+
+    test('itinerary for one day', () async {
+      await report.measure(
+        'itinerary_day_1k',
+        () => tripService.getItinerary(benchmarkId(1, 0),
+            forDate: DateTime(2025, 6, 3)),
+        iterations: 50,
+      );
+    });
+
+    test('saved places near a location', () async {
+      late List<PlaceModel> nearby;
+      await report.measure(
+        'places_near_location_10k',
+        () => nearby = placeService.getPlacesNearLocation(
+            latitude: _paris.$1, longitude: _paris.$2, radiusMiles: 50),
+        iterations: 50,
+      );
+      expect(nearby, isNotEmpty);
+    });
+  });
+
+  group('JSON parsing', () {
+    test('places', () async {
+      final body = jsonEncode(backend.tables['saved_places']);
+      await report.measure(
+        'place_decode_parse_10k',
+        () => (jsonDecode(body) as List)
+            .map((j) => PlaceModel.fromSupabaseJson(j as Map<String, dynamic>))
+            .toList(),
+      );
+    });
+
+    test('events', () async {
+      final body = jsonEncode(backend.tables['events']);
+      await report.measure(
+        'event_decode_parse_10k',
+        () => (jsonDecode(body) as List)
+            .map((j) => EventModel.fromSupabaseJson(j as Map<String, dynamic>))
+            .toList(),
+      );
+    });
+
+    test('trips', () async {
+      final body = jsonEncode(backend.select('trips', '*, trip_places(place_id)'));
+      await report.measure(
+        'trip_decode_parse_10k',
+        () => (jsonDecode(body) as List).map((j) {
+          final json = j as Map<String, dynamic>;
+          return TripModel.fromSupabaseJson(json,
+              savedPlaceIds: [
+                for (final tp in json['trip_places'] as List)
+                  tp['place_id'] as String,
+              ]);
+        }).toList(),
+      );
+    });
+  });
+
+  group('Network', () {
+    test('city events page', () async {
+      final events = EventService();
+      await report.measure(
+        'event_city_page',
+        () => events.fetchEventsForCity(
+          city: 'Paris',
+          startDate: DateTime.utc(2025, 1, 1),
+          endDate: DateTime.utc(2026, 1, 1),
+          forceRefresh: true,
+        ),
+      );
+      expect(events.destinationEvents, hasLength(EventService.pageSize));
+      events.dispose();
+    });
+
+    test('Places nearby search, cold and cached', () async {
+      final places = GooglePlacesService();
+      Future<List<PlaceModel>> search() => http.runWithClient(
+            () => places.searchNearbyPlaces(
+              latitude: _paris.$1,
+              longitude: _paris.$2,
+              placeType: PlaceType.gym,
+            ),
+            backend.placesClient,
+          );
+
+      late List<PlaceModel> results;
+      await report.measure(
+        'places_nearby_cold',
+        () async => results = await search(),
+        setUp: GooglePlacesService.clearCache,
+      );
+      expect(results, isNotEmpty);
+
+      await report.measure('places_nearby_cached', search, iterations: 50);
+    });
+  });
+
+  test('matches baseline', report.finish);
+}
+
+/// What the first screen initializes at launch (see main.dart)
+Future<void> _initializeFirstScreenServices() async {
+  final user = UserService();
+  final places = PlaceService();
+  final trips = TripService();
+  final activities = ActivityService();
+  final gamification = GamificationService();
+  await Future.wait([
+    user.initialize(),
+    places.initialize(),
+    trips.initialize(),
+    activities.initialize(),
+    gamification.initialize(),
+  ]);
+  user.dispose();
+  places.dispose();
+  trips.dispose();
+  activities.dispose();
+  gamification.dispose();
+}
+
+/// Mirrors get_startup_payload in create_startup_payload_rpc.sql
+Map<String, dynamic> _startupPayload(
+    FakeBackend backend, Map<String, dynamic> watermarks) {
+  Map<String, dynamic> section(String table, [String select = '*']) {
+    final since = watermarks[table] as String?;
+    final rows = backend.select(table, select).where((row) =>
+        since == null ||
+        !DateTime.parse(row['updated_at'] as String)
+            .isBefore(DateTime.parse(since)));
+    return {'full': since == null, 'rows': rows.toList(), 'deleted': []};
+  }
+
+  return {
+    'server_time': DateTime.now().toUtc().toIso8601String(),
+    'tables': {
+      'users': section('users'),
+      'trips': section('trips', '*, trip_places(place_id)'),
+      for (final table in [
+        'itinerary_items',
+        'saved_places',
+        'activities',
+        'user_badges',
+        'user_challenges',
+        'badges',
+        'challenges',
+      ])
+        table: section(table),
+    },
+  };
+}
+
+/// Mirrors the city branch of search_events in add_event_geo_indexes.sql
+List<Map<String, dynamic>> _searchEvents(
+    FakeBackend backend, Map<String, dynamic> params) {
+  final city = (params['p_city'] as String).trim().toLowerCase();
+  final start = DateTime.parse(params['p_start'] as String);
+  final end = DateTime.parse(params['p_end'] as String);
+  final afterStart = params['p_after_start'] != null
+      ? DateTime.parse(params['p_after_start'] as String)
+      : null;
+  final afterId = params['p_after_id'] as String?;
+  if ((afterStart == null) != (afterId == null)) {
+    throw ArgumentError(
+        'search_events requires both p_after_start and p_after_id, or neither');
+  }
+
+  final matches = backend.tables['events']!.where((e) {
+    final eventStart = DateTime.parse(e['start_date'] as String);
+    if ((e['city'] as String).toLowerCase() != city) return false;
+    if (eventStart.isBefore(start) || eventStart.isAfter(end)) return false;
+    if (afterStart == null) return true;
+    final cmp = eventStart.compareTo(afterStart);
+    return cmp > 0 || (cmp == 0 && (e['id'] as String).compareTo(afterId!) > 0);
+  }).toList()
+    ..sort((a, b) {
+      final cmp = (a['start_date'] as String).compareTo(b['start_date'] as String);
+      return cmp != 0 ? cmp : (a['id'] as String).compareTo(b['id'] as String);
+    });
+  return matches.take(params['p_limit'] as int).toList();
+}
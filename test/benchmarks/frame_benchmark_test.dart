@@ -0,0 +1,84 @@
+@Tags(['benchmark'])
+library;
+
+import 'package:flutter/material.dart';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:fittravel/screens/trips/trips_screen.dart';
+import 'package:fittravel/services/trip_service.dart';
+import '../helpers/pump_app.dart';
+import 'support/benchmark_harness.dart';
+import 'support/scaled_fixtures.dart';
+
+/// Frame build times for TripsScreen with 10k trips: the first build, a
+/// rebuild after TripService notifies, and frames while dragging the list.
+/// Run with:
+///   flutter test test/benchmarks/frame_benchmark_test.dart
+///
+/// Marker rebuilds for MapScreen are measured without the widget in
+/// marker_clustering_benchmark_test.dart, as GoogleMap is a platform view
+/// that doesn't render in widget tests.
+
+const _dragFrames = 60;
+
+/// Synced trip rows as TripService loads them from the local store
+List<Map<String, dynamic>> _scaledTripRows() => scaledTripRows().map((row) {
+      // No network images in widget tests
+      row.remove('image_url');
+      return row;
+    }).toList();
+
+Future<Duration> _timedPump(WidgetTester tester) async {
+  final stopwatch = Stopwatch()..start();
+  await tester.pump();
+  stopwatch.stop();
+  return stopwatch.elapsed;
+}
+
+void main() {
+  final report = BenchmarkReport('frames');
+  final rows = _scaledTripRows();
+
+  group('TripsScreen', () {
+    testWidgets('first build, rebuild and drag frames', (tester) async {
+      // A real TripService, seeded through the same path as a sync
+      final tripService = TripService()..debugSetTripRows(rows);
+
+      final firstBuild = Stopwatch()..start();
+      await pumpTestWidget(tester, const TripsScreen(),
+          tripService: tripService);
+      firstBuild.stop();
+      // Let the entrance animations finish before measuring steady frames
+      await tester.pumpAndSettle();
+      expect(find.text('My Trips'), findsOneWidget);
+
+      final rebuilds = <Duration>[];
+      for (var i = 0; i < 20; i++) {
+        tripService.debugSetTripRows(rows);
+        rebuilds.add(await _timedPump(tester));
+      }
+
+      final dragFrames = <Duration>[];
+      final gesture = await tester
+          .startGesture(tester.getCenter(find.byType(CustomScrollView)));
+      for (var i = 0; i < _dragFrames; i++) {
+        await gesture.moveBy(const Offset(0, -120));
+        dragFrames.add(await _timedPump(tester));
+      }
+      await gesture.up();
+
+      report
+        ..record('trips_screen_first_build_10k', [firstBuild.elapsed],
+            counters: {'trips': tripService.trips.length})
+        ..record('trips_screen_rebuild_10k', rebuilds)
+        ..record('trips_screen_drag_frame_10k', dragFrames,
+            counters: {'frames': dragFrames.length});
+
+      // Unmount and flush the staggered animation delays of built cards
+      await tester.pumpWidget(const SizedBox());
+      await tester.pump(const Duration(minutes: 30));
+      tripService.dispose();
+    });
+  });
+
+  test('matches baseline', report.finish);
+}
@@ -0,0 +1,95 @@
+@Tags(['benchmark'])
+library;
+
+import 'dart:math';
+import 'dart:typed_data';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:image/image.dart' as img;
+import 'package:fittravel/services/image_processing_pool.dart';
+import 'package:fittravel/services/photo_storage_service.dart';
+import 'support/benchmark_harness.dart';
+
+/// Benchmarks for PhotoStorageService image processing on a 12MP phone
+/// photo: latency and memory growth for one photo, an avatar and a burst
+/// of picked photos through the worker pool. Run with:
+///   flutter test test/benchmarks/image_processing_benchmark_test.dart
+
+const _burst = 6;
+
+/// A 4032x3024 JPEG with enough detail that it doesn't compress to nothing
+Uint8List _phonePhoto() {
+  final random = Random(5);
+  final image = img.Image(width: 4032, height: 3024);
+  for (final pixel in image) {
+    final noise = random.nextInt(32);
+    pixel
+      ..r = (pixel.x * 255 ~/ image.width + noise).clamp(0, 255)
+      ..g = (pixel.y * 255 ~/ image.height + noise).clamp(0, 255)
+      ..b = (128 + noise).clamp(0, 255);
+  }
+  return img.encodeJpg(image, quality: 92);
+}
+
+void main() {
+  final report = BenchmarkReport('image_processing');
+  late Uint8List photo;
+
+  setUpAll(() => photo = _phonePhoto());
+
+  group('PhotoStorageService', () {
+    test('one photo on a worker isolate', () async {
+      late ProcessedImage result;
+      await report.measure(
+        'process_photo_12mp',
+        () async => result = await PhotoStorageService.processPhoto(photo),
+        warmup: 1,
+        iterations: 5,
+        counters: () => {'input_kb': photo.length ~/ 1024},
+      );
+      expect(result.wasProcessed, isTrue);
+      expect(img.decodeJpg(result.full)!.width,
+          PhotoStorageService.maxImageWidth);
+    });
+
+    test('avatar', () async {
+      await report.measure(
+        'process_avatar_12mp',
+        () => PhotoStorageService.processAvatar(photo),
+        warmup: 1,
+        iterations: 5,
+      );
+    });
+
+    test('burst of picked photos', () async {
+      await report.measure(
+        'process_photo_burst_$_burst',
+        () => Future.wait([
+          for (var i = 0; i < _burst; i++)
+            PhotoStorageService.processPhoto(photo),
+        ]),
+        warmup: 1,
+        iterations: 3,
+        counters: () => {'workers': ImageProcessingPool.maxWorkers},
+      );
+    });
+
+    test('decode, resize and encode without the isolate hop', () async {
+      await report.measure(
+        'process_photo_inline_12mp',
+        () => processImageJob((
+          bytes: photo,
+          options: const ImageProcessingOptions(
+            maxWidth: PhotoStorageService.maxImageWidth,
+            maxHeight: PhotoStorageService.maxImageHeight,
+            thumbnailSize: PhotoStorageService.thumbnailSize,
+            jpegQuality: PhotoStorageService.jpegQuality,
+          ),
+        )),
+        warmup: 1,
+        iterations: 5,
+      );
+    });
+  });
+
+  test('matches baseline', report.finish);
+}
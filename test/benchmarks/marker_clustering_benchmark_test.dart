@@ -0,0 +1,135 @@
+@Tags(['benchmark'])
+library;
+
+import 'dart:math';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:google_maps_flutter/google_maps_flutter.dart';
+import 'package:fittravel/utils/marker_clusterer.dart';
+import 'package:fittravel/utils/marker_differ.dart';
+import 'support/benchmark_harness.dart';
+
+/// Benchmark for MapScreen marker builds.
+///
+/// Compares the old approach (one Marker per item on every rebuild) with
+/// viewport clustering plus diffing against the previous frame, across a
+/// simulated pan. Frame times are checked against baseline.json; the
+/// clusterer and differ are unit tested in test/unit/utils. Run with:
+///   flutter test test/benchmarks/marker_clustering_benchmark_test.dart
+
+const _frames = 30;
+const _center = (40.7608, -111.8910);
+
+List<ClusterPoint> _generatePoints(int count) {
+  final random = Random(42);
+  return List.generate(count, (i) {
+    // Spread across roughly a 50km square
+    final lat = _center.$1 + (random.nextDouble() - 0.5) * 0.45;
+    final lng = _center.$2 + (random.nextDouble() - 0.5) * 0.6;
+    return ClusterPoint('place_$i', lat, lng);
+  });
+}
+
+ClusterViewport _viewportForFrame(int frame) {
+  // Pan east a little each frame, zoom 13 sized window
+  final offset = frame * 0.002;
+  return ClusterViewport(
+    south: _center.$1 - 0.04,
+    west: _center.$2 - 0.06 + offset,
+    north: _center.$1 + 0.04,
+    east: _center.$2 + 0.06 + offset,
+  );
+}
+
+Marker _marker(String id, double lat, double lng) => Marker(
+      markerId: MarkerId(id),
+      position: LatLng(lat, lng),
+      icon: BitmapDescriptor.defaultMarkerWithHue(BitmapDescriptor.hueAzure),
+    );
+
+/// Old path: every point becomes a new Marker on every frame
+int _fullRebuildFrame(List<ClusterPoint> points) {
+  final markers = <Marker>{};
+  for (final p in points) {
+    markers.add(_marker(p.id, p.latitude, p.longitude));
+  }
+  return markers.length;
+}
+
+/// New path: cluster the viewport and reuse unchanged markers through the
+/// MarkerDiffer MapScreen uses, with the same signatures
+int _clusteredFrame(
+  Map<String, ClusterPoint> points,
+  ClusterViewport viewport,
+  MarkerDiffer differ,
+) {
+  final clusters = MarkerClusterer.cluster(ClusterRequest(
+    points: points.values.toList(),
+    viewport: viewport.padded(0.25),
+    zoom: 13,
+  ));
+  differ.update(
+    clusters,
+    (cluster) => (
+      cluster.isSingle
+          ? MarkerDiffer.itemSignature('place', points[cluster.id]!)
+          : MarkerDiffer.clusterSignature(cluster),
+      () => _marker(cluster.id, cluster.latitude, cluster.longitude),
+    ),
+  );
+  return differ.length;
+}
+
+({double avgMs, double p95Ms, int markers, List<Duration> samples}) _measure(
+    int Function(int frame) buildFrame) {
+  final timings = <double>[];
+  final samples = <Duration>[];
+  var markers = 0;
+  for (var frame = 0; frame < _frames; frame++) {
+    final sw = Stopwatch()..start();
+    markers = buildFrame(frame);
+    sw.stop();
+    timings.add(sw.elapsedMicroseconds / 1000);
+    samples.add(sw.elapsed);
+  }
+  timings.sort();
+  final avg = timings.reduce((a, b) => a + b) / timings.length;
+  final p95 = timings[min((timings.length * 0.95).floor(), timings.length - 1)];
+  return (avgMs: avg, p95Ms: p95, markers: markers, samples: samples);
+}
+
+void main() {
+  final report = BenchmarkReport('map_markers');
+
+  group('Marker build benchmark', () {
+    for (final count in [100, 1000, 10000]) {
+      test('$count points', () {
+        final points = _generatePoints(count);
+        final pointsById = {for (final p in points) p.id: p};
+        final differ = MarkerDiffer();
+
+        final full = _measure((_) => _fullRebuildFrame(points));
+        final clustered = _measure((frame) =>
+            _clusteredFrame(pointsById, _viewportForFrame(frame), differ));
+
+        // ignore: avoid_print
+        print('[$count points] full rebuild: '
+            '${full.avgMs.toStringAsFixed(2)}ms avg, '
+            '${full.p95Ms.toStringAsFixed(2)}ms p95, ${full.markers} markers | '
+            'clustered+diff: ${clustered.avgMs.toStringAsFixed(2)}ms avg, '
+            '${clustered.p95Ms.toStringAsFixed(2)}ms p95, '
+            '${clustered.markers} markers');
+
+        report
+          ..record('full_rebuild_frame_$count', full.samples,
+              counters: {'markers': full.markers})
+          ..record('clustered_frame_$count', clustered.samples,
+              counters: {'markers': clustered.markers});
+
+        expect(full.markers, count);
+        expect(clustered.markers, lessThanOrEqualTo(count));
+      });
+    }
+  });
+
+  test('matches baseline', report.finish);
+}
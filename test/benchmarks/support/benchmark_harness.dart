@@ -0,0 +1,239 @@
+import 'dart:async';
+import 'dart:convert';
+import 'dart:io';
+import 'dart:math';
+import 'package:flutter_test/flutter_test.dart';
+
+/// Latency, memory and frame-time reporting for the benchmark suites, with a
+/// regression check against test/benchmarks/baseline.json.
+///
+/// Each suite collects results in a [BenchmarkReport] and calls
+/// [BenchmarkReport.finish] last, which prints a table, writes
+/// build/benchmarks/<suite>.json and fails if any benchmark's median got
+/// slower than its baseline by more than the baseline's `threshold`, or if
+/// a benchmark has no baseline entry (an unrecorded benchmark would
+/// otherwise pass forever).
+///
+/// Run with `flutter test test/benchmarks`. Record or refresh the baseline
+/// on the reference machine with:
+///   BENCHMARK_UPDATE_BASELINE=1 flutter test test/benchmarks --concurrency=1
+///
+/// `flutter test` runs in debug (JIT) mode, so numbers are only comparable
+/// with a baseline recorded the same way on similar hardware.
+
+const _baselinePath = 'test/benchmarks/baseline.json';
+const _resultsDir = 'build/benchmarks';
+
+/// Samples and memory growth of one benchmark
+class BenchmarkResult {
+  final String name;
+
+  /// Sorted ascending
+  final List<Duration> samples;
+
+  /// Resident set size growth over the measured iterations. The VM doesn't
+  /// expose allocation counts to tests, so this stands in for allocations.
+  final int rssDeltaBytes;
+
+  /// Extra figures worth tracking alongside latency (rows, requests, ...)
+  final Map<String, num> counters;
+
+  BenchmarkResult(
+    this.name,
+    List<Duration> samples, {
+    this.rssDeltaBytes = 0,
+    this.counters = const {},
+  }) : samples = List.of(samples)..sort();
+
+  Duration get median => _percentile(0.5);
+  Duration get p95 => _percentile(0.95);
+  Duration get max => samples.last;
+
+  Duration get mean => Duration(
+      microseconds: samples.fold<int>(0, (sum, s) => sum + s.inMicroseconds) ~/
+          samples.length);
+
+  Duration _percentile(double p) =>
+      samples[min((samples.length * p).floor(), samples.length - 1)];
+
+  Map<String, dynamic> toJson() => {
+        'median_us': median.inMicroseconds,
+        'p95_us': p95.inMicroseconds,
+        'mean_us': mean.inMicroseconds,
+        'max_us': max.inMicroseconds,
+        'samples': samples.length,
+        'rss_delta_kb': rssDeltaBytes ~/ 1024,
+        ...counters,
+      };
+}
+
+class BenchmarkReport {
+  final String suite;
+  final List<BenchmarkResult> results = [];
+
+  BenchmarkReport(this.suite);
+
+  /// Run [body] [warmup] times unmeasured, then [iterations] times measured.
+  /// [setUp] runs before every iteration, outside the measurement.
+  Future<BenchmarkResult> measure(
+    String name,
+    FutureOr<Object?> Function() body, {
+    int warmup = 2,
+    int iterations = 10,
+    FutureOr<void> Function()? setUp,
+    Map<String, num> Function()? counters,
+  }) async {
+    for (var i = 0; i < warmup; i++) {
+      await setUp?.call();
+      await _run(body);
+    }
+
+    final samples = <Duration>[];
+    final rssBefore = ProcessInfo.currentRss;
+    var rssPeak = rssBefore;
+    for (var i = 0; i < iterations; i++) {
+      await setUp?.call();
+      final stopwatch = Stopwatch()..start();
+      await _run(body);
+      stopwatch.stop();
+      samples.add(stopwatch.elapsed);
+      rssPeak = max(rssPeak, ProcessInfo.currentRss);
+    }
+
+    return record(name, samples,
+        rssDeltaBytes: rssPeak - rssBefore, counters: counters?.call() ?? {});
+  }
+
+  /// Add samples measured elsewhere (e.g. per-frame pump times)
+  BenchmarkResult record(
+    String name,
+    List<Duration> samples, {
+    int rssDeltaBytes = 0,
+    Map<String, num> counters = const {},
+  }) {
+    final result = BenchmarkResult(name, samples,
+        rssDeltaBytes: rssDeltaBytes, counters: counters);
+    results.add(result);
+    return result;
+  }
+
+  /// Print, save and check results against the baseline
+  Future<void> finish() async {
+    final baseline = await _Baseline.load();
+    // ignore: avoid_print
+    print(_table(baseline));
+
+    await Directory(_resultsDir).create(recursive: true);
+    await File('$_resultsDir/$suite.json').writeAsString(
+        const JsonEncoder.withIndent('  ').convert({
+      for (final r in results) r.name: r.toJson(),
+    }));
+
+    if (Platform.environment['BENCHMARK_UPDATE_BASELINE'] == '1') {
+      await baseline.update(suite, results);
+      return;
+    }
+
+    final missing = results
+        .where((r) => !baseline.has(suite, r))
+        .map((r) => '$suite/${r.name}')
+        .toList();
+    expect(missing, isEmpty,
+        reason: 'Benchmarks missing from $_baselinePath; record them with '
+            'BENCHMARK_UPDATE_BASELINE=1');
+
+    final regressions = results
+        .map((r) => baseline.regression(suite, r))
+        .whereType<String>()
+        .toList();
+    expect(regressions, isEmpty,
+        reason: 'Benchmarks slower than $_baselinePath allows');
+  }
+
+  String _table(_Baseline baseline) {
+    String ms(Duration d) => (d.inMicroseconds / 1000).toStringAsFixed(2);
+    final lines = [
+      '[$suite] benchmark: median / p95 / max ms, rss growth, vs baseline',
+      for (final r in results)
+        '  ${r.name.padRight(36)} ${ms(r.median).padLeft(9)} '
+            '${ms(r.p95).padLeft(9)} ${ms(r.max).padLeft(9)} '
+            '${'${r.rssDeltaBytes ~/ 1024}KB'.padLeft(9)}  '
+            '${baseline.describe(suite, r)}'
+            '${r.counters.isEmpty ? '' : '  ${r.counters}'}',
+    ];
+    return lines.join('\n');
+  }
+
+  static Future<void> _run(FutureOr<Object?> Function() body) async {
+    final result = body();
+    if (result is Future) await result;
+  }
+}
+
+class _Baseline {
+  final Map<String, dynamic> _json;
+
+  _Baseline(this._json);
+
+  static Future<_Baseline> load() async {
+    final file = File(_baselinePath);
+    if (!await file.exists()) return _Baseline({});
+    return _Baseline(
+        jsonDecode(await file.readAsString()) as Map<String, dynamic>);
+  }
+
+  /// Allowed slowdown as a fraction of the baseline median; override per
+  /// run with BENCHMARK_THRESHOLD (e.g. 0.5 on a noisy CI runner)
+  double get threshold =>
+      double.tryParse(Platform.environment['BENCHMARK_THRESHOLD'] ?? '') ??
+      (_json['threshold'] as num?)?.toDouble() ??
+      0.25;
+
+  /// Slowdowns below this are noise regardless of [threshold]
+  int get minRegressionMicros =>
+      (_json['min_regression_us'] as num?)?.toInt() ?? 500;
+
+  int? _medianFor(String suite, String name) =>
+      ((_json['suites'] as Map?)?[suite] as Map?)?[name]?['median_us'] as int?;
+
+  bool has(String suite, BenchmarkResult result) =>
+      _medianFor(suite, result.name) != null;
+
+  String describe(String suite, BenchmarkResult result) {
+    final base = _medianFor(suite, result.name);
+    if (base == null || base == 0) return 'no baseline';
+    final change = result.median.inMicroseconds / base - 1;
+    return '${change >= 0 ? '+' : ''}${(change * 100).toStringAsFixed(0)}%';
+  }
+
+  String? regression(String suite, BenchmarkResult result) {
+    final base = _medianFor(suite, result.name);
+    if (base == null) return null;
+    final median = result.median.inMicroseconds;
+    if (median <= base * (1 + threshold) ||
+        median - base < minRegressionMicros) {
+      return null;
+    }
+    return '$suite/${result.name}: median ${median}us vs baseline ${base}us '
+        '(allowed +${(threshold * 100).toStringAsFixed(0)}%)';
+  }
+
+  Future<void> update(String suite, List<BenchmarkResult> results) async {
+    final suites = Map<String, dynamic>.from(
+        (_json['suites'] as Map?) ?? const <String, dynamic>{});
+    suites[suite] = {
+      for (final r in results)
+        r.name: {
+          'median_us': r.median.inMicroseconds,
+          'p95_us': r.p95.inMicroseconds,
+        },
+    };
+    final updated = {
+      'threshold': (_json['threshold'] as num?)?.toDouble() ?? 0.25,
+      'min_regression_us': minRegressionMicros,
+      'suites': suites,
+    };
+    await File(_baselinePath)
+        .writeAsString('${const JsonEncoder.withIndent('  ').convert(updated)}\n');
+  }
+}
@@ -0,0 +1,377 @@
+import 'dart:async';
+import 'dart:convert';
+import 'dart:io';
+import 'dart:math';
+import 'package:http/http.dart' as http;
+import 'package:http/io_client.dart';
+import 'package:supabase_flutter/supabase_flutter.dart';
+import 'scaled_fixtures.dart';
+
+typedef FakeRpc = FutureOr<Object?> Function(Map<String, dynamic> params);
+
+/// In-process stand-in for Supabase (PostgREST tables and RPCs, GoTrue
+/// sign-in) and the Google Places API, served over loopback HTTP so
+/// benchmarks run the app's real client code offline.
+///
+/// Supports the PostgREST subset the app uses: `eq`, `in`, `gte`/`lte`/
+/// `gt`/`lt` and `ilike` filters, one level of embedded children
+/// (`trip_places(place_id)`), `order`, `limit`, `offset` and single-object
+/// responses. RPCs are Dart callbacks registered in [rpcs].
+class FakeBackend {
+  /// Added to every request to approximate a mobile round trip
+  final Duration latency;
+
+  final Map<String, List<Map<String, dynamic>>> tables = {};
+  final Map<String, FakeRpc> rpcs = {};
+
+  /// Places API (New) place objects served to GooglePlacesService
+  List<Map<String, dynamic>> googlePlaces = [];
+
+  /// Requests per route, e.g. `GET /rest/v1/trips` or `POST /rpc/x`
+  final Map<String, int> requestCounts = {};
+
+  HttpServer? _server;
+
+  FakeBackend({this.latency = Duration.zero});
+
+  int get requestCount => requestCounts.values.fold(0, (a, b) => a + b);
+
+  Uri get url => Uri.parse('http://127.0.0.1:${_server!.port}');
+
+  Future<void> start() async {
+    // flutter_test answers all HttpClient requests with 400 by default
+    HttpOverrides.global = null;
+    _server = await HttpServer.bind(InternetAddress.loopbackIPv4, 0);
+    _server!.listen(_handle);
+  }
+
+  Future<void> close() async => _server?.close(force: true);
+
+  /// Point Supabase at this backend and sign in as [benchmarkUserId]
+  Future<void> connectSupabase() async {
+    await Supabase.initialize(
+      url: url.toString(),
+      anonKey: 'benchmark-anon-key',
+      authOptions: const FlutterAuthClientOptions(
+        localStorage: EmptyLocalStorage(),
+        detectSessionInUri: false,
+        autoRefreshToken: false,
+      ),
+    );
+    await Supabase.instance.client.auth
+        .signInWithPassword(email: benchmarkEmail, password: 'benchmark');
+  }
+
+  /// An http client that sends Google Places API calls here instead. Use
+  /// with `http.runWithClient` around code using GooglePlacesService.
+  http.Client placesClient() => _PlacesRedirectClient(url);
+
+  void resetCounts() => requestCounts.clear();
+
+  /// Rows of [table] shaped by a PostgREST select list, for RPC fakes
+  List<Map<String, dynamic>> select(String table, [String columns = '*']) =>
+      _project(table, tables[table] ?? const [], columns);
+
+  Future<void> _handle(HttpRequest request) async {
+    final path = request.uri.path;
+    final route = path.startsWith('/rest/v1/rpc/')
+        ? 'POST ${path.substring('/rest/v1'.length)}'
+        : '${request.method} $path';
+    requestCounts.update(route, (n) => n + 1, ifAbsent: () => 1);
+    if (latency > Duration.zero) await Future.delayed(latency);
+
+    Object? body;
+    var status = HttpStatus.ok;
+    try {
+      final raw = await utf8.decoder.bind(request).join();
+      final json = raw.isEmpty ? null : jsonDecode(raw);
+
+      if (path.startsWith('/auth/v1/token')) {
+        body = _session();
+      } else if (path == '/auth/v1/user') {
+        body = _user;
+      } else if (path.startsWith('/rest/v1/rpc/')) {
+        final name = path.substring('/rest/v1/rpc/'.length);
+        final rpc = rpcs[name];
+        if (rpc == null) {
+          status = HttpStatus.notFound;
+          body = {'code': 'PGRST202', 'message': 'Unknown function $name'};
+        } else {
+          body = await rpc(Map<String, dynamic>.from((json as Map?) ?? {}));
+        }
+      } else if (path.startsWith('/rest/v1/')) {
+        (status, body) = _table(request, path.substring('/rest/v1/'.length));
+      } else if (path == '/v1/places:searchNearby') {
+        body = {'places': _nearby(json as Map<String, dynamic>)};
+      } else if (path == '/v1/places:searchText') {
+        body = {'places': _text(json as Map<String, dynamic>)};
+      } else if (path.startsWith('/v1/places/')) {
+        final id = path.substring('/v1/places/'.length);
+        final place = googlePlaces.where((p) => p['id'] == id).firstOrNull;
+        status = place == null ? HttpStatus.notFound : HttpStatus.ok;
+        body = place ?? {'error': 'not found'};
+      } else {
+        status = HttpStatus.notFound;
+        body = {'message': 'No fake route for $path'};
+      }
+    } catch (e) {
+      status = HttpStatus.internalServerError;
+      body = {'message': '$e'};
+    }
+
+    request.response
+      ..statusCode = status
+      ..headers.contentType = ContentType.json
+      ..write(jsonEncode(body));
+    await request.response.close();
+  }
+
+  // ---------- PostgREST ----------
+
+  (int, Object?) _table(HttpRequest request, String table) {
+    // Writes are accepted and ignored; benchmarks only measure reads
+    if (request.method != 'GET') return (HttpStatus.created, []);
+
+    final params = request.uri.queryParametersAll;
+    var rows = tables[table] ?? const <Map<String, dynamic>>[];
+    for (final entry in params.entries) {
+      if (const {'select', 'order', 'limit', 'offset'}.contains(entry.key)) {
+        continue;
+      }
+      for (final expression in entry.value) {
+        final matches = _filter(entry.key, expression);
+        rows = rows.where(matches).toList();
+      }
+    }
+
+    final order = params['order']?.first;
+    if (order != null) {
+      // Only the first key of e.g. `start_date.asc,id.asc` is honoured
+      final key = order.split(',').first.split('.');
+      final descending = key.length > 1 && key[1] == 'desc';
+      rows = List.of(rows)
+        ..sort((a, b) {
+          final cmp = _compareValues(a[key[0]], b[key[0]]);
+          return descending ? -cmp : cmp;
+        });
+    }
+    final offset = int.tryParse(params['offset']?.first ?? '') ?? 0;
+    final limit = int.tryParse(params['limit']?.first ?? '');
+    rows = rows.skip(offset).take(limit ?? rows.length).toList();
+
+    final projected = _project(table, rows, params['select']?.first ?? '*');
+
+    final accept = request.headers.value(HttpHeaders.acceptHeader) ?? '';
+    if (accept.contains('vnd.pgrst.object+json')) {
+      if (projected.length == 1) return (HttpStatus.ok, projected.single);
+      return (
+        HttpStatus.notAcceptable,
+        {
+          'code': 'PGRST116',
+          'details': 'The result contains ${projected.length} rows',
+          'hint': null,
+          'message': 'JSON object requested, multiple (or no) rows returned',
+        }
+      );
+    }
+    return (HttpStatus.ok, projected);
+  }
+
+  bool Function(Map<String, dynamic>) _filter(String column, String expression) {
+    final dot = expression.indexOf('.');
+    final op = expression.substring(0, dot);
+    final operand = expression.substring(dot + 1);
+    switch (op) {
+      case 'eq':
+        return (row) => '${row[column]}' == operand;
+      case 'in':
+        final values = operand
+            .substring(1, operand.length - 1)
+            .split(',')
+            .map((v) => v.replaceAll('"', ''))
+            .toSet();
+        return (row) => values.contains('${row[column]}');
+      case 'gte':
+        return (row) => _compareValues(row[column], operand) >= 0;
+      case 'gt':
+        return (row) => _compareValues(row[column], operand) > 0;
+      case 'lte':
+        return (row) => _compareValues(row[column], operand) <= 0;
+      case 'lt':
+        return (row) => _compareValues(row[column], operand) < 0;
+      case 'ilike':
+        final needle = operand.replaceAll('%', '').replaceAll('*', '').toLowerCase();
+        return (row) => '${row[column] ?? ''}'.toLowerCase().contains(needle);
+      default:
+        throw UnsupportedError('Fake PostgREST has no "$op" filter');
+    }
+  }
+
+  static int _compareValues(Object? a, Object? b) {
+    if (a == null || b == null) return a == b ? 0 : (a == null ? -1 : 1);
+    if (a is num) return a.compareTo(b is num ? b : num.parse('$b'));
+    final aTime = DateTime.tryParse('$a');
+    final bTime = DateTime.tryParse('$b');
+    if (aTime != null && bTime != null) return aTime.compareTo(bTime);
+    return '$a'.compareTo('$b');
+  }
+
+  /// Apply a select list such as `*, trip_places(place_id)`. Children are
+  /// matched on `<singular parent>_id`, e.g. trip_places.trip_id.
+  List<Map<String, dynamic>> _project(
+      String table, List<Map<String, dynamic>> rows, String select) {
+    final embeds = <String, List<String>>{};
+    final columns = <String>[];
+    for (final match
+        in RegExp(r'(\w+)\(([^)]*)\)|(\*|\w+)').allMatches(select)) {
+      if (match.group(1) != null) {
+        embeds[match.group(1)!] =
+            match.group(2)!.split(',').map((c) => c.trim()).toList();
+      } else {
+        columns.add(match.group(3)!);
+      }
+    }
+
+    final foreignKey = '${table.replaceFirst(RegExp(r's$'), '')}_id';
+    final children = {
+      for (final embed in embeds.keys)
+        embed: _groupBy(tables[embed] ?? const [], foreignKey),
+    };
+    final all = columns.contains('*');
+
+    return [
+      for (final row in rows)
+        {
+          if (all) ...row else for (final c in columns) c: row[c],
+          for (final embed in embeds.entries)
+            embed.key: [
+              for (final child in children[embed.key]![row['id']] ?? const [])
+                {for (final c in embed.value) c: child[c]},
+            ],
+        },
+    ];
+  }
+
+  static Map<Object?, List<Map<String, dynamic>>> _groupBy(
+      List<Map<String, dynamic>> rows, String column) {
+    final groups = <Object?, List<Map<String, dynamic>>>{};
+    for (final row in rows) {
+      groups.putIfAbsent(row[column], () => []).add(row);
+    }
+    return groups;
+  }
+
+  // ---------- GoTrue ----------
+
+  Map<String, dynamic> get _user => {
+        'id': benchmarkUserId,
+        'aud': 'authenticated',
+        'role': 'authenticated',
+        'email': benchmarkEmail,
+        'app_metadata': {'provider': 'email'},
+        'user_metadata': <String, dynamic>{},
+        'created_at': '2025-01-01T00:00:00Z',
+      };
+
+  Map<String, dynamic> _session() {
+    String encode(Map<String, dynamic> json) =>
+        base64Url.encode(utf8.encode(jsonEncode(json))).replaceAll('=', '');
+    final expiresAt =
+        DateTime.now().add(const Duration(hours: 1)).millisecondsSinceEpoch ~/
+            1000;
+    final token = [
+      encode({'alg': 'HS256', 'typ': 'JWT'}),
+      encode({
+        'sub': benchmarkUserId,
+        'email': benchmarkEmail,
+        'role': 'authenticated',
+        'aud': 'authenticated',
+        'exp': expiresAt,
+      }),
+      'benchmark-signature',
+    ].join('.');
+    return {
+      'access_token': token,
+      'token_type': 'bearer',
+      'expires_in': 3600,
+      'expires_at': expiresAt,
+      'refresh_token': 'benchmark-refresh-token',
+      'user': _user,
+    };
+  }
+
+  // ---------- Google Places ----------
+
+  List<Map<String, dynamic>> _nearby(Map<String, dynamic> request) {
+    final circle = request['locationRestriction']['circle'] as Map;
+    final center = circle['center'] as Map;
+    final limit = request['maxResultCount'] as int? ?? 20;
+    return _closest(
+      (center['latitude'] as num).toDouble(),
+      (center['longitude'] as num).toDouble(),
+      radiusMeters: (circle['radius'] as num).toDouble(),
+      limit: limit,
+    );
+  }
+
+  List<Map<String, dynamic>> _text(Map<String, dynamic> request) {
+    final center = request['locationBias']?['circle']?['center'] as Map?;
+    final limit = request['maxResultCount'] as int? ?? 20;
+    if (center == null) return googlePlaces.take(limit).toList();
+    return _closest(
+      (center['latitude'] as num).toDouble(),
+      (center['longitude'] as num).toDouble(),
+      radiusMeters: 50000,
+      limit: limit,
+    );
+  }
+
+  List<Map<String, dynamic>> _closest(double lat, double lng,
+      {required double radiusMeters, required int limit}) {
+    final withDistance = <(double, Map<String, dynamic>)>[];
+    for (final place in googlePlaces) {
+      final location = place['location'] as Map;
+      final distance = _distanceMeters(lat, lng,
+          location['latitude'] as double, location['longitude'] as double);
+      if (distance <= radiusMeters) withDistance.add((distance, place));
+    }
+    withDistance.sort((a, b) => a.$1.compareTo(b.$1));
+    return withDistance.take(limit).map((e) => e.$2).toList();
+  }
+
+  static double _distanceMeters(
+      double lat1, double lng1, double lat2, double lng2) {
+    const earthRadius = 6371000.0;
+    double rad(double deg) => deg * pi / 180;
+    final dLat = rad(lat2 - lat1);
+    final dLng = rad(lng2 - lng1);
+    final a = pow(sin(dLat / 2), 2) +
+        cos(rad(lat1)) * cos(rad(lat2)) * pow(sin(dLng / 2), 2);
+    return 2 * earthRadius * asin(sqrt(a));
+  }
+}
+
+/// Rewrites places.googleapis.com requests to the fake server
+class _PlacesRedirectClient extends http.BaseClient {
+  final Uri _target;
+  // IOClient rather than http.Client(), which inside runWithClient would
+  // return this client again
+  final http.Client _inner = IOClient();
+
+  _PlacesRedirectClient(this._target);
+
+  @override
+  Future<http.StreamedResponse> send(http.BaseRequest request) async {
+    final url = request.url.host == 'places.googleapis.com'
+        ? request.url.replace(
+            scheme: _target.scheme, host: _target.host, port: _target.port)
+        : request.url;
+    final forwarded = http.Request(request.method, url)
+      ..headers.addAll(request.headers);
+    if (request is http.Request) forwarded.bodyBytes = request.bodyBytes;
+    return _inner.send(forwarded);
+  }
+
+  @override
+  void close() => _inner.close();
+}
@@ -0,0 +1,196 @@
+import 'dart:math';
+import 'package:fittravel/models/itinerary_item.dart';
+import 'package:fittravel/models/place_model.dart';
+import '../../helpers/fixtures/place_fixtures.dart';
+import '../../helpers/fixtures/trip_fixtures.dart';
+
+/// The shared model fixtures scaled up to benchmark sizes, as the
+/// snake_case rows Supabase returns. Deterministic, so runs are comparable.
+
+const int benchmarkScale = 10000;
+const String benchmarkUserId = '00000000-0000-4000-8000-000000000001';
+const String benchmarkEmail = 'benchmark@example.com';
+
+const List<(String, String, double, double)> benchmarkCities = [
+  ('Salt Lake City', 'United States', 40.7608, -111.8910),
+  ('New York City', 'United States', 40.7128, -74.0060),
+  ('Los Angeles', 'United States', 34.0522, -118.2437),
+  ('San Francisco', 'United States', 37.7749, -122.4194),
+  ('Paris', 'France', 48.8566, 2.3522),
+  ('Cairo', 'Egypt', 30.0444, 31.2357),
+  ('Dahab', 'Egypt', 28.5091, 34.5136),
+  ('Tokyo', 'Japan', 35.6762, 139.6503),
+];
+
+/// Deterministic UUID per kind (1 trips, 2 places, ...) and index
+String benchmarkId(int kind, int i) =>
+    '$kind${'0' * 7}-0000-4000-8000-${i.toRadixString(16).padLeft(12, '0')}';
+
+final DateTime _epoch = DateTime.utc(2025, 1, 1);
+
+String _timestamp(int i) =>
+    _epoch.add(Duration(minutes: i)).toIso8601String();
+
+/// Spread around a city, roughly within 20km
+(double, double) _jitter(Random random, double lat, double lng) => (
+      lat + (random.nextDouble() - 0.5) * 0.36,
+      lng + (random.nextDouble() - 0.5) * 0.36,
+    );
+
+List<Map<String, dynamic>> scaledTripRows([int count = benchmarkScale]) {
+  // Centered on today so trips split into past, current and upcoming
+  final today = DateTime.now();
+  final firstStart = DateTime(today.year, today.month, today.day)
+      .subtract(Duration(days: count ~/ 2));
+  return List.generate(count, (i) {
+    final (city, country, lat, lng) = benchmarkCities[i % benchmarkCities.length];
+    final start = firstStart.add(Duration(days: i));
+    final trip = createTestTrip(
+      id: benchmarkId(1, i),
+      userId: benchmarkUserId,
+      destinationCity: city,
+      destinationCountry: country,
+      startDate: start,
+      endDate: start.add(Duration(days: 2 + i % 10)),
+      notes: i.isEven ? 'Fitness trip #$i, runs and gyms with friends' : null,
+    );
+    return {
+      ...trip.toSupabaseJson(benchmarkUserId),
+      'id': trip.id,
+      'destination_latitude': lat,
+      'destination_longitude': lng,
+      // Set so TripService doesn't go looking for city photos
+      'image_url': 'https://images.example.com/trips/$i.jpg',
+      'created_at': _timestamp(i),
+      'updated_at': _timestamp(i),
+    };
+  });
+}
+
+List<Map<String, dynamic>> scaledPlaceRows([int count = benchmarkScale]) {
+  final random = Random(42);
+  return List.generate(count, (i) {
+    final (city, _, lat, lng) = benchmarkCities[i % benchmarkCities.length];
+    final (placeLat, placeLng) = _jitter(random, lat, lng);
+    final place = createTestPlace(
+      id: benchmarkId(2, i),
+      userId: benchmarkUserId,
+      googlePlaceId: 'gp_$i',
+      name: '${PlaceType.values[i % PlaceType.values.length].name} $i in $city',
+      address: '$i Main St, $city',
+      type: PlaceType.values[i % PlaceType.values.length],
+      latitude: placeLat,
+      longitude: placeLng,
+      rating: 3 + (i % 20) / 10,
+      isVisited: i % 3 == 0,
+      notes: i % 4 == 0 ? 'Good drop-in rate' : null,
+    );
+    return {
+      ...place.toSupabaseJson(benchmarkUserId),
+      'id': place.id,
+      'created_at': _timestamp(i),
+      'updated_at': _timestamp(i),
+    };
+  });
+}
+
+/// Two saved places per trip, as selected through `trip_places(place_id)`
+List<Map<String, dynamic>> scaledTripPlaceRows(
+    [int trips = benchmarkScale, int places = benchmarkScale]) {
+  return [
+    for (var i = 0; i < trips; i++)
+      for (var j = 0; j < 2; j++)
+        {
+          'id': benchmarkId(3, i * 2 + j),
+          'trip_id': benchmarkId(1, i),
+          'place_id': benchmarkId(2, (i * 2 + j) % places),
+        },
+  ];
+}
+
+/// One item per trip, plus [longTripItems] on the first trip so sorting a
+/// single large itinerary can be measured
+List<Map<String, dynamic>> scaledItineraryRows(
+    [int trips = benchmarkScale, int longTripItems = 1000]) {
+  final random = Random(7);
+  Map<String, dynamic> row(int index, String tripId, int day) {
+    final hour = random.nextInt(24).toString().padLeft(2, '0');
+    final minute = (random.nextInt(4) * 15).toString().padLeft(2, '0');
+    final item = ItineraryItem(
+      id: benchmarkId(4, index),
+      date: DateTime(2025, 6, 1).add(Duration(days: day)),
+      // Leave some unscheduled, sorted last within their day
+      startTime: index % 7 == 0 ? null : '$hour:$minute',
+      durationMinutes: 60,
+      title: 'Session $index',
+    );
+    return {
+      ...item.toSupabaseJson(tripId),
+      'id': item.id,
+      'updated_at': _timestamp(index),
+    };
+  }
+
+  return [
+    for (var i = 0; i < trips; i++) row(i, benchmarkId(1, i), 0),
+    for (var i = 0; i < longTripItems; i++)
+      row(trips + i, benchmarkId(1, 0), random.nextInt(14)),
+  ];
+}
+
+List<Map<String, dynamic>> scaledEventRows([int count = benchmarkScale]) {
+  final random = Random(11);
+  const categories = ['running', 'yoga', 'hiking', 'cycling', 'crossfit'];
+  return List.generate(count, (i) {
+    final (city, country, lat, lng) = benchmarkCities[i % benchmarkCities.length];
+    final (eventLat, eventLng) = _jitter(random, lat, lng);
+    final start = _epoch.add(Duration(hours: 6 * i));
+    return {
+      'id': benchmarkId(5, i),
+      'title': '${categories[i % categories.length]} meetup $i',
+      'category': categories[i % categories.length],
+      'description': 'Weekly group session. All levels welcome.',
+      'start_date': start.toIso8601String(),
+      'end_date': start.add(const Duration(hours: 2)).toIso8601String(),
+      'venue_name': 'Venue $i',
+      'address': '$i Event Ave, $city',
+      'city': city,
+      'country': country,
+      'latitude': eventLat,
+      'longitude': eventLng,
+      'website_url': 'https://events.example.com/$i',
+      'source': 'benchmark',
+    };
+  });
+}
+
+/// Places API (New) place objects for the fake Places server
+List<Map<String, dynamic>> scaledGooglePlaces([int count = benchmarkScale]) {
+  final random = Random(3);
+  return List.generate(count, (i) {
+    final (city, _, lat, lng) = benchmarkCities[i % benchmarkCities.length];
+    final (placeLat, placeLng) = _jitter(random, lat, lng);
+    return {
+      'id': 'gp_$i',
+      'displayName': {'text': 'Fitness Spot $i', 'languageCode': 'en'},
+      'formattedAddress': '$i Main St, $city',
+      'location': {'latitude': placeLat, 'longitude': placeLng},
+      'rating': 3 + (i % 20) / 10,
+      'userRatingCount': 10 + i % 500,
+      'priceLevel': 'PRICE_LEVEL_MODERATE',
+      'photos': [
+        {'name': 'places/gp_$i/photos/p0'},
+        {'name': 'places/gp_$i/photos/p1'},
+      ],
+      'currentOpeningHours': {
+        'openNow': i.isEven,
+        'weekdayDescriptions': [
+          'Monday: 6:00 AM – 10:00 PM',
+          'Tuesday: 6:00 AM – 10:00 PM',
+        ],
+      },
+      'websiteUri': 'https://places.example.com/$i',
+      'nationalPhoneNumber': '+1 555 0100',
+    };
+  });
+}
@@ -0,0 +1,112 @@
+import 'dart:convert';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:fittravel/services/ai_guide_stream.dart';
+
+void main() {
+  group('SseEvent.decode', () {
+    test('splits events across arbitrary chunk boundaries', () async {
+      const body = 'event: delta\ndata: {"text":"Hel"}\n\n'
+          ': keep-alive\n\n'
+          'event: delta\ndata: {"text":"lo"}\n\n'
+          'event: done\ndata: {"text":"Hello"}\n\n';
+      final bytes = utf8.encode(body);
+      final chunks = [
+        for (var i = 0; i < bytes.length; i += 7)
+          bytes.sublist(i, (i + 7).clamp(0, bytes.length)),
+      ];
+
+      final events = await SseEvent.decode(Stream.fromIterable(chunks)).toList();
+
+      expect(events.map((e) => e.event), ['delta', 'delta', 'done']);
+      expect(events.first.data, '{"text":"Hel"}');
+      expect(events.last.data, '{"text":"Hello"}');
+    });
+
+    test('defaults to message and joins multi-line data', () async {
+      final events = await SseEvent.decode(
+              Stream.value(utf8.encode('data: a\ndata: b\n\ndata: tail')))
+          .toList();
+
+      expect(events.map((e) => e.event), ['message', 'message']);
+      expect(events.map((e) => e.data), ['a\nb', 'tail']);
+    });
+  });
+
+  group('GuideReplyStreamParser', () {
+    /// Feed [raw] in fixed-size chunks and collect the text after each one
+    List<String> feed(GuideReplyStreamParser parser, String raw,
+        {int size = 5}) {
+      final texts = <String>[];
+      for (var i = 0; i < raw.length; i += size) {
+        parser.add(raw.substring(i, (i + size).clamp(0, raw.length)));
+        texts.add(parser.text);
+      }
+      return texts;
+    }
+
+    test('exposes partial text before the JSON is complete', () {
+      final parser = GuideReplyStreamParser();
+
+      parser.add('{"text": "Try the ');
+      expect(parser.text, 'Try the ');
+
+      parser.add('Corniche run');
+      expect(parser.text, 'Try the Corniche run');
+
+      parser.add('.", "suggestedPlaces": []}');
+      expect(parser.text, 'Try the Corniche run.');
+    });
+
+    test('decodes escapes split across chunks', () {
+      final parser = GuideReplyStreamParser();
+      const raw = r'{"text": "Line one\nSay \"hi\" \u00e9", "tags": []}';
+
+      final texts = feed(parser, raw, size: 3);
+
+      expect(parser.text, 'Line one\nSay "hi" é');
+      // Never shows a dangling backslash or half a \u sequence
+      expect(texts.any((t) => t.contains(r'\')), isFalse);
+    });
+
+    test('parses suggested places as each object completes', () {
+      final parser = GuideReplyStreamParser();
+
+      parser.add('{"text": "Two gyms", "suggestedPlaces": [');
+      parser.add('{"name": "Gold\'s Gym", "type": "gym", "lat": 30.0}, ');
+      expect(parser.suggestedPlaces.map((p) => p.name), ["Gold's Gym"]);
+
+      parser.add('{"name": "Samia {Fit}", "ty');
+      expect(parser.suggestedPlaces, hasLength(1));
+
+      parser.add('pe": "gym"}]}');
+      expect(parser.suggestedPlaces.map((p) => p.name),
+          ["Gold's Gym", 'Samia {Fit}']);
+    });
+
+    test('handles replies wrapped in a code fence', () {
+      final parser = GuideReplyStreamParser();
+
+      feed(parser, '```json\n{"text": "Fenced reply"}\n```');
+
+      expect(parser.text, 'Fenced reply');
+    });
+
+    test('shows replies that are not JSON verbatim', () {
+      final parser = GuideReplyStreamParser();
+
+      feed(parser, 'Plain answer, no JSON.');
+
+      expect(parser.text, 'Plain answer, no JSON.');
+    });
+
+    test('ignores text keys nested in quick replies', () {
+      final parser = GuideReplyStreamParser();
+
+      parser.add('{"quickReplies": [{"text": "Nearby", "value": "n"}], ');
+      expect(parser.text, isEmpty);
+
+      parser.add('"text": "Top level"}');
+      expect(parser.text, 'Top level');
+    });
+  });
+}
@@ -0,0 +1,126 @@
+import 'package:flutter_test/flutter_test.dart';
+import 'package:shared_preferences/shared_preferences.dart';
+import 'package:fittravel/services/app_bootstrap.dart';
+import 'package:fittravel/services/delta_sync.dart';
+import 'package:fittravel/services/local_row_database.dart';
+import 'package:fittravel/services/local_store.dart';
+
+void main() {
+  TestWidgetsFlutterBinding.ensureInitialized();
+
+  group('AppBootstrap', () {
+    const userId = 'user-1';
+    late LocalStore store;
+    late List<Map<String, String>> requests;
+    late Map<String, dynamic> Function() respond;
+
+    // Recent enough that watermarks aren't treated as stale
+    final yesterday = DateTime.now().toUtc().subtract(const Duration(days: 1));
+    String at(int hour) =>
+        DateTime.utc(yesterday.year, yesterday.month, yesterday.day, hour)
+            .toIso8601String();
+
+    AppBootstrap bootstrap() => AppBootstrap(
+          timings: StartupTimings(),
+          fetchPayload: (watermarks) async {
+            requests.add(watermarks);
+            return respond();
+          },
+        );
+
+    Map<String, dynamic> section(List<Map<String, dynamic>> rows,
+            {bool full = true, List<Map<String, dynamic>> deleted = const []}) =>
+        {'full': full, 'rows': rows, 'deleted': deleted};
+
+    setUp(() async {
+      SharedPreferences.setMockInitialValues({});
+      LocalStore.resetInstance(database: PrefsRowDatabase());
+      DeltaSync.resetPreload();
+      store = await LocalStore.getInstance();
+      requests = [];
+      respond = () => {
+            'tables': {
+              'users': section([
+                {'id': userId, 'name': 'Sam'},
+              ]),
+              'trips': section([
+                {'id': 't1', 'updated_at': at(8)},
+                {'id': 't2', 'updated_at': at(10)},
+              ]),
+              'badges': section([
+                {'id': 'b1', 'updated_at': at(1)},
+              ]),
+            },
+          };
+    });
+
+    test('applies every table from a single request', () async {
+      await bootstrap().load(userId);
+
+      expect(requests, [<String, String>{}]);
+      expect(await store.rows(userId, 'trips'), hasLength(2));
+      expect(
+          await store.rows(LocalStore.globalScope, 'badges'), hasLength(1));
+      expect(store.watermark(userId, 'trips'), DateTime.parse(at(10)));
+    });
+
+    test('serves preloaded tables to the first sync only', () async {
+      final loading = bootstrap().load(userId);
+
+      // Services may ask before the payload lands
+      final trips = await DeltaSync.takePreloaded(store,
+          scope: userId, table: 'trips');
+      await loading;
+
+      expect(trips, hasLength(2));
+      expect(
+          await DeltaSync.takePreloaded(store, scope: userId, table: 'trips'),
+          isNull);
+      // Not in the payload, so the service syncs it itself
+      expect(
+          await DeltaSync.takePreloaded(store,
+              scope: userId, table: 'activities'),
+          isNull);
+    });
+
+    test('sends watermarks and applies deltas with tombstones', () async {
+      await bootstrap().load(userId);
+      respond = () => {
+            'tables': {
+              'trips': section(
+                [
+                  {'id': 't3', 'updated_at': at(12)},
+                ],
+                full: false,
+                deleted: [
+                  {'row_id': 't1', 'deleted_at': at(13)},
+                ],
+              ),
+            },
+          };
+
+      await bootstrap().load(userId);
+
+      expect(requests.last['trips'], at(10));
+      expect(requests.last['trips#tombstones'], at(10));
+      expect(requests.last['badges'], at(1));
+      expect((await store.rows(userId, 'trips')).map((r) => r['id']),
+          unorderedEquals(['t2', 't3']));
+      expect(store.watermark(userId, 'trips#tombstones'),
+          DateTime.parse(at(13)));
+    });
+
+    test('falls back to per-service syncs when the request fails', () async {
+      respond = () => throw Exception('offline');
+      final app = bootstrap();
+
+      await app.load(userId);
+
+      expect(
+          await DeltaSync.takePreloaded(store, scope: userId, table: 'trips'),
+          isNull);
+      expect(app.timings.entries.keys, contains('startup_rpc'));
+      expect(app.timings.entries.keys, isNot(contains('startup_apply')));
+    });
+  });
+}
@@ -0,0 +1,203 @@
+import 'package:flutter_test/flutter_test.dart';
+import 'package:shared_preferences/shared_preferences.dart';
+import 'package:fittravel/services/delta_sync.dart';
+import 'package:fittravel/services/local_row_database.dart';
+import 'package:fittravel/services/local_store.dart';
+
+void main() {
+  TestWidgetsFlutterBinding.ensureInitialized();
+
+  group('DeltaSync.pull', () {
+    const userId = 'user-1';
+    late LocalStore store;
+    // table -> rows the fake server returns
+    late Map<String, List<Map<String, dynamic>>> server;
+    late List<({String table, DateTime? since})> queries;
+
+    // Recent enough that watermarks aren't treated as stale
+    final yesterday = DateTime.now().toUtc().subtract(const Duration(days: 1));
+    String at(int hour) =>
+        DateTime.utc(yesterday.year, yesterday.month, yesterday.day, hour)
+            .toIso8601String();
+
+    setUp(() async {
+      SharedPreferences.setMockInitialValues({});
+      LocalStore.resetInstance(database: PrefsRowDatabase());
+      DeltaSync.resetPreload();
+      store = await LocalStore.getInstance();
+      await store.clearScope(userId);
+      server = {};
+      queries = [];
+      DeltaSync.overrideQuery((table,
+          {required select,
+          required filters,
+          inFilter,
+          sinceColumn,
+          since}) async {
+        queries.add((table: table, since: since));
+        return (server[table] ?? []).where((row) {
+          if (since == null) return true;
+          return !DateTime.parse(row[sinceColumn] as String).isBefore(since);
+        }).toList();
+      });
+    });
+
+    tearDown(() => DeltaSync.overrideQuery(null));
+
+    Future<List<Map<String, dynamic>>> pullTrips() =>
+        DeltaSync.pull(store, scope: userId, table: 'trips');
+
+    test('first pull fetches everything and sets the watermark', () async {
+      server['trips'] = [
+        {'id': 't1', 'updated_at': at(8)},
+        {'id': 't2', 'updated_at': at(10)},
+      ];
+
+      final rows = await pullTrips();
+
+      expect(rows, hasLength(2));
+      expect(queries, [(table: 'trips', since: null)]);
+      expect(store.watermark(userId, 'trips'), DateTime.parse(at(10)));
+    });
+
+    test('later pulls apply changed rows and tombstones only', () async {
+      server['trips'] = [
+        {'id': 't1', 'name': 'Paris', 'updated_at': at(8)},
+        {'id': 't2', 'updated_at': at(10)},
+      ];
+      await pullTrips();
+      server['trips'] = [
+        {'id': 't1', 'name': 'Paris', 'updated_at': at(8)},
+        {'id': 't3', 'updated_at': at(12)},
+      ];
+      server['sync_tombstones'] = [
+        {'row_id': 't2', 'deleted_at': at(11)},
+      ];
+      queries.clear();
+
+      final rows = await pullTrips();
+
+      expect(queries.map((q) => q.since), everyElement(DateTime.parse(at(10))));
+      expect(rows.map((r) => r['id']), unorderedEquals(['t1', 't3']));
+      expect((await store.row(userId, 'trips', 't1'))?['name'], 'Paris');
+      expect(store.watermark(userId, 'trips'), DateTime.parse(at(12)));
+      expect(store.watermark(userId, 'trips#tombstones'),
+          DateTime.parse(at(11)));
+    });
+
+    test('a stale watermark triggers a full sync', () async {
+      await store.setWatermark(userId, 'trips',
+          DateTime.now().subtract(DeltaSync.maxWatermarkAge * 2));
+      await store.upsertRows(userId, 'trips', [
+        {'id': 'gone'},
+      ]);
+      server['trips'] = [
+        {'id': 't1', 'updated_at': at(8)},
+      ];
+
+      final rows = await pullTrips();
+
+      expect(queries, [(table: 'trips', since: null)]);
+      expect(rows.map((r) => r['id']), ['t1']);
+    });
+
+    test('falls back to a full sync when the delta query fails', () async {
+      server['trips'] = [
+        {'id': 't1', 'updated_at': at(8)},
+      ];
+      await pullTrips();
+      DeltaSync.overrideQuery((table,
+          {required select,
+          required filters,
+          inFilter,
+          sinceColumn,
+          since}) async {
+        if (since != null) throw Exception('column updated_at does not exist');
+        return [
+          {'id': 't9', 'updated_at': at(9)},
+        ];
+      });
+
+      final rows = await pullTrips();
+
+      expect(rows.map((r) => r['id']), ['t9']);
+    });
+  });
+
+  group('DeltaSync.applyPreloaded', () {
+    const userId = 'user-1';
+    late LocalStore store;
+
+    setUp(() async {
+      SharedPreferences.setMockInitialValues({});
+      LocalStore.resetInstance(database: PrefsRowDatabase());
+      DeltaSync.resetPreload();
+      store = await LocalStore.getInstance();
+      await store.clearScope(userId);
+      await store.clearScope(LocalStore.globalScope);
+    });
+
+    test('upserts deltas and removes tombstoned rows', () async {
+      await store.upsertRows(userId, 'trips', [
+        {'id': 't1', 'name': 'Paris'},
+        {'id': 't2'},
+      ]);
+      await store.setWatermark(userId, 'trips', DateTime.utc(2025, 1, 1));
+
+      await DeltaSync.applyPreloaded(
+        store,
+        scope: userId,
+        table: 'trips',
+        full: false,
+        rows: [
+          {'id': 't1', 'updated_at': '2025-01-02T00:00:00.000Z'},
+        ],
+        deleted: [
+          {'row_id': 't2', 'deleted_at': '2025-01-03T00:00:00.000Z'},
+        ],
+      );
+
+      expect(
+          (await store.rows(userId, 'trips')).map((r) => r['id']), ['t1']);
+      expect((await store.row(userId, 'trips', 't1'))?['name'], 'Paris');
+      expect(store.watermark(userId, 'trips'), DateTime.utc(2025, 1, 2));
+      expect(store.watermark(userId, 'trips#tombstones'),
+          DateTime.utc(2025, 1, 3));
+    });
+
+    test('never moves a watermark backwards', () async {
+      await store.setWatermark(userId, 'trips', DateTime.utc(2025, 1, 5));
+
+      await DeltaSync.applyPreloaded(
+        store,
+        scope: userId,
+        table: 'trips',
+        full: false,
+        rows: [
+          {'id': 't1', 'updated_at': '2025-01-02T00:00:00.000Z'},
+        ],
+      );
+
+      expect(store.watermark(userId, 'trips'), DateTime.utc(2025, 1, 5));
+    });
+
+    test('a full payload replaces local rows', () async {
+      await store.upsertRows(LocalStore.globalScope, 'badges', [
+        {'id': 'old'},
+      ]);
+
+      await DeltaSync.applyPreloaded(
+        store,
+        scope: LocalStore.globalScope,
+        table: 'badges',
+        full: true,
+        rows: [
+          {'id': 'b1', 'updated_at': '2025-01-02T00:00:00.000Z'},
+        ],
+      );
+
+      final badges = await store.rows(LocalStore.globalScope, 'badges');
+      expect(badges.map((r) => r['id']), ['b1']);
+    });
+  });
+}
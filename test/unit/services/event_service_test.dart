@@ -0,0 +1,144 @@
+import 'package:flutter_test/flutter_test.dart';
+import 'package:fittravel/services/event_service.dart';
+
+void main() {
+  group('EventService city cache', () {
+    late List<EventQuery> queries;
+    late DateTime now;
+    late int rowsPerPage;
+    late bool failFetch;
+    late EventService service;
+
+    Map<String, dynamic> row(String city, int i) => {
+          'id': '$city-$i',
+          'title': 'Event $i in $city',
+          'category': 'running',
+          'start_date':
+              DateTime.utc(2025, 6, 1).add(Duration(hours: i)).toIso8601String(),
+          'venue_name': 'Park',
+        };
+
+    setUp(() {
+      queries = [];
+      now = DateTime(2025, 5, 1, 9);
+      rowsPerPage = 3;
+      failFetch = false;
+      service = EventService(
+        clock: () => now,
+        fetchPage: (query) async {
+          queries.add(query);
+          if (failFetch) throw Exception('offline');
+          final offset = query.after == null ? 0 : rowsPerPage;
+          return [
+            for (var i = 0; i < rowsPerPage; i++) row(query.city, offset + i),
+          ];
+        },
+      );
+    });
+
+    test('serves a revisited city from cache', () async {
+      await service.fetchEventsForCity(city: 'Cairo');
+      await service.fetchEventsForCity(city: 'Dahab');
+      await service.fetchEventsForCity(city: 'cairo ');
+
+      expect(queries.map((q) => q.city), ['Cairo', 'Dahab']);
+      expect(service.destinationEvents.first.id, 'Cairo-0');
+    });
+
+    test('evicts the least recently used city', () async {
+      for (var i = 0; i <= EventService.maxCachedCities; i++) {
+        await service.fetchEventsForCity(city: 'City $i');
+      }
+      expect(service.cachedCityCount, EventService.maxCachedCities);
+
+      queries.clear();
+      await service.fetchEventsForCity(city: 'City 1');
+      await service.fetchEventsForCity(city: 'City 0');
+
+      expect(queries.map((q) => q.city), ['City 0']);
+    });
+
+    test('refetches once the cached city expires', () async {
+      await service.fetchEventsForCity(city: 'Cairo');
+      now = now.add(EventService.cityCacheTtl + const Duration(minutes: 1));
+      await service.fetchEventsForCity(city: 'Cairo');
+
+      expect(queries, hasLength(2));
+    });
+
+    test('keeps the current city when fetching another fails', () async {
+      await service.fetchEventsForCity(city: 'Cairo');
+      failFetch = true;
+      await service.fetchEventsForCity(city: 'Dahab');
+
+      expect(service.destinationEvents.first.id, 'Cairo-0');
+      expect(service.isLoading, isFalse);
+    });
+
+    test('pages with the last event as keyset cursor', () async {
+      rowsPerPage = EventService.pageSize;
+      await service.fetchEventsForCity(city: 'Cairo');
+      expect(service.hasMoreDestinationEvents, isTrue);
+
+      await service.fetchMoreEventsForCity();
+
+      final cursor = queries.last.after!;
+      expect(cursor.$2, 'Cairo-${EventService.pageSize - 1}');
+      expect(service.destinationEvents, hasLength(EventService.pageSize * 2));
+    });
+
+    test('pages until the loaded events cover a date range', () async {
+      rowsPerPage = EventService.pageSize;
+      final calls = <int>[];
+      service = EventService(
+        clock: () => now,
+        fetchPage: (query) async {
+          queries.add(query);
+          // One event per hour, continuing after the cursor
+          final after = query.after?.$2.split('-').last;
+          final offset = after == null ? 0 : int.parse(after) + 1;
+          calls.add(offset);
+          return [
+            for (var i = 0; i < rowsPerPage; i++) row(query.city, offset + i),
+          ];
+        },
+      );
+      await service.fetchEventsForCity(city: 'Cairo');
+
+      // 120 hours of events: the third page is the first to pass the end
+      await service.fetchMoreEventsThrough(DateTime.utc(2025, 6, 6));
+
+      expect(calls, [0, 50, 100]);
+      expect(service.destinationEvents, hasLength(150));
+    });
+
+    test('queries a bounding box when coordinates are given', () async {
+      await service.fetchEventsForCity(
+        city: 'Cairo',
+        latitude: 30.0,
+        longitude: 31.2,
+        radiusKm: 10,
+      );
+
+      final params = queries.single.toRpcParams();
+      expect(params['p_city'], 'Cairo');
+      expect(params['p_min_lat'], closeTo(29.91, 0.01));
+      expect(params['p_max_lat'], closeTo(30.09, 0.01));
+      expect(params['p_min_lng'], lessThan(31.2));
+      expect(params.containsKey('p_after_id'), isFalse);
+    });
+
+    test('caches each bounding box of a city separately', () async {
+      await service.fetchEventsForCity(city: 'Cairo');
+      await service.fetchEventsForCity(
+          city: 'Cairo', latitude: 30.0, longitude: 31.2, radiusKm: 10);
+      await service.fetchEventsForCity(
+          city: 'Cairo', latitude: 30.0, longitude: 31.2, radiusKm: 50);
+      await service.fetchEventsForCity(
+          city: 'Cairo', latitude: 30.0001, longitude: 31.2, radiusKm: 10);
+
+      expect(queries.map((q) => q.bounds != null), [false, true, true]);
+      expect(service.cachedCityCount, 3);
+    });
+  });
+}
@@ -0,0 +1,270 @@
+import 'package:flutter_test/flutter_test.dart';
+import 'package:http/http.dart' as http;
+import 'package:shared_preferences/shared_preferences.dart';
+import 'package:supabase_flutter/supabase_flutter.dart';
+import 'package:fittravel/services/local_row_database.dart';
+import 'package:fittravel/services/local_store.dart';
+
+void main() {
+  TestWidgetsFlutterBinding.ensureInitialized();
+
+  group('LocalStore', () {
+    late LocalStore store;
+
+    setUp(() async {
+      SharedPreferences.setMockInitialValues({});
+      LocalStore.resetInstance(database: PrefsRowDatabase());
+      store = await LocalStore.getInstance();
+      await store.clearScope('user-1');
+      await store.clearScope('user-2');
+    });
+
+    test('upsert merges into existing rows by id', () async {
+      await store.upsertRows('user-1', 'trips', [
+        {'id': 't1', 'name': 'Paris', 'notes': 'hotel'},
+      ]);
+      await store.upsertRows('user-1', 'trips', [
+        {'id': 't1', 'name': 'Paris 2025'},
+      ]);
+
+      expect(store.row('user-1', 'trips', 't1'),
+          {'id': 't1', 'name': 'Paris 2025', 'notes': 'hotel'});
+      expect(await store.rows('user-1', 'trips'), hasLength(1));
+    });
+
+    test('rows survive a restart once persisted', () async {
+      await store.upsertRows('user-1', 'trips', [
+        {'id': 't1', 'name': 'Paris'},
+      ]);
+      await store.persist();
+
+      LocalStore.resetInstance(database: PrefsRowDatabase());
+      final reopened = await LocalStore.getInstance();
+      expect(
+          (await reopened.row('user-1', 'trips', 't1'))?['name'], 'Paris');
+    });
+
+    test('persists only the rows that changed', () async {
+      final database = _RecordingRowDatabase();
+      LocalStore.resetInstance(database: database);
+      store = await LocalStore.getInstance();
+      await store.replaceRows('user-1', 'trips', [
+        {'id': 't1'},
+        {'id': 't2'},
+      ]);
+      await store.persist();
+      database.writes.clear();
+
+      await store.upsertRows('user-1', 'trips', [
+        {'id': 't1', 'name': 'Paris'},
+      ]);
+      await store.deleteRows('user-1', 'trips', ['t2']);
+      await store.persist();
+
+      expect(database.writes, [
+        {
+          't1': {'id': 't1', 'name': 'Paris'},
+          't2': null,
+        }
+      ]);
+    });
+
+    test('moves a table saved as one blob into the row database', () async {
+      SharedPreferences.setMockInitialValues({
+        'local_store:user-1:trips':
+            '{"t1": {"id": "t1", "name": "Paris"}}',
+      });
+      LocalStore.resetInstance(database: PrefsRowDatabase());
+      store = await LocalStore.getInstance();
+
+      expect((await store.row('user-1', 'trips', 't1'))?['name'], 'Paris');
+      final prefs = await SharedPreferences.getInstance();
+      expect(prefs.containsKey('local_store:user-1:trips'), isFalse);
+      expect(prefs.containsKey('local_row:user-1:trips:t1'), isTrue);
+    });
+
+    test('clearScope drops rows and watermarks of that scope only', () async {
+      await store.upsertRows('user-1', 'trips', [
+        {'id': 't1'},
+      ]);
+      await store.upsertRows('user-2', 'trips', [
+        {'id': 't2'},
+      ]);
+      await store.setWatermark('user-1', 'trips', DateTime.utc(2025, 1, 1));
+      await store.setWatermark('user-2', 'trips', DateTime.utc(2025, 1, 2));
+
+      await store.clearScope('user-1');
+
+      expect(await store.rows('user-1', 'trips'), isEmpty);
+      expect(store.watermark('user-1', 'trips'), isNull);
+      expect(await store.rows('user-2', 'trips'), hasLength(1));
+      expect(store.watermark('user-2', 'trips'), DateTime.utc(2025, 1, 2));
+    });
+
+    test('deleteWhere removes matching rows', () async {
+      await store.upsertRows('user-1', 'itinerary_items', [
+        {'id': 'i1', 'trip_id': 't1'},
+        {'id': 'i2', 'trip_id': 't2'},
+      ]);
+
+      await store.deleteWhere(
+          'user-1', 'itinerary_items', (row) => row['trip_id'] == 't1');
+
+      final items = await store.rows('user-1', 'itinerary_items');
+      expect(items.map((r) => r['id']), ['i2']);
+    });
+  });
+
+  group('PendingWrite', () {
+    test('round-trips through json', () {
+      final write = PendingWrite.update(
+        'trips',
+        {'name': 'Paris'},
+        filters: {'id': 't1'},
+      ).withAttempt();
+
+      final restored = PendingWrite.fromJson(write.toJson());
+
+      expect(restored.id, write.id);
+      expect(restored.op, WriteOp.update);
+      expect(restored.table, 'trips');
+      expect(restored.data, {'name': 'Paris'});
+      expect(restored.filters, {'id': 't1'});
+      expect(restored.attempts, 1);
+    });
+  });
+
+  group('Offline write replay', () {
+    late LocalStore store;
+    late List<String> sent;
+    // Write id -> error to throw instead of sending
+    late Map<String, Object> failing;
+
+    setUp(() async {
+      SharedPreferences.setMockInitialValues({});
+      sent = [];
+      failing = {};
+      LocalStore.resetInstance(execute: (write) async {
+        final error = failing[write.id];
+        if (error != null) throw error;
+        sent.add(write.id);
+      });
+      store = await LocalStore.getInstance();
+      await store.clearPendingWrites();
+    });
+
+    tearDown(LocalStore.resetInstance);
+
+    PendingWrite update(String id, String rowId) => PendingWrite(
+          id: id,
+          op: WriteOp.update,
+          table: 'trips',
+          data: {'name': id},
+          filters: {'id': rowId},
+        );
+
+    Future<void> queue(List<PendingWrite> writes) async {
+      // Offline, so everything lands in the outbox
+      for (final w in writes) {
+        failing[w.id] = http.ClientException('offline');
+      }
+      for (final w in writes) {
+        await store.writeOrQueue(w);
+      }
+      failing.clear();
+    }
+
+    test('replays queued writes in order once back online', () async {
+      await queue([update('w1', 't1'), update('w2', 't2'), update('w3', 't1')]);
+
+      expect(await store.replayPendingWrites(), 3);
+      expect(sent, ['w1', 'w2', 'w3']);
+      expect(store.pendingWrites, isEmpty);
+    });
+
+    test('network failures stop the replay and never count', () async {
+      await queue([update('w1', 't1'), update('w2', 't2')]);
+      failing['w1'] = http.ClientException('offline');
+
+      for (var i = 0; i < LocalStore.maxWriteAttempts * 2; i++) {
+        expect(await store.replayPendingWrites(), 0);
+      }
+
+      expect(sent, isEmpty);
+      expect(store.pendingWrites.map((w) => w.id), ['w1', 'w2']);
+      expect(store.pendingWrites.first.attempts, 0);
+    });
+
+    test('a rejected write only holds back writes to the same row', () async {
+      await queue([update('w1', 't1'), update('w2', 't2'), update('w3', 't1')]);
+      failing['w1'] = PostgrestException(message: 'denied', code: '42501');
+
+      expect(await store.replayPendingWrites(), 1);
+
+      expect(sent, ['w2']);
+      expect(store.pendingWrites.map((w) => w.id), ['w1', 'w3']);
+      expect(store.pendingWrites.first.attempts, 1);
+    });
+
+    test('drops and reports a write rejected too many times', () async {
+      await queue([update('w1', 't1'), update('w2', 't1')]);
+      failing['w1'] = PostgrestException(message: 'denied', code: '42501');
+      final dropped = <DroppedWrite>[];
+      final sub = LocalStore.droppedWrites.listen(dropped.add);
+
+      for (var i = 0; i < LocalStore.maxWriteAttempts; i++) {
+        await store.replayPendingWrites();
+      }
+      await pumpEventQueue();
+      await sub.cancel();
+
+      expect(dropped.map((d) => d.write.id), ['w1']);
+      expect(sent, ['w2']);
+      expect(store.pendingWrites, isEmpty);
+    });
+
+    test('queued writes survive a restart', () async {
+      await queue([update('w1', 't1')]);
+
+      LocalStore.resetInstance(execute: (write) async => sent.add(write.id));
+      final reopened = await LocalStore.getInstance();
+
+      expect(await reopened.replayPendingWrites(), 1);
+      expect(sent, ['w1']);
+    });
+
+    test('classifies errors', () {
+      expect(LocalStore.isRejection(http.ClientException('offline')), isFalse);
+      expect(
+          LocalStore.isRejection(
+              PostgrestException(message: 'bad gateway', code: '502')),
+          isFalse);
+      expect(
+          LocalStore.isRejection(
+              PostgrestException(message: 'JWT expired', code: 'PGRST301')),
+          isFalse);
+      expect(
+          LocalStore.isRejection(
+              PostgrestException(message: 'duplicate', code: '23505')),
+          isTrue);
+    });
+  });
+}
+
+/// Records each write and otherwise stores nothing
+class _RecordingRowDatabase implements LocalRowDatabase {
+  final List<Map<String, Map<String, dynamic>?>> writes = [];
+
+  @override
+  Future<List<Map<String, dynamic>>> load(String scope, String table) async =>
+      [];
+
+  @override
+  Future<void> write(String scope, String table,
+      Map<String, Map<String, dynamic>?> rows) async {
+    writes.add(Map.of(rows));
+  }
+
+  @override
+  Future<void> deleteScope(String scope) async {}
+}
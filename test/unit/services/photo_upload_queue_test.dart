@@ -0,0 +1,250 @@
+import 'dart:async';
+import 'dart:io';
+import 'dart:typed_data';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:image/image.dart' as img;
+import 'package:shared_preferences/shared_preferences.dart';
+import 'package:fittravel/services/image_processing_pool.dart';
+import 'package:fittravel/services/photo_file_store.dart';
+import 'package:fittravel/services/photo_upload_queue.dart';
+import 'package:fittravel/services/storage_service.dart';
+
+ProcessedImage _fakeProcessed(Uint8List bytes) =>
+    ProcessedImage(full: bytes, thumbnail: bytes);
+
+/// Completes once [done] holds, checked on every notification
+Future<void> _until(ChangeNotifier notifier, bool Function() done) {
+  if (done()) return Future.value();
+  final completer = Completer<void>();
+  void check() {
+    if (!done()) return;
+    notifier.removeListener(check);
+    completer.complete();
+  }
+
+  notifier.addListener(check);
+  return completer.future;
+}
+
+/// Files lost since the previous session
+class _EmptyFileStore extends PhotoFileStore {
+  @override
+  Future<ProcessedImage?> read(String jobId) async => null;
+}
+
+/// Disk full
+class _FailingFileStore extends PhotoFileStore {
+  @override
+  Future<void> write(String jobId, ProcessedImage image) async =>
+      throw const FileSystemException('No space left on device');
+
+  @override
+  Future<void> delete(String jobId) async {}
+}
+
+void main() {
+  group('PhotoUploadQueue', () {
+    late int inFlight;
+    late int maxInFlight;
+    late Map<String, int> failuresLeft;
+    late List<String> uploaded;
+
+    PhotoUploadQueue createQueue() => PhotoUploadQueue(
+          persist: false,
+          currentUserId: () => 'user-1',
+          processor: (bytes) async => _fakeProcessed(bytes),
+          retryDelay: const Duration(milliseconds: 1),
+          uploader: (job, image, onProgress) async {
+            inFlight++;
+            maxInFlight = inFlight > maxInFlight ? inFlight : maxInFlight;
+            await Future<void>.delayed(const Duration(milliseconds: 5));
+            inFlight--;
+            final left = failuresLeft[job.filename] ?? 0;
+            if (left > 0) {
+              failuresLeft[job.filename] = left - 1;
+              throw Exception('offline');
+            }
+            onProgress(1);
+            uploaded.add(job.filename);
+            return {'id': job.id, 'image_url': job.storagePath};
+          },
+        );
+
+    setUp(() {
+      inFlight = 0;
+      maxInFlight = 0;
+      failuresLeft = {};
+      uploaded = [];
+    });
+
+    Future<PhotoUploadJob> enqueue(PhotoUploadQueue queue, String name) =>
+        queue.enqueue(
+          kind: PhotoUploadKind.quick,
+          userId: 'user-1',
+          imageBytes: Uint8List.fromList([1, 2, 3]),
+          photoId: name,
+        );
+
+    /// Enqueue and wait for the uploaded row
+    Future<Map<String, dynamic>> upload(
+        PhotoUploadQueue queue, String name) async {
+      final done = queue.completed.firstWhere((d) => d.$1.filename == name);
+      await enqueue(queue, name);
+      return (await done).$2;
+    }
+
+    test('returns once the job is queued, before it uploads', () async {
+      final release = Completer<void>();
+      final queue = PhotoUploadQueue(
+        persist: false,
+        currentUserId: () => 'user-1',
+        processor: (bytes) async => _fakeProcessed(bytes),
+        uploader: (job, image, onProgress) async {
+          await release.future;
+          return {'id': job.id};
+        },
+      );
+
+      final job = await enqueue(queue, 'slow');
+
+      expect(queue.jobs.single.id, job.id);
+      expect(queue.progressOf(PhotoUploadKind.quick), isNotNull);
+      final done = queue.completed.first;
+      release.complete();
+      expect((await done).$1.id, job.id);
+      expect(queue.jobs, isEmpty);
+    });
+
+    test('bounds concurrent uploads', () async {
+      final queue = createQueue();
+      await Future.wait([for (var i = 0; i < 6; i++) upload(queue, 'p$i')]);
+
+      expect(uploaded, hasLength(6));
+      expect(maxInFlight, PhotoUploadQueue.maxConcurrentUploads);
+      expect(queue.jobs, isEmpty);
+    });
+
+    test('retries failed uploads with backoff until they succeed', () async {
+      final queue = createQueue();
+      failuresLeft['flaky'] = 2;
+
+      final row = await upload(queue, 'flaky');
+
+      expect(row['image_url'], 'user-1/flaky.jpg');
+      expect(uploaded, ['flaky']);
+    });
+
+    test('keeps a job that exhausted its attempts and resumes it', () async {
+      final queue = createQueue();
+      failuresLeft['offline'] = PhotoUploadQueue.maxAttempts;
+
+      final job = await enqueue(queue, 'offline');
+      await _until(queue, () => job.status == PhotoUploadStatus.failed);
+      expect(queue.jobs.single.id, job.id);
+      expect(queue.progressOf(PhotoUploadKind.quick), isNull);
+
+      final done = queue.completed.first;
+      await queue.resume();
+      final (resumed, row) = await done;
+
+      expect(resumed.id, job.id);
+      expect(row['id'], job.id);
+      expect(queue.jobs, isEmpty);
+    });
+
+    test('fails the enqueue and drops the job when saving fails', () async {
+      TestWidgetsFlutterBinding.ensureInitialized();
+      SharedPreferences.setMockInitialValues({});
+      final queue = PhotoUploadQueue(
+        currentUserId: () => 'user-1',
+        files: _FailingFileStore(),
+        processor: (bytes) async => _fakeProcessed(bytes),
+        uploader: (job, image, onProgress) async => {'id': job.id},
+      );
+
+      await expectLater(
+          enqueue(queue, 'p'), throwsA(isA<FileSystemException>()));
+      expect(queue.jobs, isEmpty);
+    });
+
+    test('forgets persisted jobs whose image is gone', () async {
+      TestWidgetsFlutterBinding.ensureInitialized();
+      SharedPreferences.setMockInitialValues({});
+      final storage = await StorageService.getInstance();
+      final lost = PhotoUploadJob(kind: PhotoUploadKind.quick, userId: 'u');
+      await storage.setJsonList(StorageKeys.photoUploadQueue, [lost.toJson()]);
+      final queue = PhotoUploadQueue(
+        currentUserId: () => 'u',
+        files: _EmptyFileStore(),
+        uploader: (job, image, onProgress) async => {'id': job.id},
+      );
+
+      await queue.resume();
+
+      expect(queue.jobs, isEmpty);
+      expect(storage.getJsonList(StorageKeys.photoUploadQueue), isEmpty);
+    });
+
+    test('reports progress while uploading', () async {
+      final queue = createQueue();
+      final progress = <double>[];
+      queue.addListener(() {
+        final value = queue.progressOf(PhotoUploadKind.quick);
+        if (value != null) progress.add(value);
+      });
+
+      await upload(queue, 'p');
+
+      expect(progress, isNotEmpty);
+      expect(progress.last, greaterThanOrEqualTo(0.9));
+    });
+  });
+
+  group('processImageJob', () {
+    const options = ImageProcessingOptions(
+      maxWidth: 200,
+      maxHeight: 200,
+      thumbnailSize: 50,
+      jpegQuality: 85,
+    );
+
+    test('builds full image and thumbnail from one decode', () {
+      final source = img.encodePng(img.Image(width: 400, height: 100));
+
+      final result = processImageJob((bytes: source, options: options));
+
+      expect(result.wasProcessed, isTrue);
+      final full = img.decodeJpg(result.full)!;
+      final thumbnail = img.decodeJpg(result.thumbnail)!;
+      expect((full.width, full.height), (200, 50));
+      expect(thumbnail.width, 50);
+    });
+
+    test('square-crops avatars', () {
+      final source = img.encodePng(img.Image(width: 300, height: 120));
+
+      final result = processImageJob((
+        bytes: source,
+        options: const ImageProcessingOptions(
+          maxWidth: 200,
+          maxHeight: 200,
+          thumbnailSize: 50,
+          jpegQuality: 85,
+          squareCrop: true,
+        ),
+      ));
+
+      final avatar = img.decodeJpg(result.full)!;
+      expect((avatar.width, avatar.height), (50, 50));
+    });
+
+    test('falls back to the original bytes when decoding fails', () {
+      final garbage = Uint8List.fromList([0, 1, 2, 3]);
+
+      final result = processImageJob((bytes: garbage, options: options));
+
+      expect(result.wasProcessed, isFalse);
+      expect(result.full, garbage);
+    });
+  });
+}
@@ -0,0 +1,131 @@
+import 'dart:async';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:fittravel/models/place_model.dart';
+import 'package:fittravel/services/places_response_cache.dart';
+import 'package:fittravel/utils/geohash.dart';
+import '../../helpers/fixtures/place_fixtures.dart';
+
+void main() {
+  group('PlacesResponseCache', () {
+    late DateTime now;
+    late PlacesResponseCache cache;
+    late int fetchCount;
+
+    Future<List<PlaceModel>> fetch() async {
+      fetchCount++;
+      return [createTestPlace(id: 'place-$fetchCount')];
+    }
+
+    setUp(() {
+      now = DateTime(2025, 1, 1, 12);
+      fetchCount = 0;
+      cache = PlacesResponseCache(
+        maxMemoryEntries: 2,
+        persistToDisk: false,
+        clock: () => now,
+      );
+    });
+
+    test('serves fresh entries from memory', () async {
+      await cache.getOrFetch('a', fetch, ttl: const Duration(minutes: 5));
+      final second =
+          await cache.getOrFetch('a', fetch, ttl: const Duration(minutes: 5));
+
+      expect(fetchCount, 1);
+      expect(second.first.id, 'place-1');
+      expect(cache.stats.memoryHits, 1);
+      expect(cache.stats.misses, 1);
+    });
+
+    test('refetches after ttl when no stale window', () async {
+      await cache.getOrFetch('a', fetch, ttl: const Duration(minutes: 5));
+      now = now.add(const Duration(minutes: 6));
+      final result =
+          await cache.getOrFetch('a', fetch, ttl: const Duration(minutes: 5));
+
+      expect(fetchCount, 2);
+      expect(result.first.id, 'place-2');
+    });
+
+    test('serves stale entry and revalidates in background', () async {
+      await cache.getOrFetch('a', fetch,
+          ttl: const Duration(minutes: 5), staleTtl: const Duration(hours: 1));
+      now = now.add(const Duration(minutes: 10));
+
+      final stale = await cache.getOrFetch('a', fetch,
+          ttl: const Duration(minutes: 5), staleTtl: const Duration(hours: 1));
+      expect(stale.first.id, 'place-1');
+      expect(cache.stats.staleHits, 1);
+
+      // Let the background refresh complete
+      await Future<void>.delayed(Duration.zero);
+      final refreshed = await cache.getOrFetch('a', fetch,
+          ttl: const Duration(minutes: 5), staleTtl: const Duration(hours: 1));
+      expect(refreshed.first.id, 'place-2');
+      expect(fetchCount, 2);
+    });
+
+    test('coalesces concurrent identical requests', () async {
+      final completer = Completer<List<PlaceModel>>();
+      var calls = 0;
+      Future<List<PlaceModel>> slowFetch() {
+        calls++;
+        return completer.future;
+      }
+
+      final first =
+          cache.getOrFetch('a', slowFetch, ttl: const Duration(minutes: 5));
+      final second =
+          cache.getOrFetch('a', slowFetch, ttl: const Duration(minutes: 5));
+      completer.complete([createTestPlace()]);
+
+      await Future.wait([first, second]);
+      expect(calls, 1);
+      expect(cache.stats.coalesced, 1);
+    });
+
+    test('does not cache failed fetches', () async {
+      await expectLater(
+        cache.getOrFetch('a', () async => throw Exception('boom'),
+            ttl: const Duration(minutes: 5)),
+        throwsException,
+      );
+      await cache.getOrFetch('a', fetch, ttl: const Duration(minutes: 5));
+      expect(fetchCount, 1);
+    });
+
+    test('evicts least recently used entry', () async {
+      const ttl = Duration(minutes: 5);
+      await cache.getOrFetch('a', fetch, ttl: ttl);
+      await cache.getOrFetch('b', fetch, ttl: ttl);
+      await cache.getOrFetch('a', fetch, ttl: ttl); // touch a
+      await cache.getOrFetch('c', fetch, ttl: ttl); // evicts b
+
+      expect(cache.stats.evictions, 1);
+      await cache.getOrFetch('a', fetch, ttl: ttl);
+      expect(fetchCount, 3);
+      await cache.getOrFetch('b', fetch, ttl: ttl);
+      expect(fetchCount, 4);
+    });
+
+    test('buckets radius values', () {
+      expect(PlacesResponseCache.radiusBucket(800), 1000);
+      expect(PlacesResponseCache.radiusBucket(8047), 10000);
+      expect(PlacesResponseCache.radiusBucket(100000), 50000);
+    });
+  });
+
+  group('Geohash', () {
+    test('encodes known coordinate', () {
+      expect(Geohash.encode(57.64911, 10.40744, precision: 11), 'u4pruydqqvj');
+    });
+
+    test('center falls inside encoded cell', () {
+      final hash = Geohash.encode(40.7608, -111.8910, precision: 6);
+      final (lat, lng) = Geohash.center(hash);
+      expect(Geohash.encode(lat, lng, precision: 6), hash);
+      expect((lat - 40.7608).abs(), lessThan(0.01));
+      expect((lng - -111.8910).abs(), lessThan(0.01));
+    });
+  });
+}
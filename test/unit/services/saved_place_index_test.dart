@@ -0,0 +1,126 @@
+import 'package:flutter_test/flutter_test.dart';
+import 'package:fittravel/models/place_model.dart';
+import 'package:fittravel/services/saved_place_index.dart';
+import '../../helpers/fixtures/place_fixtures.dart';
+
+void main() {
+  group('SavedPlaceIndex', () {
+    late SavedPlaceIndex index;
+
+    setUp(() {
+      index = SavedPlaceIndex()
+        ..rebuild([
+          createTestPlace(
+            id: 'slc-gym',
+            googlePlaceId: 'g-slc-gym',
+            name: 'Iron Paradise Gym',
+            address: '123 Main St, Salt Lake City, UT',
+            latitude: 40.7608,
+            longitude: -111.8910,
+          ),
+          createTestPlace(
+            id: 'park-city',
+            googlePlaceId: 'g-park-city',
+            name: 'Park City Trailhead',
+            address: 'Park City, UT',
+            type: PlaceType.trail,
+            latitude: 40.6461,
+            longitude: -111.4980,
+          ),
+          createTestPlace(
+            id: 'paris-cafe',
+            googlePlaceId: 'g-paris-cafe',
+            name: 'Healthy Eats Cafe',
+            address: 'Rue de Rivoli, Paris',
+            type: PlaceType.restaurant,
+            latitude: 48.8566,
+            longitude: 2.3522,
+          ),
+        ]);
+    });
+
+    group('lookups', () {
+      test('finds places by id and google id', () {
+        expect(index.byId('slc-gym')?.name, 'Iron Paradise Gym');
+        expect(index.byGoogleId('g-paris-cafe')?.id, 'paris-cafe');
+        expect(index.containsGoogleId('g-park-city'), isTrue);
+        expect(index.containsGoogleId('missing'), isFalse);
+      });
+
+      test('remove drops place from every index', () {
+        index.remove('slc-gym');
+
+        expect(index.byId('slc-gym'), isNull);
+        expect(index.containsGoogleId('g-slc-gym'), isFalse);
+        expect(index.search('iron'), isEmpty);
+        expect(
+          index
+              .near(latitude: 40.7608, longitude: -111.8910, radiusMiles: 5)
+              .map((p) => p.id),
+          isEmpty,
+        );
+      });
+
+      test('replace keeps lookups pointing at the updated copy', () {
+        final visited = index.byId('slc-gym')!.copyWith(isVisited: true);
+        index.replace(visited);
+
+        expect(index.length, 3);
+        expect(index.byId('slc-gym')!.isVisited, isTrue);
+        expect(index.byGoogleId('g-slc-gym')!.isVisited, isTrue);
+      });
+    });
+
+    group('near', () {
+      test('returns places within radius only', () {
+        final results = index.near(
+          latitude: 40.7608,
+          longitude: -111.8910,
+          radiusMiles: 50,
+        );
+        expect(results.map((p) => p.id).toSet(), {'slc-gym', 'park-city'});
+      });
+
+      test('excludes places just outside a small radius', () {
+        final results = index.near(
+          latitude: 40.7608,
+          longitude: -111.8910,
+          radiusMiles: 10,
+        );
+        expect(results.map((p) => p.id), ['slc-gym']);
+      });
+
+      test('matches a linear Haversine scan across the antimeridian', () {
+        index.add(createTestPlace(
+          id: 'fiji',
+          googlePlaceId: 'g-fiji',
+          latitude: -17.7,
+          longitude: 179.9,
+        ));
+        final results =
+            index.near(latitude: -17.7, longitude: -179.9, radiusMiles: 30);
+        expect(results.map((p) => p.id), ['fiji']);
+      });
+    });
+
+    group('search', () {
+      test('matches substrings case-insensitively', () {
+        expect(index.search('PARADISE').map((p) => p.id), ['slc-gym']);
+        expect(index.search('ark cit').map((p) => p.id), ['park-city']);
+      });
+
+      test('matches address text', () {
+        expect(index.search('rivoli').map((p) => p.id), ['paris-cafe']);
+      });
+
+      test('short queries fall back to scanning cached text', () {
+        expect(index.search('ut').map((p) => p.id).toSet(),
+            {'slc-gym', 'park-city'});
+      });
+
+      test('returns empty for unknown terms', () {
+        expect(index.search('zzzz'), isEmpty);
+      });
+    });
+  });
+}
@@ -0,0 +1,71 @@
+import 'dart:math';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:fittravel/utils/marker_clusterer.dart';
+
+const _center = (40.7608, -111.8910);
+
+List<ClusterPoint> _generatePoints(int count) {
+  final random = Random(42);
+  return List.generate(count, (i) {
+    // Spread across roughly a 50km square
+    final lat = _center.$1 + (random.nextDouble() - 0.5) * 0.45;
+    final lng = _center.$2 + (random.nextDouble() - 0.5) * 0.6;
+    return ClusterPoint('place_$i', lat, lng);
+  });
+}
+
+ClusterViewport _viewportForFrame(int frame) {
+  // Pan east a little each frame, zoom 13 sized window
+  final offset = frame * 0.002;
+  return ClusterViewport(
+    south: _center.$1 - 0.04,
+    west: _center.$2 - 0.06 + offset,
+    north: _center.$1 + 0.04,
+    east: _center.$2 + 0.06 + offset,
+  );
+}
+
+void main() {
+  group('MarkerClusterer', () {
+    test('keeps cluster ids stable while panning at fixed zoom', () {
+      final points = _generatePoints(1000);
+      List<String> idsFor(int frame) => MarkerClusterer.cluster(ClusterRequest(
+            points: points,
+            viewport: _viewportForFrame(frame),
+            zoom: 13,
+          )).map((c) => c.id).toList();
+
+      final first = idsFor(0).toSet();
+      final second = idsFor(1).toSet();
+      expect(first.intersection(second).length, greaterThan(first.length ~/ 2));
+    });
+
+    test('does not cluster past max cluster zoom', () {
+      final points = _generatePoints(100);
+      final clusters = MarkerClusterer.cluster(
+          ClusterRequest(points: points, zoom: 17));
+      expect(clusters.length, 100);
+      expect(clusters.every((c) => c.isSingle), isTrue);
+    });
+
+    test('excludes points outside the viewport', () {
+      final clusters = MarkerClusterer.cluster(ClusterRequest(
+        points: const [
+          ClusterPoint('inside', 40.76, -111.89),
+          ClusterPoint('outside', 48.85, 2.35),
+        ],
+        viewport: _viewportForFrame(0),
+        zoom: 17,
+      ));
+      expect(clusters.map((c) => c.id), ['inside']);
+    });
+
+    test('handles viewports crossing the antimeridian', () {
+      const viewport =
+          ClusterViewport(south: -20, west: 170, north: -10, east: -170);
+      expect(viewport.contains(-15, 175), isTrue);
+      expect(viewport.contains(-15, -175), isTrue);
+      expect(viewport.contains(-15, 0), isFalse);
+    });
+  });
+}
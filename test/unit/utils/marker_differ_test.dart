@@ -0,0 +1,66 @@
+import 'package:flutter_test/flutter_test.dart';
+import 'package:google_maps_flutter/google_maps_flutter.dart';
+import 'package:fittravel/utils/marker_clusterer.dart';
+import 'package:fittravel/utils/marker_differ.dart';
+
+MapCluster _cluster(String id, List<String> pointIds, {double lat = 1}) =>
+    MapCluster(id: id, latitude: lat, longitude: 2, pointIds: pointIds);
+
+void main() {
+  group('MarkerDiffer', () {
+    late MarkerDiffer differ;
+    late List<String> built;
+
+    setUp(() {
+      differ = MarkerDiffer();
+      built = [];
+    });
+
+    MarkerDiff update(List<MapCluster> clusters) =>
+        differ.update(clusters, (cluster) {
+          return (
+            MarkerDiffer.clusterSignature(cluster),
+            () {
+              built.add(cluster.id);
+              return Marker(markerId: MarkerId(cluster.id));
+            },
+          );
+        });
+
+    test('reuses markers whose signature is unchanged', () {
+      update([_cluster('a', ['1']), _cluster('b', ['2', '3'])]);
+      final first = differ.markers.toList();
+      built.clear();
+
+      final diff = update([_cluster('a', ['1']), _cluster('b', ['2', '3'])]);
+
+      expect(diff, (built: 0, removed: 0));
+      expect(built, isEmpty);
+      expect(differ.markers.toList(), first);
+    });
+
+    test('rebuilds changed markers and drops missing ones', () {
+      update([_cluster('a', ['1']), _cluster('b', ['2', '3'])]);
+      built.clear();
+
+      final diff = update([
+        _cluster('a', ['1'], lat: 5),
+        _cluster('c', ['4']),
+      ]);
+
+      expect(diff, (built: 2, removed: 1));
+      expect(built, ['a', 'c']);
+      expect(differ.markers.map((m) => m.markerId.value), ['a', 'c']);
+    });
+
+    test('item signatures follow the item and its saved state', () {
+      final item = Object();
+      expect(MarkerDiffer.itemSignature('place', item),
+          MarkerDiffer.itemSignature('place', item));
+      expect(MarkerDiffer.itemSignature('place', item, saved: true),
+          isNot(MarkerDiffer.itemSignature('place', item)));
+      expect(MarkerDiffer.itemSignature('place', Object()),
+          isNot(MarkerDiffer.itemSignature('place', item)));
+    });
+  });
+}